@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+指标采集微基准测试
+对比 /proc 采集器与 vmstat/df 子进程路径的单次采样开销
+"""
+
+import os
+import sys
+import time
+from typing import Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_guardian import FortressGuardian
+
+
+def bench(label: str, func: Callable[[], float], iterations: int) -> float:
+    """运行指定次数并打印平均耗时 (微秒)"""
+    func()  # 预热
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    per_call = (time.perf_counter() - start) / iterations * 1e6
+    print(f"{label:<28} {iterations:>6} 次  {per_call:>12.1f} us/次")
+    return per_call
+
+
+def main():
+    """主函数"""
+    guardian = FortressGuardian()
+
+    print("== CPU ==")
+    proc_cpu = bench("/proc/stat", guardian._get_cpu_usage, 10000)
+    vmstat_cpu = bench("vmstat 1 2 (子进程)", guardian._get_cpu_usage_vmstat, 3)
+
+    print("== 磁盘 ==")
+    proc_disk = bench("os.statvfs", guardian._get_disk_usage, 10000)
+    df_disk = bench("df / (子进程)", guardian._get_disk_usage_df, 50)
+
+    print("== 内存 ==")
+    bench("/proc/meminfo", guardian._get_memory_usage, 10000)
+
+    print()
+    print(f"CPU 加速比:  {vmstat_cpu / proc_cpu:,.0f}x")
+    print(f"磁盘加速比: {df_disk / proc_disk:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+集群汇聚基准测试
+在本机启动收集器，另一个进程在单个事件循环中模拟数百个守护进程，
+按固定频率推送健康快照，测量收集器的消息吞吐与端到端延迟
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_fleet import FleetAgent, FleetCollector, NodeState
+
+MODULES = ("数据核心", "防御系统", "传输通道")
+
+
+def synthetic_snapshot(rng: random.Random, published_at: float) -> Dict[str, Any]:
+    """一个节点的健康快照，每次只有少数字段变化"""
+    return {
+        "status": "OPERATIONAL",
+        "published_at": published_at,
+        "health": {
+            "cpu_usage": round(rng.uniform(5, 95), 1),
+            "memory_usage": round(rng.uniform(30, 60), 1),
+            "disk_usage": 41.0,
+            "network_status": "connected",
+        },
+        "modules": {
+            name: {"status": "active" if rng.random() > 0.01 else "failed"}
+            for name in MODULES
+        },
+    }
+
+
+async def simulate(
+    url: str, agents: int, rate: float, duration: float, batch: int, flush: float
+):
+    """在一个事件循环中运行全部模拟节点"""
+    rng = random.Random(os.getpid())
+    fleet = [
+        FleetAgent(url, node=f"node-{i:05d}", flush_interval=flush, batch_size=batch)
+        for i in range(agents)
+    ]
+    tasks = [asyncio.ensure_future(agent.run()) for agent in fleet]
+    # 全部连上后再开始计时，建连阶段的快照不计入
+    deadline = time.time() + 60
+    while not all(agent.connected for agent in fleet) and time.time() < deadline:
+        await asyncio.sleep(0.05)
+    interval = 1.0 / rate
+    # 各节点的发送时间在周期内错开
+    offsets = sorted(rng.uniform(0, interval) for _ in fleet)
+    start = time.time()
+    tick = 0
+    while time.time() - start < duration:
+        base = start + tick * interval
+        for agent, offset in zip(fleet, offsets):
+            delay = base + offset - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            now = time.time()
+            agent.submit(synthetic_snapshot(rng, now), now)
+        tick += 1
+    await asyncio.sleep(0.5)  # 等待最后一批发出
+    for agent in fleet:
+        agent.stop(timeout=0)
+    await asyncio.gather(*tasks, return_exceptions=True)
+    dropped = sum(agent.dropped for agent in fleet)
+    reconnects = sum(agent.reconnects for agent in fleet)
+    print(f"模拟端: 丢弃 {dropped} 条增量，重连 {reconnects} 次")
+
+
+def run_agents(*args):
+    asyncio.run(simulate(*args))
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="集群汇聚基准")
+    parser.add_argument("--agents", type=int, default=300, help="模拟节点数")
+    parser.add_argument("--rate", type=float, default=5.0, help="每个节点每秒快照数")
+    parser.add_argument("--duration", type=float, default=10.0, help="推送时长 (秒)")
+    parser.add_argument("--batch", type=int, default=64, help="每批最多更新数")
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=0.0,
+        help="节点合并更新的等待时间 (秒)，0 表示只合并积压的更新",
+    )
+    args = parser.parse_args()
+
+    collector = FleetCollector("127.0.0.1", 0)
+    latencies: List[float] = []
+    received: List[float] = []  # 首条与最近一条消息的到达时间
+    apply = collector.apply
+
+    def recording_apply(state: NodeState, message: Dict[str, Any], size: int = 0):
+        apply(state, message, size)
+        now = time.time()
+        latencies.extend(now - update["ts"] for update in message["updates"])
+        received[1:] = [now]
+        if len(received) == 1:
+            received.append(now)
+
+    collector.apply = recording_apply  # type: ignore[method-assign]
+    port = collector.start()
+    url = f"ws://127.0.0.1:{port}"
+
+    # 模拟端在独立进程中运行，收集器独占本进程的事件循环
+    context = multiprocessing.get_context("spawn")
+    process = context.Process(
+        target=run_agents,
+        args=(
+            url,
+            args.agents,
+            args.rate,
+            args.duration,
+            args.batch,
+            args.flush_interval,
+        ),
+    )
+    process.start()
+    process.join()
+    stats = collector.stats()
+    elapsed = received[-1] - received[0] if received else float("nan")
+    collector.stop()
+
+    expected = args.agents * args.rate * args.duration
+    print(f"节点: {stats['nodes']}  连接拒绝: {stats['rejected']}")
+    print(
+        f"更新: {stats['updates']} / 约 {expected:.0f}  消息: {stats['messages']}  "
+        f"流量: {stats['bytes'] / 1024 / 1024:.1f} MB"
+    )
+    print(
+        f"吞吐: {stats['updates'] / elapsed:,.0f} 更新/秒  "
+        f"{stats['messages'] / elapsed:,.0f} 消息/秒  "
+        f"平均 {stats['bytes'] / max(stats['updates'], 1):.0f} 字节/更新"
+    )
+    print(
+        "端到端延迟: "
+        f"p50 {percentile(latencies, 50) * 1000:.1f}ms  "
+        f"p95 {percentile(latencies, 95) * 1000:.1f}ms  "
+        f"p99 {percentile(latencies, 99) * 1000:.1f}ms  "
+        f"最大 {max(latencies, default=0) * 1000:.1f}ms"
+    )
+    print(f"序列号缺口: {stats['gaps']}")
+
+
+if __name__ == "__main__":
+    main()
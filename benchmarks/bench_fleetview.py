@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+控制台集群视图基准测试
+以不同规模的合成节点填充集群视图，测量每帧耗时 (合并一批推送的
+节点摘要、构建帧并差异渲染) 与合并摘要的耗时，并与每帧完整重新
+排序的做法比较。帧耗时应不随节点数增长。
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_suite import FakeScreen
+from fortress_console import FortressConsole
+from fortress_fleetview import NODE_SORTS
+from fortress_render import DiffRenderer
+
+MODULES = ("数据核心", "防御系统", "传输通道")
+PRIORITIES = ("critical", "high", "medium")
+
+
+def synthetic_summary(rng: random.Random, index: int) -> Dict[str, Any]:
+    """一个节点的摘要 (与收集器推送给控制台的行相同)"""
+    statuses = ["active" if rng.random() > 0.02 else "failed" for _ in MODULES]
+    modules: Dict[str, int] = {}
+    for status in statuses:
+        modules[status] = modules.get(status, 0) + 1
+    return {
+        "node": f"node-{index:06d}",
+        "connected": rng.random() > 0.01,
+        "status": "OPERATIONAL",
+        "updated_at": time.time(),
+        "cpu_usage": round(rng.uniform(5, 95), 1),
+        "memory_usage": round(rng.uniform(30, 70), 1),
+        "disk_usage": 41.0,
+        "network_status": "connected",
+        "modules": modules,
+        "module_list": {
+            name: {"status": status, "priority": priority}
+            for name, status, priority in zip(MODULES, statuses, PRIORITIES)
+        },
+    }
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+
+def run(nodes: int, frames: int, batch: int, rng: random.Random) -> Dict[str, float]:
+    """返回各项耗时 (毫秒)"""
+    console = FortressConsole(feed_path="/nonexistent/feed")
+    screen = FakeScreen()
+    console.screen = screen
+    console.renderer = DiffRenderer(screen)
+    console.current_view = "fleet"
+    console.node_list.sort = "cpu"
+
+    start = time.perf_counter()
+    console.fleet.apply(synthetic_summary(rng, i) for i in range(nodes))
+    console.fleet.nodes.view("cpu")
+    load = time.perf_counter() - start
+
+    frame_times: List[float] = []
+    apply_times: List[float] = []
+    for _ in range(frames):
+        # 每帧合并一批变化的节点 (收集器每 0.5 秒推送一次)
+        updates = [synthetic_summary(rng, rng.randrange(nodes)) for _ in range(batch)]
+        console._fleet_updates.put(updates)
+        console.node_list.move(rng.randint(-20, 20))
+        start = time.perf_counter()
+        console.drain_fleet_updates()
+        merged = time.perf_counter()
+        console.renderer.render(console.build_frame())
+        end = time.perf_counter()
+        apply_times.append(merged - start)
+        frame_times.append(end - start)
+
+    # 对照: 每帧把全部节点重新排序后取一屏
+    key = NODE_SORTS["cpu"]
+    rows = list(console.fleet.nodes.rows.values())
+    start = time.perf_counter()
+    for _ in range(max(1, frames // 10)):
+        sorted(rows, key=key)[:40]
+    resort = (time.perf_counter() - start) / max(1, frames // 10)
+
+    return {
+        "load": load * 1000,
+        "frame_p50": statistics.median(frame_times) * 1000,
+        "frame_p99": percentile(frame_times, 99) * 1000,
+        "apply": statistics.median(apply_times) * 1000,
+        "resort": resort * 1000,
+    }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="控制台集群视图基准")
+    parser.add_argument(
+        "--nodes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 50000],
+        help="节点规模 (每个节点 3 个模块)",
+    )
+    parser.add_argument("--frames", type=int, default=200, help="每种规模的帧数")
+    parser.add_argument("--batch", type=int, default=200, help="每帧变化的节点数")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(
+        f"{'节点数':>8} {'建立(ms)':>10} {'帧p50(ms)':>10} {'帧p99(ms)':>10}"
+        f" {'合并(ms)':>10} {'全量排序(ms)':>12}"
+    )
+    with patch("curses.color_pair", return_value=0):
+        for nodes in args.nodes:
+            result = run(nodes, args.frames, args.batch, rng)
+            print(
+                f"{nodes:>8} {result['load']:>10.0f} {result['frame_p50']:>10.2f}"
+                f" {result['frame_p99']:>10.2f} {result['apply']:>10.2f}"
+                f" {result['resort']:>12.2f}"
+            )
+    print(f"帧耗时含合并 {args.batch} 个变化节点，全量排序为每帧重排全部节点的对照")
+
+
+if __name__ == "__main__":
+    main()
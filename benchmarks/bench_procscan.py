@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程排行扫描基准测试
+在合成的 /proc 目录树 (优先放在 /dev/shm) 中生成上万个进程，每轮
+少数进程变忙、少量进程退出与新建，测量增量扫描与取前 N 的耗时，
+并与每轮读取解析全部 stat 后完整排序的做法比较
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_collector import ProcessAccounting
+
+
+def write_stat(root: str, pid: int, ticks: int, rss: int):
+    fields = ["S", "1"] + ["0"] * 9 + [str(ticks), "0"] + ["0"] * 6
+    fields += [str(pid), "0", str(rss)] + ["0"] * 28
+    path = os.path.join(root, str(pid))
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "stat"), "w") as f:
+        f.write(f"{pid} (proc-{pid % 97}) {' '.join(fields)}\n")
+
+
+def full_scan(root: str, prev: Dict[int, int], top_n: int) -> List[Tuple[int, int]]:
+    """对照: 读取并解析全部 stat，完整排序取前 N"""
+    current: Dict[int, int] = {}
+    for entry in os.scandir(root):
+        if not entry.name.isdigit():
+            continue
+        with open(f"{root}/{entry.name}/stat", "rb") as f:
+            fields = f.read().decode().rpartition(")")[2].split()
+        current[int(entry.name)] = int(fields[11]) + int(fields[12])
+    deltas = sorted(
+        ((ticks - prev.get(pid, ticks), pid) for pid, ticks in current.items()),
+        reverse=True,
+    )
+    prev.clear()
+    prev.update(current)
+    return deltas[:top_n]
+
+
+def run(processes: int, rounds: int, busy: float, churn: float, base: Optional[str]):
+    root = tempfile.mkdtemp(prefix="fortress_proc_", dir=base)
+    try:
+        rng = random.Random(processes)
+        ticks = {pid: rng.randrange(1000) for pid in range(1, processes + 1)}
+        for pid, value in ticks.items():
+            write_stat(root, pid, value, rng.randrange(1000, 100000))
+        next_pid = processes + 1
+
+        accounting = ProcessAccounting(proc_root=root, top_n=5)
+        start = time.perf_counter()
+        accounting.top(accounting.scan(now=0))
+        cold = time.perf_counter() - start
+
+        incremental: List[float] = []
+        reads: List[int] = []
+        naive: List[float] = []
+        prev: Dict[int, int] = {}
+        full_scan(root, prev, 5)
+        for t in range(1, rounds + 1):
+            pids = list(ticks)
+            for pid in rng.sample(pids, int(len(pids) * busy)):
+                ticks[pid] += rng.randrange(1, 500)
+                write_stat(root, pid, ticks[pid], 50000)
+            for pid in rng.sample(pids, int(len(pids) * churn)):
+                del ticks[pid]
+                shutil.rmtree(os.path.join(root, str(pid)))
+                ticks[next_pid] = 0
+                write_stat(root, next_pid, 0, 1000)
+                next_pid += 1
+
+            start = time.perf_counter()
+            accounting.top(accounting.scan(now=t * 60))
+            incremental.append(time.perf_counter() - start)
+            reads.append(accounting.last_read)
+
+            start = time.perf_counter()
+            full_scan(root, prev, 5)
+            naive.append(time.perf_counter() - start)
+        return {
+            "cold": cold * 1000,
+            "incremental": statistics.median(incremental) * 1000,
+            "reads": statistics.median(reads),
+            "naive": statistics.median(naive) * 1000,
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="进程排行扫描基准")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 20000],
+        help="合成的进程数",
+    )
+    parser.add_argument("--rounds", type=int, default=12, help="每种规模的轮数")
+    parser.add_argument("--busy", type=float, default=0.02, help="每轮变忙的比例")
+    parser.add_argument("--churn", type=float, default=0.005, help="每轮退出的比例")
+    args = parser.parse_args()
+
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    print(f"合成 /proc 位于 {base or tempfile.gettempdir()}")
+    print(
+        f"{'进程数':>8} {'首轮(ms)':>10} {'增量(ms)':>10} {'读取文件':>10}"
+        f" {'全量排序(ms)':>12}"
+    )
+    for processes in args.processes:
+        result = run(processes, args.rounds, args.busy, args.churn, base)
+        print(
+            f"{processes:>8} {result['cold']:>10.1f} {result['incremental']:>10.1f}"
+            f" {result['reads']:>10.0f} {result['naive']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
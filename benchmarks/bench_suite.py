@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+守护进程与控制台热路径基准套件
+测量各采集器单次采样、一轮健康监控、健康日志吞吐、配置解析与控制台
+帧渲染的耗时，结果写成 JSON，并与保存的基线比较，退化超过阈值时
+以非零状态退出
+
+    python benchmarks/bench_suite.py                     # 与基线比较
+    python benchmarks/bench_suite.py --update-baseline   # 重写基线
+
+子进程回退路径 (vmstat/df) 的对比见 bench_collector.py。
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_config import ConfigCache
+from fortress_console import FortressConsole
+from fortress_guardian import DEFAULT_COLLECTOR_TIMEOUTS, FortressGuardian
+from fortress_render import DiffRenderer
+from fortress_trace import Tracer
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline.json"
+)
+DEFAULT_THRESHOLD = 25.0  # 百分比
+LOG_RECORDS = 20000
+
+
+class Case(NamedTuple):
+    name: str
+    func: Callable[[], Any]
+    iterations: int  # 每轮调用次数
+    ops: int = 1  # 每次调用包含的操作数 (吞吐类用例)
+
+
+class FakeScreen:
+    """只记录尺寸、丢弃输出的伪 curses 窗口"""
+
+    def __init__(self, height: int = 40, width: int = 120):
+        self.height = height
+        self.width = width
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def addstr(self, y, x, text, attr=0):
+        pass
+
+    def noutrefresh(self):
+        pass
+
+
+def local_listener() -> socket.socket:
+    """网络探测用的本地 TCP 监听，后台线程接受并立即关闭连接"""
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(128)
+
+    def accept():
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            conn.close()
+
+    threading.Thread(target=accept, daemon=True).start()
+    return listener
+
+
+def measure(case: Case, rounds: int) -> Dict[str, Any]:
+    """预热后运行若干轮，返回每次操作耗时 (微秒)
+
+    与基线比较的 us_per_op 取各轮最小值 (与 timeit 相同，受调度
+    抖动影响最小)，中位数一并记录。
+    """
+    case.func()
+    per_op: List[float] = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(case.iterations):
+            case.func()
+        elapsed = time.perf_counter() - start
+        per_op.append(elapsed / (case.iterations * case.ops) * 1e6)
+    return {
+        "us_per_op": min(per_op),
+        "median_us": statistics.median(per_op),
+        "iterations": case.iterations,
+        "ops": case.ops,
+        "rounds": rounds,
+    }
+
+
+def build_cases(work_dir: str, scale: float, listener: socket.socket) -> List[Case]:
+    """创建守护进程与控制台并准备各用例 (数据写入 work_dir)
+
+    网络探测指向本地监听 listener，不依赖外部网络。
+    """
+
+    def n(iterations: int) -> int:
+        return max(1, int(iterations * scale))
+
+    config_path = os.path.join(ROOT, "data_fortress_config.yaml")
+    guardian = FortressGuardian(config_path, cache_dir=None)
+    guardian.load_configuration()
+    logging.getLogger("FortressGuardian").setLevel(logging.WARNING)
+    feed_path = os.path.join(work_dir, "feed")
+    monitoring = guardian.config.setdefault("monitoring", {})
+    monitoring["feed"] = {"enabled": True, "path": feed_path}
+    monitoring["log_writer"] = {
+        "log_dir": work_dir,
+        "queue_size": LOG_RECORDS,
+        "overflow": "block",
+    }
+    monitoring["tsdb"] = dict(
+        monitoring.get("tsdb", {}) or {}, path=os.path.join(work_dir, "tsdb")
+    )
+    # 每次调用都实际探测一轮 (TTL 为 0)
+    monitoring["network_probe"] = {
+        "targets": [
+            {"kind": "tcp", "host": "127.0.0.1", "port": listener.getsockname()[1]}
+        ],
+        "ttl": 0,
+    }
+    monitoring.pop("prometheus", None)
+    monitoring.pop("fleet", None)
+    guardian.initialize_modules()
+
+    scheduler = guardian._build_scheduler()
+    scheduler.start()
+    scheduler.wait_ready(max(DEFAULT_COLLECTOR_TIMEOUTS.values()))
+    scheduler.stop()
+    record = guardian._monitor_iteration(scheduler)
+
+    def log_throughput():
+        guardian.log_writer = None
+        for _ in range(LOG_RECORDS):
+            guardian._log_health_data(record)
+        writer = guardian._get_log_writer()
+        writer.close(timeout=None)
+        if writer.dropped:
+            raise RuntimeError(f"健康日志丢弃了 {writer.dropped} 条记录")
+
+    def parse_config():
+        guardian.config_cache = ConfigCache(cache_dir=None)
+        guardian.load_configuration()
+
+    cached = ConfigCache(cache_dir=None)
+
+    def cached_config():
+        guardian.config_cache = cached
+        guardian.load_configuration()
+
+    console = FortressConsole(feed_path=feed_path)
+    screen = FakeScreen()
+    console.screen = screen
+    console.renderer = DiffRenderer(screen)
+
+    def render_frame():
+        assert console.renderer is not None
+        console.renderer.render(console.build_frame())
+
+    def redraw_frame():
+        assert console.renderer is not None
+        console.renderer.invalidate()
+        console.renderer.render(console.build_frame())
+
+    # 埋点开销: 关闭时应接近空函数调用
+    off, on = Tracer(), Tracer(enabled=True)
+
+    def noop():
+        pass
+
+    traced_off = off.traced("noop")(noop)
+    traced_on = on.traced("noop")(noop)
+
+    # 配置解析用例会替换 guardian.config，放在需要临时目录配置的用例之后
+    return [
+        Case("collector.cpu_usage", guardian._get_cpu_usage, n(5000)),
+        Case("collector.memory_usage", guardian._get_memory_usage, n(5000)),
+        Case("collector.disk_usage", guardian._get_disk_usage, n(5000)),
+        Case("collector.network_status", guardian._check_network, n(500)),
+        Case("collector.top_processes", guardian._get_top_processes, n(20)),
+        Case(
+            "monitor.iteration", lambda: guardian._monitor_iteration(scheduler), n(500)
+        ),
+        Case("log.health_record", log_throughput, 1, LOG_RECORDS),
+        Case("console.frame", render_frame, n(500)),
+        Case("console.full_redraw", redraw_frame, n(200)),
+        Case("trace.baseline_call", noop, n(100000)),
+        Case("trace.disabled_call", traced_off, n(100000)),
+        Case("trace.enabled_call", traced_on, n(100000)),
+        Case("config.parse", parse_config, n(50)),
+        Case("config.cached", cached_config, n(500)),
+    ]
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float,
+) -> List[str]:
+    """打印与基线的对比，返回退化超过 threshold 百分比的用例名"""
+    regressions = []
+    print(f"{'用例':<24} {'基线 us':>12} {'本次 us':>12} {'变化':>9}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or not base.get("us_per_op"):
+            print(f"{name:<24} {'--':>12} {result['us_per_op']:>12.2f} {'新增':>9}")
+            continue
+        change = (result["us_per_op"] - base["us_per_op"]) / base["us_per_op"] * 100
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  退化"
+        print(
+            f"{name:<24} {base['us_per_op']:>12.2f} "
+            f"{result['us_per_op']:>12.2f} {change:>+8.1f}%{flag}"
+        )
+    return regressions
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="守护进程与控制台热路径基准套件")
+    parser.add_argument("--output", help="结果 JSON 路径 (默认只打印)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基线 JSON 路径")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="允许的退化百分比，超过时以状态 1 退出",
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="用本次结果重写基线"
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=5,
+        help="每个用例的轮数 (与基线比较取最小值，中位数一并记录)",
+    )
+    parser.add_argument("--scale", type=float, default=1.0, help="每轮调用次数的倍率")
+    parser.add_argument("--filter", help="只运行名称包含该字符串的用例")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="fortress_bench_")
+    listener = local_listener()
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        # 控制台未初始化 curses，颜色属性取 0
+        with patch("curses.color_pair", return_value=0):
+            for case in build_cases(work_dir, args.scale, listener):
+                if args.filter and args.filter not in case.name:
+                    continue
+                results[case.name] = measure(case, args.rounds)
+                print(f"{case.name:<24} {results[case.name]['us_per_op']:>12.2f} us/次")
+    finally:
+        listener.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"基线已更新: {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"未找到基线 {args.baseline}，使用 --update-baseline 创建")
+        return 0
+
+    print()
+    regressions = compare(results, baseline.get("results", {}), args.threshold)
+    if regressions:
+        print(
+            f"\n{len(regressions)} 个用例退化超过 {args.threshold:.0f}%: "
+            + ", ".join(regressions)
+        )
+        return 1
+    print(f"\n全部用例在基线 {args.threshold:.0f}% 以内")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞告警引擎
+按规则评估实时指标，带滞回、持续时间、去重合并与限速，历史保存在环形缓冲区
+"""
+
+import itertools
+import logging
+import math
+import operator
+import time
+from collections import deque
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from fortress_history import MetricHistory, WindowStats
+
+DEFAULT_HISTORY = 200
+DEFAULT_HYSTERESIS = 5.0
+# 每分钟最多发出的告警通知数 (超出的计入 suppressed)
+DEFAULT_RATE_LIMIT = 30
+# 告警附带的进程排行: 规则指标 -> 样本 top_processes 中的排行
+CONTEXT_RANKINGS = {"cpu_usage": "cpu", "memory_usage": "memory"}
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+class AlertRule(NamedTuple):
+    name: str
+    metric: str
+    op: str
+    threshold: Any
+    clear: Any  # 触发后需越过此值才恢复 (滞回)，None 表示与 threshold 相同
+    for_seconds: float  # 条件持续这么久才触发
+    repeat_interval: float  # 持续触发时每隔这么久再通知一次，0 表示只通知一次
+    severity: str  # "warning" 或 "critical"
+    message: str
+    stat: str = "value"  # 窗口统计量 (mean、p95、ewma、rate 等)，value 为最新读数
+    window: float = 0.0  # 统计窗口 (秒)，0 表示使用最新读数
+
+
+class Alert(NamedTuple):
+    rule: str
+    severity: str
+    state: str  # "firing" 或 "resolved"
+    value: Any
+    started_at: float
+    timestamp: float
+    hits: int  # 本次触发期间合并的通知次数
+    message: str
+    # 触发时占用最高的进程: {"ranking": "cpu"/"memory", "processes": [...]}
+    context: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+    def culprits(self, limit: int = 3) -> str:
+        """进程排行的简短描述，如 "python3[812] 93.5%"；无排行时为空"""
+        if not self.context:
+            return ""
+        parts = []
+        for proc in self.context["processes"][:limit]:
+            if self.context["ranking"] == "memory":
+                usage = f"{proc['rss_kb'] / 1024:.0f}MB"
+            else:
+                usage = f"{proc['cpu_percent']:.1f}%"
+            parts.append(f"{proc['name']}[{proc['pid']}] {usage}")
+        return ", ".join(parts)
+
+
+class _RuleState:
+    __slots__ = ("pending_since", "alert", "last_notified")
+
+    def __init__(self):
+        self.pending_since: Optional[float] = None
+        self.alert: Optional[Alert] = None  # 正在触发的告警
+        self.last_notified = 0.0
+
+
+def default_rules(config: Dict[str, Any]) -> List[AlertRule]:
+    """未配置 monitoring.alerts.rules 时按 monitoring.alert_threshold 生成的规则"""
+    monitoring = config.get("monitoring", {}) or {}
+    threshold = float(monitoring.get("alert_threshold", 85))
+    hysteresis = float(
+        (monitoring.get("alerts", {}) or {}).get("hysteresis", DEFAULT_HYSTERESIS)
+    )
+    rules = [
+        AlertRule(
+            metric,
+            metric,
+            ">",
+            threshold,
+            threshold - hysteresis,
+            0.0,
+            0.0,
+            "warning",
+            f"{label}过高: {{value:.1f}}%",
+        )
+        for metric, label in (
+            ("cpu_usage", "CPU使用率"),
+            ("memory_usage", "内存使用率"),
+            ("disk_usage", "磁盘使用率"),
+        )
+    ]
+    rules.append(
+        AlertRule(
+            "network_down",
+            "network_status",
+            "==",
+            "disconnected",
+            None,
+            0.0,
+            0.0,
+            "critical",
+            "网络连接中断",
+        )
+    )
+    return rules
+
+
+def parse_rules(config: Dict[str, Any]) -> List[AlertRule]:
+    """解析 monitoring.alerts.rules (无效规则抛出 ValueError)"""
+    options = (config.get("monitoring", {}) or {}).get("alerts", {}) or {}
+    entries = options.get("rules")
+    if not entries:
+        return default_rules(config)
+    rules = []
+    for entry in entries:
+        op = str(entry.get("op", ">"))
+        if op not in _OPERATORS:
+            raise ValueError(f"告警规则 {entry.get('name')} 的比较符无效: {op}")
+        stat = str(entry.get("stat", "value"))
+        if stat != "value" and stat not in WindowStats._fields:
+            raise ValueError(f"告警规则 {entry.get('name')} 的统计量无效: {stat}")
+        rules.append(
+            AlertRule(
+                name=str(entry["name"]),
+                metric=str(entry["metric"]),
+                op=op,
+                threshold=entry["threshold"],
+                clear=entry.get("clear"),
+                for_seconds=float(entry.get("for", 0)),
+                repeat_interval=float(entry.get("repeat_interval", 0)),
+                severity=str(entry.get("severity", "warning")),
+                message=str(entry.get("message", f"{entry['name']}: {{value}}")),
+                stat=stat,
+                window=float(entry.get("window", 0)),
+            )
+        )
+    return rules
+
+
+class AlertEngine:
+    """规则告警引擎
+
+    每个样本只对每条规则做一次比较，并更新该规则的少量状态，代价
+    与规则数成正比，与告警历史长度无关；带 window 的规则比较共享
+    指标历史上的窗口统计量 (如 15 分钟 p95)。条件成立并持续 for_seconds 后
+    触发；触发后直到越过 clear 才恢复 (滞回)，在阈值附近抖动的
+    指标不会反复告警。触发期间的重复通知合并到同一条告警的 hits
+    中，按 repeat_interval 再通知；所有通知再经过全局限速。历史
+    保存在定长环形缓冲区中。
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[AlertRule] = (),
+        history: int = DEFAULT_HISTORY,
+        rate_limit: int = DEFAULT_RATE_LIMIT,
+        metrics: Optional[MetricHistory] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.logger = logger or logging.getLogger("FortressGuardian")
+        self.metrics = metrics  # 窗口规则读取的共享指标历史
+        self.history: Deque[Alert] = deque(maxlen=history)
+        self.rate_limit = rate_limit
+        self.suppressed = 0
+        self._sent: Deque[float] = deque()
+        # 规则与其状态作为一个整体替换，评估线程不会看到不匹配的两者
+        self._ruleset: Tuple[List[AlertRule], Dict[str, _RuleState]] = ([], {})
+        self.set_rules(rules)
+
+    @property
+    def rules(self) -> List[AlertRule]:
+        return self._ruleset[0]
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Dict[str, Any],
+        logger: Optional[logging.Logger] = None,
+        metrics: Optional[MetricHistory] = None,
+    ) -> "AlertEngine":
+        """按 monitoring.alerts 创建"""
+        options = (config.get("monitoring", {}) or {}).get("alerts", {}) or {}
+        return cls(
+            parse_rules(config),
+            history=int(options.get("history", DEFAULT_HISTORY)),
+            rate_limit=int(options.get("rate_limit", DEFAULT_RATE_LIMIT)),
+            metrics=metrics,
+            logger=logger,
+        )
+
+    def set_rules(self, rules: Sequence[AlertRule]):
+        """替换规则，同名规则保留触发状态 (配置重载)"""
+        for rule in rules:
+            if rule.op not in _OPERATORS:
+                raise ValueError(f"告警规则 {rule.name} 的比较符无效: {rule.op}")
+        states = self._ruleset[1]
+        self._ruleset = (
+            list(rules),
+            {rule.name: states.get(rule.name) or _RuleState() for rule in rules},
+        )
+
+    def _allow(self, now: float) -> bool:
+        """全局限速: 60 秒内最多 rate_limit 条通知"""
+        while self._sent and now - self._sent[0] >= 60:
+            self._sent.popleft()
+        if self.rate_limit and len(self._sent) >= self.rate_limit:
+            self.suppressed += 1
+            return False
+        self._sent.append(now)
+        return True
+
+    def _emit(self, alert: Alert, notify: List[Alert]):
+        self.history.append(alert)
+        if self._allow(alert.timestamp):
+            notify.append(alert)
+
+    def evaluate(
+        self, sample: Dict[str, Any], now: Optional[float] = None
+    ) -> List[Alert]:
+        """用一个样本评估全部规则，返回需要通知的告警 (触发、重复与恢复)"""
+        now = time.time() if now is None else now
+        notify: List[Alert] = []
+        rules, states = self._ruleset
+        for rule in rules:
+            value = self._value(rule, sample, now)
+            if value is None:
+                continue  # 无读数时保持原状态
+            state = states[rule.name]
+            compare = _OPERATORS[rule.op]
+            try:
+                if state.alert is not None:
+                    clear = rule.threshold if rule.clear is None else rule.clear
+                    if not compare(value, clear):
+                        alert = state.alert._replace(
+                            state="resolved", value=value, timestamp=now
+                        )
+                        state.alert = None
+                        state.pending_since = None
+                        self._emit(alert, notify)
+                    elif (
+                        rule.repeat_interval
+                        and now - state.last_notified >= rule.repeat_interval
+                    ):
+                        alert = state.alert._replace(
+                            value=value,
+                            timestamp=now,
+                            hits=state.alert.hits + 1,
+                            context=self._context(rule, sample),
+                        )
+                        state.alert = alert
+                        state.last_notified = now
+                        self._emit(alert, notify)
+                    continue
+                if not compare(value, rule.threshold):
+                    state.pending_since = None
+                    continue
+            except TypeError:
+                continue  # 指标类型与规则不匹配
+            if state.pending_since is None:
+                state.pending_since = now
+            if now - state.pending_since < rule.for_seconds:
+                continue
+            try:
+                message = rule.message.format(value=value)
+            except (ValueError, KeyError, IndexError):
+                message = rule.message
+            state.alert = Alert(
+                rule.name,
+                rule.severity,
+                "firing",
+                value,
+                state.pending_since,
+                now,
+                1,
+                message,
+                self._context(rule, sample),
+            )
+            state.last_notified = now
+            self._emit(state.alert, notify)
+        return notify
+
+    def _context(
+        self, rule: AlertRule, sample: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """CPU/内存告警附带样本中的进程排行"""
+        ranking = CONTEXT_RANKINGS.get(rule.metric)
+        if ranking is None:
+            return None
+        processes = (sample.get("top_processes") or {}).get(ranking)
+        if not processes:
+            return None
+        return {"ranking": ranking, "processes": processes}
+
+    def _value(self, rule: AlertRule, sample: Dict[str, Any], now: float) -> Any:
+        """规则比较的值: 最新读数，或共享历史中的窗口统计量"""
+        if not rule.window or rule.stat == "value":
+            return sample.get(rule.metric)
+        if self.metrics is None:
+            return None
+        value = getattr(self.metrics.stats(rule.metric, rule.window, now), rule.stat)
+        return None if isinstance(value, float) and math.isnan(value) else value
+
+    def active(self) -> List[Alert]:
+        """正在触发的告警"""
+        return [s.alert for s in self._ruleset[1].values() if s.alert is not None]
+
+    def recent(self, limit: int = 10) -> List[Alert]:
+        """最近的告警记录 (由旧到新)"""
+        return list(itertools.islice(reversed(self.history), max(limit, 0)))[::-1]
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞备份流水线
+内容定义分块 + 进程池哈希 + 持久化块索引去重 + 多目标并发上传
+对应 storage.backup_system
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+# 分块参数: 最小2KB、平均约8KB、最大64KB，滚动窗口48字节
+MIN_CHUNK = 2 * 1024
+AVG_CHUNK_BITS = 13
+MAX_CHUNK = 64 * 1024
+WINDOW = 48
+SEGMENT_SIZE = 8 * 1024 * 1024
+# 文件在分块之后被修改时，最多重新分块的次数
+RECHUNK_ATTEMPTS = 2
+
+# 固定种子的 gear 表，保证不同进程/主机的切分点一致
+GEAR = (
+    np.random.default_rng(0x46545253)
+    .integers(0, 2**32, size=256, dtype=np.uint64)
+    .astype(np.uint32)
+)
+
+ChunkRef = Tuple[int, str]  # (长度, sha256)
+
+
+def find_cuts(
+    data: np.ndarray,
+    final: bool,
+    min_size: int = MIN_CHUNK,
+    avg_bits: int = AVG_CHUNK_BITS,
+    max_size: int = MAX_CHUNK,
+) -> List[int]:
+    """返回内容定义的切分点 (块的结束位置)
+
+    滚动哈希取最近 WINDOW 字节 gear 值之和，用 cumsum 向量化计算；
+    Python 只遍历候选切分点。final 为 False 时末尾不足一块的数据
+    留给下一段。
+    """
+    n = len(data)
+    cuts: List[int] = []
+    if n == 0:
+        return cuts
+    sums = np.cumsum(GEAR[data], dtype=np.uint32)
+    window = sums.copy()
+    window[WINDOW:] -= sums[:-WINDOW]
+    mask = np.uint32((1 << avg_bits) - 1)
+    candidates = np.flatnonzero((window & mask) == 0) + 1
+
+    last = 0
+    for cut in candidates.tolist():
+        while cut - last > max_size:
+            last += max_size
+            cuts.append(last)
+        if cut - last >= min_size:
+            cuts.append(cut)
+            last = cut
+    while n - last > max_size:
+        last += max_size
+        cuts.append(last)
+    if final and last < n:
+        cuts.append(n)
+    return cuts
+
+
+def chunk_file(path: str) -> List[ChunkRef]:
+    """对单个文件分块并计算每块的 SHA-256 (进程池工作函数)"""
+    refs: List[ChunkRef] = []
+    carry = b""
+    with open(path, "rb") as f:
+        while True:
+            segment = f.read(SEGMENT_SIZE)
+            final = not segment
+            buf = carry + segment
+            if not buf:
+                break
+            start = 0
+            for cut in find_cuts(np.frombuffer(buf, dtype=np.uint8), final):
+                piece = buf[start:cut]
+                refs.append((len(piece), hashlib.sha256(piece).hexdigest()))
+                start = cut
+            carry = buf[start:]
+            if final:
+                break
+    return refs
+
+
+class ChunkIndex:
+    """某个备份目标已持有的块集合，追加写入的文本文件持久化"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.digests: Set[str] = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.digests.update(line.strip() for line in f if line.strip())
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self.digests
+
+    def add_many(self, digests: Iterable[str]):
+        with self._lock:
+            new = [d for d in digests if d not in self.digests]
+            if not new:
+                return
+            self.digests.update(new)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(d + "\n" for d in new)
+
+
+class LocalTarget:
+    """本地目录备份目标"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.url = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def get(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+
+class S3Target:
+    """S3 备份目标，client 需提供 boto3 风格的 put_object/get_object"""
+
+    def __init__(
+        self, url: str, client: Any = None, endpoint_url: Optional[str] = None
+    ):
+        if not url.startswith("s3://"):
+            raise ValueError(f"无效的S3地址: {url}")
+        self.url = url
+        bucket, _, prefix = url[len("s3://") :].partition("/")
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        if client is None:
+            import boto3
+
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.client = client
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put(self, key: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+
+    def get(self, key: str) -> bytes:
+        response = self.client.get_object(Bucket=self.bucket, Key=self._key(key))
+        data: bytes = response["Body"].read()
+        return data
+
+
+def make_target(location: str, **kwargs) -> Any:
+    """根据地址创建备份目标"""
+    if location.startswith("s3://"):
+        return S3Target(location, **kwargs)
+    return LocalTarget(location)
+
+
+def chunk_key(digest: str) -> str:
+    """块在目标中的存储键"""
+    return f"chunks/{digest[:2]}/{digest}"
+
+
+class BackupPipeline:
+    """去重增量备份流水线
+
+    大小与修改时间未变的文件直接沿用上次的块列表，不再读取；
+    变化的文件在进程池中分块哈希；每个目标只上传其索引中不存在
+    的块，所有目标的上传共享一个线程池，在途请求数受 max_inflight
+    限制。
+    """
+
+    def __init__(
+        self,
+        source_dir: str,
+        targets: List[Any],
+        state_dir: str,
+        workers: int = 1,
+        max_inflight: int = 8,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.source_dir = source_dir
+        self.targets = targets
+        self.state_dir = state_dir
+        self.workers = workers
+        self.max_inflight = max_inflight
+        self.logger = logger or logging.getLogger("FortressGuardian")
+        os.makedirs(state_dir, exist_ok=True)
+        self.indexes = {
+            t.url: ChunkIndex(
+                os.path.join(
+                    state_dir,
+                    f"index_{hashlib.sha1(t.url.encode()).hexdigest()[:16]}.txt",
+                )
+            )
+            for t in targets
+        }
+
+    @classmethod
+    def from_config(
+        cls, config: Dict[str, Any], logger: Optional[logging.Logger] = None, **kwargs
+    ) -> "BackupPipeline":
+        """根据 storage.backup_system 配置创建流水线"""
+        backup = (config.get("storage", {}) or {}).get("backup_system", {}) or {}
+        targets = [make_target(loc) for loc in backup.get("locations", [])]
+        return cls(
+            source_dir=backup.get("source_dir", "."),
+            targets=targets,
+            state_dir=backup.get("state_dir", ".fortress_backup"),
+            workers=int(backup.get("workers", os.cpu_count() or 1)),
+            max_inflight=int(backup.get("max_inflight", 8)),
+            logger=logger,
+            **kwargs,
+        )
+
+    @property
+    def _manifest_path(self) -> str:
+        return os.path.join(self.state_dir, "last_manifest.json")
+
+    def _load_previous(self) -> Dict[str, Any]:
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                previous: Dict[str, Any] = json.load(f).get("files", {})
+                return previous
+        except (OSError, ValueError):
+            return {}
+
+    def _scan(self) -> Iterator[Tuple[str, os.stat_result]]:
+        for root, dirs, files in os.walk(self.source_dir):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                try:
+                    yield os.path.relpath(path, self.source_dir), os.stat(path)
+                except OSError:
+                    continue
+
+    def run(self, snapshot: Optional[str] = None) -> Dict[str, Any]:
+        """执行一次备份，返回统计信息"""
+        started = time.monotonic()
+        snapshot = snapshot or time.strftime("%Y%m%dT%H%M%S")
+        previous = self._load_previous()
+        files: Dict[str, Dict[str, Any]] = {}
+        changed: List[str] = []
+
+        for rel, st in self._scan():
+            entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            old = previous.get(rel)
+            if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                entry["chunks"] = old["chunks"]
+            else:
+                changed.append(rel)
+            files[rel] = entry
+
+        paths = [os.path.join(self.source_dir, rel) for rel in changed]
+        if self.workers > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                chunked = list(pool.map(chunk_file, paths))
+        else:
+            chunked = [chunk_file(p) for p in paths]
+        for rel, refs in zip(changed, chunked):
+            files[rel]["chunks"] = refs
+
+        uploaded = uploaded_bytes = 0
+        attempts = 0
+        while True:
+            count, size, stale = self._upload(files)
+            uploaded += count
+            uploaded_bytes += size
+            if not stale:
+                break
+            # 上传时读到的块与分块时的哈希不符: 文件在此期间被修改
+            attempts += 1
+            for rel in sorted(stale):
+                refreshed = self._rechunk(rel) if attempts <= RECHUNK_ATTEMPTS else None
+                if refreshed is None:
+                    self.logger.warning(f"文件 {rel} 持续变化，本次快照不包含该文件")
+                    files.pop(rel, None)
+                else:
+                    files[rel] = refreshed
+            if attempts <= RECHUNK_ATTEMPTS:
+                self.logger.warning(f"{len(stale)} 个文件在备份期间被修改，已重新分块")
+
+        manifest = json.dumps(
+            {"snapshot": snapshot, "files": files}, ensure_ascii=False
+        ).encode("utf-8")
+        for target in self.targets:
+            target.put(f"manifests/{snapshot}.json", manifest)
+        tmp = self._manifest_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(manifest)
+        os.replace(tmp, self._manifest_path)
+
+        stats = {
+            "snapshot": snapshot,
+            "files": len(files),
+            "files_chunked": len(changed),
+            "chunks_uploaded": uploaded,
+            "bytes_uploaded": uploaded_bytes,
+            "seconds": time.monotonic() - started,
+        }
+        self.logger.info(
+            f"备份 {snapshot} 完成: {len(changed)}/{len(files)} 个文件变化，"
+            f"上传 {uploaded} 个块 ({uploaded_bytes} 字节)"
+        )
+        return stats
+
+    def _rechunk(self, rel: str) -> Optional[Dict[str, Any]]:
+        """重新分块单个文件；文件已不存在时返回None"""
+        path = os.path.join(self.source_dir, rel)
+        try:
+            st = os.stat(path)
+            return {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "chunks": chunk_file(path),
+            }
+        except OSError:
+            return None
+
+    def _pending_uploads(
+        self, files: Dict[str, Dict[str, Any]]
+    ) -> Iterator[Tuple[Any, str, str, int, int]]:
+        """生成 (目标, 块哈希, 相对路径, 偏移, 长度) 上传任务
+
+        未变化的文件也会检查索引 (仅集合查找)，新增目标或上次失败的
+        目标因此能补齐缺失的块。
+        """
+        seen: Dict[str, Set[str]] = {t.url: set() for t in self.targets}
+        for rel in files:
+            offset = 0
+            for length, digest in files[rel]["chunks"]:
+                for target in self.targets:
+                    if digest in self.indexes[target.url] or digest in seen[target.url]:
+                        continue
+                    seen[target.url].add(digest)
+                    yield target, digest, rel, offset, length
+                offset += length
+
+    def _upload(self, files: Dict[str, Dict[str, Any]]) -> Tuple[int, int, Set[str]]:
+        """上传缺失的块，返回 (块数, 字节数, 内容已变化的文件)"""
+        uploaded = 0
+        uploaded_bytes = 0
+        stale: Set[str] = set()
+        done_digests: Dict[str, List[str]] = {t.url: [] for t in self.targets}
+
+        def put_chunk(target, digest, path, offset, length) -> Optional[int]:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read(length)
+            # 块从源文件重新读取，上传前必须确认内容仍与分块时一致
+            if len(data) != length or hashlib.sha256(data).hexdigest() != digest:
+                return None
+            target.put(chunk_key(digest), data)
+            return len(data)
+
+        pool = ThreadPoolExecutor(max_workers=self.max_inflight)
+        inflight: Dict[Any, Tuple[str, str, str]] = {}
+        try:
+
+            def drain(block_until: int):
+                nonlocal uploaded, uploaded_bytes
+                while len(inflight) > block_until:
+                    done, _ = wait(list(inflight), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        url, digest, rel = inflight.pop(future)
+                        try:
+                            size = future.result()
+                        except FileNotFoundError:
+                            size = None
+                        if size is None:
+                            stale.add(rel)
+                            continue
+                        uploaded_bytes += size
+                        uploaded += 1
+                        done_digests[url].append(digest)
+
+            for target, digest, rel, offset, length in self._pending_uploads(files):
+                # 在途请求达到上限时等待，避免块数据无限堆积在内存中
+                drain(self.max_inflight - 1)
+                path = os.path.join(self.source_dir, rel)
+                future = pool.submit(put_chunk, target, digest, path, offset, length)
+                inflight[future] = (target.url, digest, rel)
+            drain(0)
+        finally:
+            pool.shutdown(wait=True)
+            # 已成功上传的块即使本次备份失败也记入索引
+            for url, digests in done_digests.items():
+                self.indexes[url].add_many(digests)
+        return uploaded, uploaded_bytes, stale
+
+
+def _restore_path(dest_dir: str, rel: str) -> str:
+    """清单中的相对路径在恢复目录内的位置，越出目录时抛出 ValueError"""
+    root = os.path.realpath(dest_dir)
+    path = os.path.realpath(os.path.join(root, rel))
+    if os.path.isabs(rel) or os.path.commonpath([root, path]) != root or path == root:
+        raise ValueError(f"清单中的路径越出恢复目录: {rel}")
+    return path
+
+
+def restore(target: Any, snapshot: str, dest_dir: str) -> int:
+    """从备份目标恢复快照到目录，返回恢复的文件数
+
+    清单与块来自远端目标，不可信: 越出 dest_dir 的路径或哈希不符的块
+    抛出 ValueError，出错的文件不会留下不完整的内容。
+    """
+    manifest = json.loads(target.get(f"manifests/{snapshot}.json"))
+    files = [
+        (_restore_path(dest_dir, rel), entry["chunks"])
+        for rel, entry in manifest["files"].items()
+    ]
+    for path, chunks in files:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                for _, digest in chunks:
+                    if not isinstance(digest, str) or len(digest) != 64:
+                        raise ValueError(f"清单中的块哈希无效: {digest!r}")
+                    data = target.get(chunk_key(digest))
+                    if hashlib.sha256(data).hexdigest() != digest:
+                        raise ValueError(f"块 {digest} 的内容与哈希不符")
+                    f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+    return len(files)
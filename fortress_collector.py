@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞指标采集引擎
+直接读取/proc与statvfs，无需派生子进程
+"""
+
+import heapq
+import os
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# /proc/stat 中 cpu 行的字段顺序 (见 proc(5))
+CPU_FIELDS = (
+    "user",
+    "nice",
+    "system",
+    "idle",
+    "iowait",
+    "irq",
+    "softirq",
+    "steal",
+    "guest",
+    "guest_nice",
+)
+
+# /proc/[pid]/stat 中 ")" 之后的字段下标 (第 3 个字段 state 为 0)
+STAT_UTIME = 11
+STAT_STIME = 12
+STAT_STARTTIME = 19
+STAT_RSS = 21
+STAT_MAX = 4096  # stat 只有一行，远小于此
+# 连续这么多轮无变化的进程改为每 IDLE_STRIDE 轮读取一次
+IDLE_ROUNDS = 3
+IDLE_STRIDE = 4
+
+
+class ProcessUsage(NamedTuple):
+    pid: int
+    name: str
+    cpu_percent: float  # 单核为 100%，与 top 相同
+    rss_kb: int
+    rss_delta_kb: int  # 与上一次读取相比
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class _ProcState:
+    """一个进程在两轮扫描之间保留的计数器"""
+
+    __slots__ = ("raw", "starttime", "ticks", "rss", "name", "read_at", "idle", "usage")
+
+    def __init__(self, raw: bytes, starttime: str, ticks: int, rss: int, name: str):
+        self.raw = raw
+        self.starttime = starttime
+        self.ticks = ticks
+        self.rss = rss
+        self.name = name
+        self.read_at = 0.0
+        self.idle = 0  # 连续无变化的轮数
+        self.usage: Optional[ProcessUsage] = None
+
+
+class ProcSampler:
+    """基于/proc的进程内系统指标采集器
+
+    保存上一次的CPU计数器，按两次采样之间的差值计算使用率，
+    因此无需像 ``vmstat 1 2`` 那样阻塞等待。
+    """
+
+    def __init__(self, proc_root: str = "/proc", disk_path: str = "/"):
+        self.proc_root = proc_root
+        self.disk_path = disk_path
+        self._lock = threading.Lock()
+        self._prev_cpu: Optional[Tuple[int, int]] = None
+
+    def _proc_path(self, name: str) -> str:
+        return os.path.join(self.proc_root, name)
+
+    def read_cpu_times(self) -> Dict[str, int]:
+        """读取 /proc/stat 中的汇总CPU计数器"""
+        with open(self._proc_path("stat"), "r") as f:
+            for line in f:
+                if line.startswith("cpu "):
+                    values = [int(v) for v in line.split()[1:]]
+                    return dict(zip(CPU_FIELDS, values))
+        raise OSError("/proc/stat 中缺少cpu汇总行")
+
+    def read_meminfo(self) -> Dict[str, int]:
+        """按字段名解析 /proc/meminfo (单位KB)"""
+        meminfo: Dict[str, int] = {}
+        with open(self._proc_path("meminfo"), "r") as f:
+            for line in f:
+                key, sep, rest = line.partition(":")
+                if not sep:
+                    continue
+                parts = rest.split()
+                if parts:
+                    meminfo[key.strip()] = int(parts[0])
+        return meminfo
+
+    def cpu_usage(self) -> float:
+        """获取CPU使用率
+
+        首次调用时没有前一次计数器，返回开机以来的平均使用率。
+        """
+        times = self.read_cpu_times()
+        # guest/guest_nice 已计入 user/nice，避免重复统计
+        total = sum(v for k, v in times.items() if k not in ("guest", "guest_nice"))
+        idle = times.get("idle", 0) + times.get("iowait", 0)
+
+        with self._lock:
+            prev = self._prev_cpu
+            self._prev_cpu = (idle, total)
+
+        if prev is not None:
+            idle_delta = idle - prev[0]
+            total_delta = total - prev[1]
+            if total_delta > 0:
+                return round((1 - idle_delta / total_delta) * 100, 1)
+            if total_delta == 0:
+                return 0.0
+        if total <= 0:
+            return 0.0
+        return round((1 - idle / total) * 100, 1)
+
+    def memory_usage(self) -> float:
+        """获取内存使用率"""
+        meminfo = self.read_meminfo()
+        total = meminfo.get("MemTotal", 0)
+        if total <= 0:
+            return 0.0
+        available = meminfo.get("MemAvailable")
+        if available is None:
+            # 旧内核没有 MemAvailable，按 free + buffers + cached 估算
+            available = (
+                meminfo.get("MemFree", 0)
+                + meminfo.get("Buffers", 0)
+                + meminfo.get("Cached", 0)
+            )
+        return (total - available) / total * 100
+
+    def disk_usage(self) -> float:
+        """获取磁盘使用率，与 df 的 Use% 计算方式一致"""
+        st = os.statvfs(self.disk_path)
+        used = (st.f_blocks - st.f_bfree) * st.f_frsize
+        avail = st.f_bavail * st.f_frsize
+        if used + avail <= 0:
+            return 0.0
+        return round(used / (used + avail) * 100, 1)
+
+
+class ProcessAccounting:
+    """按进程增量统计 CPU 与内存 (读取 /proc/[pid]/stat)
+
+    每个 PID 的计数器跨轮保留，CPU 使用率按该进程两次读取之间的
+    时钟滴答差值计算；内容与上次完全相同的 stat 不再解析。连续
+    IDLE_ROUNDS 轮无变化的进程之后每 IDLE_STRIDE 轮才读取一次 (按
+    PID 错开)，空闲进程开始忙碌时最迟在 IDLE_STRIDE 轮内被发现，
+    其使用率按自己的读取间隔计算，不会因跳过而失真。排行用堆取
+    前 N 个，不对全部进程排序。
+    """
+
+    def __init__(self, proc_root: str = "/proc", top_n: int = 5):
+        self.proc_root = proc_root
+        self.top_n = top_n
+        self.clock_ticks = os.sysconf("SC_CLK_TCK")
+        self.page_kb = os.sysconf("SC_PAGE_SIZE") // 1024
+        self.rounds = 0
+        self.last_read = 0  # 上一轮实际读取的 stat 文件数
+        self._procs: Dict[int, _ProcState] = {}
+        self._lock = threading.Lock()
+
+    def _pids(self) -> List[int]:
+        return [int(name) for name in os.listdir(self.proc_root) if name.isdigit()]
+
+    def _read(self, pid: int) -> Optional[bytes]:
+        # 直接用文件描述符读取，比 open() 少创建缓冲对象 (每轮上万次)
+        try:
+            fd = os.open(f"{self.proc_root}/{pid}/stat", os.O_RDONLY)
+        except OSError:
+            return None  # 进程已退出
+        try:
+            return os.read(fd, STAT_MAX)
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+
+    def scan(self, now: Optional[float] = None) -> List[ProcessUsage]:
+        """扫描一轮，返回本轮读取到的全部进程的用量"""
+        with self._lock:
+            now = time.monotonic() if now is None else now
+            self.rounds += 1
+            procs = self._procs
+            current = self._pids()
+            alive = set(current)
+            for pid in [pid for pid in procs if pid not in alive]:
+                del procs[pid]
+
+            read = 0
+            stride = self.rounds % IDLE_STRIDE
+            for pid in current:
+                state = procs.get(pid)
+                if (
+                    state is not None
+                    and state.idle >= IDLE_ROUNDS
+                    and pid % IDLE_STRIDE != stride
+                ):
+                    continue
+                raw = self._read(pid)
+                if raw is None:
+                    procs.pop(pid, None)
+                    continue
+                read += 1
+                if state is not None and raw == state.raw:
+                    # 内容未变: 不解析，用量归零
+                    state.idle += 1
+                    usage = state.usage
+                    if usage is not None and (usage.cpu_percent or usage.rss_delta_kb):
+                        state.usage = usage._replace(cpu_percent=0.0, rss_delta_kb=0)
+                    state.read_at = now
+                    continue
+                procs[pid] = self._update(pid, raw, state, now)
+            self.last_read = read
+            return [s.usage for s in procs.values() if s.usage is not None]
+
+    def _update(
+        self, pid: int, raw: bytes, state: Optional[_ProcState], now: float
+    ) -> _ProcState:
+        text = raw.decode("utf-8", "replace")
+        head, _, rest = text.rpartition(")")
+        name = head.partition("(")[2]
+        fields = rest.split()
+        ticks = int(fields[STAT_UTIME]) + int(fields[STAT_STIME])
+        rss = int(fields[STAT_RSS])
+        starttime = fields[STAT_STARTTIME]
+        if state is None or state.starttime != starttime:
+            # 新进程或 PID 被复用: 下一轮才有 CPU 差值
+            state = _ProcState(raw, starttime, ticks, rss, name)
+            state.read_at = now
+            state.usage = ProcessUsage(pid, name, 0.0, rss * self.page_kb, 0)
+            return state
+        elapsed = now - state.read_at
+        cpu = 0.0
+        if elapsed > 0:
+            cpu = (ticks - state.ticks) / self.clock_ticks / elapsed * 100
+        state.usage = ProcessUsage(
+            pid,
+            name,
+            round(cpu, 1),
+            rss * self.page_kb,
+            (rss - state.rss) * self.page_kb,
+        )
+        state.idle = 0
+        state.raw = raw
+        state.ticks = ticks
+        state.rss = rss
+        state.name = name
+        state.read_at = now
+        return state
+
+    def top(
+        self, usages: List[ProcessUsage], n: Optional[int] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """按 CPU 与常驻内存各取前 n 个进程"""
+        n = self.top_n if n is None else n
+        by_cpu = heapq.nlargest(n, usages, key=lambda u: u.cpu_percent)
+        by_memory = heapq.nlargest(n, usages, key=lambda u: u.rss_kb)
+        return {
+            "cpu": [u.to_dict() for u in by_cpu if u.cpu_percent > 0],
+            "memory": [u.to_dict() for u in by_memory],
+        }
+
+    def top_processes(self) -> Dict[str, List[Dict[str, Any]]]:
+        """扫描一轮并返回排行"""
+        return self.top(self.scan())
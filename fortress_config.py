@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞配置加载与热重载
+按内容哈希缓存解析结果，监视配置文件变化并计算差异
+"""
+
+import ctypes
+import ctypes.util
+import hashlib
+import logging
+import marshal
+import os
+import select
+import struct
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fortress_alerts import parse_rules
+from fortress_lifecycle import parse_modules
+
+DEFAULT_CACHE_DIR = ".fortress_config_cache"  # 相对路径按配置文件所在目录解析
+CACHE_FORMAT = 1
+# 逐项比较到第二层的配置段，其余段整体比较
+NESTED_SECTIONS = ("fortress", "security", "network", "monitoring", "storage")
+
+# inotify 事件 (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class ConfigError(ValueError):
+    """配置内容无效"""
+
+
+def validate_config(config: Any):
+    """校验配置结构，无效时抛出 ConfigError"""
+    if not isinstance(config, dict):
+        raise ConfigError("配置顶层必须是映射")
+    for section in NESTED_SECTIONS:
+        if not isinstance(config.get(section) or {}, dict):
+            raise ConfigError(f"配置段 {section} 必须是映射")
+    monitoring = config.get("monitoring") or {}
+    for key in ("heartbeat_interval", "alert_threshold"):
+        value = monitoring.get(key)
+        if value is not None and (
+            isinstance(value, bool) or not isinstance(value, (int, float))
+        ):
+            raise ConfigError(f"monitoring.{key} 必须是数值")
+    if float(monitoring.get("heartbeat_interval", 60)) <= 0:
+        raise ConfigError("monitoring.heartbeat_interval 必须大于 0")
+    if not 0 <= float(monitoring.get("alert_threshold", 85)) <= 100:
+        raise ConfigError("monitoring.alert_threshold 必须在 0-100 之间")
+    modules = config.get("modules") or []
+    if not isinstance(modules, list):
+        raise ConfigError("modules 必须是列表")
+    try:
+        parse_modules(modules)
+    except (KeyError, TypeError, ValueError) as e:
+        raise ConfigError(f"modules 无效: {e}") from e
+    try:
+        parse_rules(config)
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise ConfigError(f"monitoring.alerts 无效: {e}") from e
+
+
+def diff_config(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    """返回发生变化的配置键 (如 "monitoring.alert_threshold"、"modules")"""
+    changed = []
+    for section in sorted(set(old) | set(new), key=str):
+        before, after = old.get(section), new.get(section)
+        if before == after:
+            continue
+        if (
+            section in NESTED_SECTIONS
+            and isinstance(before, dict)
+            and isinstance(after, dict)
+        ):
+            changed += [
+                f"{section}.{key}"
+                for key in sorted(set(before) | set(after), key=str)
+                if before.get(key) != after.get(key)
+            ]
+        else:
+            changed.append(str(section))
+    return changed
+
+
+def cache_dir_for(config_path: str, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """配置缓存目录: 相对路径放在配置文件旁边，不随启动时的当前目录变化"""
+    if os.path.isabs(cache_dir):
+        return cache_dir
+    return os.path.join(os.path.dirname(os.path.abspath(config_path)), cache_dir)
+
+
+class ConfigCache:
+    """按内容哈希缓存解析后的配置
+
+    解析结果以 marshal 格式保存在 cache_dir 中 (只含 YAML 的基本
+    类型，加载不会执行代码)；内容哈希未变时重启直接加载缓存，跳过
+    YAML 解析。进程内另保留最近一份序列化结果，热重载时不必读盘，
+    每次加载得到独立的副本，调用方修改配置不会污染缓存。
+    """
+
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._last: Optional[Tuple[str, bytes]] = None
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _path(self, digest: str) -> str:
+        assert self.cache_dir is not None
+        return os.path.join(self.cache_dir, f"{digest}.marshal")
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """查找缓存，未命中返回 None (每次返回独立的副本)"""
+        payload = None
+        if self._last is not None and self._last[0] == digest:
+            payload = self._last[1]
+        elif self.cache_dir is not None:
+            try:
+                with open(self._path(digest), "rb") as f:
+                    payload = f.read()
+            except OSError:
+                pass
+        if payload is not None:
+            try:
+                version, stored, config = marshal.loads(payload)
+                if (
+                    version == CACHE_FORMAT
+                    and stored == digest
+                    and isinstance(config, dict)
+                ):
+                    self._last = (digest, payload)
+                    self.hits += 1
+                    return config
+            except (EOFError, ValueError, TypeError):
+                pass
+        self.misses += 1
+        return None
+
+    def put(self, digest: str, config: Dict[str, Any]):
+        """保存解析结果 (无法序列化时不缓存，写盘失败时只保留进程内缓存)"""
+        try:
+            payload = marshal.dumps((CACHE_FORMAT, digest, config))
+        except ValueError:
+            return
+        self._last = (digest, payload)
+        if self.cache_dir is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            tmp_path = self._path(digest) + f".{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(digest))
+        except OSError:
+            pass
+
+    def load(self, path: str) -> Tuple[Dict[str, Any], str]:
+        """读取并解析配置文件，返回 (配置, 内容哈希)"""
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = self.digest(data)
+        config = self.get(digest)
+        if config is None:
+            import yaml
+
+            config = yaml.safe_load(data.decode("utf-8"))
+            validate_config(config)
+            self.put(digest, config)
+        return config, digest
+
+
+def _inotify_fd(directory: str) -> Optional[int]:
+    """监视目录的 inotify 描述符 (非 Linux 或不可用时返回 None)"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd: int = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError, TypeError):
+        return None
+
+
+class ConfigWatcher:
+    """监视配置文件并在后台线程中重新加载
+
+    优先用 inotify 监视所在目录 (编辑器常以改名方式替换文件)，
+    不可用时轮询 mtime。内容哈希未变的事件被忽略；解析或校验失败
+    时记录错误并保留当前配置。回调在监视线程中执行，参数为新配置
+    与变化的键。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        on_change: Callable[[Dict[str, Any], List[str]], None],
+        current: Tuple[Dict[str, Any], str],
+        stop_event: threading.Event,
+        cache: Optional[ConfigCache] = None,
+        poll_interval: float = 2.0,
+        use_inotify: bool = True,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.config, self.digest = current
+        self.stop_event = stop_event
+        self.cache = cache or ConfigCache(None)
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.logger = logger or logging.getLogger("FortressGuardian")
+        self.reloads = 0
+        self.rejected = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="fortress-config", daemon=True
+        )
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def check(self) -> bool:
+        """重新读取配置，内容变化且有效时回调，返回是否应用了新配置"""
+        try:
+            config, digest = self.cache.load(self.path)
+        except Exception as e:
+            self.rejected += 1
+            self.logger.error(f"配置重载失败，保留当前配置: {e}")
+            return False
+        if digest == self.digest:
+            return False
+        changed = diff_config(self.config, config)
+        try:
+            self.on_change(config, changed)
+        except Exception as e:
+            self.rejected += 1
+            self.logger.error(f"配置应用失败，保留当前配置: {e}")
+            return False
+        self.config, self.digest = config, digest
+        self.reloads += 1
+        return True
+
+    def _run(self):
+        fd = _inotify_fd(os.path.dirname(self.path)) if self.use_inotify else None
+        name = os.fsencode(os.path.basename(self.path))
+        last = self._stat()
+        try:
+            while not self.stop_event.is_set():
+                if fd is None:
+                    if self.stop_event.wait(self.poll_interval):
+                        break
+                    current = self._stat()
+                    if current != last:
+                        last = current
+                        self.check()
+                    continue
+                ready, _, _ = select.select([fd], [], [], self.poll_interval)
+                if not ready:
+                    continue
+                try:
+                    data = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                offset, touched = 0, False
+                while offset + _INOTIFY_EVENT.size <= len(data):
+                    _, _, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                    start = offset + _INOTIFY_EVENT.size
+                    touched |= data[start : start + length].rstrip(b"\0") == name
+                    offset = start + length
+                if touched:
+                    self.check()
+        except Exception as e:
+            self.logger.error(f"配置监视异常: {e}")
+        finally:
+            if fd is not None:
+                os.close(fd)
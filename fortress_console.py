@@ -5,27 +5,83 @@
 夜的命名术·壹的指挥中心
 """
 
+import argparse
 import curses
 import json
 import os
+import queue
+import select
 import subprocess
 import sys
-import threading
 import time
 from datetime import datetime
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+
+from fortress_feed import SnapshotReader
+from fortress_fleetview import MODULE_SORTS, NODE_SORTS, FleetModel, VirtualList
+from fortress_lifecycle import PRIORITY_ORDER
+from fortress_render import DiffRenderer, Frame, char_width, text_width
+
+# 超过这么多个心跳周期未更新的快照视为过期
+STALE_HEARTBEATS = 3
+
+
+def format_percent(value: Optional[float]) -> str:
+    """格式化百分比，无有效读数时显示为 --"""
+    return "--" if value is None else f"{value:.1f}%"
+
+
+def fit_column(text: str, width: int, right: bool = False) -> str:
+    """按终端显示宽度截断并补齐到 width 列 (中文字符占两列)"""
+    used = 0
+    for i, ch in enumerate(text):
+        w = char_width(ch)
+        if used + w > width - 1:
+            text = text[:i]
+            break
+        used += w
+    padding = " " * (width - text_width(text))
+    return padding + text if right else text + padding
 
 
 class FortressConsole:
     """数据要塞控制台主类"""
 
-    def __init__(self):
-        self.screen = None
+    def __init__(
+        self,
+        feed_path: Optional[str] = None,
+        show_frame_stats: bool = False,
+        fleet_url: Optional[str] = None,
+    ):
+        self.screen: Any = None
+        self.canvas: Frame = Frame(0, 0)
+        self.renderer: Optional[DiffRenderer] = None
+        self.show_frame_stats = show_frame_stats
+        self.feed = SnapshotReader(feed_path)
         self.running = True
         self.current_view = "dashboard"
-        self.system_stats = {}
-        self.alerts = []
+        self.system_stats: Dict[str, Any] = {}
         self.selected_module = 0
+        # 按快照中的模块版本号缓存，版本未变时不重建模块表
+        self._modules_version: Optional[int] = None
+        self._module_status: Dict[str, str] = {}
+        self._module_rows_version: Optional[int] = None
+        self._module_rows: List[Tuple[str, str, str]] = []
+        self._module_top = 0
+        # 集群视图: 订阅线程把收集器推送的摘要放入队列，每帧 (任何视图) 取出合并
+        self.fleet = FleetModel()
+        self.node_list = VirtualList(self.fleet.nodes, NODE_SORTS)
+        self.fleet_module_list = VirtualList(self.fleet.modules, MODULE_SORTS)
+        self.fleet_focus = "nodes"
+        self._fleet_page = 10
+        self._fleet_updates: "queue.SimpleQueue[List[Dict[str, Any]]]" = (
+            queue.SimpleQueue()
+        )
+        self.fleet_subscriber = None
+        if fleet_url:
+            from fortress_fleet import FleetSubscriber
+
+            self.fleet_subscriber = FleetSubscriber(fleet_url, self._fleet_updates.put)
 
     def initialize_curses(self):
         """初始化curses界面"""
@@ -33,7 +89,9 @@ class FortressConsole:
         curses.noecho()
         curses.cbreak()
         self.screen.keypad(True)
+        self.screen.nodelay(True)
         curses.curs_set(0)
+        self.renderer = DiffRenderer(self.screen, curses.doupdate)
 
         # 设置颜色
         if curses.has_colors():
@@ -54,72 +112,93 @@ class FortressConsole:
 
     def draw_header(self):
         """绘制头部信息"""
-        height, width = self.screen.getmaxyx()
-
-        # 清空顶部区域
-        for i in range(3):
-            self.screen.addstr(i, 0, " " * width)
+        height, width = self.canvas.getmaxyx()
 
         # 绘制标题
         title = "夜幕要塞控制中心"
         title_x = (width - len(title)) // 2
-        self.screen.addstr(0, title_x, title, curses.color_pair(1) | curses.A_BOLD)
+        self.canvas.addstr(0, title_x, title, curses.color_pair(1) | curses.A_BOLD)
 
         # 绘制状态栏
         status_text = (
             f"状态: OPERATIONAL | 时间: {datetime.now().strftime('%H:%M:%S')} |"
             f" 视图: {self.current_view.upper()}"
         )
-        self.screen.addstr(1, 2, status_text[: width - 4], curses.color_pair(4))
+        self.canvas.addstr(1, 2, status_text[: width - 4], curses.color_pair(4))
 
         # 绘制菜单
-        menu_items = ["[1]仪表板", "[2]模块管理", "[3]安全监控", "[4]系统日志", "[Q]退出"]
+        menu_items = [
+            "[1]仪表板",
+            "[2]模块管理",
+            "[3]安全监控",
+            "[4]系统日志",
+            "[5]集群",
+            "[Q]退出",
+        ]
         menu_text = " | ".join(menu_items)
         menu_x = (width - len(menu_text)) // 2
-        self.screen.addstr(2, menu_x, menu_text, curses.color_pair(3))
+        self.canvas.addstr(2, menu_x, menu_text, curses.color_pair(3))
 
     def draw_dashboard(self):
         """绘制仪表板视图"""
-        height, width = self.screen.getmaxyx()
-
-        # 清空主显示区域
-        for i in range(4, height - 1):
-            self.screen.addstr(i, 0, " " * width)
+        height, width = self.canvas.getmaxyx()
 
         # 系统概览
         y_pos = 4
-        self.screen.addstr(y_pos, 2, "系统概览", curses.color_pair(1) | curses.A_BOLD)
+        self.canvas.addstr(y_pos, 2, "系统概览", curses.color_pair(1) | curses.A_BOLD)
         y_pos += 2
 
         stats = self.get_system_stats()
         overview_items = [
             (
                 "CPU使用率",
-                f"{stats.get('cpu', 0):.1f}%",
-                self.get_status_color(stats.get("cpu", 0)),
+                format_percent(stats.get("cpu")),
+                self.get_status_color(stats.get("cpu")),
             ),
             (
                 "内存使用率",
-                f"{stats.get('memory', 0):.1f}%",
-                self.get_status_color(stats.get("memory", 0)),
+                format_percent(stats.get("memory")),
+                self.get_status_color(stats.get("memory")),
             ),
             (
                 "磁盘使用率",
-                f"{stats.get('disk', 0):.1f}%",
-                self.get_status_color(stats.get("disk", 0)),
+                format_percent(stats.get("disk")),
+                self.get_status_color(stats.get("disk")),
+            ),
+            (
+                "网络状态",
+                stats.get("network") or "unknown",
+                curses.color_pair(1),
             ),
-            ("网络状态", stats.get("network", "unknown"), curses.color_pair(1)),
             ("运行时间", stats.get("uptime", "00:00:00"), curses.color_pair(4)),
+            (
+                "数据状态",
+                stats.get("freshness", "无数据"),
+                curses.color_pair(2) if stats.get("stale") else curses.color_pair(1),
+            ),
         ]
 
         for label, value, color in overview_items:
-            self.screen.addstr(y_pos, 4, f"{label}:", curses.color_pair(4))
-            self.screen.addstr(y_pos, 20, value, color)
+            self.canvas.addstr(y_pos, 4, f"{label}:", curses.color_pair(4))
+            self.canvas.addstr(y_pos, 20, value, color)
             y_pos += 1
 
+        # 窗口趋势 (守护进程内存指标历史)
+        trends = self.get_trends()
+        if trends:
+            y_pos += 1
+            self.canvas.addstr(
+                y_pos, 2, "趋势 (最近窗口)", curses.color_pair(1) | curses.A_BOLD
+            )
+            y_pos += 2
+            for label, text, p95 in trends:
+                self.canvas.addstr(y_pos, 4, f"{label}:", curses.color_pair(4))
+                self.canvas.addstr(y_pos, 20, text, self.get_status_color(p95))
+                y_pos += 1
+
         # 模块状态
         y_pos += 1
-        self.screen.addstr(y_pos, 2, "模块状态", curses.color_pair(1) | curses.A_BOLD)
+        self.canvas.addstr(y_pos, 2, "模块状态", curses.color_pair(1) | curses.A_BOLD)
         y_pos += 2
 
         modules = self.get_module_status()
@@ -127,42 +206,138 @@ class FortressConsole:
             status_color = (
                 curses.color_pair(1) if status == "active" else curses.color_pair(2)
             )
-            self.screen.addstr(y_pos, 4, f"• {module_name}:", curses.color_pair(4))
-            self.screen.addstr(y_pos, 25, status.upper(), status_color)
+            self.canvas.addstr(y_pos, 4, f"• {module_name}:", curses.color_pair(4))
+            self.canvas.addstr(y_pos, 25, status.upper(), status_color)
             y_pos += 1
 
-        # 警报信息
-        if self.alerts:
+        # 警报信息 (守护进程告警引擎的最近记录)
+        alerts = self.get_alerts()
+        if alerts:
             y_pos += 1
-            self.screen.addstr(
+            self.canvas.addstr(
                 y_pos, 2, "最新警报", curses.color_pair(2) | curses.A_BOLD
             )
             y_pos += 2
-            for alert in self.alerts[-3:]:  # 显示最近3条警报
-                self.screen.addstr(y_pos, 4, f"{alert}", curses.color_pair(2))
+            for text, level in alerts[-3:]:  # 显示最近3条警报
+                color = {"resolved": 1, "warning": 3}.get(level, 2)
+                self.canvas.addstr(y_pos, 4, text, curses.color_pair(color))
                 y_pos += 1
 
     def get_system_stats(self) -> Dict:
-        """获取系统统计信息"""
+        """获取系统统计信息 (来自守护进程的共享内存快照)"""
+        snapshot = self.feed.read()
+        if not snapshot:
+            return {
+                "cpu": None,
+                "memory": None,
+                "disk": None,
+                "network": "unknown",
+                "uptime": "--",
+                "freshness": "无数据",
+                "stale": True,
+            }
+
+        health = snapshot.get("health", {})
+        now = time.time()
+        published_at = snapshot.get("published_at", now)
+        updated = datetime.fromtimestamp(published_at).strftime("%H:%M:%S")
+        if snapshot.get("status") == "SHUTDOWN":
+            freshness, stale = f"守护进程已停止 (最后更新 {updated})", True
+        elif now - published_at > STALE_HEARTBEATS * snapshot.get(
+            "heartbeat_interval", 60
+        ):
+            freshness, stale = f"已过期 (最后更新 {updated})", True
+        else:
+            freshness, stale = "实时", False
+        uptime = int(now - snapshot.get("started_at", now))
+        days, rest = divmod(uptime, 86400)
+        hours, rest = divmod(rest, 3600)
         return {
-            "cpu": 45.2,
-            "memory": 67.8,
-            "disk": 34.1,
-            "network": "connected",
-            "uptime": "2d 14h 32m",
+            # 采集失败的指标为 None，显示为 "--"
+            "cpu": health.get("cpu_usage"),
+            "memory": health.get("memory_usage"),
+            "disk": health.get("disk_usage"),
+            "network": health.get("network_status", "unknown"),
+            "uptime": f"{days}d {hours}h {rest // 60}m",
+            "freshness": freshness,
+            "stale": stale,
         }
 
     def get_module_status(self) -> Dict:
         """获取模块状态"""
-        return {
-            "数据核心": "active",
-            "防御系统": "active",
-            "传输通道": "operational",
-            "监控系统": "standby",
+        snapshot = self.feed.read()
+        if not snapshot:
+            return {}
+        version = snapshot.get("modules_version")
+        if version is None or version != self._modules_version:
+            self._module_status = {
+                name: info.get("status", "unknown")
+                for name, info in snapshot.get("modules", {}).items()
+            }
+            self._modules_version = version
+        return self._module_status
+
+    def get_module_rows(self) -> List[Tuple[str, str, str]]:
+        """获取模块管理视图的 (名称, 状态, 优先级) 列表，按优先级排序"""
+        snapshot = self.feed.read()
+        if not snapshot:
+            return []
+        version = snapshot.get("modules_version")
+        if version is None or version != self._module_rows_version:
+            rows = [
+                (name, info.get("status", "unknown"), info.get("priority") or "")
+                for name, info in snapshot.get("modules", {}).items()
+            ]
+            rows.sort(key=lambda row: (PRIORITY_ORDER.get(row[2], 4), row[0]))
+            self._module_rows = rows
+            self._module_rows_version = version
+        return self._module_rows
+
+    def get_trends(self) -> List[Tuple[str, str, Optional[float]]]:
+        """获取窗口趋势，返回 (指标名, 显示文本, p95) 列表"""
+        snapshot = self.feed.read()
+        if not snapshot:
+            return []
+        labels = {
+            "cpu_usage": "CPU使用率",
+            "memory_usage": "内存使用率",
+            "disk_usage": "磁盘使用率",
         }
-
-    def get_status_color(self, value: float) -> int:
+        trends = []
+        for name, stats in snapshot.get("trends", {}).items():
+            if not stats.get("samples"):
+                continue
+            rate = (stats.get("rate") or 0.0) * 60
+            text = (
+                f"均值 {format_percent(stats.get('mean'))}  "
+                f"p95 {format_percent(stats.get('p95'))}  "
+                f"最高 {format_percent(stats.get('max'))}  "
+                f"{rate:+.2f}/分钟"
+            )
+            trends.append((labels.get(name, name), text, stats.get("p95")))
+        return trends
+
+    def get_alerts(self) -> List[Tuple[str, str]]:
+        """获取最近的告警，返回 (显示文本, 级别) 列表，级别为 resolved 或告警严重度"""
+        snapshot = self.feed.read()
+        if not snapshot:
+            return []
+        alerts = []
+        for alert in snapshot.get("alerts", []):
+            timestamp = datetime.fromtimestamp(alert.get("timestamp", 0))
+            text = f"[{timestamp.strftime('%H:%M:%S')}] {alert.get('message', '')}"
+            if alert.get("hits", 1) > 1:
+                text += f" (x{alert['hits']})"
+            if alert.get("state") == "resolved":
+                alerts.append((text + " 已恢复", "resolved"))
+            else:
+                alerts.append((text, alert.get("severity", "warning")))
+        return alerts
+
+    def get_status_color(self, value: Optional[float]) -> int:
         """根据数值返回状态颜色"""
+        if value is None:
+            return curses.color_pair(3)  # 黄色 - 无有效读数
         if value < 60:
             return curses.color_pair(1)  # 绿色 - 正常
         elif value < 80:
@@ -172,34 +347,123 @@ class FortressConsole:
 
     def draw_module_management(self):
         """绘制模块管理视图"""
-        height, width = self.screen.getmaxyx()
-
-        # 清空主显示区域
-        for i in range(4, height - 1):
-            self.screen.addstr(i, 0, " " * width)
+        height, width = self.canvas.getmaxyx()
 
         y_pos = 4
-        self.screen.addstr(
+        self.canvas.addstr(
             y_pos, 2, "模块管理系统", curses.color_pair(1) | curses.A_BOLD
         )
         y_pos += 2
 
-        modules = [
-            ("数据核心", "active", "critical"),
-            ("防御系统", "active", "high"),
-            ("传输通道", "operational", "medium"),
-            ("监控系统", "standby", "low"),
-        ]
-
-        for i, (name, status, priority) in enumerate(modules):
+        modules = self.get_module_rows()
+        if not modules:
+            self.canvas.addstr(y_pos, 4, "暂无模块数据", curses.color_pair(3))
+            return
+
+        # 只绘制可见的一屏，光标移出时滚动
+        page = max(1, height - y_pos - 1)
+        self.selected_module = max(0, min(self.selected_module, len(modules) - 1))
+        if self.selected_module < self._module_top:
+            self._module_top = self.selected_module
+        elif self.selected_module >= self._module_top + page:
+            self._module_top = self.selected_module - page + 1
+        top = self._module_top
+        for i, (name, status, priority) in enumerate(modules[top : top + page], top):
             marker = "▶" if i == self.selected_module else " "
             status_color = (
                 curses.color_pair(1) if status == "active" else curses.color_pair(3)
             )
 
-            self.screen.addstr(y_pos, 4, f"{marker} {name}", curses.color_pair(4))
-            self.screen.addstr(y_pos, 25, status.upper(), status_color)
-            self.screen.addstr(y_pos, 35, f"[{priority.upper()}]", curses.color_pair(4))
+            self.canvas.addstr(y_pos, 4, f"{marker} {name}", curses.color_pair(4))
+            self.canvas.addstr(y_pos, 25, status.upper(), status_color)
+            self.canvas.addstr(y_pos, 35, f"[{priority.upper()}]", curses.color_pair(4))
+            y_pos += 1
+
+    def drain_fleet_updates(self) -> int:
+        """合并订阅线程收到的节点摘要，返回合并的行数"""
+        applied = 0
+        while True:
+            try:
+                rows = self._fleet_updates.get_nowait()
+            except queue.Empty:
+                return applied
+            self.fleet.apply(rows)
+            applied += len(rows)
+
+    def draw_fleet(self):
+        """绘制集群视图: 节点列表或 (节点, 模块) 列表，只取可见窗口"""
+        height, width = self.canvas.getmaxyx()
+        nodes = self.fleet.nodes
+        if self.fleet_subscriber is None and not len(nodes):
+            self.canvas.addstr(
+                4, 2, "未连接集群收集器 (使用 --fleet 指定地址)", curses.color_pair(3)
+            )
+            return
+        counts = "  ".join(f"{k}: {v}" for k, v in sorted(nodes.counts.items()))
+        self.canvas.addstr(
+            4,
+            2,
+            f"集群节点 {len(nodes)}  {counts}",
+            curses.color_pair(1) | curses.A_BOLD,
+        )
+        if self.fleet_focus == "nodes":
+            listing = self.node_list
+            header = (
+                fit_column("节点", 24)
+                + fit_column("状态", 10)
+                + fit_column("CPU", 8, right=True)
+                + fit_column("内存", 8, right=True)
+                + fit_column("磁盘", 8, right=True)
+                + "  网络"
+            )
+        else:
+            listing = self.fleet_module_list
+            header = (
+                fit_column("节点", 24)
+                + fit_column("模块", 16)
+                + fit_column("状态", 14)
+                + "优先级"
+            )
+        self.canvas.addstr(
+            5,
+            2,
+            f"列表: {self.fleet_focus}  排序: {listing.sort}  "
+            f"过滤: {listing.filter or '全部'}  "
+            f"({listing.selected + 1 if len(listing) else 0}/{len(listing)})"
+            "  [Tab]切换 [S]排序 [F]过滤",
+            curses.color_pair(4),
+        )
+        self.canvas.addstr(6, 4, header, curses.A_BOLD)
+
+        y_pos = 7
+        self._fleet_page = max(1, height - y_pos - 1)
+        for selected, row in listing.visible(self._fleet_page):
+            marker = "▶" if selected else " "
+            if self.fleet_focus == "nodes":
+                state = row["state"]
+                text = (
+                    fit_column(row["node"], 24)
+                    + fit_column(state, 10)
+                    + fit_column(format_percent(row.get("cpu_usage")), 8, right=True)
+                    + fit_column(format_percent(row.get("memory_usage")), 8, right=True)
+                    + fit_column(format_percent(row.get("disk_usage")), 8, right=True)
+                    + f"  {row.get('network_status') or '--'}"
+                )
+                color = curses.color_pair(
+                    1 if state == "ok" else 2 if state == "alert" else 3
+                )
+            else:
+                status = row["status"]
+                text = (
+                    fit_column(row["node"], 24)
+                    + fit_column(row["module"], 16)
+                    + fit_column(status.upper(), 14)
+                    + row["priority"].upper()
+                )
+                color = curses.color_pair(
+                    1 if status == "active" else 2 if status == "failed" else 3
+                )
+            self.canvas.addstr(y_pos, 2, f"{marker} {text}", color)
             y_pos += 1
 
     def handle_input(self, key):
@@ -214,71 +478,130 @@ class FortressConsole:
             self.current_view = "security"
         elif key == ord("4"):
             self.current_view = "logs"
+        elif key == ord("5"):
+            self.current_view = "fleet"
         elif key == curses.KEY_UP and self.current_view == "modules":
             self.selected_module = max(0, self.selected_module - 1)
         elif key == curses.KEY_DOWN and self.current_view == "modules":
-            self.selected_module = min(3, self.selected_module + 1)
-
-    def simulate_alerts(self):
-        """模拟警报生成"""
-        alerts_list = [
-            "检测到异常网络流量",
-            "内存使用率超过阈值",
-            "防火墙规则更新完成",
-            "数据备份任务开始",
-            "系统完整性检查通过",
-        ]
+            last = max(0, len(self.get_module_rows()) - 1)
+            self.selected_module = min(last, self.selected_module + 1)
+        elif self.current_view == "fleet":
+            self.handle_fleet_input(key)
+
+    def handle_fleet_input(self, key):
+        """集群视图按键: 移动、翻页、首尾、切换列表、排序与过滤"""
+        listing = (
+            self.node_list if self.fleet_focus == "nodes" else self.fleet_module_list
+        )
+        if key == curses.KEY_UP:
+            listing.move(-1)
+        elif key == curses.KEY_DOWN:
+            listing.move(1)
+        elif key == curses.KEY_PPAGE:
+            listing.move(-self._fleet_page)
+        elif key == curses.KEY_NPAGE:
+            listing.move(self._fleet_page)
+        elif key == curses.KEY_HOME:
+            listing.home()
+        elif key == curses.KEY_END:
+            listing.end()
+        elif key in (ord("s"), ord("S")):
+            listing.cycle_sort()
+        elif key in (ord("f"), ord("F")):
+            listing.cycle_filter()
+        elif key == ord("\t"):
+            self.fleet_focus = "modules" if self.fleet_focus == "nodes" else "nodes"
+
+    def build_frame(self) -> Frame:
+        """离屏构建当前视图的完整一帧"""
+        height, width = self.screen.getmaxyx()
+        self.canvas = Frame(height, width)
+        self.draw_header()
+        # 无论当前视图都合并推送的摘要，避免停留在其他视图时队列无限增长
+        self.drain_fleet_updates()
+
+        if self.current_view == "dashboard":
+            self.draw_dashboard()
+        elif self.current_view == "modules":
+            self.draw_module_management()
+        elif self.current_view == "fleet":
+            self.draw_fleet()
+        # 其他视图可以后续添加
+
+        if self.show_frame_stats and self.renderer is not None:
+            self.canvas.addstr(
+                height - 1, 2, self.renderer.stats.summary(), curses.color_pair(5)
+            )
+        return self.canvas
 
-        while self.running:
-            if len(self.alerts) < 10:  # 限制警报数量
-                import random
+    def wait_for_event(self) -> bool:
+        """阻塞等待键盘输入或下一秒时钟刷新，有输入时返回True
 
-                alert = random.choice(alerts_list)
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                self.alerts.append(f"[{timestamp}] {alert}")
-            time.sleep(30)  # 每30秒生成一次警报
+        共享内存快照没有可 select 的文件描述符，因此随每秒的时钟
+        刷新读取其序列号 (一次整数读取)，未变化时不会重绘。
+        """
+        timeout = 1.0 - (time.time() % 1.0)
+        try:
+            readable, _, _ = select.select([sys.stdin], [], [], timeout)
+        except (OSError, ValueError):
+            time.sleep(timeout)
+            return False
+        return bool(readable)
 
     def run(self):
         """运行控制台主循环"""
         try:
+            if self.fleet_subscriber is not None:
+                self.fleet_subscriber.start()
             self.initialize_curses()
-
-            # 启动警报模拟线程
-            alert_thread = threading.Thread(target=self.simulate_alerts, daemon=True)
-            alert_thread.start()
+            renderer = self.renderer
+            assert renderer is not None
 
             while self.running:
-                self.draw_header()
+                renderer.render(self.build_frame())
 
-                if self.current_view == "dashboard":
-                    self.draw_dashboard()
-                elif self.current_view == "modules":
-                    self.draw_module_management()
-                # 其他视图可以后续添加
+                if not self.wait_for_event():
+                    continue
 
-                self.screen.refresh()
-
-                # 处理用户输入
+                # 处理用户输入 (一次取完所有待处理按键)
                 try:
                     key = self.screen.getch()
-                    if key != -1:  # 有输入
-                        self.handle_input(key)
+                    while key != -1:
+                        if key == curses.KEY_RESIZE:
+                            renderer.invalidate()
+                            self.screen.clear()
+                        else:
+                            self.handle_input(key)
+                        key = self.screen.getch()
                 except:
                     pass
 
-                time.sleep(0.1)  # 短暂延迟
-
         except KeyboardInterrupt:
             self.running = False
         finally:
             self.cleanup_curses()
+            self.feed.close()
+            if self.fleet_subscriber is not None:
+                self.fleet_subscriber.stop()
 
 
 def main():
     """主函数"""
-    console = FortressConsole()
+    parser = argparse.ArgumentParser(description="数据要塞控制台")
+    parser.add_argument("--feed", default=None, help="守护进程共享内存快照路径")
+    parser.add_argument(
+        "--frame-stats", action="store_true", help="在底部显示帧耗时统计"
+    )
+    parser.add_argument(
+        "--fleet", default=None, help="集群收集器地址，如 ws://collector:8765"
+    )
+    args = parser.parse_args()
+
+    console = FortressConsole(
+        feed_path=args.feed, show_frame_stats=args.frame_stats, fleet_url=args.fleet
+    )
     console.run()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞分块认证加密引擎
+文件被切成定长分片分别认证加密，可多核并行加解密并按偏移随机读取
+每个文件用头部中的随机盐经 HKDF 派生独立密钥 (与 Tink 流式 AEAD
+的构造相同)，不同文件之间不会因 nonce 前缀碰撞而重用 nonce
+对应 security.encryption_level
+"""
+
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+MAGIC = b"FTEC"
+FORMAT_VERSION = 2  # 版本 1 所有文件共用同一密钥，已不再支持
+TAG_SIZE = 16
+SALT_SIZE = 32
+_FILE_KEY_INFO = b"fortress-file-key"
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+ALGORITHMS: Dict[str, Tuple[int, Type[Union[AESGCM, ChaCha20Poly1305]]]] = {
+    "AES-256-GCM": (1, AESGCM),
+    "ChaCha20-Poly1305": (2, ChaCha20Poly1305),
+}
+_ALGORITHM_BY_ID = {alg_id: name for name, (alg_id, _) in ALGORITHMS.items()}
+
+# 头部: magic(4s) 版本(B) 算法(B) 分片大小(I) 明文长度(Q) 盐(32s) nonce前缀(7s)
+HEADER = struct.Struct(">4sBBIQ32s7s")
+_SALT_OFFSET = HEADER.size - 7 - SALT_SIZE
+_COUNTER = struct.Struct(">IB")
+
+
+class DecryptionError(Exception):
+    """密文被篡改、截断或密钥错误"""
+
+
+def chunk_nonce(prefix: bytes, index: int, final: bool) -> bytes:
+    """由文件随机前缀、分片序号与结尾标志派生12字节nonce
+
+    同一文件内序号唯一，结尾标志防止截断或拼接攻击。
+    """
+    return prefix + _COUNTER.pack(index, 1 if final else 0)
+
+
+def derive_chunk_key(key: bytes, salt: bytes, alg_id: int) -> bytes:
+    """用 HKDF-SHA256 从文件加密密钥与头部的随机盐派生单个文件的密钥"""
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        info=_FILE_KEY_INFO + bytes([alg_id]),
+    ).derive(key)
+
+
+class ChunkedCipher:
+    """分片 AEAD 加解密
+
+    每个分片密文长度固定为 chunk_size + 16 (最后一片除外)，因此
+    任意分片的位置都可以直接计算，各分片可独立并行处理。key 不直接
+    用于加密，各文件的密钥按头部中的盐派生，并缓存最近一个文件的。
+    """
+
+    def __init__(
+        self,
+        key: bytes,
+        algorithm: str = "AES-256-GCM",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"不支持的加密算法: {algorithm}")
+        if len(key) != 32:
+            raise ValueError("密钥长度必须为32字节")
+        self.key = key
+        self.algorithm = algorithm
+        self.chunk_size = chunk_size
+        self._file: Optional[Tuple[bytes, Union[AESGCM, ChaCha20Poly1305]]] = None
+
+    @classmethod
+    def from_config(
+        cls, config: Dict[str, Any], key: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> "ChunkedCipher":
+        """按 security.encryption_level 创建"""
+        security = config.get("security", {}) or {}
+        return cls(key, security.get("encryption_level", "AES-256-GCM"), chunk_size)
+
+    def make_header(
+        self,
+        length: int,
+        prefix: Optional[bytes] = None,
+        salt: Optional[bytes] = None,
+    ) -> bytes:
+        """生成文件头 (新的随机盐与nonce前缀)"""
+        return HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            ALGORITHMS[self.algorithm][0],
+            self.chunk_size,
+            length,
+            salt or os.urandom(SALT_SIZE),
+            prefix or os.urandom(7),
+        )
+
+    @staticmethod
+    def parse_header(header: bytes) -> Tuple[str, int, int, bytes]:
+        """解析文件头，返回 (算法, 分片大小, 明文长度, nonce前缀)"""
+        if len(header) < HEADER.size:
+            raise DecryptionError("密文头部不完整")
+        magic, version, alg_id, chunk_size, length, _, prefix = HEADER.unpack(
+            header[: HEADER.size]
+        )
+        if magic == MAGIC and version != FORMAT_VERSION:
+            raise DecryptionError(f"不支持的加密格式版本: {version}")
+        if (
+            magic != MAGIC
+            or version != FORMAT_VERSION
+            or alg_id not in _ALGORITHM_BY_ID
+        ):
+            raise DecryptionError("不是有效的要塞加密文件")
+        return _ALGORITHM_BY_ID[alg_id], chunk_size, length, prefix
+
+    @staticmethod
+    def chunk_count(length: int, chunk_size: int) -> int:
+        """明文长度对应的分片数 (空文件也有一个空分片)"""
+        return max(1, -(-length // chunk_size))
+
+    def _aead(self, header: bytes) -> Union[AESGCM, ChaCha20Poly1305]:
+        """头部对应文件的 AEAD (同一文件的各分片复用派生结果)"""
+        salt = header[_SALT_OFFSET : _SALT_OFFSET + SALT_SIZE]
+        cached = self._file
+        if cached is None or cached[0] != salt:
+            alg_id, aead_class = ALGORITHMS[self.algorithm]
+            cached = (salt, aead_class(derive_chunk_key(self.key, salt, alg_id)))
+            self._file = cached
+        return cached[1]
+
+    def encrypt_chunk(
+        self, header: bytes, index: int, final: bool, plaintext: bytes
+    ) -> bytes:
+        prefix = header[-7:]
+        return self._aead(header).encrypt(
+            chunk_nonce(prefix, index, final), plaintext, header
+        )
+
+    def decrypt_chunk(
+        self, header: bytes, index: int, final: bool, ciphertext: bytes
+    ) -> bytes:
+        prefix = header[-7:]
+        try:
+            return self._aead(header).decrypt(
+                chunk_nonce(prefix, index, final), ciphertext, header
+            )
+        except InvalidTag:
+            raise DecryptionError(f"分片 {index} 认证失败") from None
+
+    def encrypt_bytes(self, data: bytes) -> bytes:
+        """加密内存中的数据 (格式与文件相同)"""
+        header = self.make_header(len(data))
+        count = self.chunk_count(len(data), self.chunk_size)
+        parts = [header]
+        for i in range(count):
+            piece = data[i * self.chunk_size : (i + 1) * self.chunk_size]
+            parts.append(self.encrypt_chunk(header, i, i == count - 1, piece))
+        return b"".join(parts)
+
+    def decrypt_bytes(self, blob: bytes) -> bytes:
+        """解密 encrypt_bytes 的输出"""
+        header = blob[: HEADER.size]
+        _, chunk_size, length, _ = self._check_header(header)
+        count = self.chunk_count(length, chunk_size)
+        stride = chunk_size + TAG_SIZE
+        parts = []
+        for i in range(count):
+            start = HEADER.size + i * stride
+            parts.append(
+                self.decrypt_chunk(
+                    header, i, i == count - 1, blob[start : start + stride]
+                )
+            )
+        plaintext = b"".join(parts)
+        if len(plaintext) != length:
+            raise DecryptionError("明文长度与头部不符")
+        return plaintext
+
+    def _check_header(self, header: bytes) -> Tuple[str, int, int, bytes]:
+        algorithm, chunk_size, length, prefix = self.parse_header(header)
+        if algorithm != self.algorithm:
+            raise DecryptionError(f"算法不匹配: {algorithm}")
+        return algorithm, chunk_size, length, prefix
+
+
+def _ciphertext_size(length: int, chunk_size: int) -> int:
+    count = ChunkedCipher.chunk_count(length, chunk_size)
+    return HEADER.size + length + count * TAG_SIZE
+
+
+def _process_range(args) -> int:
+    """工作函数: 加密或解密 [first, last) 范围的分片，用 pwrite 写到固定偏移"""
+    mode, key, algorithm, header, src, dst, first, last = args
+    _, chunk_size, length, _ = ChunkedCipher.parse_header(header)
+    cipher = ChunkedCipher(key, algorithm, chunk_size)
+    count = cipher.chunk_count(length, chunk_size)
+    stride = chunk_size + TAG_SIZE
+    src_fd = os.open(src, os.O_RDONLY)
+    dst_fd = os.open(dst, os.O_WRONLY)
+    try:
+        for i in range(first, last):
+            final = i == count - 1
+            plain_size = min(chunk_size, length - i * chunk_size)
+            if mode == "encrypt":
+                data = os.pread(src_fd, plain_size, i * chunk_size)
+                out = cipher.encrypt_chunk(header, i, final, data)
+                os.pwrite(dst_fd, out, HEADER.size + i * stride)
+            else:
+                data = os.pread(src_fd, plain_size + TAG_SIZE, HEADER.size + i * stride)
+                out = cipher.decrypt_chunk(header, i, final, data)
+                os.pwrite(dst_fd, out, i * chunk_size)
+        return int(last - first)
+    finally:
+        os.close(src_fd)
+        os.close(dst_fd)
+
+
+def _run_parallel(
+    mode: str, cipher: ChunkedCipher, header: bytes, src: str, dst: str, workers: int
+):
+    _, chunk_size, length, _ = ChunkedCipher.parse_header(header)
+    count = cipher.chunk_count(length, chunk_size)
+    # 每个任务处理连续的一段分片，任务数略多于进程数以平衡负载
+    per_job = max(1, -(-count // (workers * 4)))
+    jobs: List[Any] = [
+        (
+            mode,
+            cipher.key,
+            cipher.algorithm,
+            header,
+            src,
+            dst,
+            i,
+            min(count, i + per_job),
+        )
+        for i in range(0, count, per_job)
+    ]
+    if workers <= 1 or len(jobs) == 1:
+        for job in jobs:
+            _process_range(job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for _ in pool.map(_process_range, jobs):
+            pass
+
+
+def encrypt_file(cipher: ChunkedCipher, src: str, dst: str, workers: int = 1) -> int:
+    """加密文件，返回密文大小；每个进程同时只持有一个分片"""
+    length = os.path.getsize(src)
+    header = cipher.make_header(length)
+    with open(dst, "wb") as f:
+        f.write(header)
+        f.truncate(_ciphertext_size(length, cipher.chunk_size))
+    _run_parallel("encrypt", cipher, header, src, dst, workers)
+    return _ciphertext_size(length, cipher.chunk_size)
+
+
+def decrypt_file(cipher: ChunkedCipher, src: str, dst: str, workers: int = 1) -> int:
+    """解密文件，返回明文大小；任何分片认证失败都会抛出 DecryptionError"""
+    with open(src, "rb") as f:
+        header = f.read(HEADER.size)
+    _, chunk_size, length, _ = cipher._check_header(header)
+    if os.path.getsize(src) != _ciphertext_size(length, chunk_size):
+        raise DecryptionError("密文长度与头部不符 (可能被截断)")
+    with open(dst, "wb") as f:
+        f.truncate(length)
+    try:
+        _run_parallel("decrypt", cipher, header, src, dst, workers)
+    except DecryptionError:
+        os.unlink(dst)
+        raise
+    return length
+
+
+def read_at(cipher: ChunkedCipher, path: str, offset: int, size: int) -> bytes:
+    """随机读取明文 [offset, offset+size)，只解密涉及的分片"""
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+        _, chunk_size, length, _ = cipher._check_header(header)
+        end = min(length, offset + size)
+        if offset >= end:
+            return b""
+        count = cipher.chunk_count(length, chunk_size)
+        stride = chunk_size + TAG_SIZE
+        parts = []
+        for i in range(offset // chunk_size, (end - 1) // chunk_size + 1):
+            f.seek(HEADER.size + i * stride)
+            plain = cipher.decrypt_chunk(header, i, i == count - 1, f.read(stride))
+            parts.append(plain)
+    data = b"".join(parts)
+    start = offset % chunk_size
+    return data[start : start + (end - offset)]
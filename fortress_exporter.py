@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞 Prometheus 导出器
+抓取时只读取缓存的最新值，从不触发采集或子进程
+"""
+
+import logging
+import threading
+from socketserver import ThreadingMixIn
+from typing import Any, Callable, Dict, Optional
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+try:
+    from prometheus_client import CollectorRegistry, Gauge, make_wsgi_app
+    from prometheus_client.core import (
+        CounterMetricFamily,
+        GaugeMetricFamily,
+        HistogramMetricFamily,
+    )
+except ImportError:  # pragma: no cover - 可选依赖
+    CollectorRegistry = None  # type: ignore[misc,assignment]
+
+NETWORK_STATES = ("connected", "disconnected", "unknown")
+
+
+def _gauge_value(value: Optional[float]) -> float:
+    return float("nan") if value is None else float(value)
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _SilentHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class _RuntimeCollector:
+    """从缓存读取模块状态、采集延迟与日志队列深度"""
+
+    def __init__(self, exporter: "FortressExporter"):
+        self.exporter = exporter
+
+    def collect(self):
+        modules = GaugeMetricFamily(
+            "fortress_module_status",
+            "模块当前状态 (当前状态为1)",
+            labels=["module", "status", "priority"],
+        )
+        for name, info in self.exporter.modules.items():
+            modules.add_metric(
+                [name, str(info.get("status", "")), str(info.get("priority", ""))], 1
+            )
+        yield modules
+
+        latency = HistogramMetricFamily(
+            "fortress_collector_latency_seconds",
+            "采集器单次执行耗时",
+            labels=["collector"],
+        )
+        timeouts = CounterMetricFamily(
+            "fortress_collector_timeouts",
+            "采集器超时次数",
+            labels=["collector"],
+        )
+        errors = CounterMetricFamily(
+            "fortress_collector_errors",
+            "采集器异常次数",
+            labels=["collector"],
+        )
+        for name, stats in self.exporter.latency_source().items():
+            buckets = [
+                ("+Inf" if upper == float("inf") else repr(upper), count)
+                for upper, count in stats["buckets"]
+            ]
+            latency.add_metric([name], buckets, stats["sum"])
+            timeouts.add_metric([name], stats.get("timeouts", 0))
+            errors.add_metric([name], stats.get("errors", 0))
+        yield latency
+        yield timeouts
+        yield errors
+
+        writer = self.exporter.writer_source()
+        if writer:
+            yield GaugeMetricFamily(
+                "fortress_log_writer_queue_depth",
+                "健康日志写入队列深度",
+                value=writer.get("queue_depth", 0),
+            )
+            yield CounterMetricFamily(
+                "fortress_log_writer_dropped",
+                "因队列已满被丢弃的健康记录数",
+                value=writer.get("dropped", 0),
+            )
+
+
+class FortressExporter:
+    """可选的 Prometheus HTTP 导出线程
+
+    健康指标是预注册的 Gauge，在每次采样后由监控线程更新；其余指标
+    在抓取时读取内存中的计数器。抓取成本与采集频率无关。
+    """
+
+    def __init__(
+        self,
+        port: int = 9464,
+        addr: str = "0.0.0.0",
+        latency_source: Optional[Callable[[], Dict[str, Dict[str, Any]]]] = None,
+        writer_source: Optional[Callable[[], Optional[Dict[str, int]]]] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        if CollectorRegistry is None:
+            raise RuntimeError("未安装 prometheus-client，无法启用导出器")
+        self.port = port
+        self.addr = addr
+        self.latency_source = latency_source or dict
+        self.writer_source = writer_source or (lambda: None)
+        self.logger = logger or logging.getLogger("FortressGuardian")
+        self.modules: Dict[str, Dict[str, Any]] = {}
+
+        self.registry = CollectorRegistry(auto_describe=True)
+        self.cpu = Gauge(
+            "fortress_cpu_usage_percent", "CPU使用率", registry=self.registry
+        )
+        self.memory = Gauge(
+            "fortress_memory_usage_percent", "内存使用率", registry=self.registry
+        )
+        self.disk = Gauge(
+            "fortress_disk_usage_percent", "磁盘使用率", registry=self.registry
+        )
+        self.network = Gauge(
+            "fortress_network_status",
+            "网络状态 (当前状态为1)",
+            ["status"],
+            registry=self.registry,
+        )
+        for state in NETWORK_STATES:
+            self.network.labels(state).set(0)
+        self.last_sample = Gauge(
+            "fortress_last_sample_timestamp_seconds",
+            "最近一次健康采样的时间",
+            registry=self.registry,
+        )
+        self.registry.register(_RuntimeCollector(self))
+
+        self._server: Optional[WSGIServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def update(self, health_data: Dict[str, Any], timestamp: float):
+        """用最新的健康采样更新缓存值"""
+        # 采集失败的指标为 None，导出为 NaN 而不是伪造的 0
+        self.cpu.set(_gauge_value(health_data.get("cpu_usage")))
+        self.memory.set(_gauge_value(health_data.get("memory_usage")))
+        self.disk.set(_gauge_value(health_data.get("disk_usage")))
+        status = health_data.get("network_status", "unknown")
+        for state in NETWORK_STATES:
+            self.network.labels(state).set(1 if state == status else 0)
+        self.modules = health_data.get("module_status", {})
+        self.last_sample.set(timestamp)
+
+    def start(self):
+        """在后台线程中启动HTTP服务"""
+        if self._server is not None:
+            return
+        self._server = make_server(
+            self.addr,
+            self.port,
+            make_wsgi_app(self.registry),
+            _ThreadingWSGIServer,
+            handler_class=_SilentHandler,
+        )
+        self.port = self._server.server_port
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fortress-exporter", daemon=True
+        )
+        self._thread.start()
+        self.logger.info(f"Prometheus导出器监听 {self.addr}:{self.port}")
+
+    def stop(self):
+        """停止HTTP服务"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞共享内存快照
+守护进程发布最新健康快照，控制台通过 seqlock 无锁读取
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+MAGIC = b"FTFD"
+FORMAT_VERSION = 1
+
+# 头部: magic(4s) 版本(I) 序列号(Q) 载荷长度(I) 容量(I)
+HEADER = struct.Struct("<4sIQII")
+SEQ_OFFSET = 8
+SEQ = struct.Struct("<Q")
+LENGTH = struct.Struct("<I")
+LENGTH_OFFSET = 16
+DEFAULT_CAPACITY = 256 * 1024
+
+
+def default_feed_path() -> str:
+    """默认快照文件路径，优先使用 /dev/shm"""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "fortress_feed")
+
+
+class SnapshotPublisher:
+    """快照发布端 (单写者)
+
+    写入前把序列号加一变为奇数，写完载荷后再加一变为偶数；
+    读者看到奇数或前后序列号不一致时重试。
+    """
+
+    def __init__(self, path: Optional[str] = None, capacity: int = DEFAULT_CAPACITY):
+        self.path = path or default_feed_path()
+        self.capacity = capacity
+        self._seq = 0
+        size = HEADER.size + capacity
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(fd)
+        magic, version, seq, _, _ = HEADER.unpack_from(self._mm, 0)
+        if magic == MAGIC and version == FORMAT_VERSION:
+            # 守护进程重启后序列号继续递增，避免读者误用旧缓存
+            self._seq = seq + (seq & 1)
+        HEADER.pack_into(self._mm, 0, MAGIC, FORMAT_VERSION, self._seq, 0, capacity)
+
+    def publish(self, snapshot: Dict[str, Any]) -> int:
+        """发布快照，返回新的序列号"""
+        payload = json.dumps(snapshot, ensure_ascii=False, default=str).encode("utf-8")
+        if len(payload) > self.capacity:
+            raise ValueError(f"快照过大: {len(payload)} > {self.capacity} 字节")
+
+        self._seq += 1  # 奇数: 写入中
+        SEQ.pack_into(self._mm, SEQ_OFFSET, self._seq)
+        self._mm[HEADER.size : HEADER.size + len(payload)] = payload
+        LENGTH.pack_into(self._mm, LENGTH_OFFSET, len(payload))
+        self._seq += 1  # 偶数: 写入完成
+        SEQ.pack_into(self._mm, SEQ_OFFSET, self._seq)
+        return self._seq
+
+    def close(self, unlink: bool = False):
+        """关闭映射，可选删除快照文件"""
+        self._mm.close()
+        if unlink:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+
+class SnapshotReader:
+    """快照读取端，可被任意数量的控制台进程同时使用
+
+    读取不会向守护进程发送任何请求；序列号未变化时直接返回缓存的
+    解析结果，不重复解码。
+    """
+
+    def __init__(self, path: Optional[str] = None, max_retries: int = 100):
+        self.path = path or default_feed_path()
+        self.max_retries = max_retries
+        self._mm: Optional[mmap.mmap] = None
+        self._seq = 0
+        self._cached: Optional[Dict[str, Any]] = None
+
+    def _open(self) -> bool:
+        if self._mm is not None:
+            return True
+        try:
+            with open(self.path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+        if len(mm) < HEADER.size:
+            mm.close()
+            return False
+        magic, version, _, _, _ = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            mm.close()
+            return False
+        self._mm = mm
+        return True
+
+    def sequence(self) -> int:
+        """返回当前序列号 (无快照时为0)"""
+        if not self._open():
+            return 0
+        assert self._mm is not None
+        return int(SEQ.unpack_from(self._mm, SEQ_OFFSET)[0])
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """读取一致的最新快照，尚无快照时返回None"""
+        if not self._open():
+            return None
+        mm = self._mm
+        assert mm is not None
+
+        for attempt in range(self.max_retries):
+            before = SEQ.unpack_from(mm, SEQ_OFFSET)[0]
+            if before == self._seq:
+                return self._cached
+            if before & 1:
+                time.sleep(0 if attempt < 10 else 0.0001)
+                continue
+            length = LENGTH.unpack_from(mm, LENGTH_OFFSET)[0]
+            payload = mm[HEADER.size : HEADER.size + length]
+            if SEQ.unpack_from(mm, SEQ_OFFSET)[0] != before:
+                continue
+            try:
+                snapshot: Dict[str, Any] = json.loads(payload)
+            except ValueError:
+                continue
+            self._seq = before
+            self._cached = snapshot
+            return snapshot
+        # 写者持续占用，返回上一份一致快照
+        return self._cached
+
+    def close(self):
+        """关闭映射"""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞防火墙规则引擎
+IPv4 规则编译为基本地址区间上的规则覆盖表 (NumPy)，按端口类别惰性求出
+每个区间的首条命中规则，查找只需一次二分；IPv6 使用按字节分层的前缀树
+"""
+
+import bisect
+import ipaddress
+import socket
+from collections import OrderedDict
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+INTERNAL_NETWORKS = [
+    "10.0.0.0/8",
+    "172.16.0.0/12",
+    "192.168.0.0/16",
+    "127.0.0.0/8",
+    "fc00::/7",
+    "::1/128",
+]
+
+
+def _complement(networks: Sequence[str]) -> List[str]:
+    """全部地址空间减去给定网络，得到若干不重叠的CIDR"""
+    result: List[str] = []
+    for universe in ("0.0.0.0/0", "::/0"):
+        remaining: List[Any] = [ipaddress.ip_network(universe)]
+        for excluded in map(ipaddress.ip_network, networks):
+            if excluded.version != remaining[0].version:
+                continue
+            next_remaining: List[Any] = []
+            for net in remaining:
+                if excluded.subnet_of(net):
+                    next_remaining.extend(net.address_exclude(excluded))
+                elif not net.subnet_of(excluded):
+                    next_remaining.append(net)
+            remaining = next_remaining
+        result.extend(str(net) for net in remaining)
+    return result
+
+
+# 未在 security.firewall.aliases 中定义时使用的内置网络别名
+DEFAULT_ALIASES: Dict[str, List[str]] = {
+    "internal_network": INTERNAL_NETWORKS,
+    "external_access": _complement(INTERNAL_NETWORKS),
+    "authorized_terminals": [],
+    "any": ["0.0.0.0/0", "::/0"],
+}
+
+ACTIONS = ("allow", "deny")
+_NO_EXCEPTS: FrozenSet[int] = frozenset()
+
+
+class Decision(NamedTuple):
+    action: str
+    rule: Optional[int]  # 命中的规则序号，None 表示默认策略
+
+
+class _Node:
+    """前缀树节点: 每层消费地址的一个字节"""
+
+    __slots__ = ("rules", "children")
+
+    def __init__(self):
+        self.rules: Dict[int, List[int]] = {}
+        self.children: Dict[int, "_Node"] = {}
+
+
+class PrefixTrie:
+    """以字节为步长的多比特前缀树
+
+    每条前缀挂在其长度所在层，并按剩余位展开到该层的若干字节值上，
+    节点保存 字节值 -> 规则序号列表 (按插入顺序递增)。查找沿地址
+    最多走 4 层 (IPv6 为 16 层)，收集路径上的列表，即覆盖该地址的
+    全部规则；开销取决于覆盖该地址的规则数而不是规则总数。
+    """
+
+    def __init__(self):
+        self.root = _Node()
+        self.root_rules: List[int] = []  # /0 前缀
+
+    def insert(self, network, rule: int):
+        prefix = network.prefixlen
+        if prefix == 0:
+            self.root_rules.append(rule)
+            return
+        packed = network.network_address.packed
+        level = (prefix - 1) // 8
+        node = self.root
+        for i in range(level):
+            node = node.children.setdefault(packed[i], _Node())
+        spare = 8 * (level + 1) - prefix
+        first = packed[level]
+        for value in range(first, first + (1 << spare)):
+            node.rules.setdefault(value, []).append(rule)
+
+    def lookup(self, packed: bytes) -> List[List[int]]:
+        found = [self.root_rules] if self.root_rules else []
+        node: Optional[_Node] = self.root
+        for byte in packed:
+            if node is None:
+                break
+            rules = node.rules.get(byte)
+            if rules:
+                found.append(rules)
+            node = node.children.get(byte)
+        return found
+
+
+class PortSet:
+    """编译后的端口集合: 单个端口用集合，端口区间用有序区间二分"""
+
+    __slots__ = ("single", "lows", "highs")
+
+    def __init__(self, ports: Sequence[Tuple[int, int]]):
+        self.single = frozenset(low for low, high in ports if low == high)
+        ranges = sorted((low, high) for low, high in ports if low != high)
+        merged: List[List[int]] = []
+        for low, high in ranges:
+            if merged and low <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], high)
+            else:
+                merged.append([low, high])
+        self.lows = [low for low, _ in merged]
+        self.highs = [high for _, high in merged]
+
+    def __contains__(self, port: int) -> bool:
+        if port in self.single:
+            return True
+        i = bisect.bisect_right(self.lows, port) - 1
+        return i >= 0 and port <= self.highs[i]
+
+
+class IntervalIndex:
+    """IPv4 基本区间索引
+
+    所有源网络与例外网络的端点把地址空间切成互不重叠的基本区间，
+    同一区间内的地址被完全相同的规则覆盖。覆盖关系用 CSR 形式保存
+    (区间 -> 升序规则序号)，全部用 NumPy 构建。
+
+    端口按所有端口集合的端点划分为端口类别，同一类别的端口满足
+    完全相同的规则。每个端口类别首次出现时，用一次 minimum.reduceat
+    求出每个区间的首条命中规则 (-1 表示无)，之后的查找只是一次
+    searchsorted 加一次数组下标，开销与规则数量无关。
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[Tuple[int, int, int]],
+        excepts: Sequence[Tuple[int, int, int]],
+        ports: Sequence[Optional[PortSet]],
+        cache_size: int = 256,
+    ):
+        self.rule_count = len(ports)
+        self.cache_size = cache_size
+        src = np.array(sources, dtype=np.int64).reshape(-1, 3)
+        exc = np.array(excepts, dtype=np.int64).reshape(-1, 3)
+        self.bounds = np.unique(
+            np.concatenate([[0, 1 << 32], src[:, 0], src[:, 1], exc[:, 0], exc[:, 1]])
+        )
+        self._bounds_list = self.bounds.tolist()
+        self.intervals = len(self.bounds) - 1
+
+        rules = max(1, self.rule_count)
+        keys = np.unique(self._coverage(src) * rules + self._rules(src))
+        if len(exc):
+            excluded = self._coverage(exc) * rules + self._rules(exc)
+            keys = keys[~np.isin(keys, excluded)]
+        self.cover_rules = keys % rules
+        counts = np.bincount(keys // rules, minlength=self.intervals)
+        self._starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[counts > 0]
+        self._nonempty = counts > 0
+
+        # 端口集合 -> 使用它的规则；未限定端口的规则总是满足
+        self._any_ports = np.array([p is None for p in ports], dtype=bool)
+        groups: Dict[int, Tuple[PortSet, List[int]]] = {}
+        for index, port_set in enumerate(ports):
+            if port_set is not None:
+                groups.setdefault(id(port_set), (port_set, []))[1].append(index)
+        self._port_groups = [
+            (port_set, np.array(members)) for port_set, members in groups.values()
+        ]
+        edges: Set[int] = set()
+        for port_set, _ in self._port_groups:
+            edges.update(port_set.single)
+            edges.update(p + 1 for p in port_set.single)
+            edges.update(port_set.lows)
+            edges.update(h + 1 for h in port_set.highs)
+        self.port_bounds = np.array(sorted(edges), dtype=np.int64)
+        self._port_bounds_list = self.port_bounds.tolist()
+        self._first: "OrderedDict[int, np.ndarray]" = OrderedDict()
+
+    def _coverage(self, networks: np.ndarray) -> np.ndarray:
+        """每个 (网络, 被其覆盖的基本区间) 对应的区间编号"""
+        first = np.searchsorted(self.bounds, networks[:, 0])
+        last = np.searchsorted(self.bounds, networks[:, 1])
+        lengths = last - first
+        offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        intervals: np.ndarray = np.arange(lengths.sum()) - offsets
+        return intervals + np.repeat(first, lengths)
+
+    def _rules(self, networks: np.ndarray) -> np.ndarray:
+        lengths = np.searchsorted(self.bounds, networks[:, 1]) - np.searchsorted(
+            self.bounds, networks[:, 0]
+        )
+        return np.repeat(networks[:, 2], lengths)
+
+    def port_class(self, port: int) -> int:
+        return bisect.bisect_right(self._port_bounds_list, port)
+
+    def first_rules(self, port_class: int) -> np.ndarray:
+        """该端口类别下每个基本区间的首条命中规则 (-1 表示无)"""
+        first = self._first.get(port_class)
+        if first is not None:
+            self._first.move_to_end(port_class)
+            return first
+        # 取类别内任一端口判断各端口集合
+        if port_class:
+            port = self._port_bounds_list[port_class - 1]
+        else:
+            port = self._port_bounds_list[0] - 1 if self._port_bounds_list else 0
+        ok = self._any_ports.copy()
+        for port_set, members in self._port_groups:
+            if port in port_set:
+                ok[members] = True
+        first = np.full(self.intervals, -1, dtype=np.int32)
+        if len(self.cover_rules):
+            values = np.where(ok[self.cover_rules], self.cover_rules, self.rule_count)
+            reduced = np.minimum.reduceat(values, self._starts)
+            first[self._nonempty] = np.where(reduced == self.rule_count, -1, reduced)
+        self._first[port_class] = first
+        if len(self._first) > self.cache_size:
+            self._first.popitem(last=False)
+        return first
+
+    def lookup(self, address: int, port: int) -> int:
+        """单个地址的首条命中规则 (-1 表示无)"""
+        interval = bisect.bisect_right(self._bounds_list, address) - 1
+        return int(self.first_rules(self.port_class(port))[interval])
+
+    def lookup_array(self, addresses: np.ndarray, ports: np.ndarray) -> np.ndarray:
+        """批量查找，addresses 为 uint32 地址数组"""
+        intervals = np.searchsorted(self.bounds, addresses, side="right") - 1
+        classes = np.searchsorted(self.port_bounds, ports, side="right")
+        result = np.empty(len(addresses), dtype=np.int32)
+        for port_class in np.unique(classes).tolist():
+            selected = classes == port_class
+            result[selected] = self.first_rules(port_class)[intervals[selected]]
+        return result
+
+
+def parse_ports(value: Any) -> Optional[List[Tuple[int, int]]]:
+    """解析端口列表: 整数、"8000-8100" 区间或 "any"；未指定时返回None"""
+    if value is None or value == "any":
+        return None
+    if not isinstance(value, (list, tuple)):
+        value = [value]
+    ports = []
+    for item in value:
+        if isinstance(item, str) and "-" in item:
+            low, high = (int(p) for p in item.split("-", 1))
+        else:
+            low = high = int(item)
+        if not 0 <= low <= high <= 65535:
+            raise ValueError(f"无效的端口: {item}")
+        ports.append((low, high))
+    return ports
+
+
+def _interval(network: Any, rule: int) -> Tuple[int, int, int]:
+    start = int(network.network_address)
+    return start, start + network.num_addresses, rule
+
+
+def _pack(ip: str) -> bytes:
+    try:
+        return socket.inet_pton(socket.AF_INET, ip)
+    except OSError:
+        return socket.inet_pton(socket.AF_INET6, ip)
+
+
+class FirewallMatcher:
+    """编译后的防火墙规则
+
+    规则按配置顺序首条命中生效，端口编译为 PortSet (相同端口列表共享
+    同一对象)。IPv4 网络编译为 IntervalIndex，查找开销与规则数量无关；
+    IPv6 网络的源地址与例外地址各编译为一棵前缀树，只检查覆盖该地址
+    的规则，按序号从小到大找到第一条端口匹配且未被例外排除的规则。
+    无规则命中时使用默认策略。
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[Dict[str, Any]],
+        aliases: Optional[Dict[str, Sequence[str]]] = None,
+        default_action: str = "allow",
+    ):
+        if default_action not in ACTIONS:
+            raise ValueError(f"无效的默认策略: {default_action}")
+        self.aliases: Dict[str, Sequence[str]] = dict(DEFAULT_ALIASES)
+        self.aliases.update(aliases or {})
+        self.default_action = default_action
+        self.rules = list(rules)
+        self.actions: List[str] = []
+        self.decisions: List[Decision] = []  # 预先构造，查找时不再分配
+        self.default_decision = Decision(default_action, None)
+        self.ports: List[Optional[PortSet]] = []
+
+        # IPv4: (起始地址, 结束地址+1, 规则序号)；IPv6: 前缀树
+        self._sources4: List[Tuple[int, int, int]] = []
+        self._excepts4: List[Tuple[int, int, int]] = []
+        self._sources6 = PrefixTrie()
+        self._excepts6 = PrefixTrie()
+        self._has_excepts6 = False
+        self._port_sets: Dict[Tuple[Tuple[int, int], ...], PortSet] = {}
+        for index, rule in enumerate(self.rules):
+            self._compile_rule(index, rule)
+        self.index4 = IntervalIndex(self._sources4, self._excepts4, self.ports)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "FirewallMatcher":
+        """按 security.firewall 创建"""
+        firewall = (config.get("security", {}) or {}).get("firewall", {}) or {}
+        return cls(
+            firewall.get("rules", []) or [],
+            aliases=firewall.get("aliases"),
+            default_action=firewall.get("default", "allow"),
+        )
+
+    def resolve(self, target: Any) -> List[Any]:
+        """把别名、CIDR或它们的列表解析为网络列表"""
+        if isinstance(target, (list, tuple)):
+            return [net for item in target for net in self.resolve(item)]
+        target = str(target)
+        if target in self.aliases:
+            return [net for item in self.aliases[target] for net in self.resolve(item)]
+        try:
+            return [ipaddress.ip_network(target, strict=False)]
+        except ValueError:
+            raise ValueError(f"未知的网络别名: {target}") from None
+
+    def _compile_rule(self, index: int, rule: Dict[str, Any]):
+        actions = [action for action in ACTIONS if action in rule]
+        if len(actions) != 1:
+            raise ValueError(f"规则 {index} 必须且只能包含 allow 或 deny")
+        action = actions[0]
+        self.actions.append(action)
+        self.decisions.append(Decision(action, index))
+        for network in self.resolve(rule[action]):
+            if network.version == 4:
+                self._sources4.append(_interval(network, index))
+            else:
+                self._sources6.insert(network, index)
+        for network in self.resolve(rule.get("except", [])):
+            if network.version == 4:
+                self._excepts4.append(_interval(network, index))
+            else:
+                self._excepts6.insert(network, index)
+                self._has_excepts6 = True
+        ports = parse_ports(rule.get("ports"))
+        if ports is None:
+            self.ports.append(None)
+        else:
+            key = tuple(sorted(set(ports)))
+            if key not in self._port_sets:
+                self._port_sets[key] = PortSet(key)
+            self.ports.append(self._port_sets[key])
+
+    def _address_rules(self, packed: bytes) -> Tuple[List[List[int]], FrozenSet[int]]:
+        """覆盖该 IPv6 地址的规则列表，以及把该地址列为例外的规则"""
+        excepted: FrozenSet[int] = _NO_EXCEPTS
+        if self._has_excepts6:
+            found = self._excepts6.lookup(packed)
+            if found:
+                excepted = frozenset(i for rules in found for i in rules)
+        return self._sources6.lookup(packed), excepted
+
+    def _first_match(
+        self, candidates: List[List[int]], excepted: FrozenSet[int], port: int
+    ) -> Decision:
+        best: Optional[int] = None
+        ports = self.ports
+        for rules in candidates:
+            for index in rules:
+                if best is not None and index >= best:
+                    break
+                allowed_ports = ports[index]
+                if index in excepted or (
+                    allowed_ports is not None and port not in allowed_ports
+                ):
+                    continue
+                best = index
+                break
+        if best is None:
+            return self.default_decision
+        return self.decisions[best]
+
+    def _decision(self, index: int) -> Decision:
+        return self.default_decision if index < 0 else self.decisions[index]
+
+    def match(self, ip: str, port: int) -> Decision:
+        """判定来自 ip 访问 port 的连接"""
+        packed = _pack(ip)
+        if len(packed) == 4:
+            return self._decision(
+                self.index4.lookup(int.from_bytes(packed, "big"), port)
+            )
+        return self._first_match(*self._address_rules(packed), port)
+
+    def match_array(self, addresses: ArrayLike, ports: ArrayLike) -> np.ndarray:
+        """批量判定 IPv4 连接，返回命中的规则序号数组 (-1 表示默认策略)
+
+        addresses 为 uint32 地址数组 (主机字节序数值)，ports 为端口数组；
+        全部计算在 NumPy 中完成。
+        """
+        return self.index4.lookup_array(
+            np.asarray(addresses, dtype=np.uint32), np.asarray(ports, dtype=np.int64)
+        )
+
+    def match_many(self, flows: Iterable[Tuple[str, int]]) -> List[Decision]:
+        """批量判定流记录 (源地址, 端口)
+
+        IPv4 流记录打包为 uint32 数组后交给 match_array 一次判定，
+        IPv6 流记录逐条查找前缀树。判定结果是预先构造的共享对象。
+        """
+        flows = list(flows)
+        results: List[Decision] = [self.default_decision] * len(flows)
+        packed4: List[bytes] = []
+        ports4: List[int] = []
+        positions4: List[int] = []
+        for position, (ip, port) in enumerate(flows):
+            packed = _pack(ip)
+            if len(packed) == 4:
+                packed4.append(packed)
+                ports4.append(port)
+                positions4.append(position)
+            else:
+                results[position] = self._first_match(
+                    *self._address_rules(packed), port
+                )
+        if packed4:
+            addresses = np.frombuffer(b"".join(packed4), dtype=">u4")
+            table = self.decisions + [self.default_decision]
+            for position, index in zip(
+                positions4, self.match_array(addresses, np.array(ports4)).tolist()
+            ):
+                results[position] = table[index]
+        return results
+
+    def allowed(self, ip: str, port: int) -> bool:
+        """连接是否被放行"""
+        return self.match(ip, port).action == "allow"
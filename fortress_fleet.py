@@ -0,0 +1,728 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞集群汇聚
+各节点守护进程通过 websocket 把健康快照以批量增量的形式推送到中心收集器
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from fortress_scheduler import LatencyHistogram
+
+try:
+    import websockets
+    from websockets.exceptions import ConnectionClosed, WebSocketException
+except ImportError:  # pragma: no cover - 可选依赖
+    websockets = None  # type: ignore[assignment]
+
+PROTOCOL = 1
+SEP = "/"  # 扁平化路径分隔符 (快照键中不含 /)
+DEFAULT_PORT = 8765
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_FLUSH_INTERVAL = 0.2
+DEFAULT_BUFFER = 1000
+DEFAULT_BACKOFF = (0.5, 30.0)
+HELLO_TIMEOUT = 10.0
+# 控制台订阅: 变化的节点摘要每隔这么久推送一次，全量按块发送
+VIEW_INTERVAL = 0.5
+VIEW_CHUNK = 1000
+VIEW_SEND_TIMEOUT = 5.0  # 控制台在此时间内收不完一轮推送即断开
+NODE_TTL = 24 * 3600.0  # 断开超过此时间的节点从收集器中移除
+MAX_MESSAGE = 4 * 1024 * 1024
+# 端到端延迟直方图的桶上界 (秒)
+FLEET_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def flatten(
+    obj: Dict[str, Any], prefix: str = "", out: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """把嵌套字典展开为 "a/b/c" 路径到叶子值的映射 (列表与空字典视为叶子)"""
+    out = {} if out is None else out
+    for key, value in obj.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            flatten(value, path + SEP, out)
+        else:
+            out[path] = value
+    return out
+
+
+def unflatten(flat: Dict[str, Any]) -> Dict[str, Any]:
+    """flatten 的逆运算"""
+    root: Dict[str, Any] = {}
+    for path, value in flat.items():
+        *parents, leaf = path.split(SEP)
+        node = root
+        for key in parents:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = node[key] = {}
+            node = child
+        node[leaf] = value
+    return root
+
+
+def diff(
+    previous: Dict[str, Any], current: Dict[str, Any]
+) -> Tuple[Dict[str, Any], List[str]]:
+    """两个扁平快照的差异: (新增或变化的路径, 删除的路径)"""
+    changed = {
+        path: value
+        for path, value in current.items()
+        if path not in previous or previous[path] != value
+    }
+    removed = [path for path in previous if path not in current]
+    return changed, removed
+
+
+class FleetAgent:
+    """节点端推送器
+
+    ``submit`` 在调用线程中与上一次入队的状态求差异，只把变化的
+    路径放入有界发送队列；发送协程把队列中的更新合并成批发送。
+    队列满时丢弃积压的增量，改为入队一个当前状态的全量关键帧，
+    连接 (重) 建立后同样先发送关键帧，收集器据此重建节点状态。
+    连接失败按指数退避 (带抖动) 重连。
+    """
+
+    def __init__(
+        self,
+        url: str,
+        node: Optional[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        buffer: int = DEFAULT_BUFFER,
+        backoff: Tuple[float, float] = DEFAULT_BACKOFF,
+        logger: Optional[logging.Logger] = None,
+    ):
+        if websockets is None:
+            raise RuntimeError("未安装 websockets，无法启用集群推送")
+        if buffer <= 0:
+            raise ValueError("发送队列容量必须大于 0")
+        self.url = url
+        self.node = node or socket.gethostname()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = buffer
+        self.backoff = backoff
+        self.logger = logger or logging.getLogger("FortressGuardian")
+
+        self.connected = False
+        self.sent = 0  # 已发送的更新数
+        self.batches = 0
+        self.bytes = 0
+        self.dropped = 0  # 因队列满被关键帧取代的增量数
+        self.reconnects = 0
+
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {}  # 最近入队的扁平状态
+        self._state_ts = 0.0
+        self._seq = 0
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(
+        cls, config: Dict[str, Any], logger: Optional[logging.Logger] = None
+    ) -> "FleetAgent":
+        """按 monitoring.fleet 创建"""
+        options = (config.get("monitoring", {}) or {}).get("fleet", {}) or {}
+        return cls(
+            options["collector"],
+            node=options.get("node"),
+            batch_size=int(options.get("batch_size", DEFAULT_BATCH_SIZE)),
+            flush_interval=float(options.get("flush_interval", DEFAULT_FLUSH_INTERVAL)),
+            buffer=int(options.get("buffer", DEFAULT_BUFFER)),
+            backoff=(
+                float(options.get("backoff_min", DEFAULT_BACKOFF[0])),
+                float(options.get("backoff_max", DEFAULT_BACKOFF[1])),
+            ),
+            logger=logger,
+        )
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def submit(self, snapshot: Dict[str, Any], timestamp: Optional[float] = None):
+        """入队一个快照的增量 (线程安全，无变化时不入队)"""
+        flat = flatten(snapshot)
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            changed, removed = diff(self._state, flat)
+            self._state = flat
+            self._state_ts = timestamp
+            if not changed and not removed:
+                return
+            self._seq += 1
+            if len(self._queue) >= self.buffer:
+                self.dropped += len(self._queue)
+                self._queue.clear()
+                self._queue.append(self._keyframe())
+            else:
+                update: Dict[str, Any] = {
+                    "seq": self._seq,
+                    "ts": timestamp,
+                    "set": changed,
+                }
+                if removed:
+                    update["del"] = removed
+                self._queue.append(update)
+        self._wake()
+
+    def _keyframe(self) -> Dict[str, Any]:
+        return {
+            "seq": self._seq,
+            "ts": self._state_ts,
+            "full": True,
+            "set": dict(self._state),
+        }
+
+    def _resync(self):
+        """新连接上先发送全量关键帧，之前积压的增量作废"""
+        with self._lock:
+            self._queue.clear()
+            if self._state:
+                self._queue.append(self._keyframe())
+        if self._queue and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            count = min(len(self._queue), self.batch_size)
+            return [self._queue.popleft() for _ in range(count)]
+
+    def _wake(self):
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass  # 事件循环已关闭
+
+    async def run(self):
+        """连接、发送与退避重连，直到 stop"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stop = asyncio.Event()
+        if self._closing:
+            return
+        delay = self.backoff[0]
+        while not self._stop.is_set():
+            try:
+                async with websockets.connect(
+                    self.url, compression=None, open_timeout=HELLO_TIMEOUT
+                ) as ws:
+                    await ws.send(
+                        _encode(
+                            {"type": "hello", "node": self.node, "protocol": PROTOCOL}
+                        )
+                    )
+                    self._resync()
+                    self.connected = True
+                    delay = self.backoff[0]
+                    await self._send_loop(ws)
+            except (OSError, asyncio.TimeoutError, WebSocketException) as e:
+                self.logger.debug(f"集群收集器连接中断: {e}")
+            finally:
+                self.connected = False
+            if self._stop.is_set():
+                break
+            self.reconnects += 1
+            try:
+                await asyncio.wait_for(
+                    self._stop.wait(), delay * random.uniform(0.5, 1.0)
+                )
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, self.backoff[1])
+
+    async def _send_loop(self, ws):
+        assert self._wakeup is not None and self._stop is not None
+        closed = asyncio.ensure_future(ws.wait_closed())
+        stopping = asyncio.ensure_future(self._stop.wait())
+        try:
+            while True:
+                woken = asyncio.ensure_future(self._wakeup.wait())
+                await asyncio.wait(
+                    {woken, closed, stopping}, return_when=asyncio.FIRST_COMPLETED
+                )
+                woken.cancel()
+                if closed.done() or stopping.done():
+                    return
+                self._wakeup.clear()
+                # 等待一小段时间，把这期间的更新合并到同一批
+                if self.flush_interval and self.pending < self.batch_size:
+                    await asyncio.wait({closed, stopping}, timeout=self.flush_interval)
+                batch = self._drain()
+                while batch:
+                    message = _encode({"type": "batch", "updates": batch})
+                    await ws.send(message)
+                    self.sent += len(batch)
+                    self.batches += 1
+                    self.bytes += len(message)
+                    batch = self._drain()
+        finally:
+            closed.cancel()
+            stopping.cancel()
+
+    def start(self):
+        """在独立线程的事件循环中运行"""
+        if self._thread is not None:
+            return
+        self._closing = False
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self.run()),
+            name="fortress-fleet-agent",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """停止发送并等待线程退出 (未发送的更新被丢弃)"""
+        self._closing = True
+        loop, stop = self._loop, self._stop
+        if loop is not None and stop is not None:
+            try:
+                loop.call_soon_threadsafe(stop.set)
+            except RuntimeError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "pending": self.pending,
+            "sent": self.sent,
+            "batches": self.batches,
+            "bytes": self.bytes,
+            "dropped": self.dropped,
+            "reconnects": self.reconnects,
+        }
+
+
+class NodeState:
+    """收集器中一个节点的最新状态"""
+
+    __slots__ = (
+        "node",
+        "flat",
+        "seq",
+        "updated_at",
+        "received_at",
+        "connected",
+        "disconnected_at",
+    )
+
+    def __init__(self, node: str):
+        self.node = node
+        self.flat: Dict[str, Any] = {}
+        self.seq = 0
+        self.updated_at = 0.0  # 节点发布时间
+        self.received_at = 0.0
+        self.connected = False
+        self.disconnected_at = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return unflatten(self.flat)
+
+    def summary(self) -> Dict[str, Any]:
+        """控制台列表使用的精简行"""
+        flat = self.flat
+        modules: Dict[str, int] = {}
+        module_list: Dict[str, Dict[str, Any]] = {}
+        prefix = "modules" + SEP
+        for path, value in flat.items():
+            if not path.startswith(prefix):
+                continue
+            name, _, field = path[len(prefix) :].rpartition(SEP)
+            if field == "status":
+                modules[value] = modules.get(value, 0) + 1
+            if field in ("status", "priority"):
+                module_list.setdefault(name, {})[field] = value
+        return {
+            "node": self.node,
+            "connected": self.connected,
+            "status": flat.get("status"),
+            "updated_at": self.updated_at,
+            "cpu_usage": flat.get(f"health{SEP}cpu_usage"),
+            "memory_usage": flat.get(f"health{SEP}memory_usage"),
+            "disk_usage": flat.get(f"health{SEP}disk_usage"),
+            "network_status": flat.get(f"health{SEP}network_status"),
+            "modules": modules,
+            "module_list": module_list,
+        }
+
+
+class FleetCollector:
+    """中心收集器
+
+    所有连接在同一个 asyncio 事件循环中处理；每条消息只做一次 JSON
+    解析与若干字典更新，不分配每连接线程。关闭了 permessage-deflate
+    压缩 (增量本身很小)，每连接内存只剩读写缓冲区。断开超过 node_ttl
+    秒的节点被移除，控制台收到带 removed 标记的行。
+    """
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = DEFAULT_PORT,
+        logger: Optional[logging.Logger] = None,
+        node_ttl: float = NODE_TTL,
+        view_timeout: float = VIEW_SEND_TIMEOUT,
+    ):
+        if websockets is None:
+            raise RuntimeError("未安装 websockets，无法启动集群收集器")
+        self.host = host
+        self.port = port
+        self.logger = logger or logging.getLogger("FortressGuardian")
+        self.node_ttl = node_ttl
+        self.view_timeout = view_timeout
+        self.nodes: Dict[str, NodeState] = {}
+        self.latency = LatencyHistogram(FLEET_BUCKETS)
+        self.connections = 0
+        self.messages = 0
+        self.updates = 0
+        self.bytes = 0
+        self.gaps = 0  # 序列号不连续的增量 (不应出现)
+        self.rejected = 0
+        self.evicted = 0
+        self.slow_viewers = 0
+        self._viewers: Set[Any] = set()
+        self._dirty: Set[str] = set()  # 摘要待推送给控制台的节点
+        self._removed: Set[str] = set()  # 已移除、待通知控制台的节点
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    async def serve(self):
+        """监听直到 stop"""
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        async with websockets.serve(
+            self._handle,
+            self.host,
+            self.port,
+            compression=None,
+            max_size=MAX_MESSAGE,
+        ) as server:
+            self.port = next(iter(server.sockets)).getsockname()[1]
+            self._ready.set()
+            broadcaster = asyncio.ensure_future(self._broadcast())
+            try:
+                await self._stop.wait()
+            finally:
+                broadcaster.cancel()
+
+    async def _handle(self, websocket, path=None):
+        state: Optional[NodeState] = None
+        self.connections += 1
+        try:
+            hello = json.loads(await asyncio.wait_for(websocket.recv(), HELLO_TIMEOUT))
+            if not isinstance(hello, dict) or hello.get("protocol") != PROTOCOL:
+                raise ValueError(f"无效的握手: {hello!r:.100}")
+            if hello.get("type") == "viewer":
+                await self._serve_viewer(websocket)
+                return
+            if hello.get("type") != "hello":
+                raise ValueError(f"无效的握手: {hello!r:.100}")
+            node = str(hello["node"])
+            state = self.nodes.get(node)
+            if state is None:
+                state = self.nodes[node] = NodeState(node)
+            state.connected = True
+            self._removed.discard(node)
+            self._dirty.add(node)
+            async for message in websocket:
+                self.apply(state, json.loads(message), len(message))
+        except (ValueError, KeyError, TypeError, asyncio.TimeoutError) as e:
+            self.rejected += 1
+            self.logger.warning(f"拒绝集群连接: {e}")
+        except ConnectionClosed:
+            pass
+        finally:
+            self.connections -= 1
+            if state is not None:
+                state.connected = False
+                state.disconnected_at = time.time()
+                self._dirty.add(state.node)
+
+    async def _serve_viewer(self, websocket):
+        """控制台订阅: 先分块发送全部节点摘要，之后由 _broadcast 推送变化"""
+        self._viewers.add(websocket)
+        try:
+            rows = self.summaries()
+            for start in range(0, len(rows), VIEW_CHUNK):
+                chunk = rows[start : start + VIEW_CHUNK]
+                await websocket.send(_encode({"type": "rows", "rows": chunk}))
+            await websocket.wait_closed()
+        finally:
+            self._viewers.discard(websocket)
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """移除断开超过 node_ttl 的节点，返回移除数"""
+        now = time.time() if now is None else now
+        expired = [
+            node
+            for node, state in list(self.nodes.items())
+            if not state.connected and now - state.disconnected_at > self.node_ttl
+        ]
+        for node in expired:
+            del self.nodes[node]
+            self._dirty.discard(node)
+            self._removed.add(node)
+        self.evicted += len(expired)
+        return len(expired)
+
+    async def _broadcast(self):
+        """每隔 VIEW_INTERVAL 把变化节点的摘要推送给全部控制台
+
+        每个控制台的发送单独限时，收不完的控制台被断开，不拖慢其他控制台。
+        """
+        sweep_interval = min(60.0, self.node_ttl / 4)
+        last_sweep = time.monotonic()
+        while True:
+            await asyncio.sleep(VIEW_INTERVAL)
+            if time.monotonic() - last_sweep >= sweep_interval:
+                last_sweep = time.monotonic()
+                self.evict()
+            if not self._dirty and not self._removed:
+                continue
+            dirty, self._dirty = self._dirty, set()
+            removed, self._removed = self._removed, set()
+            if not self._viewers:
+                continue
+            rows = [self.nodes[node].summary() for node in dirty]
+            rows.extend({"node": node, "removed": True} for node in removed)
+            messages = [
+                _encode({"type": "rows", "rows": rows[i : i + VIEW_CHUNK]})
+                for i in range(0, len(rows), VIEW_CHUNK)
+            ]
+
+            async def send_all(viewer):
+                for message in messages:
+                    await viewer.send(message)
+
+            async def send(viewer):
+                try:
+                    await asyncio.wait_for(send_all(viewer), self.view_timeout)
+                except asyncio.TimeoutError:
+                    self.slow_viewers += 1
+                    self._viewers.discard(viewer)
+                    self.logger.warning("控制台接收过慢，已断开")
+                    asyncio.ensure_future(viewer.close())
+
+            await asyncio.gather(
+                *(send(viewer) for viewer in list(self._viewers)),
+                return_exceptions=True,
+            )
+
+    def apply(self, state: NodeState, message: Dict[str, Any], size: int = 0):
+        """应用一批更新"""
+        now = time.time()
+        self.messages += 1
+        self.bytes += size
+        for update in message["updates"]:
+            if update.get("full"):
+                state.flat = dict(update["set"])
+            else:
+                if update["seq"] != state.seq + 1:
+                    self.gaps += 1
+                state.flat.update(update["set"])
+                for path in update.get("del", ()):
+                    state.flat.pop(path, None)
+            state.seq = update["seq"]
+            self._dirty.add(state.node)
+            state.updated_at = update["ts"]
+            state.received_at = now
+            self.updates += 1
+            self.latency.observe(max(0.0, now - update["ts"]))
+
+    def start(self, timeout: float = 10.0) -> int:
+        """在独立线程中运行，返回实际监听端口"""
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self.serve()),
+            name="fortress-fleet-collector",
+            daemon=True,
+        )
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError("集群收集器启动超时")
+        return self.port
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        loop, stop = self._loop, self._stop
+        if loop is not None and stop is not None:
+            loop.call_soon_threadsafe(stop.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._ready.clear()
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        """全部节点的精简行"""
+        return [state.summary() for state in list(self.nodes.values())]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "nodes": len(self.nodes),
+            "connections": self.connections,
+            "messages": self.messages,
+            "updates": self.updates,
+            "bytes": self.bytes,
+            "gaps": self.gaps,
+            "rejected": self.rejected,
+            "evicted": self.evicted,
+            "slow_viewers": self.slow_viewers,
+            "latency": self.latency.snapshot(),
+        }
+
+
+class FleetSubscriber:
+    """控制台端订阅器: 在后台线程接收收集器推送的节点摘要
+
+    回调在订阅线程中调用，调用方应只做入队等轻量操作。断线后按
+    指数退避重连，重连时收集器会重新发送全部摘要。
+    """
+
+    def __init__(
+        self,
+        url: str,
+        on_rows: Callable[[List[Dict[str, Any]]], Any],
+        backoff: Tuple[float, float] = DEFAULT_BACKOFF,
+        logger: Optional[logging.Logger] = None,
+    ):
+        if websockets is None:
+            raise RuntimeError("未安装 websockets，无法订阅集群收集器")
+        self.url = url
+        self.on_rows = on_rows
+        self.backoff = backoff
+        self.logger = logger or logging.getLogger("FortressConsole")
+        self.connected = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        if self._closing:
+            return
+        delay = self.backoff[0]
+        while not self._stop.is_set():
+            try:
+                async with websockets.connect(
+                    self.url,
+                    compression=None,
+                    open_timeout=HELLO_TIMEOUT,
+                    max_size=MAX_MESSAGE,
+                ) as ws:
+                    await ws.send(_encode({"type": "viewer", "protocol": PROTOCOL}))
+                    self.connected = True
+                    delay = self.backoff[0]
+                    receiving = asyncio.ensure_future(self._receive(ws))
+                    stopping = asyncio.ensure_future(self._stop.wait())
+                    await asyncio.wait(
+                        {receiving, stopping}, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    stopping.cancel()
+                    receiving.cancel()
+            except (OSError, asyncio.TimeoutError, WebSocketException) as e:
+                self.logger.debug(f"集群收集器连接中断: {e}")
+            finally:
+                self.connected = False
+            if self._stop.is_set():
+                break
+            try:
+                await asyncio.wait_for(
+                    self._stop.wait(), delay * random.uniform(0.5, 1.0)
+                )
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, self.backoff[1])
+
+    async def _receive(self, ws):
+        try:
+            async for message in ws:
+                self.on_rows(json.loads(message)["rows"])
+        except ConnectionClosed:
+            pass
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._closing = False
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self.run()),
+            name="fortress-fleet-subscriber",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        self._closing = True
+        loop, stop = self._loop, self._stop
+        if loop is not None and stop is not None:
+            try:
+                loop.call_soon_threadsafe(stop.set)
+            except RuntimeError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def main():
+    """主函数: 运行集群收集器并定期打印统计"""
+    parser = argparse.ArgumentParser(description="数据要塞集群收集器")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--report-interval", type=float, default=10.0)
+    parser.add_argument(
+        "--node-ttl", type=float, default=NODE_TTL, help="断开多久后移除节点 (秒)"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    collector = FleetCollector(
+        args.host, args.port, logging.getLogger("FortressFleet"), args.node_ttl
+    )
+    collector.start()
+    print(f"集群收集器监听 {args.host}:{collector.port}")
+    try:
+        last = 0
+        while True:
+            time.sleep(args.report_interval)
+            stats = collector.stats()
+            rate = (stats["updates"] - last) / args.report_interval
+            last = stats["updates"]
+            connected = sum(1 for s in list(collector.nodes.values()) if s.connected)
+            print(
+                f"节点 {stats['nodes']} (在线 {connected})  更新 {rate:.0f}/秒  "
+                f"平均延迟 {stats['latency']['mean'] * 1000:.1f}ms"
+            )
+    except KeyboardInterrupt:
+        collector.stop()
+
+
+if __name__ == "__main__":
+    main()
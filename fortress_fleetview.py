@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞控制台集群视图
+按排序键与过滤条件维护有序索引，行更新时增量调整，绘制时只取可见窗口
+"""
+
+import bisect
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fortress_lifecycle import PRIORITY_ORDER
+
+Row = Dict[str, Any]
+SortKey = Callable[[Row], Any]
+ViewKey = Tuple[str, Optional[str]]
+
+# 同时缓存的 (排序, 过滤) 索引数，超出后丢弃最久未用的
+MAX_VIEWS = 8
+# 有序索引每块的最大条目数，插入删除只移动一块内的元素
+CHUNK_SIZE = 512
+# CPU/内存/磁盘达到此值的节点标记为告警
+NODE_ALERT_PERCENT = 80.0
+STATUS_ORDER = {"failed": 0, "offline": 0, "alert": 1, "standby": 2}
+
+
+def _descending(value: Optional[float]) -> Tuple[int, float]:
+    """数值降序，无读数的排在最后"""
+    return (1, 0.0) if value is None else (0, -float(value))
+
+
+NODE_SORTS: Dict[str, SortKey] = {
+    "node": lambda row: row["node"],
+    "cpu": lambda row: _descending(row.get("cpu_usage")),
+    "status": lambda row: (STATUS_ORDER.get(row["state"], 3), row["node"]),
+}
+MODULE_SORTS: Dict[str, SortKey] = {
+    "priority": lambda row: (PRIORITY_ORDER.get(row["priority"], 4), row["status"]),
+    "status": lambda row: (STATUS_ORDER.get(row["status"], 3), row["module"]),
+    "node": lambda row: (row["node"], row["module"]),
+}
+
+
+def node_state(summary: Dict[str, Any]) -> str:
+    """节点的过滤分类: offline、alert (资源过高或有失败模块) 或 ok"""
+    if not summary.get("connected"):
+        return "offline"
+    if summary.get("modules", {}).get("failed"):
+        return "alert"
+    for metric in ("cpu_usage", "memory_usage", "disk_usage"):
+        value = summary.get(metric)
+        if value is not None and value >= NODE_ALERT_PERCENT:
+            return "alert"
+    return "ok"
+
+
+class SortedChunks:
+    """分块的有序列表
+
+    条目分布在若干个各自有序、长度不超过 CHUNK_SIZE 的块中，另存
+    每块的最大值用于定位。插入删除先二分找到块，再在块内二分，只
+    移动块内的元素；单个有序列表在数万条目时每次插入都要移动半个
+    列表。
+    """
+
+    def __init__(self, entries: Iterable[Any] = ()):
+        ordered = sorted(entries)
+        self._chunks: List[List[Any]] = [
+            ordered[i : i + CHUNK_SIZE] for i in range(0, len(ordered), CHUNK_SIZE)
+        ]
+        self._maxes: List[Any] = [chunk[-1] for chunk in self._chunks]
+        self._len = len(ordered)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            yield from chunk
+
+    def add(self, entry: Any):
+        self._len += 1
+        if not self._chunks:
+            self._chunks.append([entry])
+            self._maxes.append(entry)
+            return
+        position = bisect.bisect_left(self._maxes, entry)
+        if position == len(self._maxes):
+            position -= 1
+            self._maxes[position] = entry
+        chunk = self._chunks[position]
+        bisect.insort(chunk, entry)
+        if len(chunk) > CHUNK_SIZE:
+            half = len(chunk) // 2
+            self._chunks[position : position + 1] = [chunk[:half], chunk[half:]]
+            self._maxes[position : position + 1] = [chunk[half - 1], chunk[-1]]
+
+    def remove(self, entry: Any):
+        position = bisect.bisect_left(self._maxes, entry)
+        chunk = self._chunks[position]
+        del chunk[bisect.bisect_left(chunk, entry)]
+        self._len -= 1
+        if not chunk:
+            del self._chunks[position]
+            del self._maxes[position]
+        else:
+            self._maxes[position] = chunk[-1]
+
+    def slice(self, offset: int, count: int) -> List[Any]:
+        """从第 offset 个条目开始的 count 个条目"""
+        result: List[Any] = []
+        for chunk in self._chunks:
+            if offset >= len(chunk):
+                offset -= len(chunk)
+                continue
+            result.extend(chunk[offset : offset + count - len(result)])
+            offset = 0
+            if len(result) >= count:
+                break
+        return result
+
+
+class FleetIndex:
+    """行集合及其有序索引
+
+    每个索引是按 (排序键, 行 id) 排好序的 SortedChunks，只包含满足
+    过滤条件的行。行更新时只对排序键或过滤归属发生变化的索引做一次
+    删除和一次插入，不重新排序；首次使用某个 (排序, 过滤) 组合
+    时建立索引并缓存，之后切换回来无需重建。
+    """
+
+    def __init__(self, sorts: Dict[str, SortKey], filter_field: str):
+        self.sorts = sorts
+        self.filter_field = filter_field
+        self.rows: Dict[str, Row] = {}
+        self.counts: Dict[str, int] = {}  # 各过滤值的行数
+        self._views: "OrderedDict[ViewKey, SortedChunks]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _matches(self, row: Row, flt: Optional[str]) -> bool:
+        return flt is None or row[self.filter_field] == flt
+
+    def _count(self, row: Row, delta: int):
+        value = row[self.filter_field]
+        count = self.counts.get(value, 0) + delta
+        if count:
+            self.counts[value] = count
+        else:
+            self.counts.pop(value, None)
+
+    def upsert(self, row_id: str, row: Row):
+        """插入或更新一行"""
+        old = self.rows.get(row_id)
+        for (sort, flt), view in self._views.items():
+            key = self.sorts[sort]
+            old_entry = (
+                (key(old), row_id)
+                if old is not None and self._matches(old, flt)
+                else None
+            )
+            new_entry = (key(row), row_id) if self._matches(row, flt) else None
+            if old_entry == new_entry:
+                continue
+            if old_entry is not None:
+                view.remove(old_entry)
+            if new_entry is not None:
+                view.add(new_entry)
+        if old is not None:
+            self._count(old, -1)
+        self._count(row, 1)
+        self.rows[row_id] = row
+
+    def remove(self, row_id: str):
+        """删除一行 (不存在时忽略)"""
+        old = self.rows.pop(row_id, None)
+        if old is None:
+            return
+        self._count(old, -1)
+        for (sort, flt), view in self._views.items():
+            if self._matches(old, flt):
+                view.remove((self.sorts[sort](old), row_id))
+
+    def view(self, sort: str, flt: Optional[str] = None) -> SortedChunks:
+        """(排序, 过滤) 组合的有序索引，不存在时建立"""
+        key = (sort, flt)
+        view = self._views.get(key)
+        if view is None:
+            sort_key = self.sorts[sort]
+            view = SortedChunks(
+                (sort_key(row), row_id)
+                for row_id, row in self.rows.items()
+                if self._matches(row, flt)
+            )
+            self._views[key] = view
+            if len(self._views) > MAX_VIEWS:
+                self._views.popitem(last=False)
+        else:
+            self._views.move_to_end(key)
+        return view
+
+    def window(
+        self, sort: str, flt: Optional[str], offset: int, count: int
+    ) -> List[Row]:
+        """有序索引中从 offset 开始的 count 行"""
+        entries = self.view(sort, flt).slice(offset, count)
+        return [self.rows[row_id] for _, row_id in entries]
+
+
+class VirtualList:
+    """虚拟滚动列表的光标、滚动位置与排序过滤状态
+
+    只保存光标在有序索引中的位置，绘制时取出可见的一屏；列表长度
+    变化 (过滤、节点上下线) 时把光标与首行限制在有效范围内。
+    """
+
+    def __init__(self, index: FleetIndex, sorts: Iterable[str]):
+        self.index = index
+        self.sort_order = list(sorts)
+        self.sort = self.sort_order[0]
+        self.filter: Optional[str] = None
+        self.selected = 0
+        self.top = 0
+
+    def __len__(self) -> int:
+        return len(self.index.view(self.sort, self.filter))
+
+    def move(self, delta: int):
+        self.selected = max(0, min(len(self) - 1, self.selected + delta))
+
+    def home(self):
+        self.selected = 0
+
+    def end(self):
+        self.selected = max(0, len(self) - 1)
+
+    def cycle_sort(self):
+        position = self.sort_order.index(self.sort)
+        self.sort = self.sort_order[(position + 1) % len(self.sort_order)]
+        self.selected = self.top = 0
+
+    def cycle_filter(self):
+        """依次: 全部 → 各过滤值 (按名称) → 全部"""
+        values: List[Optional[str]] = [None] + sorted(self.index.counts)
+        position = values.index(self.filter) if self.filter in values else 0
+        self.filter = values[(position + 1) % len(values)]
+        self.selected = self.top = 0
+
+    def visible(self, height: int) -> List[Tuple[bool, Row]]:
+        """一屏 height 行的 (是否选中, 行)，必要时滚动使光标可见"""
+        total = len(self)
+        self.selected = max(0, min(self.selected, total - 1))
+        if self.selected < self.top:
+            self.top = self.selected
+        elif self.selected >= self.top + height:
+            self.top = self.selected - height + 1
+        self.top = max(0, min(self.top, max(0, total - height)))
+        rows = self.index.window(self.sort, self.filter, self.top, height)
+        return [(self.top + i == self.selected, row) for i, row in enumerate(rows)]
+
+
+class FleetModel:
+    """集群视图的数据: 节点索引与 (节点, 模块) 索引"""
+
+    def __init__(self):
+        self.nodes = FleetIndex(NODE_SORTS, "state")
+        self.modules = FleetIndex(MODULE_SORTS, "status")
+        self._node_modules: Dict[str, List[str]] = {}
+
+    def apply(self, summaries: Iterable[Dict[str, Any]]):
+        """应用收集器推送的节点摘要 (FleetCollector 的精简行)
+
+        带 removed 标记的行表示收集器已移除该节点。
+        """
+        for summary in summaries:
+            node = summary["node"]
+            if summary.get("removed"):
+                self.nodes.remove(node)
+                for row_id in self._node_modules.pop(node, ()):
+                    self.modules.remove(row_id)
+                continue
+            self.nodes.upsert(node, dict(summary, state=node_state(summary)))
+            module_list = summary.get("module_list", {}) or {}
+            ids = []
+            for name, info in module_list.items():
+                row_id = f"{node}/{name}"
+                ids.append(row_id)
+                self.modules.upsert(
+                    row_id,
+                    {
+                        "node": node,
+                        "module": name,
+                        "status": info.get("status") or "unknown",
+                        "priority": info.get("priority") or "",
+                    },
+                )
+            for row_id in set(self._node_modules.get(node, ())) - set(ids):
+                self.modules.remove(row_id)
+            self._node_modules[node] = ids
@@ -5,7 +5,6 @@
 来自夜的命名术·壹的数字守护者
 """
 
-import json
 import logging
 import os
 import subprocess
@@ -13,19 +12,108 @@ import sys
 import threading
 import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fortress_alerts import Alert, AlertEngine, parse_rules
+from fortress_collector import ProcessAccounting, ProcSampler
+from fortress_config import (
+    DEFAULT_CACHE_DIR,
+    ConfigCache,
+    ConfigWatcher,
+    cache_dir_for,
+)
+from fortress_feed import SnapshotPublisher
+from fortress_history import MetricHistory
+from fortress_lifecycle import ModuleLifecycle, ModuleSpec, StartupReport, parse_modules
+from fortress_log_writer import HealthLogWriter
+from fortress_probe import NetworkProber
+from fortress_registry import ModuleRecord, ModuleRegistry, RegistrySnapshot
+from fortress_scheduler import MetricScheduler
+from fortress_trace import DEFAULT_SIGNAL, TRACER, env_enabled, traced
+
+# 采集器默认超时 (秒)，周期默认取 monitoring.heartbeat_interval
+DEFAULT_COLLECTOR_TIMEOUTS = {
+    "cpu_usage": 2.0,
+    "memory_usage": 2.0,
+    "disk_usage": 2.0,
+    "network_status": 5.0,
+    "top_processes": 5.0,
+}
+# 运行中修改后立即生效的配置键，其余键的变化需要重启
+HOT_RELOAD_KEYS = (
+    "monitoring.heartbeat_interval",
+    "monitoring.alert_threshold",
+    "monitoring.alerts",
+    "security.firewall",
+    "monitoring.tracing",
+    "monitoring.network_probe",
+    "network.internal_ip",
+    "modules",
+)
+# 网络探测目标由这些配置推导，变化时重建探测器
+NETWORK_PROBE_KEYS = (
+    "monitoring.network_probe",
+    "network.internal_ip",
+    "security.firewall",
+)
+# 快照中附带的最近告警条数
+FEED_ALERTS = 10
+# 健康日志每隔这么多条记录写一次全量模块状态，其余记录只写变化
+MODULE_KEYFRAME_EVERY = 60
+# 健康日志队列持续满时，每丢弃这么多条记录才警告一次
+DROP_WARNING_EVERY = 1000
 
 
 class FortressGuardian:
     """数据要塞守护者核心类"""
 
-    def __init__(self, config_path: str = "data_fortress_config.yaml"):
+    def __init__(
+        self,
+        config_path: str = "data_fortress_config.yaml",
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+    ):
+        """cache_dir 为解析结果的缓存目录 (相对路径放在配置文件旁边，None 不写盘)"""
         self.config_path = config_path
         self.status = "INITIALIZING"
-        self.modules: Dict[str, Dict[str, Any]] = {}
         self.logger = self._setup_logger()
-        self.encryption_key = None
+        self.registry = ModuleRegistry()
+        self._module_specs: List[ModuleSpec] = []
+        self._logged_module_version: Optional[int] = None
+        self._records_since_keyframe = 0
+        self.startup_report: Optional[StartupReport] = None
+        self.encryption_key: Optional[bytes] = None
         self.config: Dict[str, Any] = {}
+        self.config_cache = ConfigCache(
+            None if cache_dir is None else cache_dir_for(config_path, cache_dir)
+        )
+        self.config_digest: Optional[str] = None
+        self.config_watcher: Optional[ConfigWatcher] = None
+        self.sampler = ProcSampler()
+        self.process_accounting: Optional[ProcessAccounting] = None
+        self.scheduler: Optional[MetricScheduler] = None
+        self.log_writer: Optional[HealthLogWriter] = None
+        self.feed: Optional[SnapshotPublisher] = None
+        self.exporter: Optional[Any] = None
+        self.fleet_agent: Optional[Any] = None
+        self.network_prober: Optional[NetworkProber] = None
+        self.key_manager: Optional[Any] = None
+        self.firewall: Optional[Any] = None
+        self.ids: Optional[Any] = None
+        self.alert_engine: Optional[AlertEngine] = None
+        self.metric_history: Optional[MetricHistory] = None
+        self._ids_thread: Optional[threading.Thread] = None
+        # 上次应用的 monitoring.tracing.enabled (None 表示尚未配置)
+        self._tracing_config: Optional[bool] = None
+        self.started_at = time.time()
+        self._last_snapshot: Dict[str, Any] = {}
+        self._drops_warned = 0
+        self._stop_event = threading.Event()
+        self._monitor_thread: Optional[threading.Thread] = None
+
+    @property
+    def modules(self) -> Dict[str, Dict[str, Any]]:
+        """当前版本的模块状态副本 (修改副本不影响已发布的快照，修改请通过 registry)"""
+        return {name: r.to_dict() for name, r in self.registry.snapshot().items()}
 
     def _setup_logger(self) -> logging.Logger:
         """设置日志系统"""
@@ -41,13 +129,11 @@ class FortressGuardian:
 
         return logger
 
+    @traced("guardian.load_configuration")
     def load_configuration(self) -> bool:
-        """加载要塞配置"""
+        """加载要塞配置 (内容未变时使用缓存的解析结果)"""
         try:
-            import yaml  # type: ignore
-
-            with open(self.config_path, "r", encoding="utf-8") as f:
-                self.config = yaml.safe_load(f)
+            self.config, self.config_digest = self.config_cache.load(self.config_path)
 
             self.logger.info("配置文件加载成功")
             self.status = "CONFIG_LOADED"
@@ -57,19 +143,22 @@ class FortressGuardian:
             self.logger.error(f"配置加载失败: {e}")
             return False
 
+    @traced("guardian.initialize_modules")
     def initialize_modules(self) -> bool:
-        """初始化要塞模块"""
+        """初始化要塞模块 (解析依赖并登记初始状态)"""
         try:
-            modules = self.config.get("modules", [])
-            for module in modules:
-                module_name = module["name"]
-                self.modules[module_name] = {
-                    "status": module["status"],
-                    "priority": module["priority"],
-                    "last_check": datetime.now().isoformat(),
-                }
-
-            self.logger.info(f"初始化了 {len(modules)} 个核心模块")
+            self._module_specs = parse_modules(
+                self.config.get("modules", []) or [], self.logger
+            )
+            now = datetime.now().isoformat()
+            self.registry.replace_all(
+                ModuleRecord(
+                    spec.name, spec.status, spec.priority, spec.depends_on, now
+                )
+                for spec in self._module_specs
+            )
+
+            self.logger.info(f"初始化了 {len(self._module_specs)} 个核心模块")
             self.status = "MODULES_READY"
             return True
 
@@ -77,143 +166,605 @@ class FortressGuardian:
             self.logger.error(f"模块初始化失败: {e}")
             return False
 
-    def start_defense_system(self) -> bool:
-        """启动防御系统"""
+    @traced("guardian.start_modules")
+    def start_modules(self) -> bool:
+        """按依赖关系并发启动模块，记录每个模块的启动耗时"""
         try:
-            self.logger.info("启动防御系统...")
-
-            # 模拟防火墙启动
-            firewall_status = self._activate_firewall()
-            if not firewall_status:
-                raise Exception("防火墙激活失败")
-
-            # 启动入侵检测
-            ids_status = self._start_intrusion_detection()
-            if not ids_status:
-                raise Exception("入侵检测系统启动失败")
-
-            self.modules["防御系统"]["status"] = "active"
-            self.logger.info("防御系统启动完成")
-            return True
-
-        except Exception as e:
-            self.logger.error(f"防御系统启动失败: {e}")
+            lifecycle = ModuleLifecycle(
+                self._module_specs,
+                actions=self._module_actions(),
+                probes=self._module_probes(),
+                on_change=self._on_module_change,
+                logger=self.logger,
+            )
+        except ValueError as e:
+            self.logger.error(f"模块启动配置无效: {e}")
             return False
 
+        self.startup_report = lifecycle.start_all()
+        self.logger.info(self.startup_report.summary())
+        return self.startup_report.ok
+
+    def _module_actions(self) -> Dict[str, Callable[[], bool]]:
+        """modules[].start 可引用的启动动作"""
+        return {
+            "firewall": self._activate_firewall,
+            "intrusion_detection": self._start_intrusion_detection,
+        }
+
+    def _module_probes(self) -> Dict[str, Callable[[], bool]]:
+        """modules[].ready_when 可引用的就绪探针"""
+        return {
+            "firewall": lambda: self.firewall is not None,
+            "intrusion_detection": self._intrusion_detection_ready,
+        }
+
+    def _on_module_change(self, name: str, status: str):
+        """生命周期状态变化: 带启动动作的模块就绪后为 active，其余保持配置状态"""
+        spec = next(s for s in self._module_specs if s.name == name)
+        if status == "ready":
+            status = "active" if spec.actions else spec.status
+        self.registry.update(name, status=status, last_check=datetime.now().isoformat())
+
+    def _start_config_watcher(self):
+        """监视配置文件，变化时热重载"""
+        settings = (self.config.get("monitoring", {}) or {}).get(
+            "config_reload", {}
+        ) or {}
+        if not settings.get("enabled", True) or self.config_digest is None:
+            return
+        self.config_watcher = ConfigWatcher(
+            self.config_path,
+            self._apply_config,
+            (self.config, self.config_digest),
+            self._stop_event,
+            cache=self.config_cache,
+            poll_interval=float(settings.get("poll_interval", 2.0)),
+            logger=self.logger,
+        )
+        self.config_watcher.start()
+
+    def _apply_config(self, config: Dict[str, Any], changed: List[str]):
+        """应用重载的配置
+
+        在监视线程中先准备好变化的部分 (编译防火墙规则、解析模块与告警规则)，
+        任何一步失败都抛出异常并保留当前配置；全部成功后再逐个替换
+        引用，读者看到的始终是完整的旧对象或新对象。
+        """
+        if not changed:
+            return
+        firewall = self.firewall
+        if "security.firewall" in changed:
+            from fortress_firewall import FirewallMatcher
+
+            firewall = FirewallMatcher.from_config(config)
+        prober = self.network_prober
+        if prober is not None and any(key in NETWORK_PROBE_KEYS for key in changed):
+            prober = NetworkProber.from_config(config, self.logger)
+        rules = None
+        if any(key.startswith("monitoring.alert") for key in changed):
+            rules = parse_rules(config)
+        specs = self._module_specs
+        records: Optional[List[ModuleRecord]] = None
+        added: List[ModuleSpec] = []
+        if "modules" in changed:
+            specs = parse_modules(config.get("modules", []) or [], self.logger)
+            records, added = self._reconcile_modules(specs)
+
+        self.config = config
+        self.firewall = firewall
+        self.network_prober = prober
+        self._module_specs = specs
+        if records is not None:
+            self.registry.replace_all(records)
+        if rules is not None and self.alert_engine is not None:
+            self.alert_engine.set_rules(rules)
+        if "monitoring.heartbeat_interval" in changed and self.scheduler is not None:
+            self._retune_scheduler()
+        if "monitoring.tracing" in changed:
+            self._configure_tracing()
+
+        self.logger.info(f"配置已重载，变化: {', '.join(changed)}")
+        pending = [key for key in changed if key not in HOT_RELOAD_KEYS]
+        if pending:
+            self.logger.warning(f"以下配置需要重启后生效: {', '.join(pending)}")
+        if added:
+            self._start_added_modules(added)
+
+    def _reconcile_modules(
+        self, specs: List[ModuleSpec]
+    ) -> Tuple[List[ModuleRecord], List[ModuleSpec]]:
+        """按新的模块列表生成模块记录，已启动模块保留运行状态"""
+        current = self.registry.snapshot()
+        now = datetime.now().isoformat()
+        records = []
+        added = []
+        for spec in specs:
+            status = spec.status
+            if spec.name not in current:
+                added.append(spec)
+            elif spec.actions:
+                status = current[spec.name].status
+            records.append(
+                ModuleRecord(spec.name, status, spec.priority, spec.depends_on, now)
+            )
+        removed = set(current) - {spec.name for spec in specs}
+        if removed:
+            self.logger.info(f"移除模块: {', '.join(sorted(removed))}")
+        return records, added
+
+    def _start_added_modules(self, added: List[ModuleSpec]):
+        """启动重载新增的模块 (对已有模块的依赖视为已满足)"""
+        names = {spec.name for spec in added}
+        specs = [
+            spec._replace(depends_on=tuple(d for d in spec.depends_on if d in names))
+            for spec in added
+        ]
+        try:
+            report = ModuleLifecycle(
+                specs,
+                actions=self._module_actions(),
+                probes=self._module_probes(),
+                on_change=self._on_module_change,
+                logger=self.logger,
+            ).start_all()
+            self.logger.info(report.summary())
+        except ValueError as e:
+            self.logger.error(f"新增模块启动失败: {e}")
+
+    def _retune_scheduler(self):
+        """未单独配置周期的采集器改用新的心跳间隔"""
+        assert self.scheduler is not None
+        monitoring = self.config.get("monitoring", {}) or {}
+        heartbeat = float(monitoring.get("heartbeat_interval", 60))
+        overrides = monitoring.get("collectors", {}) or {}
+        for name, task in self.scheduler.tasks.items():
+            if "interval" not in (overrides.get(name, {}) or {}):
+                task.interval = heartbeat
+
+    def _configure_tracing(self, install_signal: bool = False):
+        """按 monitoring.tracing 开关埋点
+
+        环境变量 FORTRESS_TRACE 与配置任一开启即开启；只有配置中的 enabled
+        与上次不同时才切换，未变化的重载不会撤销信号开启的追踪。
+        """
+        settings = (self.config.get("monitoring", {}) or {}).get("tracing", {}) or {}
+        capacity = settings.get("capacity")
+        enabled = TRACER.enabled
+        if "enabled" in settings and bool(settings["enabled"]) != self._tracing_config:
+            self._tracing_config = bool(settings["enabled"])
+            enabled = self._tracing_config or env_enabled()
+        TRACER.configure(enabled, int(capacity) if capacity else None)
+        signame = settings.get("dump_signal", DEFAULT_SIGNAL)
+        if install_signal and signame:
+            TRACER.install_signal(signame, settings.get("dump_dir", "."), self.logger)
+
+    def _intrusion_detection_ready(self) -> bool:
+        """检测器已加载，且有日志源时跟踪线程在运行"""
+        return self.ids is not None and (
+            self._ids_thread is None or self._ids_thread.is_alive()
+        )
+
+    @traced("guardian.activate_firewall")
     def _activate_firewall(self) -> bool:
         """激活防火墙规则"""
         try:
-            # 模拟防火墙规则应用
-            rules = (
-                self.config.get("security", {})
-                .get("firewall", {})
-                .get("rules", [])
-            )
-            self.logger.info(f"应用 {len(rules)} 条防火墙规则")
-            time.sleep(2)  # 模拟处理时间
+            from fortress_firewall import FirewallMatcher
+
+            self.firewall = FirewallMatcher.from_config(self.config)
+            self.logger.info(f"应用 {len(self.firewall.rules)} 条防火墙规则")
             return True
-        except:
+        except Exception as e:
+            self.logger.error(f"防火墙规则编译失败: {e}")
             return False
 
+    @traced("guardian.start_intrusion_detection")
     def _start_intrusion_detection(self) -> bool:
         """启动入侵检测系统"""
         try:
-            self.logger.info("启动入侵检测系统")
-            # 模拟IDS启动
-            time.sleep(1)
+            from fortress_ids import IntrusionDetector, LogTailer
+
+            detector = IntrusionDetector.from_config(self.config, self.logger)
+            self.ids = detector
+            options = (self.config.get("security", {}) or {}).get(
+                "intrusion_detection", {}
+            ) or {}
+            sources = [
+                (source["path"], source.get("port"))
+                for source in options.get("sources", []) or []
+            ]
+            self.logger.info(
+                f"启动入侵检测系统 ({len(detector.matcher.patterns)} 条特征, "
+                f"{len(sources)} 个日志源)"
+            )
+            if sources:
+                # 立即打开日志源并记录位置，线程启动前追加的行也会被读取
+                tailer = LogTailer(sources, self._stop_event)
+                self._ids_thread = threading.Thread(
+                    target=self._run_intrusion_detection,
+                    args=(detector, tailer),
+                    name="fortress-ids",
+                    daemon=True,
+                )
+                self._ids_thread.start()
             return True
-        except:
+        except Exception as e:
+            self.logger.error(f"入侵检测规则加载失败: {e}")
             return False
 
+    def _run_intrusion_detection(self, detector, tailer):
+        """跟踪日志源并记录入侵告警"""
+        try:
+            for alert in detector.run(tailer):
+                self.logger.warning(
+                    f"入侵检测告警 [{alert.rule}] 来源 {alert.source_ip}: {alert.line}"
+                )
+        except Exception as e:
+            self.logger.error(f"入侵检测异常: {e}")
+
+    def _build_scheduler(self) -> MetricScheduler:
+        """按配置创建采集调度器"""
+        monitoring = self.config.get("monitoring", {}) or {}
+        heartbeat = float(monitoring.get("heartbeat_interval", 60))
+        overrides = monitoring.get("collectors", {}) or {}
+
+        collectors = [
+            # 数值指标从未采集成功时为 None，不以 0.0 冒充真实读数
+            ("cpu_usage", self._get_cpu_usage, None),
+            ("memory_usage", self._get_memory_usage, None),
+            ("disk_usage", self._get_disk_usage, None),
+            ("network_status", self._check_network, "unknown"),
+        ]
+        if (monitoring.get("processes", {}) or {}).get("enabled", True):
+            collectors.append(("top_processes", self._get_top_processes, None))
+        scheduler = MetricScheduler(max_workers=len(collectors), logger=self.logger)
+        for name, func, default in collectors:
+            settings = overrides.get(name, {}) or {}
+            scheduler.add(
+                name,
+                func,
+                interval=float(settings.get("interval", heartbeat)),
+                timeout=float(
+                    settings.get("timeout", DEFAULT_COLLECTOR_TIMEOUTS[name])
+                ),
+                default=default,
+            )
+        return scheduler
+
+    def get_collector_latency(self) -> Dict[str, Dict[str, Any]]:
+        """获取各采集器的延迟直方图"""
+        if self.scheduler is None:
+            return {}
+        return self.scheduler.latency_stats()
+
     def monitor_system_health(self):
         """持续监控系统健康状态"""
-        while self.status != "SHUTDOWN":
-            try:
-                health_data = {
-                    "timestamp": datetime.now().isoformat(),
-                    "cpu_usage": self._get_cpu_usage(),
-                    "memory_usage": self._get_memory_usage(),
-                    "disk_usage": self._get_disk_usage(),
-                    "network_status": self._check_network(),
-                    "module_status": self.modules.copy(),
-                }
-
-                # 检查异常状态
-                if health_data["cpu_usage"] > 85:
-                    self.logger.warning(
-                        f"CPU使用率过高: {health_data['cpu_usage']}%"
-                    )
+        self.scheduler = self._build_scheduler()
+        self.scheduler.start()
+        # 首轮等待所有采集器给出结果，避免记录默认值
+        self.scheduler.wait_ready(max(DEFAULT_COLLECTOR_TIMEOUTS.values()))
 
-                if health_data["memory_usage"] > 80:
-                    self.logger.warning(
-                        f"内存使用率过高: {health_data['memory_usage']}%"
+        try:
+            while self.status != "SHUTDOWN" and not self._stop_event.is_set():
+                try:
+                    self._monitor_iteration(self.scheduler)
+                    # 每轮重新读取配置，热重载的间隔立即生效
+                    monitoring = self.config.get("monitoring", {}) or {}
+                    self._stop_event.wait(
+                        float(monitoring.get("heartbeat_interval", 60))
                     )
 
-                self._log_health_data(health_data)
-                time.sleep(60)  # 每分钟检查一次
-
-            except Exception as e:
-                self.logger.error(f"健康监控异常: {e}")
-                time.sleep(10)
+                except Exception as e:
+                    self.logger.error(f"健康监控异常: {e}")
+                    self._stop_event.wait(10)
+        finally:
+            self.scheduler.stop()
+
+    @traced("guardian.monitor_iteration")
+    def _monitor_iteration(self, scheduler: MetricScheduler) -> Dict[str, Any]:
+        """一轮健康监控: 汇总采集结果、记录历史、评估告警、发布并写日志"""
+        health_data: Dict[str, Any] = {"timestamp": datetime.now().isoformat()}
+        health_data.update(scheduler.snapshot())
+        health_data["stale_metrics"] = scheduler.stale()
+        # 取当前版本的不可变快照，不复制模块表
+        modules = self.registry.snapshot()
+        health_data["module_status"] = modules.as_dict()
+        health_data["module_version"] = modules.version
+
+        now = time.time()
+        self._get_metric_history().record(health_data, now)
+        # 按告警规则检查 (采集失败的指标为 None，不参与判断)
+        for alert in self._get_alert_engine().evaluate(health_data, now):
+            TRACER.count("alerts.notified")
+            self._log_alert(alert)
+
+        self._publish_snapshot(health_data)
+        if self.exporter is not None:
+            self.exporter.update(health_data, time.time())
+        self._log_health_data(self._health_record(health_data, modules))
+        return health_data
+
+    def _get_metric_history(self) -> MetricHistory:
+        """获取 (必要时按配置创建) 内存指标历史"""
+        if self.metric_history is None:
+            self.metric_history = MetricHistory.from_config(self.config)
+            self.logger.info(
+                f"指标历史: {len(self.metric_history.rings)} 个指标 × "
+                f"{self.metric_history.capacity} 个样本 "
+                f"({self.metric_history.nbytes // 1024} KB)"
+            )
+        return self.metric_history
 
+    def _get_alert_engine(self) -> AlertEngine:
+        """获取 (必要时按配置创建) 告警引擎，窗口规则使用共享指标历史"""
+        if self.alert_engine is None:
+            self.alert_engine = AlertEngine.from_config(
+                self.config, self.logger, metrics=self._get_metric_history()
+            )
+        return self.alert_engine
+
+    def _log_alert(self, alert: Alert):
+        """记录告警通知"""
+        if alert.state == "resolved":
+            self.logger.info(f"告警恢复 [{alert.rule}]: {alert.message}")
+            return
+        repeat = f" (第 {alert.hits} 次)" if alert.hits > 1 else ""
+        culprits = alert.culprits()
+        detail = f" (主要进程: {culprits})" if culprits else ""
+        level = logging.ERROR if alert.severity == "critical" else logging.WARNING
+        self.logger.log(level, f"告警 [{alert.rule}]{repeat}: {alert.message}{detail}")
+
+    def _health_record(
+        self, health_data: Dict[str, Any], modules: RegistrySnapshot
+    ) -> Dict[str, Any]:
+        """健康日志记录: 模块状态只写变化事件，定期或增量不可得时写全量"""
+        record = {k: v for k, v in health_data.items() if k != "module_status"}
+        changes = (
+            None
+            if self._logged_module_version is None
+            else self.registry.changes_since(self._logged_module_version)
+        )
+        self._records_since_keyframe += 1
+        if changes is None or self._records_since_keyframe >= MODULE_KEYFRAME_EVERY:
+            record["module_status"] = modules.as_dict()
+            self._records_since_keyframe = 0
+        elif changes:
+            record["module_changes"] = [
+                event.to_dict() for event in changes if event.version <= modules.version
+            ]
+        self._logged_module_version = modules.version
+        return record
+
+    @traced("collector.cpu_usage")
     def _get_cpu_usage(self) -> float:
         """获取CPU使用率"""
         try:
-            result = subprocess.run(
-                ["vmstat", "1", "2"], capture_output=True, text=True
-            )
-            lines = result.stdout.strip().split("\n")
-            if len(lines) >= 4:
-                # 解析最后一行的idle列
-                idle = int(lines[-1].split()[15])
-                return 100 - idle
-            return 0.0
-        except:
-            return 0.0
-
+            return self.sampler.cpu_usage()
+        except (OSError, ValueError):
+            return self._get_cpu_usage_vmstat()
+
+    @traced("collector.cpu_usage_vmstat")
+    def _get_cpu_usage_vmstat(self) -> float:
+        """通过vmstat获取CPU使用率 (无/proc时的回退路径)
+
+        失败时抛出异常，由调度器保留上一次的值并标记过期，不发布 0%。
+        """
+        result = subprocess.run(["vmstat", "1", "2"], capture_output=True, text=True)
+        lines = result.stdout.strip().split("\n")
+        if len(lines) < 4:
+            raise ValueError(f"无法解析vmstat输出: {result.stdout!r:.100}")
+        # 解析最后一行的idle列
+        idle = int(lines[-1].split()[15])
+        return float(100 - idle)
+
+    @traced("collector.memory_usage")
     def _get_memory_usage(self) -> float:
-        """获取内存使用率"""
+        """获取内存使用率 (读取失败时抛出异常，由调度器标记过期)"""
+        return self.sampler.memory_usage()
+
+    @traced("collector.top_processes")
+    def _get_top_processes(self) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """获取 CPU 与内存占用最高的进程 (随健康记录与告警一起记录)"""
+        if self.process_accounting is None:
+            settings = (self.config.get("monitoring", {}) or {}).get(
+                "processes", {}
+            ) or {}
+            self.process_accounting = ProcessAccounting(
+                top_n=int(settings.get("top_n", 5))
+            )
         try:
-            with open("/proc/meminfo", "r") as f:
-                lines = f.readlines()
-                mem_total = int(lines[0].split()[1])  # KB
-                mem_free = int(lines[1].split()[1])
-                mem_available = int(lines[2].split()[1])
-                used = mem_total - mem_available
-                return (used / mem_total) * 100
-        except:
-            return 0.0
+            return self.process_accounting.top_processes()
+        except (OSError, ValueError, IndexError):
+            return None
 
+    @traced("collector.disk_usage")
     def _get_disk_usage(self) -> float:
         """获取磁盘使用率"""
         try:
-            result = subprocess.run(["df", "/"], capture_output=True, text=True)
-            lines = result.stdout.strip().split("\n")
-            if len(lines) >= 2:
-                usage_percent = lines[1].split()[4]  # 第5列是使用百分比
-                return float(usage_percent.rstrip("%"))
-            return 0.0
-        except:
-            return 0.0
-
+            return self.sampler.disk_usage()
+        except OSError:
+            return self._get_disk_usage_df()
+
+    @traced("collector.disk_usage_df")
+    def _get_disk_usage_df(self) -> float:
+        """通过df获取磁盘使用率 (statvfs不可用时的回退路径，失败时抛出异常)"""
+        result = subprocess.run(["df", "/"], capture_output=True, text=True)
+        lines = result.stdout.strip().split("\n")
+        if len(lines) < 2:
+            raise ValueError(f"无法解析df输出: {result.stdout!r:.100}")
+        usage_percent = lines[1].split()[4]  # 第5列是使用百分比
+        return float(usage_percent.rstrip("%"))
+
+    @traced("collector.network_status")
     def _check_network(self) -> str:
-        """检查网络状态"""
+        """检查网络状态 (并发探测 monitoring.network_probe 中的目标)"""
         try:
-            result = subprocess.run(
-                ["ping", "-c", "1", "8.8.8.8"],
-                capture_output=True,
-                timeout=5,
-            )
-            return "connected" if result.returncode == 0 else "disconnected"
-        except:
+            prober = self.network_prober
+            if prober is None:
+                prober = NetworkProber.from_config(self.config, self.logger)
+                self.network_prober = prober
+            return prober.check()
+        except Exception as e:
+            self.logger.warning(f"网络探测失败: {e}")
             return "unknown"
 
+    @traced("guardian.publish_snapshot")
+    def _publish_snapshot(self, health_data: Dict):
+        """向共享内存发布最新健康快照供控制台读取，并推送到集群收集器"""
+        feed_config = (self.config.get("monitoring", {}) or {}).get("feed", {}) or {}
+        feed_enabled = feed_config.get("enabled", True)
+        if not feed_enabled and self.fleet_agent is None:
+            return
+        monitoring = self.config.get("monitoring", {}) or {}
+        snapshot = {
+            "status": self.status,
+            "started_at": self.started_at,
+            # 控制台据此判断快照是否过期 (守护进程停止或卡住)
+            "published_at": time.time(),
+            "heartbeat_interval": float(monitoring.get("heartbeat_interval", 60)),
+            "health": {
+                k: v
+                for k, v in health_data.items()
+                if k not in ("module_status", "module_version")
+            },
+            "modules": health_data.get("module_status", {}),
+            # 控制台按版本号判断模块表是否变化
+            "modules_version": health_data.get("module_version"),
+            # 控制台显示的窗口趋势 (每个心跳计算一次)
+            "trends": (
+                self.metric_history.trends() if self.metric_history is not None else {}
+            ),
+            "alerts": (
+                [a.to_dict() for a in self.alert_engine.recent(FEED_ALERTS)]
+                if self.alert_engine is not None
+                else []
+            ),
+        }
+        self._last_snapshot = snapshot
+        if self.fleet_agent is not None:
+            self.fleet_agent.submit(snapshot, snapshot["published_at"])
+        if not feed_enabled:
+            return
+        try:
+            if self.feed is None:
+                self.feed = SnapshotPublisher(feed_config.get("path"))
+            self.feed.publish(snapshot)
+        except Exception as e:
+            self.logger.error(f"健康快照发布失败: {e}")
+
+    def _start_fleet_agent(self):
+        """按配置向集群收集器推送健康快照 (可选)"""
+        settings = (self.config.get("monitoring", {}) or {}).get("fleet", {}) or {}
+        if not settings.get("enabled", False):
+            return
+        try:
+            from fortress_fleet import FleetAgent
+
+            self.fleet_agent = FleetAgent.from_config(self.config, self.logger)
+            self.fleet_agent.start()
+            self.logger.info(
+                f"集群推送: {self.fleet_agent.node} -> {self.fleet_agent.url}"
+            )
+        except Exception as e:
+            self.fleet_agent = None
+            self.logger.error(f"集群推送启动失败: {e}")
+
+    def _start_exporter(self):
+        """按配置启动Prometheus导出器 (可选)"""
+        settings = (self.config.get("monitoring", {}) or {}).get("prometheus", {}) or {}
+        if not settings.get("enabled", False):
+            return
+        try:
+            from fortress_exporter import FortressExporter
+
+            self.exporter = FortressExporter(
+                port=int(settings.get("port", 9464)),
+                addr=settings.get("addr", "0.0.0.0"),
+                latency_source=self.get_collector_latency,
+                writer_source=lambda: (
+                    self.log_writer.stats() if self.log_writer is not None else None
+                ),
+                logger=self.logger,
+            )
+            self.exporter.start()
+        except Exception as e:
+            self.exporter = None
+            self.logger.error(f"Prometheus导出器启动失败: {e}")
+
+    def run_backup(self) -> Optional[Dict[str, Any]]:
+        """按 storage.backup_system 执行一次增量备份"""
+        backup = (self.config.get("storage", {}) or {}).get("backup_system", {}) or {}
+        if not backup.get("enabled", False):
+            return None
+        try:
+            from fortress_backup import BackupPipeline
+
+            return BackupPipeline.from_config(self.config, self.logger).run()
+        except Exception as e:
+            self.logger.error(f"备份失败: {e}")
+            return None
+
+    def _start_key_manager(self):
+        """读取主密钥并启动会话密钥轮换"""
+        try:
+            from fortress_keys import (
+                SessionKeyManager,
+                derive_file_key,
+                load_master_key,
+            )
+
+            master_key = load_master_key(self.config)
+            if master_key is None:
+                self.logger.warning("未配置主密钥，会话密钥轮换未启用")
+                return
+            # 文件加密使用独立派生的密钥，主密钥本身不直接用于加密
+            self.encryption_key = derive_file_key(master_key)
+            self.key_manager = SessionKeyManager.from_config(
+                self.config, master_key, self.logger
+            )
+            self.key_manager.start()
+        except Exception as e:
+            self.key_manager = None
+            self.logger.error(f"会话密钥管理启动失败: {e}")
+
+    def get_cipher(self):
+        """按 security.encryption_level 返回分片加密器"""
+        if self.encryption_key is None:
+            raise RuntimeError("加密密钥未设置")
+        from fortress_crypto import ChunkedCipher
+
+        return ChunkedCipher.from_config(self.config, self.encryption_key)
+
+    def _get_log_writer(self) -> HealthLogWriter:
+        """获取 (必要时创建并启动) 健康日志写入器"""
+        if self.log_writer is None:
+            self.log_writer = HealthLogWriter.from_config(self.config, self.logger)
+            tsdb_config = (self.config.get("monitoring", {}) or {}).get("tsdb", {})
+            if tsdb_config and tsdb_config.get("enabled", False):
+                try:
+                    from fortress_tsdb import ColumnStore
+
+                    store = ColumnStore(tsdb_config.get("path", "fortress_tsdb"))
+                    self.log_writer.add_sink(store.append_many)
+                except Exception as e:
+                    self.logger.error(f"列式存储初始化失败: {e}")
+            self.log_writer.start()
+        return self.log_writer
+
+    @traced("guardian.log_health_data")
     def _log_health_data(self, data: Dict):
         """记录健康数据"""
         try:
-            log_file = f"fortress_health_{datetime.now().strftime('%Y%m%d')}.log"
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps(data, ensure_ascii=False) + "\n")
+            writer = self._get_log_writer()
+            if not writer.submit(data):
+                TRACER.count("health_log.dropped")
+                dropped = writer.dropped
+                if (
+                    self._drops_warned == 0
+                    or dropped - self._drops_warned >= DROP_WARNING_EVERY
+                ):
+                    self._drops_warned = dropped
+                    self.logger.warning(f"健康日志队列已满，累计丢弃 {dropped} 条记录")
         except Exception as e:
             self.logger.error(f"健康数据记录失败: {e}")
 
@@ -225,23 +776,31 @@ class FortressGuardian:
         # 加载配置
         if not self.load_configuration():
             return False
+        self._configure_tracing(
+            install_signal=threading.current_thread() is threading.main_thread()
+        )
 
         # 初始化模块
         if not self.initialize_modules():
             return False
 
-        # 启动防御系统
-        if not self.start_defense_system():
+        # 按依赖关系启动模块
+        if not self.start_modules():
             return False
 
         self.status = "OPERATIONAL"
         self.logger.info("数据要塞已进入运行状态")
 
         # 启动健康监控线程
-        monitor_thread = threading.Thread(
+        self._stop_event.clear()
+        self._start_fleet_agent()
+        self._monitor_thread = threading.Thread(
             target=self.monitor_system_health, daemon=True
         )
-        monitor_thread.start()
+        self._monitor_thread.start()
+        self._start_config_watcher()
+        self._start_exporter()
+        self._start_key_manager()
 
         return True
 
@@ -249,7 +808,40 @@ class FortressGuardian:
         """关闭要塞系统"""
         self.logger.info("开始关闭数据要塞...")
         self.status = "SHUTDOWN"
-        time.sleep(2)
+        self._stop_event.set()
+        if self._monitor_thread is not None:
+            self._monitor_thread.join(timeout=5)
+            self._monitor_thread = None
+        if self.config_watcher is not None:
+            self.config_watcher.join(timeout=5)
+            self.config_watcher = None
+        if self.log_writer is not None:
+            self.log_writer.close()
+            self.log_writer = None
+        if self.feed is not None:
+            # 发布最终快照，控制台据此显示守护进程已停止而不是旧数据
+            try:
+                self.feed.publish(
+                    dict(
+                        self._last_snapshot, status="SHUTDOWN", published_at=time.time()
+                    )
+                )
+            except Exception as e:
+                self.logger.error(f"健康快照发布失败: {e}")
+            self.feed.close()
+            self.feed = None
+        if self.exporter is not None:
+            self.exporter.stop()
+            self.exporter = None
+        if self.fleet_agent is not None:
+            self.fleet_agent.stop()
+            self.fleet_agent = None
+        if self._ids_thread is not None:
+            self._ids_thread.join(timeout=2)
+            self._ids_thread = None
+        if self.key_manager is not None:
+            self.key_manager.stop()
+            self.key_manager = None
         self.logger.info("数据要塞已安全关闭")
 
 
@@ -270,4 +862,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
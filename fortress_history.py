@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞内存指标历史
+每个指标一个定长 NumPy 环形缓冲区，窗口统计全部向量化计算
+"""
+
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_CAPACITY = 1440  # 默认心跳 60 秒时约为一天
+DEFAULT_METRICS = ("cpu_usage", "memory_usage", "disk_usage")
+DEFAULT_TREND_WINDOW = 900.0
+PERCENTILES = (50, 95, 99)
+
+
+class WindowStats(NamedTuple):
+    samples: int  # 窗口内的有效 (非NaN) 样本数
+    mean: float
+    min: float
+    max: float
+    p50: float
+    p95: float
+    p99: float
+    ewma: float  # 按时间衰减的指数加权均值
+    rate: float  # 最小二乘斜率，每秒变化量
+
+    def to_dict(self) -> Dict[str, Any]:
+        # NaN 不是合法 JSON，无数据的统计量输出为 None
+        return {
+            key: None if isinstance(value, float) and math.isnan(value) else value
+            for key, value in self._asdict().items()
+        }
+
+
+EMPTY_STATS = WindowStats(0, *([math.nan] * 8))
+
+
+class MetricRing:
+    """单个指标的定长环形缓冲区
+
+    时间戳与数值各占一个预分配的 float64 数组，追加只写一个槽位并
+    移动写指针 (O(1))，写满后覆盖最旧的样本，内存固定为
+    16 字节 × capacity。缺失的读数保存为 NaN，不参与统计。
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        if capacity <= 0:
+            raise ValueError("环形缓冲区容量必须大于 0")
+        self.capacity = capacity
+        self._ts = np.full(capacity, -np.inf)
+        self._values = np.full(capacity, np.nan)
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._ts.nbytes + self._values.nbytes)
+
+    def append(self, timestamp: float, value: Optional[float]):
+        with self._lock:
+            index = self._next
+            self._ts[index] = timestamp
+            self._values[index] = math.nan if value is None else value
+            self._next = (index + 1) % self.capacity
+            if self._size < self.capacity:
+                self._size += 1
+
+    def window(
+        self, seconds: Optional[float] = None, now: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """按时间顺序返回窗口内的 (时间戳, 数值) 副本，seconds 为 None 时取全部"""
+        with self._lock:
+            if self._size < self.capacity:
+                ts = self._ts[: self._size].copy()
+                values = self._values[: self._size].copy()
+            else:
+                ts = np.concatenate((self._ts[self._next :], self._ts[: self._next]))
+                values = np.concatenate(
+                    (self._values[self._next :], self._values[: self._next])
+                )
+        if seconds is not None:
+            now = time.time() if now is None else now
+            start = int(np.searchsorted(ts, now - seconds, side="left"))
+            ts, values = ts[start:], values[start:]
+        return ts, values
+
+    def stats(
+        self,
+        seconds: Optional[float] = None,
+        now: Optional[float] = None,
+        halflife: Optional[float] = None,
+    ) -> WindowStats:
+        """窗口统计，halflife 为 EWMA 半衰期 (默认取窗口的四分之一)"""
+        ts, values = self.window(seconds, now)
+        valid = ~np.isnan(values)
+        if not valid.any():
+            return EMPTY_STATS
+        ts, values = ts[valid], values[valid]
+        p50, p95, p99 = np.percentile(values, PERCENTILES)
+        span = float(ts[-1] - ts[0])
+        if halflife is None:
+            halflife = (seconds if seconds is not None else span) / 4 or 1.0
+        weights = np.exp2(-(ts[-1] - ts) / halflife)
+        ewma = float(np.dot(weights, values) / weights.sum())
+        if len(values) > 1 and span > 0:
+            dt = ts - ts.mean()
+            rate = float(np.dot(dt, values - values.mean()) / np.dot(dt, dt))
+        else:
+            rate = 0.0
+        return WindowStats(
+            int(len(values)),
+            float(values.mean()),
+            float(values.min()),
+            float(values.max()),
+            float(p50),
+            float(p95),
+            float(p99),
+            ewma,
+            rate,
+        )
+
+
+class MetricHistory:
+    """守护进程内各指标的共享历史"""
+
+    def __init__(
+        self,
+        metrics: Iterable[str] = DEFAULT_METRICS,
+        capacity: int = DEFAULT_CAPACITY,
+        trend_window: float = DEFAULT_TREND_WINDOW,
+    ):
+        self.capacity = capacity
+        self.trend_window = trend_window
+        self.rings: Dict[str, MetricRing] = {m: MetricRing(capacity) for m in metrics}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "MetricHistory":
+        """按 monitoring.history 创建"""
+        options = (config.get("monitoring", {}) or {}).get("history", {}) or {}
+        return cls(
+            options.get("metrics") or DEFAULT_METRICS,
+            capacity=int(options.get("capacity", DEFAULT_CAPACITY)),
+            trend_window=float(options.get("trend_window", DEFAULT_TREND_WINDOW)),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return sum(ring.nbytes for ring in self.rings.values())
+
+    def record(self, sample: Dict[str, Any], timestamp: Optional[float] = None):
+        """追加一个样本中的全部跟踪指标 (非数值读数记为缺失)"""
+        timestamp = time.time() if timestamp is None else timestamp
+        for name, ring in self.rings.items():
+            value = sample.get(name)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                value = None
+            ring.append(timestamp, value)
+
+    def stats(
+        self,
+        metric: str,
+        seconds: Optional[float] = None,
+        now: Optional[float] = None,
+        halflife: Optional[float] = None,
+    ) -> WindowStats:
+        """指标的窗口统计，未跟踪的指标返回空统计"""
+        ring = self.rings.get(metric)
+        if ring is None:
+            return EMPTY_STATS
+        return ring.stats(seconds, now, halflife)
+
+    def trends(self, now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """各指标在 trend_window 内的统计 (供快照与控制台使用)"""
+        return {
+            name: ring.stats(self.trend_window, now).to_dict()
+            for name, ring in self.rings.items()
+        }
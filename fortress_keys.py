@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞会话密钥轮换
+会话密钥由主密钥经 HKDF 按轮换周期派生，保留若干旧密钥用于解密
+"""
+
+import base64
+import binascii
+import logging
+import os
+import re
+import struct
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Union
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from fortress_crypto import ALGORITHMS, DecryptionError
+
+NONCE_SIZE = 12
+_KEY_ID = struct.Struct(">Q")
+_SECRET_RE = re.compile(r"\$\{\{\s*secrets\.(\w+)\s*\}\}")
+_HKDF_SALT = b"fortress-session-keys"
+_FILE_KEY_INFO = b"file-encryption"
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def parse_duration(value: Any) -> float:
+    """解析时长 (如 "30s"、"30m"、"24h"、"7d"、"2w")，返回秒数；纯数字按秒"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*", str(value))
+    if not match:
+        raise ValueError(f"无效的时长: {value}")
+    return float(match.group(1)) * _DURATION_UNITS[match.group(2) or "s"]
+
+
+def resolve_secret(value: Any) -> Optional[str]:
+    """把 ``${{ secrets.NAME }}`` 占位符解析为同名环境变量"""
+    if not isinstance(value, str):
+        return None
+    match = _SECRET_RE.fullmatch(value.strip())
+    if match:
+        return os.environ.get(match.group(1)) or None
+    return value or None
+
+
+def load_master_key(config: Dict[str, Any]) -> Optional[bytes]:
+    """读取 keys.master_key (十六进制或base64编码的32字节)，未配置时返回None"""
+    raw = resolve_secret((config.get("keys", {}) or {}).get("master_key"))
+    if raw is None:
+        return None
+    try:
+        key = bytes.fromhex(raw)
+    except ValueError:
+        try:
+            key = base64.b64decode(raw, validate=True)
+        except binascii.Error:
+            raise ValueError("主密钥必须是十六进制或base64编码") from None
+    if len(key) != 32:
+        raise ValueError("主密钥长度必须为32字节")
+    return key
+
+
+def derive_session_key(master_key: bytes, key_id: int) -> bytes:
+    """用 HKDF-SHA256 从主密钥派生第 key_id 个会话密钥"""
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=_HKDF_SALT,
+        info=b"session:" + key_id.to_bytes(8, "big"),
+    ).derive(master_key)
+
+
+def derive_file_key(master_key: bytes) -> bytes:
+    """派生文件加密专用密钥，与会话密钥使用不同的 HKDF info，互不相同"""
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=_HKDF_SALT,
+        info=_FILE_KEY_INFO,
+    ).derive(master_key)
+
+
+class SessionKey(NamedTuple):
+    key_id: int
+    aead: Union[AESGCM, ChaCha20Poly1305]
+    created_at: float
+
+
+class SessionKeyManager:
+    """按计划轮换会话密钥
+
+    当前密钥与密钥环作为一个不可变元组保存在单个属性中，轮换时
+    构造新元组后整体替换。读取方只做一次属性读取，无需加锁，
+    也不会看到当前密钥与密钥环不一致的中间状态。
+
+    密钥编号始终等于 ``time // rotation_interval``，因此重启后可以
+    按当前时间重新派生出历史窗口内的全部旧密钥。
+    """
+
+    def __init__(
+        self,
+        master_key: bytes,
+        rotation_interval: float = 86400.0,
+        history: int = 3,
+        algorithm: str = "ChaCha20-Poly1305",
+        logger: Optional[logging.Logger] = None,
+    ):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"不支持的加密算法: {algorithm}")
+        if rotation_interval <= 0:
+            raise ValueError("轮换周期必须大于0")
+        self.master_key = master_key
+        self.rotation_interval = rotation_interval
+        self.history = history
+        self.algorithm = algorithm
+        self.logger = logger or logging.getLogger("FortressGuardian")
+        self.rotations = 0
+
+        now = time.time()
+        current_id = self._epoch(now)
+        keyring = {
+            key_id: self._make_key(key_id, now)
+            for key_id in range(max(0, current_id - history), current_id + 1)
+        }
+        self._state: Tuple[SessionKey, Dict[int, SessionKey]] = (
+            keyring[current_id],
+            keyring,
+        )
+        self._rotate_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Dict[str, Any],
+        master_key: bytes,
+        logger: Optional[logging.Logger] = None,
+    ) -> "SessionKeyManager":
+        """按 keys.session_keys 创建"""
+        options = (config.get("keys", {}) or {}).get("session_keys", {}) or {}
+        return cls(
+            master_key,
+            rotation_interval=parse_duration(options.get("rotation_interval", "24h")),
+            history=int(options.get("history", 3)),
+            algorithm=options.get("algorithm", "ChaCha20-Poly1305"),
+            logger=logger,
+        )
+
+    def _epoch(self, now: float) -> int:
+        return int(now // self.rotation_interval)
+
+    def _make_key(self, key_id: int, now: float) -> SessionKey:
+        key = derive_session_key(self.master_key, key_id)
+        return SessionKey(key_id, ALGORITHMS[self.algorithm][1](key), now)
+
+    @property
+    def current(self) -> SessionKey:
+        """当前会话密钥 (无锁读取)"""
+        return self._state[0]
+
+    def lookup(self, key_id: int) -> Optional[SessionKey]:
+        """按编号查找仍在历史窗口内的密钥 (无锁读取)"""
+        return self._state[1].get(key_id)
+
+    def key_ids(self):
+        """当前保留的密钥编号 (升序)"""
+        return sorted(self._state[1])
+
+    def rotate(self, now: Optional[float] = None) -> SessionKey:
+        """轮换到 now 所在周期的密钥，淘汰超出历史窗口的旧密钥
+
+        密钥编号只由时间决定，不会超前于当前周期；now 仍处于当前
+        密钥的周期内时不做任何改变，直接返回当前密钥。
+        """
+        now = time.time() if now is None else now
+        with self._rotate_lock:
+            current, keyring = self._state
+            key_id = self._epoch(now)
+            if key_id <= current.key_id:
+                return current
+            new_key = self._make_key(key_id, now)
+            new_ring = {
+                kid: key for kid, key in keyring.items() if kid >= key_id - self.history
+            }
+            new_ring[key_id] = new_key
+            self._state = (new_key, new_ring)
+            self.rotations += 1
+        self.logger.info(f"会话密钥已轮换 (编号 {key_id})")
+        return new_key
+
+    def encrypt(self, data: bytes, aad: bytes = b"") -> bytes:
+        """用当前密钥加密: 密钥编号(8) + nonce(12) + 密文"""
+        key = self.current
+        header = _KEY_ID.pack(key.key_id)
+        nonce = os.urandom(NONCE_SIZE)
+        return header + nonce + key.aead.encrypt(nonce, data, header + aad)
+
+    def decrypt(self, blob: bytes, aad: bytes = b"") -> bytes:
+        """按消息中的密钥编号解密；密钥已过期时抛出 DecryptionError"""
+        if len(blob) < _KEY_ID.size + NONCE_SIZE:
+            raise DecryptionError("消息过短")
+        (key_id,) = _KEY_ID.unpack_from(blob)
+        key = self.lookup(key_id)
+        if key is None:
+            raise DecryptionError(f"会话密钥 {key_id} 已过期或未知")
+        header = blob[: _KEY_ID.size]
+        nonce = blob[_KEY_ID.size : _KEY_ID.size + NONCE_SIZE]
+        try:
+            return key.aead.decrypt(
+                nonce, blob[_KEY_ID.size + NONCE_SIZE :], header + aad
+            )
+        except InvalidTag:
+            raise DecryptionError(f"会话消息认证失败 (密钥 {key_id})") from None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            next_at = (self.current.key_id + 1) * self.rotation_interval
+            if self._stop_event.wait(max(0.0, next_at - time.time())):
+                break
+            try:
+                self.rotate()
+            except Exception as e:
+                self.logger.error(f"会话密钥轮换失败: {e}")
+
+    def start(self):
+        """启动后台轮换线程"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="fortress-key-rotation", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """停止后台轮换线程"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
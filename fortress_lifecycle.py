@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞模块生命周期
+按依赖关系并发启动 modules 中声明的模块，等待就绪探针并记录启动耗时
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from fortress_trace import span
+
+# 同一时刻可启动的模块按优先级排序 (数值越小越先提交)
+PRIORITY_ORDER = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+DEFAULT_READY_TIMEOUT = 10.0
+PROBE_INTERVAL = 0.05
+# 引入 modules[].start 之前固定执行的启动动作，旧配置未声明 start 时沿用
+LEGACY_START = {"防御系统": ("firewall", "intrusion_detection")}
+
+
+class ModuleSpec(NamedTuple):
+    name: str
+    status: str  # 配置中的初始状态
+    priority: str
+    depends_on: Sequence[str]
+    actions: Sequence[str]  # 依次执行的启动动作
+    probes: Sequence[str]  # 全部为真时模块就绪
+    ready_timeout: float
+
+    @property
+    def rank(self) -> int:
+        return PRIORITY_ORDER.get(self.priority, len(PRIORITY_ORDER))
+
+
+class ModuleTiming(NamedTuple):
+    name: str
+    status: str  # "ready"、"failed" 或 "skipped"
+    started: float  # 相对启动开始的秒数
+    finished: float
+    error: Optional[str]
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+
+class StartupReport(NamedTuple):
+    timings: Dict[str, ModuleTiming]
+    total: float
+    critical_path: List[str]  # 决定总耗时的依赖链
+
+    @property
+    def ok(self) -> bool:
+        return all(t.status == "ready" for t in self.timings.values())
+
+    def summary(self) -> str:
+        """按完成时间排列的启动耗时明细"""
+        lines = [
+            f"启动耗时 {self.total:.3f}s，关键路径: {' -> '.join(self.critical_path)}"
+        ]
+        for timing in sorted(self.timings.values(), key=lambda t: t.finished):
+            line = (
+                f"  {timing.name}: {timing.status} "
+                f"[{timing.started:.3f}s - {timing.finished:.3f}s] "
+                f"{timing.duration:.3f}s"
+            )
+            if timing.error:
+                line += f" ({timing.error})"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [str(v) for v in value]
+
+
+def _start_actions(
+    entry: Dict[str, Any], logger: Optional[logging.Logger]
+) -> Tuple[str, ...]:
+    """模块的启动动作；LEGACY_START 中的模块未声明 start 时使用原先的固定动作"""
+    name = str(entry["name"])
+    if "start" not in entry and name in LEGACY_START:
+        actions = LEGACY_START[name]
+        if logger is not None:
+            logger.warning(
+                f"模块 {name} 未配置 start，沿用默认启动动作: {', '.join(actions)}"
+            )
+        return actions
+    return tuple(_as_list(entry.get("start")))
+
+
+def parse_modules(
+    entries: Sequence[Dict[str, Any]], logger: Optional[logging.Logger] = None
+) -> List[ModuleSpec]:
+    """解析 modules 配置并校验依赖 (未知模块或循环依赖时抛出 ValueError)
+
+    传入 logger 时对沿用默认启动动作的旧配置给出警告。
+    """
+    specs = [
+        ModuleSpec(
+            name=str(entry["name"]),
+            status=str(entry.get("status", "standby")),
+            priority=str(entry.get("priority", "medium")),
+            depends_on=tuple(_as_list(entry.get("depends_on"))),
+            actions=_start_actions(entry, logger),
+            probes=tuple(_as_list(entry.get("ready_when"))),
+            ready_timeout=float(entry.get("ready_timeout", DEFAULT_READY_TIMEOUT)),
+        )
+        for entry in entries or []
+    ]
+    names = [spec.name for spec in specs]
+    if len(set(names)) != len(names):
+        raise ValueError("模块名称重复")
+    for spec in specs:
+        unknown = [dep for dep in spec.depends_on if dep not in names]
+        if unknown:
+            raise ValueError(f"模块 {spec.name} 依赖未知模块: {', '.join(unknown)}")
+    layers(specs)  # 检查循环依赖
+    return specs
+
+
+def layers(specs: Sequence[ModuleSpec]) -> List[List[ModuleSpec]]:
+    """按依赖分层 (同层模块互不依赖)，层内按优先级排序"""
+    remaining = {spec.name: spec for spec in specs}
+    done: Set[str] = set()
+    result: List[List[ModuleSpec]] = []
+    while remaining:
+        layer = [
+            spec
+            for spec in remaining.values()
+            if all(dep in done for dep in spec.depends_on)
+        ]
+        if not layer:
+            raise ValueError(f"模块存在循环依赖: {', '.join(sorted(remaining))}")
+        layer.sort(key=lambda s: s.rank)
+        result.append(layer)
+        for spec in layer:
+            done.add(spec.name)
+            del remaining[spec.name]
+    return result
+
+
+class ModuleLifecycle:
+    """按依赖图并发启动模块
+
+    模块在其全部依赖就绪后立即提交到线程池，同时可启动的模块按
+    优先级提交。每个模块依次执行启动动作，再轮询就绪探针直到全部
+    为真或超时；失败模块的下游模块被跳过。总耗时由最长的依赖链
+    决定，而不是所有步骤之和。
+    """
+
+    def __init__(
+        self,
+        specs: Sequence[ModuleSpec],
+        actions: Dict[str, Callable[[], bool]],
+        probes: Optional[Dict[str, Callable[[], bool]]] = None,
+        max_workers: int = 4,
+        on_change: Optional[Callable[[str, str], None]] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.specs = {spec.name: spec for spec in specs}
+        self.actions = actions
+        self.probes = probes or {}
+        self.max_workers = max_workers
+        self.on_change = on_change
+        self.logger = logger or logging.getLogger("FortressGuardian")
+        self._stop_event = threading.Event()
+        for spec in specs:
+            for name in spec.actions:
+                if name not in self.actions:
+                    raise ValueError(f"模块 {spec.name} 的启动动作未注册: {name}")
+            for name in spec.probes:
+                if name not in self.probes:
+                    raise ValueError(f"模块 {spec.name} 的就绪探针未注册: {name}")
+
+    def stop(self):
+        """中止仍在等待就绪探针的模块"""
+        self._stop_event.set()
+
+    def _start_module(self, spec: ModuleSpec):
+        with span(f"module.start:{spec.name}"):
+            for name in spec.actions:
+                if not self.actions[name]():
+                    raise RuntimeError(f"启动动作 {name} 失败")
+            deadline = time.monotonic() + spec.ready_timeout
+            pending = list(spec.probes)
+            while pending:
+                pending = [name for name in pending if not self.probes[name]()]
+                if not pending:
+                    break
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"就绪探针超时: {', '.join(pending)}")
+                if self._stop_event.wait(PROBE_INTERVAL):
+                    raise RuntimeError("启动已中止")
+
+    def _notify(self, name: str, status: str):
+        if self.on_change is not None:
+            self.on_change(name, status)
+
+    def start_all(self) -> StartupReport:
+        """启动全部模块并返回耗时明细"""
+        origin = time.monotonic()
+        timings: Dict[str, ModuleTiming] = {}
+        started: Dict[str, float] = {}
+        waiting = dict(self.specs)
+        running: Dict[Future, str] = {}
+
+        def finish(name: str, status: str, error: Optional[str] = None):
+            now = time.monotonic() - origin
+            timings[name] = ModuleTiming(
+                name, status, started.get(name, now), now, error
+            )
+            self._notify(name, status)
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="fortress-module"
+        ) as pool:
+            while waiting or running:
+                # 跳过依赖失败的模块，提交依赖全部就绪的模块
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for spec in sorted(waiting.values(), key=lambda s: s.rank):
+                        failed = [
+                            dep
+                            for dep in spec.depends_on
+                            if dep in timings and timings[dep].status != "ready"
+                        ]
+                        if failed:
+                            del waiting[spec.name]
+                            finish(spec.name, "skipped", f"依赖未就绪: {failed[0]}")
+                            progressed = True
+                        elif all(
+                            dep in timings and timings[dep].status == "ready"
+                            for dep in spec.depends_on
+                        ):
+                            del waiting[spec.name]
+                            started[spec.name] = time.monotonic() - origin
+                            self._notify(spec.name, "starting")
+                            running[pool.submit(self._start_module, spec)] = spec.name
+                if not running:
+                    break
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        finish(name, "ready")
+                    else:
+                        self.logger.error(f"模块 {name} 启动失败: {error}")
+                        finish(name, "failed", str(error))
+
+        total = time.monotonic() - origin
+        return StartupReport(timings, total, self._critical_path(timings))
+
+    def _critical_path(self, timings: Dict[str, ModuleTiming]) -> List[str]:
+        """从最晚完成的模块沿最晚完成的依赖回溯"""
+        if not timings:
+            return []
+        name: Optional[str] = max(timings, key=lambda n: timings[n].finished)
+        path: List[str] = []
+        while name is not None:
+            path.append(name)
+            deps = [d for d in self.specs[name].depends_on if d in timings]
+            name = max(deps, key=lambda d: timings[d].finished) if deps else None
+        return path[::-1]
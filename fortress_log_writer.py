@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞健康日志写入器
+后台线程批量写入 fortress_health_*.log，保持当日文件句柄常开
+"""
+
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, IO, List, Optional, Tuple
+
+FSYNC_POLICIES = ("never", "batch", "interval")
+OVERFLOW_POLICIES = ("drop", "block")
+
+_RETENTION_UNITS = {"h": 1 / 24, "d": 1, "w": 7}
+_STOP = object()
+
+
+def parse_retention(value: Any) -> Optional[float]:
+    """解析保留期 (如 "90d"、"12h"、"2w")，返回天数；无效或为空时返回None"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([hdw]?)\s*", str(value))
+    if not match:
+        raise ValueError(f"无效的保留期: {value}")
+    return float(match.group(1)) * _RETENTION_UNITS[match.group(2) or "d"]
+
+
+class HealthLogWriter:
+    """带有界队列的健康数据批量写入器
+
+    监控线程只负责入队；序列化、写盘、fsync、按日轮转与过期清理
+    都在写入线程中完成。队列满时按 overflow 策略丢弃或短暂退避，
+    并统计丢弃条数，慢磁盘不会阻塞健康采集。
+    """
+
+    def __init__(
+        self,
+        log_dir: str = ".",
+        prefix: str = "fortress_health_",
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+        fsync: str = "never",
+        fsync_interval: float = 5.0,
+        overflow: str = "drop",
+        block_timeout: float = 0.05,
+        retention_days: Optional[float] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"未知的fsync策略: {fsync}")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"未知的溢出策略: {overflow}")
+
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.retention_days = retention_days
+        self.logger = logger or logging.getLogger("FortressGuardian")
+
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+
+        self._sinks: List[Callable[[List[Dict[str, Any]]], Any]] = []
+        self._file: Optional[IO[str]] = None
+        self._file_day: Optional[str] = None
+        self._last_fsync = time.monotonic()
+        self._drop_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(
+        cls, config: Dict[str, Any], logger: Optional[logging.Logger] = None
+    ) -> "HealthLogWriter":
+        """根据 monitoring 配置段创建写入器"""
+        monitoring = config.get("monitoring", {}) or {}
+        settings = monitoring.get("log_writer", {}) or {}
+        return cls(
+            log_dir=settings.get("log_dir", "."),
+            queue_size=int(settings.get("queue_size", 10000)),
+            batch_size=int(settings.get("batch_size", 256)),
+            flush_interval=float(settings.get("flush_interval", 1.0)),
+            fsync=settings.get("fsync", "never"),
+            fsync_interval=float(settings.get("fsync_interval", 5.0)),
+            overflow=settings.get("overflow", "drop"),
+            retention_days=parse_retention(monitoring.get("log_retention")),
+            logger=logger,
+        )
+
+    def file_path(self, day: str) -> str:
+        """返回指定日期 (YYYYMMDD) 的日志文件路径"""
+        return os.path.join(self.log_dir, f"{self.prefix}{day}.log")
+
+    def add_sink(self, sink: Callable[[List[Dict[str, Any]]], Any]):
+        """注册附加存储后端，在写入线程中按批调用"""
+        self._sinks.append(sink)
+
+    def start(self):
+        """启动写入线程"""
+        if self._thread is not None:
+            return
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._run, name="fortress-log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, data: Dict[str, Any]) -> bool:
+        """提交一条健康记录，队列满时返回False"""
+        item = (datetime.now().strftime("%Y%m%d"), data)
+        try:
+            if self.overflow == "block":
+                self.queue.put(item, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+            return False
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """写完队列中剩余记录后关闭"""
+        if self._thread is None:
+            return
+        # 哨兵必须入队，即使队列已满也要等待
+        self.queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, int]:
+        """返回写入器计数"""
+        return {
+            "queue_depth": self.queue.qsize(),
+            "dropped": self.dropped,
+            "written": self.written,
+            "batches": self.batches,
+            "errors": self.errors,
+        }
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                first = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._maybe_fsync(force=False)
+                continue
+
+            batch: List[Tuple[str, Dict[str, Any]]] = []
+            if first is _STOP:
+                stopping = True
+            else:
+                batch.append(first)
+            while not stopping and len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+
+            if batch:
+                self._write_batch(batch)
+
+        self._close_file()
+
+    def _write_batch(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        try:
+            lines: List[str] = []
+            day = batch[0][0]
+            for item_day, data in batch:
+                if item_day != day:
+                    self._write_lines(day, lines)
+                    day, lines = item_day, []
+                lines.append(json.dumps(data, ensure_ascii=False) + "\n")
+            self._write_lines(day, lines)
+            self.batches += 1
+            self._maybe_fsync(force=self.fsync == "batch")
+        except Exception as e:
+            self.errors += 1
+            self.logger.error(f"健康数据记录失败: {e}")
+
+        records = [data for _, data in batch]
+        for sink in self._sinks:
+            try:
+                sink(records)
+            except Exception as e:
+                self.errors += 1
+                self.logger.error(f"健康数据存储后端写入失败: {e}")
+
+    def _write_lines(self, day: str, lines: List[str]):
+        if not lines:
+            return
+        handle = self._open_for(day)
+        handle.writelines(lines)
+        handle.flush()
+        self.written += len(lines)
+
+    def _open_for(self, day: str) -> IO[str]:
+        if self._file is not None and self._file_day == day:
+            return self._file
+        # 跨过午夜: 轮转到新文件并清理过期日志
+        self._close_file()
+        self._file = open(self.file_path(day), "a", encoding="utf-8")
+        self._file_day = day
+        self.purge_expired()
+        return self._file
+
+    def _maybe_fsync(self, force: bool):
+        if self._file is None or self.fsync == "never":
+            return
+        now = time.monotonic()
+        if force or (
+            self.fsync == "interval" and now - self._last_fsync >= self.fsync_interval
+        ):
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    def _close_file(self):
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            if self.fsync != "never":
+                os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+            self._file = None
+            self._file_day = None
+
+    def purge_expired(self, now: Optional[datetime] = None) -> List[str]:
+        """删除超出保留期的日志文件，返回被删除的路径"""
+        if self.retention_days is None:
+            return []
+        cutoff = (now or datetime.now()) - timedelta(days=self.retention_days)
+        cutoff_day = cutoff.strftime("%Y%m%d")
+        pattern = re.compile(re.escape(self.prefix) + r"(\d{8})\.log")
+        removed = []
+        for name in os.listdir(self.log_dir):
+            match = pattern.match(name)
+            if match and match.group(1) < cutoff_day:
+                path = os.path.join(self.log_dir, name)
+                try:
+                    os.unlink(path)
+                    removed.append(path)
+                except OSError as e:
+                    self.logger.error(f"清理过期日志失败: {path}: {e}")
+        return removed
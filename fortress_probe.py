@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞网络探测
+在一个事件循环中并发探测多个目标 (TCP 建连与可选的 ICMP 回显)，
+每个目标独立超时并记录往返时间，结果按 TTL 缓存
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+DEFAULT_TIMEOUT = 2.0  # 单个目标的超时 (秒)
+DEFAULT_TTL = 30.0  # 结果缓存时间 (秒)
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+PROBE_KINDS = ("tcp", "icmp")
+
+
+class ProbeTarget(NamedTuple):
+    name: str
+    kind: str  # "tcp" 或 "icmp"
+    host: str
+    port: int = 0  # 仅 tcp
+    timeout: float = DEFAULT_TIMEOUT
+    ttl: float = DEFAULT_TTL
+
+
+class ProbeResult(NamedTuple):
+    target: str
+    ok: bool
+    rtt: Optional[float]  # 往返时间 (秒)，失败时为 None
+    error: str  # 成功时为空
+    checked_at: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+def default_targets(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """未配置 targets 时的目标: network.internal_ip 上防火墙放行的单个端口"""
+    host = (config.get("network", {}) or {}).get("internal_ip")
+    if not host:
+        return []
+    from fortress_firewall import parse_ports
+
+    firewall = (config.get("security", {}) or {}).get("firewall", {}) or {}
+    ports: List[int] = []
+    for rule in firewall.get("rules", []) or []:
+        if "allow" not in rule:
+            continue
+        for low, high in parse_ports(rule.get("ports")) or []:
+            # 端口区间无法逐个探测，只取单个端口
+            if low == high and low not in ports:
+                ports.append(low)
+    entries: List[Dict[str, Any]] = [
+        {"kind": "tcp", "host": host, "port": port} for port in ports
+    ]
+    options = (config.get("monitoring", {}) or {}).get("network_probe", {}) or {}
+    if options.get("icmp"):
+        entries.append({"kind": "icmp", "host": host})
+    return entries
+
+
+def parse_targets(config: Dict[str, Any]) -> List[ProbeTarget]:
+    """解析 monitoring.network_probe.targets (无效目标抛出 ValueError)"""
+    options = (config.get("monitoring", {}) or {}).get("network_probe", {}) or {}
+    timeout = float(options.get("timeout", DEFAULT_TIMEOUT))
+    ttl = float(options.get("ttl", DEFAULT_TTL))
+    entries = options.get("targets")
+    if entries is None:
+        entries = default_targets(config)
+    targets = []
+    for entry in entries:
+        kind = str(entry.get("kind", "tcp"))
+        if kind not in PROBE_KINDS:
+            raise ValueError(f"探测目标 {entry.get('name')} 的类型无效: {kind}")
+        host = str(entry["host"])
+        port = int(entry.get("port", 0))
+        if kind == "tcp" and not 0 < port <= 65535:
+            raise ValueError(f"探测目标 {entry.get('name')} 的端口无效: {port}")
+        default_name = f"tcp:{host}:{port}" if kind == "tcp" else f"icmp:{host}"
+        targets.append(
+            ProbeTarget(
+                name=str(entry.get("name") or default_name),
+                kind=kind,
+                host=host,
+                port=port,
+                timeout=float(entry.get("timeout", timeout)),
+                ttl=float(entry.get("ttl", ttl)),
+            )
+        )
+    return targets
+
+
+def _checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b"\0"
+    total: int = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def _echo_request(ident: int, seq: int) -> bytes:
+    payload = struct.pack("!d", time.monotonic())
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    checksum = _checksum(header + payload)
+    return struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, ident, seq) + payload
+
+
+def _icmp_socket() -> Tuple[socket.socket, bool]:
+    """优先使用无需特权的 ICMP 数据报套接字，不允许时退回原始套接字
+
+    返回 (套接字, 是否原始套接字)；原始套接字收到的数据带 IP 头。
+    两者都不可用时抛出 PermissionError。
+    """
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        raw = False
+    except PermissionError:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        raw = True
+    sock.setblocking(False)
+    return sock, raw
+
+
+class NetworkProber:
+    """并发网络探测器
+
+    check() 只探测缓存已过期的目标，全部目标在同一个事件循环中并发
+    进行，一轮耗时取决于最慢的目标而不是各目标之和。至少 quorum 个
+    目标可达时网络状态为 connected，未配置目标时为 unknown。
+    """
+
+    def __init__(
+        self,
+        targets: Iterable[ProbeTarget],
+        quorum: int = 1,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.targets = list(targets)
+        self.quorum = max(1, quorum)
+        self.logger = logger or logging.getLogger("FortressGuardian")
+        self.results: Dict[str, ProbeResult] = {}
+        self.rounds = 0
+        self._seq = itertools.count(1)
+        self._ident = os.getpid() & 0xFFFF
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls, config: Dict[str, Any], logger: Optional[logging.Logger] = None
+    ) -> "NetworkProber":
+        options = (config.get("monitoring", {}) or {}).get("network_probe", {}) or {}
+        return cls(
+            parse_targets(config), quorum=int(options.get("quorum", 1)), logger=logger
+        )
+
+    def stale(self, now: float) -> List[ProbeTarget]:
+        """缓存结果已过期 (或尚未探测) 的目标"""
+        stale = []
+        for target in self.targets:
+            result = self.results.get(target.name)
+            if result is None or now - result.checked_at >= target.ttl:
+                stale.append(target)
+        return stale
+
+    async def probe_round(
+        self, targets: Iterable[ProbeTarget], now: Optional[float] = None
+    ) -> List[ProbeResult]:
+        """并发探测一组目标"""
+        return list(await asyncio.gather(*(self.probe(t, now) for t in targets)))
+
+    async def probe(
+        self, target: ProbeTarget, now: Optional[float] = None
+    ) -> ProbeResult:
+        """探测单个目标，超时与连接错误记为失败"""
+        checked_at = time.time() if now is None else now
+        start = time.monotonic()
+        try:
+            if target.kind == "icmp":
+                await asyncio.wait_for(self._icmp(target), target.timeout)
+            else:
+                await asyncio.wait_for(self._tcp(target), target.timeout)
+        except asyncio.TimeoutError:
+            return ProbeResult(target.name, False, None, "timeout", checked_at)
+        except OSError as e:
+            error = e.strerror or type(e).__name__
+            return ProbeResult(target.name, False, None, error, checked_at)
+        return ProbeResult(target.name, True, time.monotonic() - start, "", checked_at)
+
+    async def _tcp(self, target: ProbeTarget):
+        _, writer = await asyncio.open_connection(target.host, target.port)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    async def _icmp(self, target: ProbeTarget):
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(target.host, None, family=socket.AF_INET)
+        address = infos[0][4][0]
+        sock, raw = _icmp_socket()
+        try:
+            seq = next(self._seq) & 0xFFFF
+            sock.connect((address, 0))
+            await loop.sock_sendall(sock, _echo_request(self._ident, seq))
+            while True:
+                data = await loop.sock_recv(sock, 1024)
+                if raw:
+                    data = data[(data[0] & 0x0F) * 4 :]
+                if len(data) < 8:
+                    continue
+                kind, _, _, ident, reply_seq = struct.unpack("!BBHHH", data[:8])
+                # 数据报套接字的标识由内核改写，只能按序列号匹配
+                if kind == ICMP_ECHO_REPLY and reply_seq == seq:
+                    if not raw or ident == self._ident:
+                        return
+        finally:
+            sock.close()
+
+    def check(self, now: Optional[float] = None) -> str:
+        """探测过期目标并返回网络状态 (在采集器线程中调用)"""
+        with self._lock:
+            now = time.time() if now is None else now
+            stale = self.stale(now)
+            if stale:
+                for result in asyncio.run(self.probe_round(stale, now)):
+                    if not result.ok:
+                        self.logger.debug(
+                            f"网络探测失败: {result.target} ({result.error})"
+                        )
+                    self.results[result.target] = result
+                self.rounds += 1
+            return self.status()
+
+    def status(self) -> str:
+        """按缓存结果给出网络状态"""
+        if not self.targets:
+            return "unknown"
+        up = 0
+        for target in self.targets:
+            result = self.results.get(target.name)
+            if result is not None and result.ok:
+                up += 1
+        quorum = min(self.quorum, len(self.targets))
+        return "connected" if up >= quorum else "disconnected"
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞健康日志查询
+为每个日志文件维护稀疏索引 (分钟桶 -> 字节偏移)，按时间范围直接定位
+"""
+
+import argparse
+import bisect
+import json
+import operator
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+INDEX_SUFFIX = ".idx"
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+_PREDICATE_RE = re.compile(r"\s*(\w+)\s*(>=|<=|==|!=|>|<)\s*(.+?)\s*$")
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+
+def _minute_key(timestamp: str) -> int:
+    """ISO时间戳 -> 自 epoch 起的分钟数 (本地时间)"""
+    return int(datetime.fromisoformat(timestamp).timestamp() // 60)
+
+
+def parse_predicate(expression: str) -> Predicate:
+    """解析简单条件表达式，如 ``cpu_usage > 85`` 或 ``network_status == connected``"""
+    match = _PREDICATE_RE.match(expression)
+    if not match:
+        raise ValueError(f"无效的查询条件: {expression}")
+    field, op, raw = match.groups()
+    compare = _OPERATORS[op]
+    value: Any
+    try:
+        value = float(raw)
+    except ValueError:
+        value = raw.strip("\"'")
+
+    def predicate(record: Dict[str, Any]) -> bool:
+        actual = record.get(field)
+        if actual is None:
+            return False
+        try:
+            return compare(actual, value)
+        except TypeError:
+            return False
+
+    return predicate
+
+
+class SparseIndex:
+    """单个日志文件的稀疏索引
+
+    索引文件只追加: ``<分钟> <偏移>`` 表示该分钟首条记录的位置，
+    ``# <已索引字节数>`` 记录索引进度。新记录追加后只需扫描
+    进度之后的部分。假设日志按时间顺序写入。
+    """
+
+    def __init__(self, log_path: str):
+        self.log_path = log_path
+        self.index_path = log_path + INDEX_SUFFIX
+        self.minutes: List[int] = []
+        self.offsets: List[int] = []
+        self.indexed_end = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) != 2:
+                    continue
+                if parts[0] == "#":
+                    self.indexed_end = int(parts[1])
+                else:
+                    minute, offset = int(parts[0]), int(parts[1])
+                    if offset < self.indexed_end or (
+                        self.minutes and minute <= self.minutes[-1]
+                    ):
+                        continue
+                    self.minutes.append(minute)
+                    self.offsets.append(offset)
+        # 丢弃进度标记之后残留的条目 (索引写入被中断)
+        while self.offsets and self.offsets[-1] >= self.indexed_end:
+            self.minutes.pop()
+            self.offsets.pop()
+        if self.indexed_end > os.path.getsize(self.log_path):
+            # 日志被截断或替换，重建索引
+            self.minutes, self.offsets, self.indexed_end = [], [], 0
+            os.unlink(self.index_path)
+
+    def update(self) -> int:
+        """增量索引新追加的记录，返回新增的分钟桶数"""
+        with self._lock:
+            size = os.path.getsize(self.log_path)
+            if size <= self.indexed_end:
+                return 0
+            added: List[str] = []
+            offset = self.indexed_end
+            with open(self.log_path, "rb") as f:
+                f.seek(offset)
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break  # 尚未写完的行，留到下次
+                    try:
+                        minute = _minute_key(json.loads(raw)["timestamp"])
+                    except (ValueError, KeyError, TypeError):
+                        offset += len(raw)
+                        continue
+                    if not self.minutes or minute > self.minutes[-1]:
+                        self.minutes.append(minute)
+                        self.offsets.append(offset)
+                        added.append(f"{minute} {offset}\n")
+                    offset += len(raw)
+            if offset == self.indexed_end:
+                return 0
+            self.indexed_end = offset
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.writelines(added)
+                f.write(f"# {offset}\n")
+            return len(added)
+
+    def seek_offset(self, start: datetime) -> int:
+        """返回不晚于 start 所在分钟的首条记录偏移"""
+        minute = int(start.timestamp() // 60)
+        position = bisect.bisect_right(self.minutes, minute) - 1
+        return self.offsets[position] if position >= 0 else 0
+
+
+class HealthLogQuery:
+    """健康日志时间范围查询"""
+
+    def __init__(self, log_dir: str = ".", prefix: str = "fortress_health_"):
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self._indexes: Dict[str, SparseIndex] = {}
+        self._lock = threading.Lock()
+
+    def _index_for(self, path: str) -> SparseIndex:
+        with self._lock:
+            index = self._indexes.get(path)
+            if index is None:
+                index = SparseIndex(path)
+                self._indexes[path] = index
+        index.update()
+        return index
+
+    def _files_between(self, start: datetime, end: datetime) -> Iterator[str]:
+        day = start.date()
+        while day <= end.date():
+            path = os.path.join(self.log_dir, f"{self.prefix}{day:%Y%m%d}.log")
+            if os.path.exists(path):
+                yield path
+            day += timedelta(days=1)
+
+    def query(
+        self,
+        start: datetime,
+        end: datetime,
+        fields: Optional[Sequence[str]] = None,
+        where: Union[None, str, Predicate, Sequence[Union[str, Predicate]]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """流式返回 [start, end) 内满足条件的记录
+
+        fields 指定投影字段 (timestamp 总是保留)；where 可以是条件
+        表达式、可调用对象或它们的列表，多个条件按 AND 组合。
+        """
+        if where is None:
+            predicates: List[Predicate] = []
+        elif isinstance(where, str) or callable(where):
+            predicates = [where if callable(where) else parse_predicate(where)]
+        else:
+            predicates = [p if callable(p) else parse_predicate(p) for p in where]
+
+        for path in self._files_between(start, end):
+            index = self._index_for(path)
+            with open(path, "rb") as f:
+                f.seek(index.seek_offset(start))
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(raw)
+                        ts = datetime.fromisoformat(record["timestamp"])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    if ts < start:
+                        continue
+                    if ts >= end:
+                        break
+                    if not all(p(record) for p in predicates):
+                        continue
+                    if fields:
+                        record = {k: record.get(k) for k in ("timestamp", *fields)}
+                    yield record
+
+
+def main():
+    """主函数: 命令行查询健康日志"""
+    parser = argparse.ArgumentParser(description="按时间范围查询健康日志")
+    parser.add_argument("start", help="起始时间 (ISO格式)")
+    parser.add_argument("end", help="结束时间 (ISO格式)")
+    parser.add_argument("--log-dir", default=".", help="日志目录")
+    parser.add_argument("--fields", nargs="*", help="投影字段")
+    parser.add_argument("--where", action="append", help="条件，如 'cpu_usage > 85'")
+    args = parser.parse_args()
+
+    query = HealthLogQuery(args.log_dir)
+    for record in query.query(
+        datetime.fromisoformat(args.start),
+        datetime.fromisoformat(args.end),
+        fields=args.fields,
+        where=args.where,
+    ):
+        print(json.dumps(record, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞模块状态注册表
+写时复制的版本化快照：读者无锁取当前版本，写者生成新版本并记录变更事件
+"""
+
+import threading
+from collections import deque
+from types import MappingProxyType
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+# 保留的最近变更事件数，供按版本拉取增量
+DEFAULT_HISTORY = 256
+
+
+class ModuleRecord:
+    """单个模块的状态 (创建后不再修改，变更通过 replace 生成新记录)"""
+
+    __slots__ = ("name", "status", "priority", "depends_on", "last_check")
+
+    def __init__(
+        self,
+        name: str,
+        status: str,
+        priority: str,
+        depends_on: Sequence[str] = (),
+        last_check: Optional[str] = None,
+    ):
+        self.name = name
+        self.status = status
+        self.priority = priority
+        self.depends_on = tuple(depends_on)
+        self.last_check = last_check
+
+    def replace(self, **changes: Any) -> "ModuleRecord":
+        """返回修改了指定字段的新记录"""
+        fields = {slot: getattr(self, slot) for slot in self.__slots__}
+        fields.update(changes)
+        return ModuleRecord(**fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "priority": self.priority,
+            "depends_on": list(self.depends_on),
+            "last_check": self.last_check,
+        }
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ModuleRecord):
+            return NotImplemented
+        return all(getattr(self, s) == getattr(other, s) for s in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"ModuleRecord({self.name!r}, {self.status!r}, {self.priority!r})"
+
+
+class ModuleEvent(NamedTuple):
+    version: int
+    kind: str  # "added"、"changed" 或 "removed"
+    name: str
+    record: Optional[ModuleRecord]  # removed 时为 None
+
+    def to_dict(self) -> Dict[str, Any]:
+        event: Dict[str, Any] = {
+            "version": self.version,
+            "kind": self.kind,
+            "name": self.name,
+        }
+        if self.record is not None:
+            event.update(self.record.to_dict())
+        return event
+
+
+class RegistrySnapshot(Mapping[str, ModuleRecord]):
+    """某一版本的全部模块状态，不可修改，可跨线程共享"""
+
+    __slots__ = ("version", "_records", "_dict")
+
+    def __init__(self, version: int, records: Dict[str, ModuleRecord]):
+        self.version = version
+        self._records = MappingProxyType(records)
+        self._dict: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def __getitem__(self, name: str) -> ModuleRecord:
+        return self._records[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """名称 -> 状态字典 (每个版本只生成一次，调用方不得修改)"""
+        if self._dict is None:
+            self._dict = {name: r.to_dict() for name, r in self._records.items()}
+        return self._dict
+
+
+class ModuleRegistry:
+    """写时复制的模块状态注册表
+
+    当前版本保存在一个引用中，snapshot() 直接返回它，读者不加锁也
+    不复制。写者在锁内复制记录表、生成新版本并替换引用。最近的
+    变更事件另存一份，消费者 (健康日志、控制台快照) 按自己的节奏
+    用 changes_since() 拉取增量，写者不回调任何代码。
+    """
+
+    def __init__(
+        self,
+        records: Iterable[ModuleRecord] = (),
+        history: int = DEFAULT_HISTORY,
+    ):
+        self._lock = threading.Lock()
+        self._snapshot = RegistrySnapshot(0, {r.name: r for r in records})
+        self._history: Deque[ModuleEvent] = deque(maxlen=history)
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def snapshot(self) -> RegistrySnapshot:
+        """当前版本 (无锁、无复制)"""
+        return self._snapshot
+
+    def changes_since(self, version: int) -> Optional[List[ModuleEvent]]:
+        """version 之后的事件；历史已不足以覆盖时返回 None (需取全量快照)"""
+        history = list(self._history)
+        if version >= self.version:
+            return []
+        if not history or history[0].version > version + 1:
+            return None
+        return [event for event in history if event.version > version]
+
+    def update(self, name: str, **changes: Any) -> RegistrySnapshot:
+        """修改一个模块的字段，内容未变时不生成新版本"""
+        with self._lock:
+            current = self._snapshot
+            record = current[name].replace(**changes)
+            if record == current[name]:
+                return current
+            return self._commit(current, {name: record}, [("changed", name)])
+
+    def replace_all(self, records: Iterable[ModuleRecord]) -> RegistrySnapshot:
+        """用新的模块列表整体替换 (配置重载)，逐个生成增删改事件"""
+        with self._lock:
+            current = self._snapshot
+            new = {r.name: r for r in records}
+            kinds = [("removed", name) for name in current if name not in new]
+            for name, record in new.items():
+                if name not in current:
+                    kinds.append(("added", name))
+                elif record != current[name]:
+                    kinds.append(("changed", name))
+            if not kinds:
+                return current
+            return self._commit(current, new, kinds, replace=True)
+
+    def _commit(
+        self,
+        current: RegistrySnapshot,
+        changed: Dict[str, ModuleRecord],
+        kinds: List[Tuple[str, str]],
+        replace: bool = False,
+    ) -> RegistrySnapshot:
+        records = dict(changed) if replace else {**current._records, **changed}
+        version = current.version
+        events = []
+        for kind, name in kinds:
+            version += 1
+            events.append(ModuleEvent(version, kind, name, records.get(name)))
+        snapshot = RegistrySnapshot(version, records)
+        self._snapshot = snapshot
+        self._history.extend(events)
+        return snapshot
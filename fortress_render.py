@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞控制台渲染层
+离屏构建整帧，与上一帧逐格比较，只重绘变化的区域
+"""
+
+import time
+import unicodedata
+from typing import List, Optional, Tuple
+
+# 宽字符占两列，第二列用占位符表示
+_WIDE_TAIL = ""
+
+Cell = Tuple[str, int]
+
+
+def char_width(ch: str) -> int:
+    """返回字符在终端中占用的列数"""
+    return 2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1
+
+
+def text_width(text: str) -> int:
+    """返回字符串在终端中占用的列数"""
+    return sum(char_width(ch) for ch in text)
+
+
+class Frame:
+    """离屏帧缓冲，接口与 curses 窗口的 addstr/getmaxyx 一致"""
+
+    def __init__(self, height: int, width: int):
+        self.height = height
+        self.width = width
+        blank: List[Cell] = [(" ", 0)] * width
+        self.rows: List[List[Cell]] = [list(blank) for _ in range(height)]
+
+    def getmaxyx(self) -> Tuple[int, int]:
+        return self.height, self.width
+
+    def addstr(self, y: int, x: int, text: str, attr: int = 0):
+        """在 (y, x) 处写入文本，超出边界的部分被截断"""
+        if not 0 <= y < self.height:
+            return
+        row = self.rows[y]
+        col = max(0, x)
+        for ch in text:
+            w = char_width(ch)
+            if col + w > self.width:
+                break
+            # 覆盖宽字符的一半时清除另一半
+            if row[col][0] == _WIDE_TAIL and col > 0:
+                row[col - 1] = (" ", 0)
+            row[col] = (ch, attr)
+            if w == 2:
+                row[col + 1] = (_WIDE_TAIL, attr)
+            if col + w < self.width and row[col + w][0] == _WIDE_TAIL:
+                row[col + w] = (" ", 0)
+            col += w
+
+
+class FrameStats:
+    """帧耗时统计"""
+
+    def __init__(self):
+        self.frames = 0
+        self.cells = 0
+        self.total_time = 0.0
+        self.last_time = 0.0
+        self.last_cells = 0
+
+    def record(self, seconds: float, cells: int):
+        self.frames += 1
+        self.cells += cells
+        self.total_time += seconds
+        self.last_time = seconds
+        self.last_cells = cells
+
+    def summary(self) -> str:
+        avg = self.total_time / self.frames * 1000 if self.frames else 0.0
+        return (
+            f"帧:{self.frames} 上帧:{self.last_time * 1000:.2f}ms "
+            f"平均:{avg:.2f}ms 重绘格:{self.last_cells}"
+        )
+
+
+class DiffRenderer:
+    """把帧的差异区域绘制到 curses 窗口
+
+    只对变化的连续区段调用 ``addstr``，随后 ``noutrefresh`` +
+    ``doupdate`` 一次性提交；帧未变化时不产生任何终端输出。
+    """
+
+    def __init__(self, window, doupdate=None):
+        self.window = window
+        self._doupdate = doupdate
+        self._previous: Optional[Frame] = None
+        self.stats = FrameStats()
+
+    def invalidate(self):
+        """丢弃上一帧 (如终端尺寸变化后)，下次渲染全量重绘"""
+        self._previous = None
+
+    def render(self, frame: Frame) -> int:
+        """绘制差异并提交，返回重绘的格数"""
+        start = time.perf_counter()
+        previous = self._previous
+        if previous is not None and (
+            previous.height != frame.height or previous.width != frame.width
+        ):
+            previous = None
+
+        drawn = 0
+        for y, row in enumerate(frame.rows):
+            old = previous.rows[y] if previous is not None else None
+            if old == row:
+                continue
+            for x0, x1 in self._changed_runs(row, old):
+                drawn += x1 - x0
+                self._draw_run(y, x0, row[x0:x1])
+
+        if drawn:
+            self.window.noutrefresh()
+            if self._doupdate is not None:
+                self._doupdate()
+        self._previous = frame
+        self.stats.record(time.perf_counter() - start, drawn)
+        return drawn
+
+    @staticmethod
+    def _changed_runs(
+        row: List[Cell], old: Optional[List[Cell]]
+    ) -> List[Tuple[int, int]]:
+        width = len(row)
+        if old is None:
+            return [(0, width)]
+        runs: List[Tuple[int, int]] = []
+        x = 0
+        while x < width:
+            if row[x] == old[x]:
+                x += 1
+                continue
+            x0 = x
+            while x < width and row[x] != old[x]:
+                x += 1
+            # 区段不能从宽字符的后半格开始或在前半格结束
+            if row[x0][0] == _WIDE_TAIL and x0 > 0:
+                x0 -= 1
+            if x < width and row[x][0] == _WIDE_TAIL:
+                x += 1
+            if runs and x0 <= runs[-1][1]:
+                runs[-1] = (runs[-1][0], x)
+            else:
+                runs.append((x0, x))
+        return runs
+
+    def _draw_run(self, y: int, x: int, cells: List[Cell]):
+        text: List[str] = []
+        attr = cells[0][1] if cells else 0
+        run_x = x
+        col = x
+        for ch, cell_attr in cells:
+            if ch == _WIDE_TAIL:
+                col += 1
+                continue
+            if cell_attr != attr and text:
+                self._addstr(y, run_x, "".join(text), attr)
+                text, run_x = [], col
+            attr = cell_attr
+            text.append(ch)
+            col += 1
+        if text:
+            self._addstr(y, run_x, "".join(text), attr)
+
+    def _addstr(self, y: int, x: int, text: str, attr: int):
+        try:
+            self.window.addstr(y, x, text, attr)
+        except Exception:
+            # curses 在写入右下角最后一格时会报错，内容已经输出
+            pass
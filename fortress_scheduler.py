@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞指标采集调度器
+每个采集器拥有独立的周期与超时，并发执行并发布最新值
+"""
+
+import bisect
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set
+
+# 采集延迟直方图的桶上界 (秒)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """固定桶的采集延迟直方图"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 最后一个桶为 +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        """记录一次耗时"""
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """返回直方图的只读快照，桶计数为累计值"""
+        with self._lock:
+            cumulative = []
+            running = 0
+            for upper, n in zip(self.buckets + (float("inf"),), self.counts):
+                running += n
+                cumulative.append((upper, running))
+            return {
+                "count": self.count,
+                "sum": self.total,
+                "max": self.max,
+                "mean": self.total / self.count if self.count else 0.0,
+                "buckets": cumulative,
+            }
+
+
+class CollectorTask:
+    """单个采集任务的调度状态
+
+    started_at、future 与 timed_out 同时被调度线程与线程池的完成
+    回调修改，读写都必须持有 lock。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        interval: float,
+        timeout: float,
+        default: Any = None,
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.timeout = timeout
+        self.default = default
+        self.next_run = 0.0
+        self.started_at: Optional[float] = None
+        self.future: Optional[Future] = None
+        self.timed_out = False
+        self.lock = threading.Lock()
+        self.runs = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.histogram = LatencyHistogram()
+
+
+class MetricScheduler:
+    """并发的按指标周期采集调度器
+
+    调度线程在停止事件上等待到下一个到期时间，因此 ``stop()``
+    可以立即唤醒它。采集函数在线程池中执行，慢探针 (如 ping)
+    只会延迟自身的结果，不会阻塞其他指标。
+
+    采集超时或出错时不发布伪造的数值: 保留上一次成功的值并把该
+    指标标记为过期 (从未成功过时为注册时的 default，默认 None)，
+    下次成功后清除标记。
+    """
+
+    def __init__(self, max_workers: int = 4, logger: Optional[logging.Logger] = None):
+        self.max_workers = max_workers
+        self.logger = logger or logging.getLogger("FortressGuardian")
+        self.tasks: Dict[str, CollectorTask] = {}
+        self._values: Dict[str, Any] = {}
+        self._updated_at: Dict[str, float] = {}
+        self._stale: Set[str] = set()
+        self._reported: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._ready = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        interval: float,
+        timeout: float,
+        default: Any = None,
+    ):
+        """注册采集器"""
+        self.tasks[name] = CollectorTask(name, func, interval, timeout, default)
+        with self._lock:
+            self._values[name] = default
+
+    def start(self):
+        """启动调度线程，所有采集器立即执行一次"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="fortress-collector"
+        )
+        self._thread = threading.Thread(
+            target=self._run, name="fortress-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """停止调度，立即唤醒等待中的调度线程"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._executor is not None:
+            # 不等待仍在运行的慢探针
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """等待每个采集器至少发布一次结果 (或超时)"""
+        return self._ready.wait(timeout)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """返回所有采集器的最新值"""
+        with self._lock:
+            return dict(self._values)
+
+    def stale(self) -> List[str]:
+        """最近一次采集超时或出错、当前值已过期的指标"""
+        with self._lock:
+            return sorted(self._stale)
+
+    def latency_stats(self) -> Dict[str, Dict[str, Any]]:
+        """返回每个采集器的延迟直方图与计数"""
+        stats = {}
+        for name, task in self.tasks.items():
+            entry = task.histogram.snapshot()
+            entry.update(runs=task.runs, errors=task.errors, timeouts=task.timeouts)
+            stats[name] = entry
+        return stats
+
+    def _publish(self, task: CollectorTask, value: Any):
+        with self._lock:
+            self._values[task.name] = value
+            self._stale.discard(task.name)
+            self._updated_at[task.name] = time.monotonic()
+            self._mark_reported(task)
+
+    def _publish_stale(self, task: CollectorTask):
+        """采集失败: 保留上一次的值 (从未成功时为 default) 并标记过期"""
+        with self._lock:
+            if task.name not in self._updated_at:
+                self._values[task.name] = task.default
+            self._stale.add(task.name)
+            self._mark_reported(task)
+
+    def _mark_reported(self, task: CollectorTask):
+        self._reported.add(task.name)
+        if len(self._reported) == len(self.tasks):
+            self._ready.set()
+
+    def _on_done(self, task: CollectorTask, future: Future):
+        try:
+            value = future.result()
+            failed = False
+        except Exception as e:
+            self.logger.error(f"采集器 {task.name} 异常: {e}")
+            value, failed = None, True
+        with task.lock:
+            elapsed = time.monotonic() - (task.started_at or time.monotonic())
+            timed_out = task.timed_out
+            task.runs += 1
+            task.errors += failed
+            task.future = None
+            task.started_at = None
+            task.timed_out = False
+        task.histogram.observe(elapsed)
+        if failed:
+            self._publish_stale(task)
+        elif not timed_out:
+            self._publish(task, value)
+        # 完成后唤醒调度线程，以便重新计算下一次到期时间
+        self._wake_event.set()
+
+    def _submit(self, task: CollectorTask, now: float):
+        assert self._executor is not None
+        task.next_run = now + task.interval
+        with task.lock:
+            try:
+                future = self._executor.submit(task.func)
+            except RuntimeError:
+                # 线程池已关闭
+                return
+            task.started_at = now
+            task.future = future
+        # 在锁外注册回调: 已完成的 future 会在当前线程立即执行回调
+        future.add_done_callback(functools.partial(self._on_done, task))
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            deadlines: List[float] = []
+            for task in self.tasks.values():
+                with task.lock:
+                    running = task.future is not None
+                    started = task.started_at or now
+                    expired = (
+                        running and not task.timed_out and now - started >= task.timeout
+                    )
+                    if expired:
+                        task.timed_out = True
+                        task.timeouts += 1
+                    waiting = running and not task.timed_out
+                if expired:
+                    # 超时: 标记过期，但不重复提交仍在运行的探针
+                    self.logger.warning(f"采集器 {task.name} 超时 ({task.timeout}s)")
+                    self._publish_stale(task)
+                if running:
+                    if waiting:
+                        deadlines.append(started + task.timeout)
+                    continue
+                if now >= task.next_run:
+                    self._submit(task, now)
+                    deadlines.append(now + task.timeout)
+                else:
+                    deadlines.append(task.next_run)
+
+            wait = max(0.0, min(deadlines) - time.monotonic()) if deadlines else 1.0
+            self._wake_event.wait(wait)
+            self._wake_event.clear()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞热路径埋点
+记录耗时区段与计数器，汇总为进程内直方图，可按信号导出 Chrome 追踪文件
+"""
+
+import functools
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from fortress_scheduler import LatencyHistogram
+
+# 区段耗时直方图的桶上界 (秒)，覆盖微秒级采集到秒级启动
+SPAN_BUCKETS = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+)
+DEFAULT_CAPACITY = 20000  # 保留的最近区段数
+DEFAULT_SIGNAL = "SIGUSR2"
+ENV_ENABLE = "FORTRESS_TRACE"
+
+F = TypeVar("F", bound=Callable[..., Any])
+# (名称, 开始 ns, 耗时 ns, 线程 id)
+SpanEvent = Tuple[str, int, int, int]
+
+
+class _NullSpan:
+    """追踪关闭时返回的共享空区段"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer: "Tracer", name: str):
+        self.tracer = tracer
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer._record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+
+class Tracer:
+    """区段与计数器记录器
+
+    关闭时 ``span`` 返回共享的空上下文，``traced`` 包装的函数只多
+    一次属性判断，不取时间也不分配对象。开启后每个区段的耗时计入
+    按名称分组的直方图，并追加到定长环形缓冲区 (用于导出时间线)。
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, enabled: bool = False):
+        self.enabled = enabled
+        self.epoch_ns = time.perf_counter_ns()
+        self.events: Deque[SpanEvent] = deque(maxlen=capacity)
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, enabled: bool, capacity: Optional[int] = None):
+        """开启或关闭追踪，capacity 变化时保留最近的区段"""
+        if capacity is not None and capacity != self.events.maxlen:
+            self.events = deque(self.events, maxlen=capacity)
+        self.enabled = enabled
+
+    def reset(self):
+        """清空区段、直方图与计数器"""
+        with self._lock:
+            self.events.clear()
+            self._histograms = {}
+            self._counters = {}
+
+    def span(self, name: str):
+        """计时上下文: ``with tracer.span("name"): ...``"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def traced(self, name: Optional[str] = None) -> Callable[[F], F]:
+        """计时装饰器，默认以函数的限定名作为区段名"""
+
+        def decorate(func: F) -> F:
+            label = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self._record(label, start, time.perf_counter_ns())
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorate
+
+    def count(self, name: str, n: int = 1):
+        """累加计数器"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def _record(self, name: str, start: int, end: int):
+        self.events.append((name, start, end - start, threading.get_ident()))
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    name, LatencyHistogram(SPAN_BUCKETS)
+                )
+        histogram.observe((end - start) / 1e9)
+
+    def histograms(self) -> Dict[str, Dict[str, Any]]:
+        """各区段的耗时直方图快照"""
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {name: h.snapshot() for name, h in sorted(histograms.items())}
+
+    def counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Chrome 追踪格式 (chrome://tracing、Perfetto 可直接打开)
+
+        区段为完整事件 (ph=X)，时间以微秒计；直方图与计数器附在
+        fortress 键下 (查看器会忽略)。
+        """
+        pid = os.getpid()
+        events = list(self.events)
+        names = {t.ident: t.name for t in threading.enumerate()}
+        trace: List[Dict[str, Any]] = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": names.get(tid, f"thread-{tid}")},
+            }
+            for tid in sorted({event[3] for event in events})
+        ]
+        trace.extend(
+            {
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": (start - self.epoch_ns) / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": tid,
+            }
+            for name, start, duration, tid in events
+        )
+        histograms = self.histograms()
+        for snapshot in histograms.values():
+            # +Inf 不是合法 JSON
+            snapshot["buckets"] = [
+                ["+Inf" if upper == float("inf") else upper, n]
+                for upper, n in snapshot["buckets"]
+            ]
+        return {
+            "traceEvents": trace,
+            "displayTimeUnit": "ms",
+            "fortress": {"histograms": histograms, "counters": self.counters()},
+        }
+
+    def dump(self, directory: str = ".") -> str:
+        """把 Chrome 追踪写入 directory，返回文件路径"""
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(directory, f"fortress_trace_{os.getpid()}_{stamp}.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
+
+    def install_signal(
+        self,
+        signame: str = DEFAULT_SIGNAL,
+        directory: str = ".",
+        logger: Optional[logging.Logger] = None,
+    ) -> bool:
+        """注册导出信号 (只能在主线程调用)
+
+        追踪开启时收到信号导出一次追踪文件；关闭时先开启追踪，
+        再次发送信号即导出这段时间的记录，无需重启进程。
+        """
+        logger = logger or logging.getLogger("FortressGuardian")
+
+        def export():
+            try:
+                logger.info(f"追踪文件已导出: {self.dump(directory)}")
+            except Exception as e:
+                logger.error(f"追踪文件导出失败: {e}")
+
+        def handler(signum, frame):
+            if not self.enabled:
+                self.enabled = True
+                logger.info("收到信号，已开启追踪，再次发送信号导出")
+                return
+            # 信号处理函数可能打断持有锁的主线程，导出放到独立线程
+            threading.Thread(target=export, name="fortress-trace-dump").start()
+
+        try:
+            signal.signal(getattr(signal, signame), handler)
+            return True
+        except (AttributeError, ValueError, OSError) as e:
+            logger.warning(f"追踪导出信号 {signame} 注册失败: {e}")
+            return False
+
+
+def env_enabled() -> bool:
+    """环境变量 FORTRESS_TRACE 是否要求开启追踪"""
+    return os.environ.get(ENV_ENABLE, "") not in ("", "0")
+
+
+TRACER = Tracer(enabled=env_enabled())
+span = TRACER.span
+traced = TRACER.traced
+count = TRACER.count
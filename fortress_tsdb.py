@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞列式时序存储
+定宽列文件 + mmap 零拷贝读取 + 预计算 5 分钟/1 小时汇总
+"""
+
+import argparse
+import glob
+import json
+import os
+import threading
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# 列名 -> (array类型码, numpy dtype)，均为主机字节序
+COLUMNS: Dict[str, Tuple[str, str]] = {
+    "timestamp": ("d", "f8"),
+    "cpu_usage": ("f", "f4"),
+    "memory_usage": ("f", "f4"),
+    "disk_usage": ("f", "f4"),
+    "network_code": ("B", "u1"),
+}
+METRICS = ("cpu_usage", "memory_usage", "disk_usage")
+
+NETWORK_CODES = {"unknown": 0, "connected": 1, "disconnected": 2}
+
+# 汇总粒度 (秒)
+ROLLUP_RESOLUTIONS = (300, 3600)
+
+
+def _rollup_columns() -> Dict[str, Tuple[str, str]]:
+    columns = {"start": ("d", "f8"), "count": ("I", "u4")}
+    for metric in METRICS:
+        for stat in ("min", "max", "mean"):
+            columns[f"{metric}_{stat}"] = ("f", "f4")
+    return columns
+
+
+ROLLUP_COLUMNS = _rollup_columns()
+
+
+def _to_epoch(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(str(value)).timestamp()
+
+
+class _Bucket:
+    """未完成的汇总桶累加器"""
+
+    __slots__ = ("start", "count", "counts", "mins", "maxs", "sums")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.count = 0
+        self.counts = [0] * len(METRICS)  # 每个指标的有效 (非NaN) 样本数
+        self.mins = [float("inf")] * len(METRICS)
+        self.maxs = [float("-inf")] * len(METRICS)
+        self.sums = [0.0] * len(METRICS)
+
+    def add(self, values: List[float]):
+        self.count += 1
+        for i, v in enumerate(values):
+            if v != v:  # NaN: 采集失败的样本不参与汇总
+                continue
+            self.counts[i] += 1
+            if v < self.mins[i]:
+                self.mins[i] = v
+            if v > self.maxs[i]:
+                self.maxs[i] = v
+            self.sums[i] += v
+
+    def row(self) -> Dict[str, float]:
+        row: Dict[str, float] = {"start": self.start, "count": self.count}
+        for i, metric in enumerate(METRICS):
+            valid = self.counts[i] > 0
+            row[f"{metric}_min"] = self.mins[i] if valid else float("nan")
+            row[f"{metric}_max"] = self.maxs[i] if valid else float("nan")
+            row[f"{metric}_mean"] = (
+                self.sums[i] / self.counts[i] if valid else float("nan")
+            )
+        return row
+
+
+def _map_column(path: str, dtype: str, rows: int) -> np.ndarray:
+    """以只读 mmap 映射列文件的前 rows 行"""
+    if rows == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(rows,))
+
+
+class ColumnStore:
+    """健康样本的列式时序存储
+
+    每列一个定宽二进制文件，追加写入使用 ``array``，读取时通过
+    ``np.memmap`` 返回零拷贝视图。样本必须按时间递增追加。
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        for resolution in ROLLUP_RESOLUTIONS:
+            os.makedirs(self._rollup_dir(resolution), exist_ok=True)
+
+        self.rows = self._repair(self.root, COLUMNS)
+        self._rollup_rows = {
+            r: self._repair(self._rollup_dir(r), ROLLUP_COLUMNS)
+            for r in ROLLUP_RESOLUTIONS
+        }
+        self.last_timestamp = float("-inf")
+        if self.rows:
+            self.last_timestamp = float(self._column("timestamp")[-1])
+        self._buckets: Dict[int, Optional[_Bucket]] = {
+            r: self._restore_bucket(r) for r in ROLLUP_RESOLUTIONS
+        }
+
+    def _rollup_dir(self, resolution: int) -> str:
+        return os.path.join(self.root, f"rollup_{resolution}")
+
+    @staticmethod
+    def _column_path(directory: str, name: str, dtype: str) -> str:
+        return os.path.join(directory, f"{name}.{dtype}")
+
+    def _repair(self, directory: str, columns: Dict[str, Tuple[str, str]]) -> int:
+        """对齐各列行数 (截断中断写入留下的残行)，返回行数"""
+        sizes = []
+        for name, (_, dtype) in columns.items():
+            path = self._column_path(directory, name, dtype)
+            if not os.path.exists(path):
+                open(path, "wb").close()
+            sizes.append(os.path.getsize(path) // np.dtype(dtype).itemsize)
+        rows = min(sizes)
+        for name, (_, dtype) in columns.items():
+            path = self._column_path(directory, name, dtype)
+            if os.path.getsize(path) != rows * np.dtype(dtype).itemsize:
+                os.truncate(path, rows * np.dtype(dtype).itemsize)
+        return rows
+
+    def _column(self, name: str) -> np.ndarray:
+        dtype = COLUMNS[name][1]
+        return _map_column(self._column_path(self.root, name, dtype), dtype, self.rows)
+
+    def _restore_bucket(self, resolution: int) -> Optional[_Bucket]:
+        """从原始列尾部重建尚未落盘的汇总桶"""
+        if not self.rows:
+            return None
+        start = self.last_timestamp // resolution * resolution
+        rows = self._rollup_rows[resolution]
+        if rows:
+            directory = self._rollup_dir(resolution)
+            starts = _map_column(
+                self._column_path(directory, "start", "f8"), "f8", rows
+            )
+            if starts[-1] >= start:
+                return None
+        timestamps = self._column("timestamp")
+        first = int(np.searchsorted(timestamps, start, side="left"))
+        bucket = _Bucket(start)
+        columns = [self._column(m)[first:] for m in METRICS]
+        for values in zip(*columns):
+            bucket.add([float(v) for v in values])
+        return bucket
+
+    def append(self, record: Dict[str, Any]) -> bool:
+        """追加一条健康记录，时间早于已有数据时忽略并返回False"""
+        return self.append_many([record]) == 1
+
+    def append_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """批量追加健康记录，返回写入条数"""
+        with self._lock:
+            buffers: Dict[str, "array[Any]"] = {
+                name: array(code) for name, (code, _) in COLUMNS.items()
+            }
+            rollup_rows: Dict[int, List[Dict[str, float]]] = {
+                r: [] for r in ROLLUP_RESOLUTIONS
+            }
+            last = self.last_timestamp
+            for record in records:
+                ts = _to_epoch(record["timestamp"])
+                if ts <= last:
+                    continue
+                last = ts
+                # 采集失败的指标 (None) 存为 NaN
+                values = [
+                    float("nan") if record.get(m) is None else float(record[m])
+                    for m in METRICS
+                ]
+                buffers["timestamp"].append(ts)
+                for metric, value in zip(METRICS, values):
+                    buffers[metric].append(value)
+                buffers["network_code"].append(
+                    NETWORK_CODES.get(record.get("network_status", "unknown"), 0)
+                )
+                for resolution in ROLLUP_RESOLUTIONS:
+                    self._roll(resolution, ts, values, rollup_rows[resolution])
+
+            count = len(buffers["timestamp"])
+            if count:
+                for name, (_, dtype) in COLUMNS.items():
+                    path = self._column_path(self.root, name, dtype)
+                    with open(path, "ab") as f:
+                        buffers[name].tofile(f)
+                self.rows += count
+                self.last_timestamp = last
+            for resolution, rows in rollup_rows.items():
+                self._write_rollup(resolution, rows)
+            return count
+
+    def _roll(self, resolution: int, ts: float, values: List[float], done: List[Dict]):
+        start = ts // resolution * resolution
+        bucket = self._buckets[resolution]
+        if bucket is not None and bucket.start != start:
+            done.append(bucket.row())
+            bucket = None
+        if bucket is None:
+            bucket = _Bucket(start)
+            self._buckets[resolution] = bucket
+        bucket.add(values)
+
+    def _write_rollup(self, resolution: int, rows: List[Dict[str, float]]):
+        if not rows:
+            return
+        directory = self._rollup_dir(resolution)
+        for name, (code, dtype) in ROLLUP_COLUMNS.items():
+            buf = array(code, (row[name] for row in rows))
+            with open(self._column_path(directory, name, dtype), "ab") as f:
+                buf.tofile(f)
+        self._rollup_rows[resolution] += len(rows)
+
+    def read(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> Dict[str, np.ndarray]:
+        """返回 [start, end) 区间内各列的零拷贝视图"""
+        with self._lock:
+            columns = {name: self._column(name) for name in COLUMNS}
+        lo, hi = self._bounds(columns["timestamp"], start, end)
+        return {name: column[lo:hi] for name, column in columns.items()}
+
+    def rollup(
+        self,
+        resolution: int,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        include_partial: bool = True,
+    ) -> Dict[str, np.ndarray]:
+        """返回指定粒度的汇总 (min/max/mean)，可包含当前未完成的桶"""
+        if resolution not in ROLLUP_RESOLUTIONS:
+            raise ValueError(f"不支持的汇总粒度: {resolution}")
+        with self._lock:
+            directory = self._rollup_dir(resolution)
+            rows = self._rollup_rows[resolution]
+            columns = {
+                name: _map_column(
+                    self._column_path(directory, name, dtype), dtype, rows
+                )
+                for name, (_, dtype) in ROLLUP_COLUMNS.items()
+            }
+            bucket = self._buckets[resolution]
+            partial = bucket.row() if include_partial and bucket else None
+
+        if partial is not None:
+            # 附加未完成的桶需要复制一次
+            columns = {
+                name: np.append(column, np.array(partial[name], dtype=column.dtype))
+                for name, column in columns.items()
+            }
+        lo, hi = self._bounds(columns["start"], start, end)
+        return {name: column[lo:hi] for name, column in columns.items()}
+
+    @staticmethod
+    def _bounds(
+        timestamps: np.ndarray, start: Optional[float], end: Optional[float]
+    ) -> Tuple[int, int]:
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, "left"))
+        hi = (
+            len(timestamps)
+            if end is None
+            else int(np.searchsorted(timestamps, end, "left"))
+        )
+        return lo, hi
+
+    def import_jsonl(self, paths: Iterable[str]) -> int:
+        """导入 fortress_health_*.log，已存在的时间段会被跳过"""
+        records = []
+        for path in sorted(paths):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                        record["timestamp"] = _to_epoch(record["timestamp"])
+                    except (ValueError, KeyError):
+                        continue
+                    records.append(record)
+        records.sort(key=lambda r: r["timestamp"])
+        return self.append_many(records)
+
+
+def main():
+    """主函数: 导入现有健康日志"""
+    parser = argparse.ArgumentParser(description="导入健康日志到列式存储")
+    parser.add_argument("store", help="列式存储目录")
+    parser.add_argument(
+        "logs",
+        nargs="*",
+        default=None,
+        help="健康日志文件 (默认 fortress_health_*.log)",
+    )
+    args = parser.parse_args()
+
+    paths = args.logs or glob.glob("fortress_health_*.log")
+    store = ColumnStore(args.store)
+    imported = store.import_jsonl(paths)
+    print(f"从 {len(paths)} 个文件导入 {imported} 条记录，共 {store.rows} 条")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞告警引擎单元测试
+"""
+
+import os
+import sys
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_alerts import AlertEngine, AlertRule, parse_rules
+
+
+def rule(**kwargs) -> AlertRule:
+    return AlertRule(
+        name="cpu_high",
+        metric="cpu_usage",
+        op=">",
+        threshold=85,
+        clear=80,
+        for_seconds=0.0,
+        repeat_interval=0.0,
+        severity="warning",
+        message="CPU {value:.0f}%",
+    )._replace(**kwargs)
+
+
+def states(alerts):
+    return [(a.rule, a.state) for a in alerts]
+
+
+class TestAlertEngine(unittest.TestCase):
+    """测试规则评估"""
+
+    def test_hysteresis_suppresses_flapping(self):
+        """测试在阈值附近抖动只告警一次，回落到 clear 以下才恢复"""
+        engine = AlertEngine([rule()])
+        notified = []
+        for t, value in enumerate([90, 84, 86, 83, 88, 81, 79, 86]):
+            notified += engine.evaluate({"cpu_usage": value}, now=t)
+        self.assertEqual(
+            [(a.state, a.value) for a in notified],
+            [("firing", 90), ("resolved", 79), ("firing", 86)],
+        )
+        self.assertEqual(notified[0].message, "CPU 90%")
+        self.assertEqual(states(engine.active()), [("cpu_high", "firing")])
+
+    def test_for_duration(self):
+        """测试条件持续 for_seconds 后才触发，中断则重新计时"""
+        engine = AlertEngine([rule(for_seconds=30)])
+        self.assertEqual(engine.evaluate({"cpu_usage": 90}, now=0), [])
+        self.assertEqual(engine.evaluate({"cpu_usage": 70}, now=20), [])
+        self.assertEqual(engine.evaluate({"cpu_usage": 90}, now=25), [])
+        self.assertEqual(engine.evaluate({"cpu_usage": 90}, now=50), [])
+        alerts = engine.evaluate({"cpu_usage": 90}, now=55)
+        self.assertEqual(states(alerts), [("cpu_high", "firing")])
+        self.assertEqual(alerts[0].started_at, 25)
+
+    def test_repeats_grouped(self):
+        """测试持续触发时按 repeat_interval 重复通知并累计次数"""
+        engine = AlertEngine([rule(repeat_interval=60)])
+        notified = []
+        for t in range(0, 181, 10):
+            notified += engine.evaluate({"cpu_usage": 95}, now=t)
+        self.assertEqual([a.hits for a in notified], [1, 2, 3, 4])
+        self.assertEqual({a.started_at for a in notified}, {0})
+
+    def test_rate_limit_and_ring_buffer(self):
+        """测试全局限速与定长历史"""
+        rules = [rule(name=f"r{i}", threshold=i, clear=i) for i in range(10)]
+        engine = AlertEngine(rules, history=5, rate_limit=3)
+        notified = engine.evaluate({"cpu_usage": 100}, now=0)
+        self.assertEqual(len(notified), 3)
+        self.assertEqual(engine.suppressed, 7)
+        self.assertEqual(len(engine.history), 5)
+        self.assertEqual([a.rule for a in engine.recent(2)], ["r8", "r9"])
+        self.assertEqual(engine.recent(0), [])
+        # 一分钟后限额恢复
+        notified = engine.evaluate({"cpu_usage": -1}, now=61)
+        self.assertEqual(len(notified), 3)
+
+    def test_missing_and_string_metrics(self):
+        """测试无读数的指标保持状态，字符串指标按相等比较"""
+        engine = AlertEngine.from_config({})
+        alerts = engine.evaluate({"cpu_usage": None, "network_status": "disconnected"})
+        self.assertEqual(states(alerts), [("network_down", "firing")])
+        self.assertEqual(engine.evaluate({"network_status": None}), [])
+        alerts = engine.evaluate({"network_status": "connected"})
+        self.assertEqual(states(alerts), [("network_down", "resolved")])
+
+    def test_alert_carries_top_processes(self):
+        """测试 CPU 告警附带样本中的进程排行，其他指标不附带"""
+        engine = AlertEngine([rule(), rule(name="disk", metric="disk_usage")])
+        top = {
+            "cpu": [
+                {"pid": 812, "name": "python3", "cpu_percent": 93.5, "rss_kb": 10240},
+                {"pid": 1, "name": "init", "cpu_percent": 1.0, "rss_kb": 2048},
+            ],
+            "memory": [],
+        }
+        sample = {"cpu_usage": 95, "disk_usage": 95, "top_processes": top}
+        cpu, disk = engine.evaluate(sample, now=0)
+        assert cpu.context is not None
+        self.assertEqual(cpu.context["ranking"], "cpu")
+        self.assertEqual(cpu.culprits(), "python3[812] 93.5%, init[1] 1.0%")
+        self.assertEqual(cpu.to_dict()["context"]["processes"][0]["pid"], 812)
+        self.assertIsNone(disk.context)
+        self.assertEqual(disk.culprits(), "")
+
+    def test_set_rules_keeps_state(self):
+        """测试重载规则时同名规则保留触发状态"""
+        engine = AlertEngine([rule()])
+        engine.evaluate({"cpu_usage": 90}, now=0)
+        engine.set_rules([rule(threshold=95, clear=90)])
+        self.assertEqual(states(engine.active()), [("cpu_high", "firing")])
+        alerts = engine.evaluate({"cpu_usage": 89}, now=1)
+        self.assertEqual(states(alerts), [("cpu_high", "resolved")])
+
+
+class TestParseRules(unittest.TestCase):
+    """测试规则配置"""
+
+    def test_defaults_follow_alert_threshold(self):
+        """测试默认规则使用 monitoring.alert_threshold"""
+        rules = parse_rules({"monitoring": {"alert_threshold": 70}})
+        cpu = next(r for r in rules if r.metric == "cpu_usage")
+        self.assertEqual((cpu.threshold, cpu.clear), (70.0, 65.0))
+        self.assertIn("memory_usage", [r.metric for r in rules])
+
+    def test_configured_rules(self):
+        """测试解析配置的规则，无效比较符被拒绝"""
+        config = {
+            "monitoring": {
+                "alerts": {
+                    "rules": [
+                        {"name": "disk", "metric": "disk_usage", "threshold": 90},
+                    ]
+                }
+            }
+        }
+        (disk,) = parse_rules(config)
+        self.assertEqual((disk.op, disk.clear, disk.for_seconds), (">", None, 0.0))
+        config["monitoring"]["alerts"]["rules"][0]["op"] = "~"
+        with self.assertRaises(ValueError):
+            parse_rules(config)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞备份流水线单元测试
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from typing import List
+from unittest.mock import patch
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_backup import (
+    MAX_CHUNK,
+    MIN_CHUNK,
+    BackupPipeline,
+    LocalTarget,
+    S3Target,
+    chunk_file,
+    chunk_key,
+    find_cuts,
+    restore,
+)
+
+
+class FakeS3Client:
+    """内存中的S3替身，实现 put_object/get_object"""
+
+    def __init__(self):
+        self.objects = {}
+        self.puts = 0
+        self.lock = threading.Lock()
+
+    def put_object(self, Bucket, Key, Body):
+        with self.lock:
+            self.objects[(Bucket, Key)] = bytes(Body)
+            self.puts += 1
+
+    def get_object(self, Bucket, Key):
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+
+class TestChunking(unittest.TestCase):
+    """测试内容定义分块"""
+
+    def test_chunk_sizes_bounded(self):
+        """测试块大小在上下限之间"""
+        data = np.frombuffer(os.urandom(1_000_000), dtype=np.uint8)
+        cuts = find_cuts(data, final=True)
+        sizes = np.diff([0] + cuts)
+        self.assertEqual(cuts[-1], len(data))
+        self.assertTrue((sizes[:-1] >= MIN_CHUNK).all())
+        self.assertTrue((sizes <= MAX_CHUNK).all())
+
+    def test_insertion_only_changes_nearby_chunks(self):
+        """测试插入数据后只有附近的块变化"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        payload = os.urandom(500_000)
+        a, b = os.path.join(tmp_dir, "a"), os.path.join(tmp_dir, "b")
+        with open(a, "wb") as f:
+            f.write(payload)
+        with open(b, "wb") as f:
+            f.write(payload[:250_000] + b"inserted" + payload[250_000:])
+
+        before = {d for _, d in chunk_file(a)}
+        after = {d for _, d in chunk_file(b)}
+        self.assertLessEqual(len(after - before), 2)
+
+
+class TestBackupPipeline(unittest.TestCase):
+    """测试去重增量备份"""
+
+    def setUp(self):
+        """准备数据目录、本地目标与S3替身"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.tmp_dir, "data")
+        os.makedirs(os.path.join(self.source, "sub"))
+        for name, size in (("a.bin", 300_000), ("sub/b.bin", 200_000), ("c.txt", 10)):
+            with open(os.path.join(self.source, name), "wb") as f:
+                f.write(os.urandom(size))
+
+        self.local = LocalTarget(os.path.join(self.tmp_dir, "backup"))
+        self.s3_client = FakeS3Client()
+        self.s3 = S3Target("s3://fortress-test/node1", client=self.s3_client)
+        self.state_dir = os.path.join(self.tmp_dir, "state")
+
+    def tearDown(self):
+        """删除临时目录"""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _pipeline(self, workers: int = 1) -> BackupPipeline:
+        return BackupPipeline(
+            self.source,
+            [self.local, self.s3],
+            self.state_dir,
+            workers=workers,
+            max_inflight=4,
+        )
+
+    def _assert_restored(self, target, snapshot):
+        dest = os.path.join(self.tmp_dir, f"restore_{id(target)}_{snapshot}")
+        self.assertEqual(restore(target, snapshot, dest), 3)
+        for name in ("a.bin", "sub/b.bin", "c.txt"):
+            with open(os.path.join(self.source, name), "rb") as f:
+                expected = f.read()
+            with open(os.path.join(dest, name), "rb") as f:
+                self.assertEqual(f.read(), expected)
+
+    def test_full_then_incremental(self):
+        """测试首次全量、无变化时零上传、修改后只上传变化的块"""
+        first = self._pipeline(workers=2).run("s1")
+        self.assertEqual(first["files_chunked"], 3)
+        self.assertGreater(first["chunks_uploaded"], 0)
+        self._assert_restored(self.local, "s1")
+        self._assert_restored(self.s3, "s1")
+
+        # 无变化: 不读取文件，也不上传块
+        second = self._pipeline().run("s2")
+        self.assertEqual(second["files_chunked"], 0)
+        self.assertEqual(second["chunks_uploaded"], 0)
+
+        # 修改大文件中的一小段
+        path = os.path.join(self.source, "a.bin")
+        with open(path, "r+b") as f:
+            f.seek(150_000)
+            f.write(b"changed!")
+        # 文件系统时间戳粒度较粗时，紧接着的修改可能不改变 mtime
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        third = self._pipeline().run("s3")
+        self.assertEqual(third["files_chunked"], 1)
+        self.assertLessEqual(third["chunks_uploaded"], 2 * 2)
+        self.assertLess(third["bytes_uploaded"], first["bytes_uploaded"] / 10)
+        self._assert_restored(self.local, "s3")
+        self._assert_restored(self.s3, "s3")
+
+    def test_file_modified_after_chunking(self):
+        """测试分块后被修改的文件重新分块，不上传与哈希不符的块"""
+        path = os.path.join(self.source, "sub", "b.bin")
+        original = chunk_file
+        modified: List[str] = []
+
+        def chunk_then_modify(p):
+            refs = original(p)
+            if p == path and not modified:
+                modified.append(p)
+                with open(p, "r+b") as f:
+                    f.write(os.urandom(100))
+            return refs
+
+        with patch("fortress_backup.chunk_file", side_effect=chunk_then_modify):
+            with self.assertLogs("FortressGuardian", "WARNING") as logs:
+                self._pipeline().run("s1")
+        self.assertIn("重新分块", "\n".join(logs.output))
+        # 每个已上传的块都与其存储键中的哈希一致
+        for (_, key), body in self.s3_client.objects.items():
+            if "/chunks/" in key:
+                self.assertTrue(key.endswith(hashlib.sha256(body).hexdigest()))
+        self._assert_restored(self.local, "s1")
+        self._assert_restored(self.s3, "s1")
+
+    def test_restore_rejects_untrusted_manifest(self):
+        """测试越出恢复目录的路径与哈希不符的块被拒绝"""
+        self._pipeline().run("s1")
+        manifest = json.loads(self.local.get("manifests/s1.json"))
+        dest = os.path.join(self.tmp_dir, "restore")
+        for rel in ("../escape.bin", "/tmp/escape.bin", "sub/../../escape.bin"):
+            evil = {"files": {rel: manifest["files"]["c.txt"]}}
+            self.local.put("manifests/evil.json", json.dumps(evil).encode())
+            with self.assertRaises(ValueError):
+                restore(self.local, "evil", dest)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, "escape.bin")))
+
+        _, digest = manifest["files"]["c.txt"]["chunks"][0]
+        self.local.put(chunk_key(digest), b"swapped")
+        with self.assertRaises(ValueError):
+            restore(self.local, "s1", dest)
+        self.assertFalse(os.path.exists(os.path.join(dest, "c.txt")))
+
+    def test_new_target_is_backfilled(self):
+        """测试新增目标会补齐已有块"""
+        BackupPipeline(self.source, [self.local], self.state_dir).run("s1")
+        stats = self._pipeline().run("s2")
+        self.assertEqual(stats["files_chunked"], 0)
+        self.assertGreater(self.s3_client.puts, 1)
+        self._assert_restored(self.s3, "s2")
+
+
+if __name__ == "__main__":
+    unittest.main()
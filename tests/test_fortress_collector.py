@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞指标采集引擎单元测试
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_collector import IDLE_ROUNDS, IDLE_STRIDE, ProcessAccounting, ProcSampler
+
+
+def write_stat(proc_root: str, pid: int, name: str, ticks: int, rss: int, start=100):
+    """写一个伪造的 /proc/[pid]/stat (utime=ticks, stime=0, rss 单位为页)"""
+    fields = ["S", "1"] + ["0"] * 9 + [str(ticks), "0"] + ["0"] * 6
+    fields += [str(start), "0", str(rss)] + ["0"] * 28
+    os.makedirs(os.path.join(proc_root, str(pid)), exist_ok=True)
+    with open(os.path.join(proc_root, str(pid), "stat"), "w") as f:
+        f.write(f"{pid} ({name}) {' '.join(fields)}\n")
+
+
+class TestProcSampler(unittest.TestCase):
+    """测试/proc采集器"""
+
+    def setUp(self):
+        """创建伪造的/proc目录"""
+        self.proc_root = tempfile.mkdtemp()
+        self.sampler = ProcSampler(proc_root=self.proc_root)
+
+    def tearDown(self):
+        """删除伪造的/proc目录"""
+        shutil.rmtree(self.proc_root, ignore_errors=True)
+
+    def _write(self, name: str, content: str):
+        with open(os.path.join(self.proc_root, name), "w") as f:
+            f.write(content)
+
+    def test_cpu_usage_delta(self):
+        """测试CPU使用率按计数器差值计算"""
+        self._write("stat", "cpu  100 0 100 700 100 0 0 0 0 0\nintr 1 2\n")
+        self.assertAlmostEqual(self.sampler.cpu_usage(), 20.0)
+
+        # 第二次采样: 总增量100, 空闲增量25 -> 75%
+        self._write("stat", "cpu  140 0 135 725 100 0 0 0 0 0\nintr 1 2\n")
+        self.assertAlmostEqual(self.sampler.cpu_usage(), 75.0)
+
+    def test_cpu_usage_ignores_guest(self):
+        """测试guest时间不重复计入总量"""
+        self._write("stat", "cpu  0 0 0 0 0 0 0 0 0 0\n")
+        self.sampler.cpu_usage()
+        self._write("stat", "cpu  50 0 0 50 0 0 0 0 40 0\n")
+        self.assertAlmostEqual(self.sampler.cpu_usage(), 50.0)
+
+    def test_memory_usage_by_field_name(self):
+        """测试按字段名解析meminfo，与行顺序无关"""
+        self._write(
+            "meminfo",
+            "MemFree:  100 kB\nBuffers: 10 kB\n"
+            "MemAvailable:  250 kB\nMemTotal:  1000 kB\n",
+        )
+        self.assertAlmostEqual(self.sampler.memory_usage(), 75.0)
+
+    def test_memory_usage_without_available(self):
+        """测试旧内核缺少MemAvailable时的估算"""
+        self._write(
+            "meminfo",
+            "MemTotal: 1000 kB\nMemFree: 100 kB\nBuffers: 50 kB\nCached: 50 kB\n",
+        )
+        self.assertAlmostEqual(self.sampler.memory_usage(), 80.0)
+
+    def test_disk_usage(self):
+        """测试磁盘使用率范围"""
+        usage = ProcSampler(disk_path=self.proc_root).disk_usage()
+        self.assertGreaterEqual(usage, 0.0)
+        self.assertLessEqual(usage, 100.0)
+
+    def test_missing_proc_raises(self):
+        """测试/proc缺失时抛出OSError供调用方回退"""
+        with self.assertRaises(OSError):
+            self.sampler.cpu_usage()
+
+
+class TestProcessAccounting(unittest.TestCase):
+    """测试按进程增量统计"""
+
+    def setUp(self):
+        """创建伪造的/proc目录"""
+        self.proc_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.proc_root, True)
+        self.accounting = ProcessAccounting(proc_root=self.proc_root, top_n=2)
+        self.accounting.clock_ticks = 100
+        self.accounting.page_kb = 4
+
+    def usage(self, usages):
+        return {u.pid: (u.cpu_percent, u.rss_kb, u.rss_delta_kb) for u in usages}
+
+    def test_cpu_and_rss_deltas(self):
+        """测试按两次读取之间的滴答差计算 CPU，退出的进程被清除"""
+        write_stat(self.proc_root, 10, "busy (worker)", 1000, 100)
+        write_stat(self.proc_root, 11, "idle", 50, 200)
+        write_stat(self.proc_root, 12, "gone", 0, 1)
+        self.accounting.scan(now=0)
+
+        write_stat(self.proc_root, 10, "busy (worker)", 1150, 150)
+        shutil.rmtree(os.path.join(self.proc_root, "12"))
+        usages = self.accounting.scan(now=2)
+        self.assertEqual(self.usage(usages), {10: (75.0, 600, 200), 11: (0.0, 800, 0)})
+        self.assertEqual([u.name for u in usages if u.pid == 10], ["busy (worker)"])
+
+        top = self.accounting.top(usages)
+        self.assertEqual([p["pid"] for p in top["cpu"]], [10])
+        self.assertEqual([p["pid"] for p in top["memory"]], [11, 10])
+
+    def test_pid_reuse_resets_counters(self):
+        """测试 PID 被复用 (启动时间不同) 时不与旧进程做差"""
+        write_stat(self.proc_root, 10, "old", 5000, 10, start=100)
+        self.accounting.scan(now=0)
+        write_stat(self.proc_root, 10, "new", 20, 10, start=900)
+        (usage,) = self.accounting.scan(now=1)
+        self.assertEqual((usage.name, usage.cpu_percent), ("new", 0.0))
+
+    def test_idle_processes_read_less_often(self):
+        """测试长期无变化的进程按步长错开读取，忙碌后按自身间隔计算"""
+        for pid in range(100, 140):
+            write_stat(self.proc_root, pid, "sleeper", 10, 10)
+        for t in range(IDLE_ROUNDS + 1):
+            self.accounting.scan(now=t)
+        self.assertEqual(self.accounting.last_read, 40)
+
+        self.accounting.scan(now=IDLE_ROUNDS + 1)
+        self.assertEqual(self.accounting.last_read, 40 // IDLE_STRIDE)
+
+        # 一个休眠进程开始忙碌: 最迟 IDLE_STRIDE 轮内被读到
+        write_stat(self.proc_root, 101, "sleeper", 10 + 100 * IDLE_STRIDE, 10)
+        busy = []
+        for t in range(IDLE_ROUNDS + 2, IDLE_ROUNDS + 2 + IDLE_STRIDE):
+            busy += [u for u in self.accounting.scan(now=t) if u.cpu_percent]
+        self.assertEqual(len(busy), 1)
+        self.assertEqual(busy[0].pid, 101)
+        self.assertLessEqual(busy[0].cpu_percent, 100.0)
+        self.assertGreater(busy[0].cpu_percent, 0.0)
+
+    def test_real_proc(self):
+        """测试读取本机 /proc，本进程出现在内存排行中"""
+        if not os.path.isdir("/proc/self"):
+            self.skipTest("没有 /proc")
+        accounting = ProcessAccounting(top_n=100000)
+        accounting.scan()
+        top = accounting.top_processes()
+        self.assertIn(os.getpid(), [p["pid"] for p in top["memory"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞配置缓存与热重载单元测试
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from typing import Any, Dict, List, Tuple
+from unittest.mock import patch
+
+import yaml
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_config import (
+    ConfigCache,
+    ConfigError,
+    ConfigWatcher,
+    cache_dir_for,
+    diff_config,
+    validate_config,
+)
+
+BASE_CONFIG = {
+    "monitoring": {"heartbeat_interval": 60, "alert_threshold": 85},
+    "security": {"firewall": {"enabled": True, "rules": []}},
+    "modules": [{"name": "数据核心", "status": "active", "priority": "critical"}],
+}
+
+
+def write_config(path, config):
+    # 先写临时文件再改名，与编辑器保存方式相同
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        yaml.dump(config, f, allow_unicode=True)
+    os.replace(tmp_path, path)
+
+
+class TestValidateAndDiff(unittest.TestCase):
+    """测试配置校验与差异"""
+
+    def test_validate(self):
+        """测试无效配置被拒绝"""
+        validate_config(BASE_CONFIG)
+        for bad in (
+            ["not", "a", "mapping"],
+            {"monitoring": {"alert_threshold": "high"}},
+            {"monitoring": {"heartbeat_interval": 0}},
+            {"modules": [{"name": "a", "depends_on": ["missing"]}]},
+        ):
+            with self.assertRaises(ConfigError):
+                validate_config(bad)
+
+    def test_diff(self):
+        """测试差异精确到第二层配置键"""
+        new = {
+            "monitoring": {"heartbeat_interval": 30, "alert_threshold": 85},
+            "security": {"firewall": {"enabled": False}},
+            "modules": [],
+        }
+        self.assertEqual(
+            diff_config(BASE_CONFIG, new),
+            ["modules", "monitoring.heartbeat_interval", "security.firewall"],
+        )
+        self.assertEqual(diff_config(BASE_CONFIG, dict(BASE_CONFIG)), [])
+
+
+class TestConfigCache(unittest.TestCase):
+    """测试按内容哈希缓存"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "config.yaml")
+        self.cache_dir = os.path.join(self.tmp_dir, "cache")
+        write_config(self.path, BASE_CONFIG)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_restart_skips_parse(self):
+        """测试内容未变时新进程直接加载缓存"""
+        config, digest = ConfigCache(self.cache_dir).load(self.path)
+        self.assertEqual(config, BASE_CONFIG)
+
+        cache = ConfigCache(self.cache_dir)
+        with patch("yaml.safe_load", side_effect=AssertionError("不应解析")):
+            cached, cached_digest = cache.load(self.path)
+        self.assertEqual(cached, BASE_CONFIG)
+        self.assertEqual(cached_digest, digest)
+        self.assertEqual(cache.hits, 1)
+
+        write_config(self.path, dict(BASE_CONFIG, extra=1))
+        changed, changed_digest = cache.load(self.path)
+        self.assertEqual(changed["extra"], 1)
+        self.assertNotEqual(changed_digest, digest)
+
+    def test_returns_independent_copies(self):
+        """测试修改加载结果不影响缓存"""
+        cache = ConfigCache(None)
+        first, _ = cache.load(self.path)
+        first["monitoring"]["alert_threshold"] = 1
+        second, _ = cache.load(self.path)
+        self.assertEqual(second["monitoring"]["alert_threshold"], 85)
+
+    def test_corrupt_cache_reparsed(self):
+        """测试损坏的缓存文件被忽略"""
+        _, digest = ConfigCache(self.cache_dir).load(self.path)
+        with open(os.path.join(self.cache_dir, f"{digest}.marshal"), "wb") as f:
+            f.write(b"garbage")
+        config, _ = ConfigCache(self.cache_dir).load(self.path)
+        self.assertEqual(config, BASE_CONFIG)
+
+    def test_cache_dir_next_to_config(self):
+        """测试相对缓存目录放在配置文件旁边，与当前目录无关"""
+        cwd = os.getcwd()
+        self.addCleanup(os.chdir, cwd)
+        os.chdir(self.tmp_dir)
+        expected = os.path.join(self.tmp_dir, ".fortress_config_cache")
+        self.assertEqual(cache_dir_for("config.yaml"), expected)
+        os.chdir("/")
+        self.assertEqual(cache_dir_for(self.path), expected)
+        self.assertEqual(cache_dir_for(self.path, self.cache_dir), self.cache_dir)
+
+
+class TestConfigWatcher(unittest.TestCase):
+    """测试配置监视"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "config.yaml")
+        write_config(self.path, BASE_CONFIG)
+        self.stop = threading.Event()
+        self.changes: List[Tuple[Dict[str, Any], List[str]]] = []
+        self.changed = threading.Event()
+
+    def tearDown(self):
+        self.stop.set()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def on_change(self, config, changed):
+        self.changes.append((config, changed))
+        self.changed.set()
+
+    def watcher(self, use_inotify):
+        cache = ConfigCache(None)
+        watcher = ConfigWatcher(
+            self.path,
+            self.on_change,
+            cache.load(self.path),
+            self.stop,
+            cache=cache,
+            poll_interval=0.02,
+            use_inotify=use_inotify,
+        )
+        watcher.start()
+        time.sleep(0.05)
+        return watcher
+
+    def check_reload(self, use_inotify):
+        watcher = self.watcher(use_inotify)
+        new = dict(BASE_CONFIG, monitoring={"heartbeat_interval": 5})
+        write_config(self.path, new)
+        self.assertTrue(self.changed.wait(5))
+        config, changed = self.changes[-1]
+        self.assertEqual(config["monitoring"]["heartbeat_interval"], 5)
+        self.assertEqual(
+            changed, ["monitoring.alert_threshold", "monitoring.heartbeat_interval"]
+        )
+        self.stop.set()
+        watcher.join(timeout=5)
+        self.assertEqual(watcher.reloads, 1)
+
+    def test_reload_inotify(self):
+        """测试 inotify 发现改名替换的配置"""
+        self.check_reload(use_inotify=True)
+
+    def test_reload_polling(self):
+        """测试轮询 mtime 发现配置变化"""
+        self.check_reload(use_inotify=False)
+
+    def test_invalid_and_unchanged_ignored(self):
+        """测试无效配置被拒绝、内容未变的写入被忽略"""
+        watcher = ConfigWatcher(
+            self.path,
+            self.on_change,
+            ConfigCache(None).load(self.path),
+            self.stop,
+        )
+        write_config(self.path, BASE_CONFIG)
+        self.assertFalse(watcher.check())
+        write_config(self.path, {"monitoring": {"alert_threshold": 500}})
+        self.assertFalse(watcher.check())
+        self.assertEqual(watcher.rejected, 1)
+
+        def fail(config, changed):
+            raise ValueError("防火墙规则无效")
+
+        watcher.on_change = fail
+        write_config(self.path, dict(BASE_CONFIG, extra=1))
+        self.assertFalse(watcher.check())
+        self.assertEqual(watcher.rejected, 2)
+        self.assertEqual(self.changes, [])
+        self.assertNotIn("extra", watcher.config)
+
+
+if __name__ == "__main__":
+    unittest.main()
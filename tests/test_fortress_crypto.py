@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞分块加密引擎单元测试
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_crypto import (
+    HEADER,
+    TAG_SIZE,
+    ChunkedCipher,
+    DecryptionError,
+    chunk_nonce,
+    decrypt_file,
+    encrypt_file,
+    read_at,
+)
+
+
+class TestChunkedCipher(unittest.TestCase):
+    """测试内存数据的分片加解密"""
+
+    def setUp(self):
+        self.key = os.urandom(32)
+
+    def test_roundtrip_both_algorithms(self):
+        """测试两种算法在不同长度下的往返"""
+        for algorithm in ("AES-256-GCM", "ChaCha20-Poly1305"):
+            cipher = ChunkedCipher(self.key, algorithm, chunk_size=1024)
+            for length in (0, 1, 1023, 1024, 1025, 5000):
+                data = os.urandom(length)
+                blob = cipher.encrypt_bytes(data)
+                self.assertEqual(cipher.decrypt_bytes(blob), data)
+
+    def test_nonce_unique_per_chunk(self):
+        """测试nonce由计数器派生且结尾标志参与其中"""
+        prefix = b"\x01" * 7
+        self.assertEqual(len(chunk_nonce(prefix, 0, False)), 12)
+        self.assertNotEqual(
+            chunk_nonce(prefix, 0, False), chunk_nonce(prefix, 1, False)
+        )
+        self.assertNotEqual(chunk_nonce(prefix, 3, False), chunk_nonce(prefix, 3, True))
+
+    def test_per_file_keys(self):
+        """测试不同文件的密钥由头部的盐派生，前缀相同也不会重用 nonce"""
+        cipher = ChunkedCipher(self.key, chunk_size=256)
+        data = b"\0" * 300
+        prefix = b"\x05" * 7
+        first = cipher.encrypt_chunk(cipher.make_header(300, prefix), 0, False, data)
+        second = cipher.encrypt_chunk(cipher.make_header(300, prefix), 0, False, data)
+        self.assertNotEqual(first, second)
+        # 主密钥不直接用于加密
+        header = cipher.make_header(300, prefix)
+        direct = AESGCM(self.key).encrypt(chunk_nonce(prefix, 0, False), data, header)
+        self.assertNotEqual(cipher.encrypt_chunk(header, 0, False, data), direct)
+
+        blob = bytearray(cipher.encrypt_bytes(os.urandom(1000)))
+        blob[HEADER.size - 10] ^= 1  # 改动盐
+        with self.assertRaises(DecryptionError):
+            cipher.decrypt_bytes(bytes(blob))
+
+    def test_tamper_and_truncation_detected(self):
+        """测试篡改、截断与错误密钥都会被拒绝"""
+        cipher = ChunkedCipher(self.key, chunk_size=256)
+        blob = bytearray(cipher.encrypt_bytes(os.urandom(1000)))
+
+        tampered = bytearray(blob)
+        tampered[HEADER.size + 10] ^= 1
+        with self.assertRaises(DecryptionError):
+            cipher.decrypt_bytes(bytes(tampered))
+
+        # 去掉最后一个分片: 倒数第二片没有结尾标志
+        truncated = bytes(blob[: HEADER.size + 3 * (256 + TAG_SIZE)])
+        with self.assertRaises(DecryptionError):
+            cipher.decrypt_bytes(truncated)
+
+        with self.assertRaises(DecryptionError):
+            ChunkedCipher(os.urandom(32), chunk_size=256).decrypt_bytes(bytes(blob))
+
+    def test_from_config(self):
+        """测试按 security.encryption_level 选择算法"""
+        config = {"security": {"encryption_level": "ChaCha20-Poly1305"}}
+        self.assertEqual(
+            ChunkedCipher.from_config(config, self.key).algorithm, "ChaCha20-Poly1305"
+        )
+        with self.assertRaises(ValueError):
+            ChunkedCipher.from_config(
+                {"security": {"encryption_level": "ROT13"}}, self.key
+            )
+
+
+class TestFileEncryption(unittest.TestCase):
+    """测试文件的并行加解密与随机读取"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cipher = ChunkedCipher(os.urandom(32), chunk_size=4096)
+        self.data = os.urandom(4096 * 20 + 123)
+        self.src = os.path.join(self.tmp_dir, "plain.bin")
+        with open(self.src, "wb") as f:
+            f.write(self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_parallel_roundtrip(self):
+        """测试多进程加密后可被单进程解密，反之亦然"""
+        enc = os.path.join(self.tmp_dir, "data.enc")
+        dec = os.path.join(self.tmp_dir, "data.dec")
+        size = encrypt_file(self.cipher, self.src, enc, workers=2)
+        self.assertEqual(size, os.path.getsize(enc))
+        decrypt_file(self.cipher, enc, dec, workers=1)
+        with open(dec, "rb") as f:
+            self.assertEqual(f.read(), self.data)
+
+        encrypt_file(self.cipher, self.src, enc, workers=1)
+        decrypt_file(self.cipher, enc, dec, workers=2)
+        with open(dec, "rb") as f:
+            self.assertEqual(f.read(), self.data)
+
+    def test_random_offset_read(self):
+        """测试跨分片边界的随机读取"""
+        enc = os.path.join(self.tmp_dir, "data.enc")
+        encrypt_file(self.cipher, self.src, enc)
+        for offset, size in (
+            (0, 10),
+            (4090, 20),
+            (4096 * 7, 4096 * 3),
+            (len(self.data) - 5, 100),
+        ):
+            self.assertEqual(
+                read_at(self.cipher, enc, offset, size),
+                self.data[offset : offset + size],
+            )
+        self.assertEqual(read_at(self.cipher, enc, len(self.data) + 1, 10), b"")
+
+    def test_truncated_file_rejected(self):
+        """测试被截断的密文文件不会产生输出"""
+        enc = os.path.join(self.tmp_dir, "data.enc")
+        dec = os.path.join(self.tmp_dir, "data.dec")
+        encrypt_file(self.cipher, self.src, enc)
+        with open(enc, "r+b") as f:
+            f.truncate(os.path.getsize(enc) - 200)
+        with self.assertRaises(DecryptionError):
+            decrypt_file(self.cipher, enc, dec)
+        self.assertFalse(os.path.exists(dec))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞纠删码引擎单元测试
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_erasure import (
+    ErasureCoder,
+    _gf_matmul,
+    _gf_matmul_table,
+    decode_file,
+    encode_file,
+    gf_invert_matrix,
+    gf_mul,
+    shard_path,
+)
+
+
+class TestGaloisField(unittest.TestCase):
+    """测试GF(256)运算"""
+
+    def test_multiplication_table(self):
+        """测试乘法满足已知值与交换律"""
+        self.assertEqual(gf_mul(0, 7), 0)
+        self.assertEqual(gf_mul(1, 123), 123)
+        self.assertEqual(gf_mul(2, 0x80), 0x1D)
+        self.assertEqual(gf_mul(37, 91), gf_mul(91, 37))
+
+    def test_packed_matmul_matches_table(self):
+        """测试打包位运算实现与查表实现结果一致"""
+        rng = np.random.default_rng(7)
+        coefs = rng.integers(0, 256, size=(3, 7), dtype=np.uint8)
+        data = rng.integers(0, 256, size=(7, 64), dtype=np.uint8)
+        np.testing.assert_array_equal(
+            _gf_matmul(coefs, data), _gf_matmul_table(coefs, data)
+        )
+        # 长度不是8的倍数时回退到查表实现
+        np.testing.assert_array_equal(
+            _gf_matmul(coefs, data[:, :13]), _gf_matmul_table(coefs, data[:, :13])
+        )
+
+    def test_matrix_inverse(self):
+        """测试矩阵求逆"""
+        matrix = ErasureCoder(3, 2).matrix[2:5]
+        inverse = gf_invert_matrix(matrix)
+        for i in range(3):
+            for j in range(3):
+                value = 0
+                for t in range(3):
+                    value ^= gf_mul(matrix[i][t], inverse[t][j])
+                self.assertEqual(value, 1 if i == j else 0)
+
+
+class TestErasureCoder(unittest.TestCase):
+    """测试7+3纠删码"""
+
+    def setUp(self):
+        """准备随机数据"""
+        self.coder = ErasureCoder(7, 3)
+        self.rng = np.random.default_rng(2024)
+
+    def test_reconstruct_any_three_missing(self):
+        """测试任意丢失3个分片均可重建"""
+        data = self.rng.integers(0, 256, size=(7, 4096), dtype=np.uint8)
+        shards = list(np.concatenate([data, self.coder.encode(data)]))
+        for _ in range(20):
+            lost = random.sample(range(10), 3)
+            damaged = [None if i in lost else s for i, s in enumerate(shards)]
+            rebuilt = self.coder.reconstruct(damaged)
+            for i in range(10):
+                np.testing.assert_array_equal(rebuilt[i], shards[i])
+
+    def test_too_many_missing(self):
+        """测试丢失超过校验分片数时报错"""
+        data = self.rng.integers(0, 256, size=(7, 16), dtype=np.uint8)
+        shards = list(np.concatenate([data, self.coder.encode(data)]))
+        damaged = [None] * 4 + shards[4:]
+        with self.assertRaises(ValueError):
+            self.coder.reconstruct(damaged)
+
+    def test_from_config(self):
+        """测试从配置读取分片数量"""
+        coder = ErasureCoder.from_config(
+            {"storage": {"data_shards": 4, "parity_shards": 2}}
+        )
+        self.assertEqual((coder.data_shards, coder.parity_shards), (4, 2))
+
+
+class TestErasureFiles(unittest.TestCase):
+    """测试文件流式编码与恢复"""
+
+    def setUp(self):
+        """创建临时目录与源文件"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.src = os.path.join(self.tmp_dir, "data.bin")
+        self.payload = os.urandom(300_000)
+        with open(self.src, "wb") as f:
+            f.write(self.payload)
+        self.shard_dir = os.path.join(self.tmp_dir, "shards")
+
+    def tearDown(self):
+        """删除临时目录"""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _roundtrip_after_deleting(self, workers: int):
+        encode_file(self.src, self.shard_dir, chunk_size=8192, workers=workers)
+        lost = random.sample(range(10), 3)
+        for i in lost:
+            os.unlink(shard_path(self.shard_dir, i))
+
+        dest = os.path.join(self.tmp_dir, "restored.bin")
+        self.assertEqual(decode_file(self.shard_dir, dest), len(self.payload))
+        with open(dest, "rb") as f:
+            self.assertEqual(f.read(), self.payload)
+        # 缺失的分片已被重建
+        for i in lost:
+            self.assertTrue(os.path.exists(shard_path(self.shard_dir, i)))
+
+    def test_delete_three_random_shards(self):
+        """测试删除3个随机分片后恢复数据"""
+        self._roundtrip_after_deleting(workers=1)
+
+    def test_process_pool_encoding(self):
+        """测试进程池编码结果与单进程一致"""
+        self._roundtrip_after_deleting(workers=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
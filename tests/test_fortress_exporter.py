@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞 Prometheus 导出器单元测试
+"""
+
+import os
+import sys
+import unittest
+import urllib.request
+from unittest.mock import MagicMock, patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+try:
+    import prometheus_client  # noqa: F401
+except ImportError:  # pragma: no cover
+    prometheus_client = None  # type: ignore[assignment]
+
+from fortress_scheduler import LatencyHistogram
+
+
+@unittest.skipIf(prometheus_client is None, "未安装 prometheus-client")
+class TestFortressExporter(unittest.TestCase):
+    """测试Prometheus导出器"""
+
+    def setUp(self):
+        """启动监听随机端口的导出器"""
+        from fortress_exporter import FortressExporter
+
+        histogram = LatencyHistogram()
+        histogram.observe(0.002)
+        self.latency_source = MagicMock(
+            return_value={"cpu_usage": dict(histogram.snapshot(), timeouts=1)}
+        )
+        self.exporter = FortressExporter(
+            port=0,
+            addr="127.0.0.1",
+            latency_source=self.latency_source,
+            writer_source=lambda: {"queue_depth": 3, "dropped": 2},
+        )
+        self.exporter.start()
+
+    def tearDown(self):
+        """停止导出器"""
+        self.exporter.stop()
+
+    def _scrape(self) -> str:
+        url = f"http://127.0.0.1:{self.exporter.port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body: bytes = response.read()
+            return body.decode("utf-8")
+
+    def test_scrape_cached_values(self):
+        """测试抓取返回缓存的健康指标与运行时指标"""
+        self.exporter.update(
+            {
+                "cpu_usage": 42.0,
+                "network_status": "connected",
+                "module_status": {
+                    "数据核心": {"status": "active", "priority": "critical"}
+                },
+            },
+            1700000000.0,
+        )
+        body = self._scrape()
+        self.assertIn("fortress_cpu_usage_percent 42.0", body)
+        self.assertIn('fortress_network_status{status="connected"} 1.0', body)
+        self.assertIn('status="active"', body)
+        self.assertIn(
+            'fortress_collector_latency_seconds_bucket{collector="cpu_usage"', body
+        )
+        self.assertIn(
+            'fortress_collector_timeouts_total{collector="cpu_usage"} 1.0', body
+        )
+        self.assertIn("fortress_log_writer_queue_depth 3.0", body)
+
+    def test_guardian_scrape_does_not_collect(self):
+        """测试抓取守护进程指标不会触发采集或子进程"""
+        from fortress_guardian import FortressGuardian
+
+        guardian = FortressGuardian()
+        guardian.config = {
+            "monitoring": {
+                "prometheus": {"enabled": True, "port": 0, "addr": "127.0.0.1"}
+            }
+        }
+        guardian._start_exporter()
+        exporter = guardian.exporter
+        assert exporter is not None
+        self.addCleanup(exporter.stop)
+        url = f"http://127.0.0.1:{exporter.port}/metrics"
+
+        with patch("subprocess.run") as run, patch.object(
+            guardian, "_get_cpu_usage"
+        ) as get_cpu:
+            for _ in range(5):
+                with urllib.request.urlopen(url, timeout=5) as response:
+                    self.assertEqual(response.status, 200)
+        run.assert_not_called()
+        get_cpu.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞共享内存快照单元测试
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from typing import Any, Dict
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_console import FortressConsole
+from fortress_feed import SnapshotPublisher, SnapshotReader
+
+
+def read(reader: SnapshotReader) -> Dict[str, Any]:
+    """读取快照，断言已有快照"""
+    snapshot = reader.read()
+    assert snapshot is not None
+    return snapshot
+
+
+class TestSnapshotFeed(unittest.TestCase):
+    """测试seqlock快照发布与读取"""
+
+    def setUp(self):
+        """创建临时快照文件路径"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "feed")
+
+    def tearDown(self):
+        """删除临时目录"""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_read_before_publish(self):
+        """测试守护进程未启动或未发布时读取为空"""
+        self.assertIsNone(SnapshotReader(self.path).read())
+        SnapshotPublisher(self.path).close()
+        self.assertIsNone(SnapshotReader(self.path).read())
+
+    def test_publish_and_read(self):
+        """测试多个读者读取同一快照"""
+        publisher = SnapshotPublisher(self.path)
+        publisher.publish({"health": {"cpu_usage": 12.5}})
+        readers = [SnapshotReader(self.path) for _ in range(3)]
+        for reader in readers:
+            self.assertEqual(read(reader)["health"]["cpu_usage"], 12.5)
+
+        publisher.publish({"health": {"cpu_usage": 50.0}})
+        self.assertEqual(read(readers[0])["health"]["cpu_usage"], 50.0)
+        publisher.close()
+
+    def test_unchanged_sequence_returns_cached(self):
+        """测试序列号未变时返回缓存对象，不重复解析"""
+        publisher = SnapshotPublisher(self.path)
+        publisher.publish({"n": 1})
+        reader = SnapshotReader(self.path)
+        self.assertIs(reader.read(), reader.read())
+        publisher.close()
+
+    def test_restart_keeps_sequence_increasing(self):
+        """测试发布端重启后序列号继续递增"""
+        first = SnapshotPublisher(self.path)
+        seq = first.publish({"n": 1})
+        first.close()
+        second = SnapshotPublisher(self.path)
+        self.assertGreater(second.publish({"n": 2}), seq)
+        second.close()
+
+    def test_concurrent_reads_are_consistent(self):
+        """测试并发写入时读者总能得到完整快照"""
+        publisher = SnapshotPublisher(self.path)
+        publisher.publish({"a": 0, "b": 0})
+        stop = threading.Event()
+
+        def write():
+            i = 0
+            while not stop.is_set():
+                i += 1
+                publisher.publish({"a": i, "b": i, "pad": "x" * (i % 500)})
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        try:
+            reader = SnapshotReader(self.path)
+            for _ in range(2000):
+                snapshot = read(reader)
+                self.assertEqual(snapshot["a"], snapshot["b"])
+        finally:
+            stop.set()
+            writer.join()
+            publisher.close()
+
+    def test_console_reads_feed(self):
+        """测试控制台显示守护进程发布的数据"""
+        publisher = SnapshotPublisher(self.path)
+        publisher.publish(
+            {
+                "started_at": 0,
+                "health": {"cpu_usage": 33.0, "network_status": "connected"},
+                "modules": {"数据核心": {"status": "active", "priority": "critical"}},
+                "modules_version": 1,
+            }
+        )
+        console = FortressConsole(feed_path=self.path)
+        self.assertEqual(console.get_system_stats()["cpu"], 33.0)
+        modules = console.get_module_status()
+        self.assertEqual(modules, {"数据核心": "active"})
+
+        # 模块版本未变时复用已解析的模块表
+        publisher.publish(
+            {
+                "health": {"cpu_usage": 35.0},
+                "modules": {"数据核心": {"status": "active"}},
+                "modules_version": 1,
+            }
+        )
+        self.assertIs(console.get_module_status(), modules)
+        publisher.close()
+
+    def test_console_shows_engine_alerts(self):
+        """测试控制台显示守护进程告警引擎的记录"""
+        from fortress_alerts import AlertEngine
+
+        engine = AlertEngine.from_config({})
+        engine.evaluate({"cpu_usage": 95.0}, now=1)
+        engine.evaluate({"cpu_usage": 50.0}, now=2)
+        publisher = SnapshotPublisher(self.path)
+        publisher.publish({"alerts": [a.to_dict() for a in engine.recent()]})
+        console = FortressConsole(feed_path=self.path)
+        alerts = console.get_alerts()
+        self.assertEqual([level for _, level in alerts], ["warning", "resolved"])
+        self.assertIn("CPU使用率过高: 95.0%", alerts[0][0])
+        self.assertTrue(alerts[1][0].endswith("已恢复"))
+        publisher.close()
+
+    def test_console_shows_trends(self):
+        """测试控制台显示守护进程指标历史的窗口统计"""
+        from fortress_history import MetricHistory
+
+        history = MetricHistory(["cpu_usage", "disk_usage"], trend_window=600)
+        for t in range(0, 600, 60):
+            history.record({"cpu_usage": 40.0 + t / 60}, t)
+        publisher = SnapshotPublisher(self.path)
+        publisher.publish({"trends": history.trends(now=599)})
+        console = FortressConsole(feed_path=self.path)
+        (trend,) = console.get_trends()  # 无有效样本的磁盘指标不显示
+        self.assertEqual(trend[0], "CPU使用率")
+        self.assertIn("最高 49.0%", trend[1])
+        self.assertIn("+1.00/分钟", trend[1])
+        publisher.close()
+
+    def test_console_marks_stale_feed(self):
+        """测试快照超过若干心跳未更新或守护进程停止时显示为过期"""
+        publisher = SnapshotPublisher(self.path)
+        snapshot = {
+            "status": "RUNNING",
+            "published_at": time.time(),
+            "heartbeat_interval": 60,
+            "health": {"cpu_usage": 10.0},
+        }
+        publisher.publish(snapshot)
+        console = FortressConsole(feed_path=self.path)
+        self.assertFalse(console.get_system_stats()["stale"])
+
+        publisher.publish(dict(snapshot, published_at=time.time() - 600))
+        stats = console.get_system_stats()
+        self.assertTrue(stats["stale"])
+        self.assertIn("已过期", stats["freshness"])
+
+        publisher.publish(dict(snapshot, status="SHUTDOWN"))
+        stats = console.get_system_stats()
+        self.assertTrue(stats["stale"])
+        self.assertIn("已停止", stats["freshness"])
+        publisher.close()
+
+    def test_guardian_marks_feed_on_shutdown(self):
+        """测试守护进程关闭时发布停止状态"""
+        from fortress_guardian import FortressGuardian
+
+        guardian = FortressGuardian()
+        guardian.config = {"monitoring": {"feed": {"path": self.path}}}
+        guardian._publish_snapshot({"cpu_usage": 21.0})
+        reader = SnapshotReader(self.path)
+        self.assertIn("published_at", read(reader))
+        guardian.shutdown()
+        snapshot = read(reader)
+        self.assertEqual(snapshot["status"], "SHUTDOWN")
+        self.assertEqual(snapshot["health"]["cpu_usage"], 21.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞防火墙规则引擎单元测试
+"""
+
+import ipaddress
+import os
+import random
+import sys
+import unittest
+from typing import Any, Dict, List
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_firewall import DEFAULT_ALIASES, FirewallMatcher, PortSet, parse_ports
+
+CONFIG_RULES: List[Dict[str, Any]] = [
+    {"allow": "internal_network", "ports": [8080, 8443, 2222]},
+    {"deny": "external_access", "except": ["authorized_terminals"]},
+]
+
+
+class TestRuleParsing(unittest.TestCase):
+    """测试规则解析"""
+
+    def test_parse_ports(self):
+        """测试端口列表与区间"""
+        self.assertIsNone(parse_ports(None))
+        self.assertEqual(parse_ports([22, "8000-8100"]), [(22, 22), (8000, 8100)])
+        with self.assertRaises(ValueError):
+            parse_ports([70000])
+
+    def test_port_set_ranges(self):
+        """测试区间合并后的成员判断"""
+        ports = PortSet([(22, 22), (100, 200), (150, 300), (1000, 1000)])
+        for port in (22, 100, 250, 300, 1000):
+            self.assertTrue(port in ports)
+        for port in (21, 99, 301, 999):
+            self.assertFalse(port in ports)
+
+    def test_external_is_complement_of_internal(self):
+        """测试 external_access 不包含内网地址"""
+        external = [ipaddress.ip_network(n) for n in DEFAULT_ALIASES["external_access"]]
+        for ip in ("192.168.1.100", "10.1.2.3", "127.0.0.1"):
+            address = ipaddress.ip_address(ip)
+            self.assertFalse(any(address in net for net in external))
+        self.assertTrue(any(ipaddress.ip_address("8.8.8.8") in n for n in external))
+
+    def test_invalid_rules(self):
+        """测试未知别名与缺少动作的规则"""
+        with self.assertRaises(ValueError):
+            FirewallMatcher([{"allow": "no_such_alias"}])
+        with self.assertRaises(ValueError):
+            FirewallMatcher([{"ports": [22]}])
+
+
+class TestFirewallMatcher(unittest.TestCase):
+    """测试规则匹配"""
+
+    def setUp(self):
+        self.matcher = FirewallMatcher(
+            CONFIG_RULES, aliases={"authorized_terminals": ["203.0.113.0/24"]}
+        )
+
+    def test_config_rules(self):
+        """测试默认配置中的规则语义"""
+        self.assertEqual(self.matcher.match("192.168.1.100", 8443).rule, 0)
+        self.assertTrue(self.matcher.allowed("192.168.1.100", 2222))
+        self.assertFalse(self.matcher.allowed("8.8.8.8", 8443))
+        # 授权终端被排除在拒绝规则之外，落到默认策略
+        self.assertEqual(self.matcher.match("203.0.113.9", 22).rule, None)
+        self.assertTrue(self.matcher.allowed("203.0.113.9", 22))
+        self.assertFalse(self.matcher.allowed("2001:db8::1", 80))
+        self.assertTrue(self.matcher.allowed("::1", 8080))
+
+    def test_first_match_wins(self):
+        """测试按规则顺序首条命中"""
+        matcher = FirewallMatcher(
+            [
+                {"deny": "10.0.0.0/24", "ports": ["1-1024"]},
+                {"allow": "10.0.0.0/8"},
+            ],
+            default_action="deny",
+        )
+        self.assertEqual(matcher.match("10.0.0.5", 22).action, "deny")
+        self.assertEqual(matcher.match("10.0.0.5", 8080).action, "allow")
+        self.assertEqual(matcher.match("10.9.0.5", 22).action, "allow")
+        self.assertEqual(matcher.match("11.0.0.1", 22), ("deny", None))
+
+    def test_port_edges_and_empty_rules(self):
+        """测试端口边界与空规则表"""
+        matcher = FirewallMatcher([{"deny": "any", "ports": [0, "65000-65535"]}])
+        self.assertFalse(matcher.allowed("1.2.3.4", 0))
+        self.assertTrue(matcher.allowed("1.2.3.4", 1))
+        self.assertFalse(matcher.allowed("1.2.3.4", 65535))
+        self.assertFalse(matcher.allowed("::2", 65535))
+        empty = FirewallMatcher([], default_action="deny")
+        self.assertEqual(empty.match("1.2.3.4", 80), empty.default_decision)
+        self.assertEqual(empty.match_array([1, 2], [80, 81]).tolist(), [-1, -1])
+
+    def test_matches_linear_reference(self):
+        """测试大量随机规则下与逐条比较的结果一致"""
+        rng = random.Random(7)
+        rules = []
+        for _ in range(300):
+            network = ipaddress.ip_network(
+                (rng.randrange(1 << 32), rng.randint(4, 28)), strict=False
+            )
+            rule: Dict[str, Any] = {rng.choice(["allow", "deny"]): str(network)}
+            if rng.random() < 0.7:
+                low = rng.randrange(65000)
+                rule["ports"] = [
+                    rng.randrange(65536),
+                    f"{low}-{low + rng.randrange(500)}",
+                ]
+            if rng.random() < 0.2:
+                rule["except"] = [
+                    str(
+                        next(network.subnets(new_prefix=min(32, network.prefixlen + 2)))
+                    )
+                ]
+            rules.append(rule)
+        matcher = FirewallMatcher(rules, default_action="deny")
+
+        def reference(ip, port):
+            address = ipaddress.ip_address(ip)
+            for index, rule in enumerate(rules):
+                action = "allow" if "allow" in rule else "deny"
+                if address not in ipaddress.ip_network(rule[action]):
+                    continue
+                if any(
+                    address in ipaddress.ip_network(n) for n in rule.get("except", [])
+                ):
+                    continue
+                ports = parse_ports(rule.get("ports"))
+                if ports is not None and not any(lo <= port <= hi for lo, hi in ports):
+                    continue
+                return action, index
+            return "deny", None
+
+        flows = []
+        for rule in rules[:100]:
+            network = ipaddress.ip_network(rule.get("allow") or rule["deny"])
+            ip = str(network.network_address + rng.randrange(network.num_addresses))
+            port = rng.choice(
+                [p[0] for p in parse_ports(rule.get("ports")) or [(80, 80)]]
+            )
+            flows.append((ip, port))
+        flows += [
+            (str(ipaddress.ip_address(rng.randrange(1 << 32))), rng.randrange(65536))
+            for _ in range(200)
+        ]
+
+        batch = matcher.match_many(flows + flows)
+        for (ip, port), decision in zip(flows + flows, batch):
+            self.assertEqual(tuple(decision), reference(ip, port))
+            self.assertEqual(matcher.match(ip, port), decision)
+
+        indices = matcher.match_array(
+            np.array([int(ipaddress.ip_address(ip)) for ip, _ in flows]),
+            np.array([port for _, port in flows]),
+        )
+        for (ip, port), index in zip(flows, indices.tolist()):
+            expected = reference(ip, port)[1]
+            self.assertEqual(index, -1 if expected is None else expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞集群汇聚单元测试
+"""
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+from typing import Any, Callable, Dict, List
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_fleet import (
+    FleetAgent,
+    FleetCollector,
+    FleetSubscriber,
+    NodeState,
+    diff,
+    flatten,
+    unflatten,
+)
+
+
+def wait_until(predicate: Callable[[], bool], timeout: float = 5.0) -> bool:
+    """轮询等待条件成立"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def snapshot(cpu: float, **modules: str):
+    return {
+        "status": "OPERATIONAL",
+        "health": {"cpu_usage": cpu, "network_status": "connected"},
+        "modules": {name: {"status": status} for name, status in modules.items()},
+        "alerts": [],
+    }
+
+
+class TestDeltaEncoding(unittest.TestCase):
+    """测试扁平化与增量"""
+
+    def test_roundtrip(self):
+        """测试展开后可还原，列表与空字典作为叶子"""
+        data = snapshot(12.5, 数据核心="active")
+        data["trends"] = {}
+        flat = flatten(data)
+        self.assertEqual(flat["modules/数据核心/status"], "active")
+        self.assertEqual(flat["trends"], {})
+        self.assertEqual(unflatten(flat), data)
+
+    def test_diff_only_changed_paths(self):
+        """测试增量只包含变化与删除的路径"""
+        before = flatten(snapshot(10.0, 数据核心="active", 防御系统="standby"))
+        after = flatten(snapshot(20.0, 数据核心="active"))
+        changed, removed = diff(before, after)
+        self.assertEqual(changed, {"health/cpu_usage": 20.0})
+        self.assertEqual(removed, ["modules/防御系统/status"])
+
+
+class TestFleetAgent(unittest.TestCase):
+    """测试节点端发送队列"""
+
+    def test_unchanged_snapshot_not_queued(self):
+        """测试快照无变化时不入队"""
+        agent = FleetAgent("ws://127.0.0.1:1", node="n1")
+        agent.submit(snapshot(10.0), timestamp=1)
+        agent.submit(snapshot(10.0), timestamp=2)
+        self.assertEqual(agent.pending, 1)
+
+    def test_overflow_collapses_to_keyframe(self):
+        """测试队列满时积压的增量被当前状态的关键帧取代"""
+        agent = FleetAgent("ws://127.0.0.1:1", node="n1", buffer=3)
+        for i in range(4):
+            agent.submit(snapshot(float(i)), timestamp=i)
+        self.assertEqual(agent.dropped, 3)
+        (update,) = agent._drain()
+        self.assertTrue(update["full"])
+        self.assertEqual(update["seq"], 4)
+        self.assertEqual(unflatten(update["set"]), snapshot(3.0))
+
+
+class StalledViewer:
+    """不再读取数据的控制台: send 永远不返回"""
+
+    def __init__(self):
+        self.closed = False
+
+    async def send(self, message):
+        await asyncio.Event().wait()
+
+    async def close(self):
+        self.closed = True
+
+
+class TestFleetCollector(unittest.TestCase):
+    """测试收集器的节点清理"""
+
+    def test_disconnected_nodes_evicted(self):
+        """测试断开超过 TTL 的节点被移除并通知控制台，在线节点保留"""
+        collector = FleetCollector("127.0.0.1", 0, node_ttl=60)
+        for node, connected, disconnected_at in (
+            ("old", False, 1000.0),
+            ("recent", False, 1050.0),
+            ("online", True, 0.0),
+        ):
+            state = collector.nodes[node] = NodeState(node)
+            state.connected = connected
+            state.disconnected_at = disconnected_at
+        collector._dirty.add("old")
+        self.assertEqual(collector.evict(now=1100.0), 1)
+        self.assertEqual(sorted(collector.nodes), ["online", "recent"])
+        self.assertEqual(collector._removed, {"old"})
+        self.assertNotIn("old", collector._dirty)
+        self.assertEqual(collector.stats()["evicted"], 1)
+
+
+class TestFleetEndToEnd(unittest.TestCase):
+    """测试节点推送到本地收集器"""
+
+    def setUp(self):
+        """启动本地收集器"""
+        self.collector = FleetCollector("127.0.0.1", 0)
+        self.port = self.collector.start()
+        self.agents = []
+
+    def tearDown(self):
+        """停止节点与收集器"""
+        for agent in self.agents:
+            agent.stop()
+        self.collector.stop()
+
+    def agent(self, node: str, port: int) -> FleetAgent:
+        agent = FleetAgent(
+            f"ws://127.0.0.1:{port}",
+            node=node,
+            flush_interval=0.01,
+            backoff=(0.05, 0.2),
+        )
+        self.agents.append(agent)
+        agent.start()
+        return agent
+
+    def test_nodes_stream_deltas(self):
+        """测试多个节点的快照在收集器中重建，后续只发送增量"""
+        agents = [self.agent(f"node-{i}", self.port) for i in range(5)]
+        for i, agent in enumerate(agents):
+            agent.submit(snapshot(float(i), 数据核心="active", 防御系统="standby"))
+        self.assertTrue(wait_until(lambda: self.collector.updates >= 5))
+
+        agents[0].submit(snapshot(99.0, 数据核心="active", 防御系统="failed"))
+        self.assertTrue(wait_until(lambda: self.collector.updates >= 6))
+        state = self.collector.nodes["node-0"]
+        self.assertEqual(state.snapshot()["health"]["cpu_usage"], 99.0)
+        summary = state.summary()
+        self.assertEqual(summary["modules"], {"active": 1, "failed": 1})
+        self.assertTrue(summary["connected"])
+        self.assertEqual(self.collector.gaps, 0)
+        self.assertEqual(len(self.collector.summaries()), 5)
+        # 第二次只发送了两个变化的路径，比首个全量小
+        self.assertLess(agents[0].bytes, 2 * agents[1].bytes)
+
+    def test_reconnect_resyncs_state(self):
+        """测试收集器重启后节点退避重连并用关键帧恢复状态"""
+        agent = self.agent("node-r", self.port)
+        agent.submit(snapshot(10.0, 数据核心="active"))
+        self.assertTrue(wait_until(lambda: self.collector.updates >= 1))
+        self.collector.stop()
+        self.assertTrue(wait_until(lambda: not agent.connected))
+        agent.submit(snapshot(30.0, 数据核心="failed"))
+
+        self.collector = FleetCollector("127.0.0.1", self.port)
+        self.collector.start()
+        self.assertTrue(wait_until(lambda: "node-r" in self.collector.nodes))
+        self.assertTrue(wait_until(lambda: self.collector.updates >= 1))
+        restored = self.collector.nodes["node-r"].snapshot()
+        self.assertEqual(restored, snapshot(30.0, 数据核心="failed"))
+        self.assertGreaterEqual(agent.reconnects, 1)
+
+    def test_viewer_receives_summaries(self):
+        """测试控制台订阅先收到全部节点摘要，之后只收到变化的节点"""
+        agents = [self.agent(f"node-{i}", self.port) for i in range(3)]
+        for agent in agents:
+            agent.submit(snapshot(10.0, 数据核心="active"))
+        self.assertTrue(wait_until(lambda: self.collector.updates >= 3))
+        # 等连接时标记的变化推送完，订阅后只会收到之后的变化
+        self.assertTrue(wait_until(lambda: not self.collector._dirty))
+
+        batches: List[List[Dict[str, Any]]] = []
+        viewer = FleetSubscriber(
+            f"ws://127.0.0.1:{self.port}", batches.append, backoff=(0.05, 0.2)
+        )
+        viewer.start()
+        self.addCleanup(viewer.stop)
+        self.assertTrue(wait_until(lambda: len(batches) >= 1))
+        self.assertEqual(
+            sorted(row["node"] for row in batches[0]),
+            [
+                "node-0",
+                "node-1",
+                "node-2",
+            ],
+        )
+        self.assertEqual(
+            batches[0][0]["module_list"], {"数据核心": {"status": "active"}}
+        )
+
+        agents[1].submit(snapshot(70.0, 数据核心="failed"))
+        self.assertTrue(
+            wait_until(lambda: any(r["cpu_usage"] == 70.0 for r in batches[-1]))
+        )
+        self.assertEqual([row["node"] for row in batches[-1]], ["node-1"])
+        self.assertEqual(batches[-1][0]["modules"], {"failed": 1})
+
+    def test_stalled_viewer_dropped(self):
+        """测试收不完推送的控制台被断开，不阻塞其他控制台"""
+        agent = self.agent("node-s", self.port)
+        agent.submit(snapshot(10.0, 数据核心="active"))
+        self.assertTrue(wait_until(lambda: self.collector.updates >= 1))
+        self.collector.view_timeout = 0.2
+        stalled = StalledViewer()
+        assert self.collector._loop is not None
+        self.collector._loop.call_soon_threadsafe(self.collector._viewers.add, stalled)
+        batches: List[List[Dict[str, Any]]] = []
+        viewer = FleetSubscriber(
+            f"ws://127.0.0.1:{self.port}", batches.append, backoff=(0.05, 0.2)
+        )
+        viewer.start()
+        self.addCleanup(viewer.stop)
+        self.assertTrue(wait_until(lambda: len(batches) >= 1))
+
+        for cpu in (20.0, 30.0, 40.0):
+            agent.submit(snapshot(cpu, 数据核心="active"))
+            self.assertTrue(
+                wait_until(
+                    lambda: any(r.get("cpu_usage") == cpu for r in batches[-1]), 2.0
+                )
+            )
+        self.assertTrue(wait_until(lambda: stalled.closed))
+        self.assertEqual(self.collector.slow_viewers, 1)
+        self.assertNotIn(stalled, self.collector._viewers)
+
+    def test_non_object_hello_rejected(self):
+        """测试不是对象的握手被拒绝"""
+        from websockets.sync.client import connect
+
+        with connect(f"ws://127.0.0.1:{self.port}") as ws:
+            ws.send("[1, 2]")
+            self.assertTrue(wait_until(lambda: self.collector.rejected == 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞控制台集群视图单元测试
+"""
+
+import curses
+import os
+import random
+import sys
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_console import FortressConsole
+from fortress_fleetview import (
+    NODE_SORTS,
+    FleetIndex,
+    FleetModel,
+    SortedChunks,
+    VirtualList,
+)
+from fortress_render import DiffRenderer
+from test_fortress_render import FakeScreen
+
+
+def summary(node, cpu=10.0, connected=True, modules=None):
+    """收集器推送的节点摘要"""
+    return {
+        "node": node,
+        "connected": connected,
+        "cpu_usage": cpu,
+        "memory_usage": 40.0,
+        "disk_usage": 30.0,
+        "network_status": "connected",
+        "modules": {},
+        "module_list": modules or {},
+    }
+
+
+class TestFleetIndex(unittest.TestCase):
+    """测试增量维护的有序索引"""
+
+    def test_incremental_updates_match_full_sort(self):
+        """测试随机插入、更新、删除后索引与重新排序的结果一致"""
+        rng = random.Random(7)
+        index = FleetIndex(NODE_SORTS, "state")
+        index.view("cpu")
+        index.view("status", "alert")
+        for _ in range(3000):
+            node = f"node-{rng.randrange(300):03d}"
+            if rng.random() < 0.1:
+                index.remove(node)
+                continue
+            cpu = None if rng.random() < 0.05 else rng.choice([10.0, 50.0, 90.0])
+            state = "alert" if cpu and cpu >= 80 else rng.choice(["ok", "offline"])
+            index.upsert(node, {"node": node, "cpu_usage": cpu, "state": state})
+
+        for sort, flt in (("cpu", None), ("status", "alert")):
+            expected = sorted(
+                (NODE_SORTS[sort](row), row_id)
+                for row_id, row in index.rows.items()
+                if flt is None or row["state"] == flt
+            )
+            self.assertEqual(list(index.view(sort, flt)), expected)
+        states = [row["state"] for row in index.rows.values()]
+        self.assertEqual(index.counts, {s: states.count(s) for s in set(states)})
+
+    @patch("fortress_fleetview.CHUNK_SIZE", 4)
+    def test_sorted_chunks_split_and_merge(self):
+        """测试块分裂与删空后仍与有序列表一致，切片可跨块"""
+        rng = random.Random(3)
+        chunks = SortedChunks(rng.sample(range(1000), 50))
+        expected = sorted(chunks)
+        for _ in range(2000):
+            if expected and rng.random() < 0.5:
+                value = rng.choice(expected)
+                chunks.remove(value)
+                expected.remove(value)
+            else:
+                value = rng.randrange(1000) + rng.random()
+                chunks.add(value)
+                expected.append(value)
+                expected.sort()
+        self.assertEqual(list(chunks), expected)
+        self.assertEqual(len(chunks), len(expected))
+        self.assertEqual(chunks.slice(5, 11), expected[5:16])
+        self.assertEqual(chunks.slice(len(expected) - 2, 10), expected[-2:])
+
+    def test_window(self):
+        """测试按排序取窗口，CPU 降序且无读数的排在最后"""
+        index = FleetIndex(NODE_SORTS, "state")
+        for i, cpu in enumerate([30.0, None, 90.0, 60.0]):
+            index.upsert(f"n{i}", {"node": f"n{i}", "cpu_usage": cpu, "state": "ok"})
+        rows = index.window("cpu", None, 1, 2)
+        self.assertEqual([row["node"] for row in rows], ["n3", "n0"])
+        self.assertEqual(index.window("cpu", None, 3, 5)[0]["node"], "n1")
+
+
+class TestVirtualList(unittest.TestCase):
+    """测试虚拟滚动列表"""
+
+    def setUp(self):
+        """创建 100 个节点的模型"""
+        self.model = FleetModel()
+        self.model.apply(
+            summary(f"node-{i:03d}", cpu=float(i % 50), connected=i % 10 != 0)
+            for i in range(100)
+        )
+        self.listing = VirtualList(self.model.nodes, NODE_SORTS)
+
+    def test_scroll_and_page(self):
+        """测试光标移出窗口时滚动，翻页与首尾跳转限制在有效范围"""
+        visible = self.listing.visible(10)
+        self.assertEqual(len(visible), 10)
+        self.assertTrue(visible[0][0])
+        self.listing.move(15)
+        visible = self.listing.visible(10)
+        self.assertEqual(self.listing.top, 6)
+        self.assertEqual([row["node"] for sel, row in visible if sel], ["node-015"])
+        self.listing.move(1000)
+        self.assertEqual(self.listing.selected, 99)
+        self.listing.visible(10)
+        self.assertEqual(self.listing.top, 90)
+        self.listing.home()
+        self.listing.visible(10)
+        self.assertEqual(self.listing.top, 0)
+
+    def test_filter_clamps_selection(self):
+        """测试过滤后列表变短时光标被限制在范围内"""
+        self.listing.end()
+        self.listing.visible(10)
+        self.listing.cycle_filter()  # 全部 → offline
+        self.assertEqual(self.listing.filter, "offline")
+        self.listing.move(50)
+        visible = self.listing.visible(5)
+        self.assertEqual(len(self.listing), 10)
+        self.assertEqual(self.listing.selected, 9)
+        self.assertEqual(visible[-1][1]["node"], "node-090")
+
+    def test_module_rows_follow_summaries(self):
+        """测试节点摘要中的模块增删同步到模块索引"""
+        self.model.apply(
+            [
+                summary(
+                    "node-001",
+                    modules={
+                        "数据核心": {"status": "active", "priority": "critical"},
+                        "防御系统": {"status": "failed", "priority": "high"},
+                    },
+                )
+            ]
+        )
+        self.assertEqual(self.model.modules.counts, {"active": 1, "failed": 1})
+        self.assertEqual(self.model.nodes.rows["node-001"]["state"], "ok")
+        self.model.apply(
+            [
+                summary(
+                    "node-001",
+                    modules={"数据核心": {"status": "active", "priority": "critical"}},
+                )
+            ]
+        )
+        self.assertEqual(list(self.model.modules.rows), ["node-001/数据核心"])
+
+        self.model.apply([{"node": "node-001", "removed": True}])
+        self.assertNotIn("node-001", self.model.nodes.rows)
+        self.assertEqual(len(self.model.modules), 0)
+
+
+class TestConsoleFleetView(unittest.TestCase):
+    """测试控制台集群视图与模块管理视图"""
+
+    @patch("curses.color_pair", return_value=0)
+    def test_fleet_frame_draws_visible_window(self, _):
+        """测试集群视图只绘制一屏，且合并订阅线程推送的摘要"""
+        console = FortressConsole(feed_path="/nonexistent/feed")
+        console.screen = FakeScreen(20, 100)
+        console.current_view = "fleet"
+        console._fleet_updates.put([summary(f"node-{i:05d}") for i in range(5000)])
+        frame = console.build_frame()
+        self.assertEqual(len(console.fleet.nodes), 5000)
+        text = "\n".join("".join(ch for ch, _ in row) for row in frame.rows)
+        self.assertIn("node-00000", text)
+        self.assertIn("node-00011", text)
+        self.assertNotIn("node-00012", text)
+
+        console.handle_input(ord("5"))
+        console.handle_input(curses.KEY_END)
+        console.handle_input(ord("\t"))
+        self.assertEqual(console.fleet_focus, "modules")
+        console.handle_input(ord("\t"))
+        frame = console.build_frame()
+        text = "\n".join("".join(ch for ch, _ in row) for row in frame.rows)
+        self.assertIn("node-04999", text)
+
+    @patch("curses.color_pair", return_value=0)
+    def test_updates_drained_on_other_views(self, _):
+        """测试停留在其他视图时推送的摘要仍每帧合并，队列不积压"""
+        console = FortressConsole(feed_path="/nonexistent/feed")
+        console.screen = FakeScreen(20, 100)
+        console.current_view = "dashboard"
+        for frame in range(50):
+            console._fleet_updates.put(
+                [summary(f"node-{i:03d}", cpu=float(frame)) for i in range(100)]
+            )
+            console.build_frame()
+            self.assertTrue(console._fleet_updates.empty())
+        self.assertEqual(len(console.fleet.nodes), 100)
+        self.assertEqual(console.fleet.nodes.rows["node-007"]["cpu_usage"], 49.0)
+
+    @patch("curses.color_pair", return_value=0)
+    def test_module_view_uses_feed(self, _):
+        """测试模块管理视图显示快照中的模块，光标不超过实际模块数"""
+        console = FortressConsole(feed_path="/nonexistent/feed")
+        console.screen = FakeScreen()
+        console.renderer = DiffRenderer(console.screen)
+        modules = {
+            "防御系统": {"status": "standby", "priority": "high"},
+            "数据核心": {"status": "active", "priority": "critical"},
+        }
+        with patch.object(
+            console.feed,
+            "read",
+            return_value={"modules": modules, "modules_version": 3},
+        ):
+            console.current_view = "modules"
+            for _ in range(5):
+                console.handle_input(curses.KEY_DOWN)
+            self.assertEqual(console.selected_module, 1)
+            self.assertEqual(
+                [name for name, _, _ in console.get_module_rows()],
+                ["数据核心", "防御系统"],
+            )
+            frame = console.build_frame()
+        text = "\n".join("".join(ch for ch, _ in row) for row in frame.rows)
+        self.assertIn("▶ 防", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
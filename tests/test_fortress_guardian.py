@@ -4,9 +4,12 @@
 数据要塞守护进程单元测试
 """
 
+import copy
 import os
 import sys
 import tempfile
+import threading
+import time
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -44,7 +47,7 @@ class TestFortressGuardian(unittest.TestCase):
         self.temp_config.close()
 
         # 创建守护进程实例
-        self.guardian = FortressGuardian(self.temp_config.name)
+        self.guardian = FortressGuardian(self.temp_config.name, cache_dir=None)
 
     def tearDown(self):
         """测试后置清理"""
@@ -58,6 +61,18 @@ class TestFortressGuardian(unittest.TestCase):
         self.assertEqual(self.guardian.config_path, self.temp_config.name)
         self.assertIsInstance(self.guardian.modules, dict)
 
+    def test_modules_is_a_copy(self):
+        """测试修改 modules 不会改动已发布的注册表快照"""
+        self.guardian.load_configuration()
+        self.guardian.initialize_modules()
+        modules = self.guardian.modules
+        modules["数据核心"]["status"] = "tampered"
+        modules.pop("防御系统")
+        published = self.guardian.registry.snapshot().as_dict()
+        self.assertEqual(published["数据核心"]["status"], "active")
+        self.assertIn("防御系统", published)
+        self.assertEqual(self.guardian.modules["数据核心"]["status"], "active")
+
     def test_load_configuration_success(self):
         """测试配置加载成功"""
         result = self.guardian.load_configuration()
@@ -83,6 +98,191 @@ class TestFortressGuardian(unittest.TestCase):
         self.assertIn("数据核心", self.guardian.modules)
         self.assertIn("防御系统", self.guardian.modules)
 
+    def test_start_modules(self):
+        """测试按配置的启动动作激活防御系统，并记录启动耗时"""
+        self.guardian.load_configuration()
+        self.guardian.config["modules"][1].update(
+            depends_on=["数据核心"], start=["firewall", "intrusion_detection"]
+        )
+        self.guardian.initialize_modules()
+
+        self.assertTrue(self.guardian.start_modules())
+        self.assertEqual(self.guardian.modules["防御系统"]["status"], "active")
+        self.assertEqual(self.guardian.modules["数据核心"]["status"], "active")
+        self.assertIsNotNone(self.guardian.firewall)
+        report = self.guardian.startup_report
+        assert report is not None
+        self.assertEqual(report.critical_path, ["数据核心", "防御系统"])
+
+    def test_start_modules_legacy_config(self):
+        """测试防御系统未配置 start 的旧配置仍启动防火墙并告警提示"""
+        self.guardian.load_configuration()
+        with self.assertLogs(self.guardian.logger, "WARNING") as logs:
+            self.guardian.initialize_modules()
+        self.assertIn("未配置 start", "\n".join(logs.output))
+        self.assertTrue(self.guardian.start_modules())
+        self.assertIsNotNone(self.guardian.firewall)
+        self.assertEqual(self.guardian.modules["防御系统"]["status"], "active")
+
+    def test_apply_reloaded_config(self):
+        """测试热重载只替换变化的部分，无效的防火墙规则整体拒绝"""
+        self.guardian.load_configuration()
+        self.guardian.initialize_modules()
+        self.guardian.start_modules()
+        firewall = self.guardian.firewall
+
+        config = copy.deepcopy(self.guardian.config)
+        config["modules"].append(
+            {"name": "传输通道", "status": "operational", "priority": "medium"}
+        )
+        config["modules"][0]["priority"] = "high"
+        self.guardian._apply_config(config, ["modules"])
+        self.assertIs(self.guardian.firewall, firewall)
+        self.assertEqual(self.guardian.modules["传输通道"]["status"], "operational")
+        self.assertEqual(self.guardian.modules["数据核心"]["priority"], "high")
+
+        broken = copy.deepcopy(config)
+        broken["security"]["firewall"]["rules"] = [{"allow": "no_such_alias"}]
+        with self.assertRaises(ValueError):
+            self.guardian._apply_config(broken, ["security.firewall"])
+        self.assertIs(self.guardian.config, config)
+        self.assertIs(self.guardian.firewall, firewall)
+
+    def test_tracing_hot_reload(self):
+        """测试按 monitoring.tracing 开关埋点，重载后立即生效"""
+        from fortress_trace import TRACER
+
+        self.addCleanup(TRACER.reset)
+        self.addCleanup(TRACER.configure, TRACER.enabled)
+        self.guardian.load_configuration()
+        config = copy.deepcopy(self.guardian.config)
+        config.setdefault("monitoring", {})["tracing"] = {"enabled": True}
+        self.guardian._apply_config(config, ["monitoring.tracing"])
+        self.assertTrue(TRACER.enabled)
+
+        self.guardian.initialize_modules()
+        self.guardian.start_modules()
+        self.guardian._get_memory_usage()
+        histograms = TRACER.histograms()
+        for name in (
+            "guardian.initialize_modules",
+            "guardian.start_modules",
+            "module.start:防御系统",
+            "collector.memory_usage",
+        ):
+            self.assertEqual(histograms[name]["count"], 1, name)
+
+        config = copy.deepcopy(config)
+        config["monitoring"]["tracing"]["enabled"] = False
+        self.guardian._apply_config(config, ["monitoring.tracing"])
+        self.guardian._get_memory_usage()
+        self.assertEqual(TRACER.histograms()["collector.memory_usage"]["count"], 1)
+
+    def test_tracing_env_overrides_config(self):
+        """测试 FORTRESS_TRACE=1 时默认配置 (enabled: false) 不关闭追踪，
+        未改变 enabled 的重载也不撤销信号开启的追踪"""
+        from fortress_trace import TRACER
+
+        self.addCleanup(TRACER.configure, TRACER.enabled, TRACER.events.maxlen)
+        shipped = os.path.join(
+            os.path.dirname(__file__), "..", "data_fortress_config.yaml"
+        )
+        with open(shipped, encoding="utf-8") as f:
+            config = yaml.safe_load(f)
+        self.assertFalse(config["monitoring"]["tracing"]["enabled"])
+        with patch.dict(os.environ, {"FORTRESS_TRACE": "1"}):
+            self.guardian.config = config
+            self.guardian._configure_tracing()
+            self.assertTrue(TRACER.enabled)
+
+        TRACER.configure(False)
+        self.guardian._configure_tracing()
+        self.assertFalse(TRACER.enabled)
+        TRACER.configure(True)  # SIGUSR2 开启
+        config = copy.deepcopy(config)
+        config["monitoring"]["tracing"]["capacity"] = 100
+        self.guardian._apply_config(config, ["monitoring.tracing"])
+        self.assertTrue(TRACER.enabled)
+        self.assertEqual(TRACER.events.maxlen, 100)
+
+    def test_snapshot_pushed_to_fleet(self):
+        """测试关闭共享内存快照时仍向集群收集器推送"""
+        self.guardian.config = {"monitoring": {"feed": {"enabled": False}}}
+        self.guardian.fleet_agent = MagicMock()
+        self.guardian._publish_snapshot({"cpu_usage": 42.0})
+        snapshot, published_at = self.guardian.fleet_agent.submit.call_args[0]
+        self.assertEqual(snapshot["health"]["cpu_usage"], 42.0)
+        self.assertEqual(snapshot["published_at"], published_at)
+        self.assertIsNone(self.guardian.feed)
+
+    def test_network_probe_hot_reload(self):
+        """测试网络状态来自配置的探测目标，重载目标后重建探测器"""
+        import socket
+
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen(4)
+        self.addCleanup(server.close)
+        port = server.getsockname()[1]
+
+        self.guardian.load_configuration()
+        config = copy.deepcopy(self.guardian.config)
+        probe = {"targets": [{"host": "127.0.0.1", "port": port}], "ttl": 0}
+        config.setdefault("monitoring", {})["network_probe"] = probe
+        self.guardian.config = config
+        self.assertEqual(self.guardian._check_network(), "connected")
+        prober = self.guardian.network_prober
+        assert prober is not None
+        self.assertEqual(prober.results[f"tcp:127.0.0.1:{port}"].error, "")
+
+        server.close()
+        config = copy.deepcopy(config)
+        config["monitoring"]["network_probe"]["targets"][0]["timeout"] = 0.5
+        self.guardian._apply_config(config, ["monitoring.network_probe"])
+        self.assertIsNot(self.guardian.network_prober, prober)
+        self.assertEqual(self.guardian._check_network(), "disconnected")
+
+    def test_cpu_alert_names_top_processes(self):
+        """测试进程排行随健康数据采集，CPU 告警日志写出主要进程"""
+        self.guardian.load_configuration()
+        self.assertIn("top_processes", self.guardian._build_scheduler().tasks)
+        top = self.guardian._get_top_processes()
+        assert top is not None
+        self.assertEqual(set(top), {"cpu", "memory"})
+
+        sample = {
+            "cpu_usage": 99.0,
+            "top_processes": {
+                "cpu": [
+                    {"pid": 4242, "name": "miner", "cpu_percent": 97.0, "rss_kb": 1}
+                ]
+            },
+        }
+        with self.assertLogs(self.guardian.logger, "WARNING") as logs:
+            for alert in self.guardian._get_alert_engine().evaluate(sample):
+                self.guardian._log_alert(alert)
+        self.assertIn("主要进程: miner[4242] 97.0%", logs.output[0])
+
+    def test_health_record_module_deltas(self):
+        """测试健康日志首条写全量模块状态，之后只写变化"""
+        self.guardian.load_configuration()
+        self.guardian.initialize_modules()
+        first = self.guardian._health_record({}, self.guardian.registry.snapshot())
+        self.assertEqual(set(first["module_status"]), {"数据核心", "防御系统"})
+
+        unchanged = self.guardian._health_record({}, self.guardian.registry.snapshot())
+        self.assertNotIn("module_status", unchanged)
+        self.assertNotIn("module_changes", unchanged)
+
+        self.guardian._on_module_change("防御系统", "failed")
+        changed = self.guardian._health_record({}, self.guardian.registry.snapshot())
+        self.assertNotIn("module_status", changed)
+        self.assertEqual(
+            [(e["name"], e["status"]) for e in changed["module_changes"]],
+            [("防御系统", "failed")],
+        )
+        self.assertEqual(self.guardian.modules["防御系统"]["status"], "failed")
+
     @patch("subprocess.run")
     def test_get_system_metrics(self, mock_run):
         """测试系统指标获取"""
@@ -102,6 +302,30 @@ class TestFortressGuardian(unittest.TestCase):
         self.assertGreaterEqual(cpu_usage, 0)
         self.assertLessEqual(cpu_usage, 100)
 
+    def test_failed_collectors_marked_stale(self):
+        """测试采集失败时不发布 0%，调度器保留 None 并标记过期"""
+        self.guardian.config = {"monitoring": {"processes": {"enabled": False}}}
+        failed = MagicMock(stdout="", returncode=1)
+        with patch.object(
+            self.guardian.sampler, "cpu_usage", side_effect=OSError("no /proc")
+        ), patch.object(
+            self.guardian.sampler, "memory_usage", side_effect=OSError("no /proc")
+        ), patch.object(
+            self.guardian.sampler, "disk_usage", side_effect=OSError("no statvfs")
+        ), patch(
+            "subprocess.run", return_value=failed
+        ), patch.object(
+            self.guardian, "_check_network", return_value="connected"
+        ):
+            scheduler = self.guardian._build_scheduler()
+            scheduler.start()
+            self.addCleanup(scheduler.stop, 1)
+            self.assertTrue(scheduler.wait_ready(5))
+        snapshot = scheduler.snapshot()
+        for name in ("cpu_usage", "memory_usage", "disk_usage"):
+            self.assertIsNone(snapshot[name], name)
+        self.assertEqual(scheduler.stale(), ["cpu_usage", "disk_usage", "memory_usage"])
+
     def test_log_health_data(self):
         """测试健康数据记录"""
         test_data = {
@@ -121,6 +345,45 @@ class TestFortressGuardian(unittest.TestCase):
         except Exception as e:
             self.fail(f"健康数据记录失败: {e}")
 
+    def test_dropped_records_warn_rate_limited(self):
+        """测试日志队列持续满时丢弃警告被限频"""
+        from fortress_log_writer import HealthLogWriter
+
+        # 不启动写入线程，队列很快写满
+        log_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(log_dir.cleanup)
+        self.guardian.log_writer = HealthLogWriter(log_dir=log_dir.name, queue_size=1)
+        with self.assertLogs(self.guardian.logger, "WARNING") as logs:
+            for i in range(2500):
+                self.guardian._log_health_data({"seq": i})
+        self.assertEqual(self.guardian.log_writer.dropped, 2499)
+        self.assertEqual(len(logs.output), 3)
+        self.guardian.log_writer = None
+
+    def test_monitor_shutdown_wakes_immediately(self):
+        """测试关闭时立即唤醒监控线程"""
+        self.guardian.load_configuration()
+        self.guardian.config["monitoring"] = {
+            "heartbeat_interval": 3600,
+            "feed": {"enabled": False},
+        }
+        logged = threading.Event()
+
+        with patch.object(
+            self.guardian, "_check_network", return_value="connected"
+        ), patch.object(
+            self.guardian, "_log_health_data", side_effect=lambda d: logged.set()
+        ):
+            self.guardian._monitor_thread = threading.Thread(
+                target=self.guardian.monitor_system_health, daemon=True
+            )
+            self.guardian._monitor_thread.start()
+            self.assertTrue(logged.wait(5))
+
+            start = time.monotonic()
+            self.guardian.shutdown()
+            self.assertLess(time.monotonic() - start, 1.0)
+
 
 class TestFortressSecurity(unittest.TestCase):
     """测试要塞安全功能"""
@@ -132,4 +395,4 @@ class TestFortressSecurity(unittest.TestCase):
 
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞内存指标历史单元测试
+"""
+
+import math
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_alerts import AlertEngine, parse_rules
+from fortress_history import MetricHistory, MetricRing
+
+
+class TestMetricRing(unittest.TestCase):
+    """测试环形缓冲区"""
+
+    def test_wraparound_keeps_latest(self):
+        """测试写满后覆盖最旧样本，窗口按时间顺序返回"""
+        ring = MetricRing(capacity=5)
+        for t in range(8):
+            ring.append(float(t), t * 10.0)
+        self.assertEqual(len(ring), 5)
+        self.assertEqual(ring.nbytes, 80)
+        ts, values = ring.window()
+        self.assertEqual(ts.tolist(), [3.0, 4.0, 5.0, 6.0, 7.0])
+        self.assertEqual(values.tolist(), [30.0, 40.0, 50.0, 60.0, 70.0])
+        ts, _ = ring.window(seconds=2, now=7)
+        self.assertEqual(ts.tolist(), [5.0, 6.0, 7.0])
+
+    def test_stats_match_reference(self):
+        """测试窗口统计与直接计算一致，缺失读数不参与"""
+        rng = np.random.default_rng(7)
+        values = rng.uniform(0, 100, 500)
+        ring = MetricRing(capacity=300)
+        for t, value in enumerate(values):
+            ring.append(float(t), None if t % 50 == 0 else float(value))
+        window = values[400:]
+        window = window[[t % 50 != 0 for t in range(400, 500)]]
+        stats = ring.stats(seconds=99, now=499)
+        self.assertEqual(stats.samples, len(window))
+        self.assertAlmostEqual(stats.mean, window.mean())
+        self.assertEqual((stats.min, stats.max), (window.min(), window.max()))
+        self.assertAlmostEqual(stats.p95, np.percentile(window, 95))
+        self.assertTrue(stats.min <= stats.ewma <= stats.max)
+
+    def test_rate_and_ewma(self):
+        """测试线性增长的斜率，EWMA 偏向近期样本"""
+        ring = MetricRing(capacity=100)
+        for t in range(0, 600, 10):
+            ring.append(float(t), 10.0 + t / 60)
+        stats = ring.stats()
+        self.assertAlmostEqual(stats.rate * 60, 1.0)
+        self.assertGreater(stats.ewma, stats.mean)
+
+    def test_empty(self):
+        """测试无有效样本时统计为 NaN，导出为 None"""
+        ring = MetricRing(capacity=4)
+        ring.append(1.0, None)
+        stats = ring.stats()
+        self.assertEqual(stats.samples, 0)
+        self.assertTrue(math.isnan(stats.mean))
+        self.assertIsNone(stats.to_dict()["p95"])
+        with self.assertRaises(ValueError):
+            MetricRing(capacity=0)
+
+
+class TestMetricHistory(unittest.TestCase):
+    """测试共享历史"""
+
+    def test_from_config_bounded(self):
+        """测试容量与指标由配置决定，内存固定"""
+        history = MetricHistory.from_config(
+            {"monitoring": {"history": {"capacity": 10, "metrics": ["cpu_usage"]}}}
+        )
+        for t in range(100):
+            history.record({"cpu_usage": 50.0, "network_status": "connected"}, t)
+        self.assertEqual(list(history.rings), ["cpu_usage"])
+        self.assertEqual(history.nbytes, 160)
+        self.assertEqual(history.stats("cpu_usage").samples, 10)
+        self.assertEqual(history.stats("missing").samples, 0)
+
+    def test_windowed_alert_rule(self):
+        """测试告警规则比较窗口统计量而不是单个读数"""
+        history = MetricHistory(["cpu_usage"], capacity=100)
+        config = {
+            "monitoring": {
+                "alerts": {
+                    "rules": [
+                        {
+                            "name": "cpu_p95",
+                            "metric": "cpu_usage",
+                            "stat": "p95",
+                            "window": 60,
+                            "threshold": 90,
+                        }
+                    ]
+                }
+            }
+        }
+        engine = AlertEngine(parse_rules(config), metrics=history)
+        fired = []
+        for t in range(0, 200, 10):
+            sample = {"cpu_usage": 95.0 if t in (50, 60) else 20.0}
+            history.record(sample, t)
+            fired += engine.evaluate(sample, now=t)
+        # 单次尖峰不足以让 p95 越过阈值，第二次尖峰后触发，移出窗口后恢复
+        self.assertEqual([(a.state, a.timestamp) for a in fired][0], ("firing", 60))
+        self.assertEqual([a.state for a in fired], ["firing", "resolved"])
+        with self.assertRaises(ValueError):
+            config["monitoring"]["alerts"]["rules"][0]["stat"] = "median"
+            parse_rules(config)
+
+
+if __name__ == "__main__":
+    unittest.main()
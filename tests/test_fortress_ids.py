@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞入侵检测引擎单元测试
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_ids import (
+    IntrusionDetector,
+    LogTailer,
+    RateRule,
+    SignatureSet,
+    SlidingWindowCounter,
+)
+
+FAILED = "sshd[1]: Failed password for root from {ip} port 50022 ssh2"
+
+
+class TestSignatureSet(unittest.TestCase):
+    """测试多模式匹配"""
+
+    def test_overlapping_matches(self):
+        """测试重叠与互为前缀的模式都被报告"""
+        patterns = ["he", "she", "his", "hers", "her"]
+        matcher = SignatureSet(patterns)
+        found = {(pos, patterns[i]) for pos, i in matcher.find_all("ushers")}
+        self.assertEqual(found, {(1, "she"), (2, "he"), (2, "her"), (2, "hers")})
+        self.assertTrue(matcher.search("this"))
+        self.assertFalse(matcher.search("xyz"))
+
+    def test_matches_naive_search(self):
+        """测试与逐个 find 的结果一致，且特殊字符被转义"""
+        patterns = ["a.b", "(x", "ab", "b", "aab", "[0-9]"]
+        matcher = SignatureSet(patterns)
+        text = "aab a.b (x [0-9] ab"
+        expected = {
+            (pos, i)
+            for i, p in enumerate(patterns)
+            for pos in range(len(text))
+            if text.startswith(p, pos)
+        }
+        self.assertEqual(set(matcher.find_all(text)), expected)
+
+
+class TestSlidingWindowCounter(unittest.TestCase):
+    """测试滑动窗口计数"""
+
+    def test_window_expiry(self):
+        """测试超出窗口的计数过期"""
+        counter = SlidingWindowCounter(window=60, buckets=6)
+        for t in range(0, 50, 10):
+            counter.add("1.2.3.4", t)
+        self.assertEqual(counter.add("1.2.3.4", 55), 6)
+        self.assertEqual(counter.count("1.2.3.4", 75), 4)
+        self.assertEqual(counter.add("1.2.3.4", 500), 1)
+
+    def test_bounded_keys(self):
+        """测试跟踪键数受限，淘汰最久未更新的键"""
+        counter = SlidingWindowCounter(window=60, max_keys=100)
+        for i in range(1000):
+            counter.add(f"10.0.{i // 256}.{i % 256}", 1.0)
+        self.assertEqual(len(counter), 100)
+        self.assertEqual(counter.evicted, 900)
+        self.assertEqual(counter.count("10.0.0.0", 1.0), 0)
+
+
+class TestIntrusionDetector(unittest.TestCase):
+    """测试检测流水线"""
+
+    def setUp(self):
+        self.detector = IntrusionDetector(
+            signatures=["Invalid user", "/etc/passwd"],
+            rate_rules=[RateRule("ssh_bruteforce", "failed password", 2222, 60, 5)],
+        )
+
+    def test_bruteforce_alert_once_at_threshold(self):
+        """测试同一来源达到阈值时告警一次"""
+        alerts = []
+        for i in range(8):
+            alerts += self.detector.process(
+                FAILED.format(ip="198.51.100.7"), timestamp=i, port=2222
+            )
+        self.assertEqual(len(alerts), 1)
+        self.assertEqual(alerts[0].kind, "rate")
+        self.assertEqual(alerts[0].source_ip, "198.51.100.7")
+        self.assertEqual(alerts[0].hits, 5)
+
+    def test_port_filter(self):
+        """测试其他端口的失败登录不计入"""
+        for i in range(10):
+            self.assertEqual(
+                self.detector.process(
+                    FAILED.format(ip="198.51.100.8"), timestamp=i, port=22
+                ),
+                [],
+            )
+        line = "IN=eth0 SRC=198.51.100.9 DST=192.168.1.100 DPT=2222 failed password"
+        alerts = []
+        for i in range(5):
+            alerts += self.detector.process(line, timestamp=i)
+        self.assertEqual([a.source_ip for a in alerts], ["198.51.100.9"])
+
+    def test_signature_alert(self):
+        """测试特征命中 (大小写不敏感)"""
+        alerts = self.detector.process("GET /../../ETC/PASSWD from 203.0.113.5")
+        self.assertEqual(
+            [(a.kind, a.rule) for a in alerts], [("signature", "/etc/passwd")]
+        )
+        self.assertEqual(self.detector.stats()["matched"], 1)
+
+    def test_from_config(self):
+        """测试按 security.intrusion_detection 创建"""
+        config = {
+            "security": {
+                "intrusion_detection": {
+                    "signatures": ["cmd.exe"],
+                    "rate_rules": [{"name": "r", "signature": "x", "threshold": 3}],
+                }
+            }
+        }
+        detector = IntrusionDetector.from_config(config)
+        self.assertEqual(detector.matcher.patterns, ["cmd.exe", "x"])
+        self.assertEqual(detector.rate_rules[0].window, 60)
+
+
+class TestTailFiles(unittest.TestCase):
+    """测试日志跟踪"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "auth.log")
+        with open(self.path, "w") as f:
+            f.write("old line\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_lines_appended_before_iteration(self):
+        """测试构造后、开始迭代前追加的行不会丢失"""
+        tailer = LogTailer([(self.path, 2222)], threading.Event())
+        with open(self.path, "a") as f:
+            f.write("first\n")
+        self.assertEqual(tailer.poll(), [(2222, "first")])
+        tailer.close()
+
+    def test_partial_line_and_rotation(self):
+        """测试不完整行与文件轮转"""
+        tailer = LogTailer([(self.path, 2222)], threading.Event(), from_end=False)
+        self.assertEqual(tailer.poll(), [(2222, "old line")])
+        with open(self.path, "a") as f:
+            f.write("second-part")
+        self.assertEqual(tailer.poll(), [])
+        with open(self.path, "a") as f:
+            f.write("-done\n")
+        self.assertEqual(tailer.poll(), [(2222, "second-part-done")])
+
+        os.rename(self.path, self.path + ".1")
+        with open(self.path, "w") as f:
+            f.write("rotated\n")
+        tailer.poll()  # 发现 inode 变化并重新打开
+        self.assertEqual(tailer.poll(), [(2222, "rotated")])
+        tailer.close()
+
+    def test_iteration_stops_on_event(self):
+        """测试 stop_event 置位后迭代结束"""
+        stop = threading.Event()
+        tailer = LogTailer([(self.path, None)], stop, poll_interval=0.01)
+        with open(self.path, "a") as f:
+            f.write("line\n")
+        collected = []
+
+        def consume():
+            for item in tailer:
+                collected.append(item)
+                stop.set()
+
+        thread = threading.Thread(target=consume, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(collected, [(None, "line")])
+
+
+if __name__ == "__main__":
+    unittest.main()
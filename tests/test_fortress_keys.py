@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞会话密钥轮换单元测试
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_crypto import DecryptionError
+from fortress_keys import (
+    SessionKeyManager,
+    derive_file_key,
+    derive_session_key,
+    load_master_key,
+    parse_duration,
+    resolve_secret,
+)
+
+
+class TestMasterKey(unittest.TestCase):
+    """测试主密钥解析"""
+
+    def test_resolve_secret_placeholder(self):
+        """测试占位符从环境变量读取"""
+        with patch.dict(os.environ, {"FORTRESS_MASTER_KEY": "abc"}):
+            self.assertEqual(
+                resolve_secret("${{ secrets.FORTRESS_MASTER_KEY }}"), "abc"
+            )
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(resolve_secret("${{ secrets.FORTRESS_MASTER_KEY }}"))
+
+    def test_load_master_key(self):
+        """测试十六进制主密钥与长度校验"""
+        key = os.urandom(32)
+        self.assertEqual(load_master_key({"keys": {"master_key": key.hex()}}), key)
+        self.assertIsNone(load_master_key({}))
+        with self.assertRaises(ValueError):
+            load_master_key({"keys": {"master_key": "00" * 16}})
+
+    def test_file_key_is_separate(self):
+        """测试文件加密密钥与主密钥、会话密钥均不同"""
+        master = os.urandom(32)
+        file_key = derive_file_key(master)
+        self.assertEqual(len(file_key), 32)
+        self.assertEqual(file_key, derive_file_key(master))
+        self.assertNotEqual(file_key, master)
+        self.assertNotEqual(file_key, derive_session_key(master, 0))
+
+    def test_parse_duration(self):
+        """测试轮换周期的时长单位"""
+        self.assertEqual(parse_duration("30m"), 1800)
+        self.assertEqual(parse_duration("45s"), 45)
+        self.assertEqual(parse_duration("24h"), 86400)
+        self.assertEqual(parse_duration("1w"), 7 * 86400)
+        self.assertEqual(parse_duration(90), 90)
+        with self.assertRaises(ValueError):
+            parse_duration("soon")
+
+
+class TestSessionKeyManager(unittest.TestCase):
+    """测试会话密钥轮换"""
+
+    def setUp(self):
+        self.master = os.urandom(32)
+        self.manager = SessionKeyManager(self.master, rotation_interval=3600, history=2)
+        self.now = time.time()
+
+    def advance(self, manager=None):
+        """把模拟时钟推进一个周期并轮换"""
+        self.now += 3600
+        return (manager or self.manager).rotate(now=self.now)
+
+    def test_derivation_is_deterministic(self):
+        """测试同一主密钥与编号派生出相同密钥"""
+        self.assertEqual(
+            derive_session_key(self.master, 7), derive_session_key(self.master, 7)
+        )
+        self.assertNotEqual(
+            derive_session_key(self.master, 7), derive_session_key(self.master, 8)
+        )
+
+    def test_old_keys_decrypt_until_expired(self):
+        """测试轮换后旧消息在历史窗口内仍可解密"""
+        blob = self.manager.encrypt(b"secret", aad=b"ctx")
+        old_id = self.manager.current.key_id
+        self.advance()
+        self.advance()
+        self.assertEqual(self.manager.decrypt(blob, aad=b"ctx"), b"secret")
+        with self.assertRaises(DecryptionError):
+            self.manager.decrypt(blob, aad=b"other")
+
+        self.advance()
+        self.assertNotIn(old_id, self.manager.key_ids())
+        with self.assertRaises(DecryptionError):
+            self.manager.decrypt(blob, aad=b"ctx")
+
+    def test_restart_rederives_history(self):
+        """测试重启后仍能解密历史窗口内的消息"""
+        blob = self.manager.encrypt(b"payload")
+        restarted = SessionKeyManager(self.master, rotation_interval=3600, history=2)
+        self.assertEqual(restarted.decrypt(blob), b"payload")
+
+    def test_key_id_follows_epoch(self):
+        """测试同一周期内轮换不改变密钥，编号不会超前于周期"""
+        current = self.manager.current
+        self.assertIs(self.manager.rotate(now=self.now), current)
+        self.assertEqual(self.manager.rotations, 0)
+        self.assertEqual(self.advance().key_id, int(self.now // 3600))
+        # 轮换后加密的消息在重启 (按真实时间重建) 后仍可解密
+        blob = self.manager.encrypt(b"later")
+        restarted = SessionKeyManager(self.master, rotation_interval=3600, history=2)
+        restarted.rotate(now=self.now)
+        self.assertEqual(restarted.decrypt(blob), b"later")
+
+    def test_readers_during_rotation(self):
+        """测试并发轮换时加解密不出错"""
+        manager = SessionKeyManager(self.master, rotation_interval=3600, history=256)
+        errors = []
+        stop = threading.Event()
+
+        def reader():
+            while not stop.is_set():
+                try:
+                    manager.decrypt(manager.encrypt(b"x" * 64))
+                except DecryptionError as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for _ in range(200):
+            self.advance(manager)
+        stop.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(manager.rotations, 200)
+        self.assertEqual(errors, [])
+
+    def test_from_config(self):
+        """测试按 keys.session_keys 创建"""
+        config = {
+            "keys": {
+                "session_keys": {
+                    "rotation_interval": "30m",
+                    "algorithm": "AES-256-GCM",
+                    "history": 5,
+                }
+            }
+        }
+        manager = SessionKeyManager.from_config(config, self.master)
+        self.assertEqual(manager.rotation_interval, 30 * 60)
+        self.assertEqual(manager.algorithm, "AES-256-GCM")
+        self.assertEqual(len(manager.key_ids()), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
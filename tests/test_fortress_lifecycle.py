@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞模块生命周期单元测试
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import unittest
+from typing import List, Tuple
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_lifecycle import ModuleLifecycle, layers, parse_modules
+
+
+def sleeper(seconds, log=None, name=None, result=True):
+    def action():
+        if log is not None:
+            log.append(name)
+        time.sleep(seconds)
+        return result
+
+    return action
+
+
+class TestParseModules(unittest.TestCase):
+    """测试模块配置解析"""
+
+    def test_layers_by_dependency_and_priority(self):
+        """测试按依赖分层，层内按优先级排序"""
+        specs = parse_modules(
+            [
+                {"name": "c", "priority": "medium", "depends_on": ["a"]},
+                {"name": "a", "priority": "critical"},
+                {"name": "b", "priority": "high", "depends_on": "a"},
+                {"name": "d", "priority": "low"},
+            ]
+        )
+        self.assertEqual(
+            [[s.name for s in layer] for layer in layers(specs)],
+            [["a", "d"], ["b", "c"]],
+        )
+
+    def test_invalid_dependencies(self):
+        """测试未知依赖与循环依赖被拒绝"""
+        with self.assertRaises(ValueError):
+            parse_modules([{"name": "a", "depends_on": ["x"]}])
+        with self.assertRaises(ValueError):
+            parse_modules(
+                [
+                    {"name": "a", "depends_on": ["b"]},
+                    {"name": "b", "depends_on": ["a"]},
+                ]
+            )
+
+    def test_legacy_defense_start(self):
+        """测试旧配置的防御系统未声明 start 时沿用防火墙与入侵检测并警告"""
+        logger = logging.getLogger("FortressGuardian")
+        with self.assertLogs(logger, "WARNING") as logs:
+            specs = parse_modules([{"name": "防御系统"}, {"name": "数据核心"}], logger)
+        self.assertEqual(specs[0].actions, ("firewall", "intrusion_detection"))
+        self.assertEqual(specs[1].actions, ())
+        self.assertIn("防御系统", logs.output[0])
+        explicit = parse_modules([{"name": "防御系统", "start": []}])
+        self.assertEqual(explicit[0].actions, ())
+
+
+class TestModuleLifecycle(unittest.TestCase):
+    """测试并发启动"""
+
+    def test_independent_modules_start_concurrently(self):
+        """测试总耗时取决于最长依赖链而不是各步骤之和"""
+        specs = parse_modules(
+            [
+                {"name": "core", "start": ["core"]},
+                {"name": "a", "depends_on": ["core"], "start": ["slow"]},
+                {"name": "b", "depends_on": ["core"], "start": ["slow"]},
+                {"name": "c", "depends_on": ["core"], "start": ["slow"]},
+            ]
+        )
+        lifecycle = ModuleLifecycle(
+            specs, {"core": sleeper(0.05), "slow": sleeper(0.2)}
+        )
+        report = lifecycle.start_all()
+        self.assertTrue(report.ok)
+        self.assertLess(report.total, 0.5)
+        for name in ("a", "b", "c"):
+            self.assertGreaterEqual(
+                report.timings[name].started, report.timings["core"].finished
+            )
+            self.assertGreaterEqual(report.timings[name].duration, 0.2)
+        self.assertEqual(report.critical_path[0], "core")
+        self.assertEqual(len(report.critical_path), 2)
+        self.assertIn("关键路径", report.summary())
+
+    def test_priority_order_when_workers_limited(self):
+        """测试同时可启动的模块按优先级提交"""
+        log: List[str] = []
+        specs = parse_modules(
+            [
+                {"name": "low", "priority": "low", "start": ["low"]},
+                {"name": "critical", "priority": "critical", "start": ["critical"]},
+                {"name": "high", "priority": "high", "start": ["high"]},
+            ]
+        )
+        actions = {n: sleeper(0.01, log, n) for n in ("low", "critical", "high")}
+        ModuleLifecycle(specs, actions, max_workers=1).start_all()
+        self.assertEqual(log, ["critical", "high", "low"])
+
+    def test_failure_skips_dependents(self):
+        """测试启动失败的模块的下游被跳过，其他分支照常启动"""
+        changes: List[Tuple[str, str]] = []
+        specs = parse_modules(
+            [
+                {"name": "bad", "start": ["fail"]},
+                {"name": "child", "depends_on": ["bad"]},
+                {"name": "grandchild", "depends_on": ["child"]},
+                {"name": "other"},
+            ]
+        )
+        report = ModuleLifecycle(
+            specs,
+            {"fail": sleeper(0, result=False)},
+            on_change=lambda name, status: changes.append((name, status)),
+        ).start_all()
+        self.assertFalse(report.ok)
+        self.assertEqual(report.timings["bad"].status, "failed")
+        self.assertEqual(report.timings["child"].status, "skipped")
+        self.assertEqual(report.timings["grandchild"].status, "skipped")
+        self.assertEqual(report.timings["other"].status, "ready")
+        self.assertIn(("bad", "starting"), changes)
+        self.assertIn(("other", "ready"), changes)
+
+    def test_readiness_probe(self):
+        """测试等待就绪探针，探针超时视为失败"""
+        ready = threading.Event()
+        threading.Timer(0.1, ready.set).start()
+        specs = parse_modules(
+            [
+                {"name": "svc", "ready_when": ["up"]},
+                {"name": "never", "ready_when": ["down"], "ready_timeout": 0.1},
+            ]
+        )
+        report = ModuleLifecycle(
+            specs, {}, {"up": ready.is_set, "down": lambda: False}
+        ).start_all()
+        self.assertEqual(report.timings["svc"].status, "ready")
+        self.assertGreaterEqual(report.timings["svc"].duration, 0.05)
+        self.assertEqual(report.timings["never"].status, "failed")
+        self.assertIn("down", report.timings["never"].error or "")
+
+    def test_unregistered_action(self):
+        """测试引用未注册的启动动作时报错"""
+        specs = parse_modules([{"name": "a", "start": ["missing"]}])
+        with self.assertRaises(ValueError):
+            ModuleLifecycle(specs, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
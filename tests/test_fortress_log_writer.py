@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞健康日志写入器单元测试
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_log_writer import HealthLogWriter, parse_retention
+
+
+class TestHealthLogWriter(unittest.TestCase):
+    """测试批量日志写入器"""
+
+    def setUp(self):
+        """创建临时日志目录"""
+        self.log_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """删除临时日志目录"""
+        shutil.rmtree(self.log_dir, ignore_errors=True)
+
+    def _read_lines(self, day: str):
+        path = os.path.join(self.log_dir, f"fortress_health_{day}.log")
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_batched_write(self):
+        """测试批量写入并在关闭时落盘"""
+        writer = HealthLogWriter(log_dir=self.log_dir, batch_size=16, fsync="batch")
+        writer.start()
+        for i in range(100):
+            self.assertTrue(writer.submit({"seq": i, "cpu_usage": 1.5}))
+        writer.close()
+
+        records = self._read_lines(datetime.now().strftime("%Y%m%d"))
+        self.assertEqual([r["seq"] for r in records], list(range(100)))
+        self.assertEqual(writer.stats()["written"], 100)
+        self.assertLessEqual(writer.stats()["batches"], 100)
+
+    def test_midnight_rotation(self):
+        """测试跨日记录写入各自的文件"""
+        writer = HealthLogWriter(log_dir=self.log_dir)
+        writer._write_batch(
+            [
+                ("20240101", {"seq": 1}),
+                ("20240101", {"seq": 2}),
+                ("20240102", {"seq": 3}),
+            ]
+        )
+        writer._close_file()
+        self.assertEqual([r["seq"] for r in self._read_lines("20240101")], [1, 2])
+        self.assertEqual([r["seq"] for r in self._read_lines("20240102")], [3])
+
+    def test_queue_full_drops_and_counts(self):
+        """测试队列满时丢弃并计数，不阻塞调用方"""
+        writer = HealthLogWriter(log_dir=self.log_dir, queue_size=2)
+        # 不启动写入线程，模拟磁盘停滞
+        results = [writer.submit({"seq": i}) for i in range(5)]
+        self.assertEqual(results, [True, True, False, False, False])
+        self.assertEqual(writer.stats()["dropped"], 3)
+
+    def test_purge_expired(self):
+        """测试按保留期删除旧日志"""
+        for day in ("20240101", "20240301", "20240330"):
+            open(os.path.join(self.log_dir, f"fortress_health_{day}.log"), "w").close()
+        open(os.path.join(self.log_dir, "other.log"), "w").close()
+
+        writer = HealthLogWriter(log_dir=self.log_dir, retention_days=30)
+        removed = writer.purge_expired(now=datetime(2024, 3, 31))
+        self.assertEqual(
+            [os.path.basename(p) for p in removed], ["fortress_health_20240101.log"]
+        )
+        self.assertEqual(len(os.listdir(self.log_dir)), 3)
+
+    def test_parse_retention(self):
+        """测试保留期解析"""
+        self.assertEqual(parse_retention("90d"), 90)
+        self.assertEqual(parse_retention("2w"), 14)
+        self.assertEqual(parse_retention("12h"), 0.5)
+        self.assertIsNone(parse_retention(None))
+        with self.assertRaises(ValueError):
+            parse_retention("forever")
+
+
+if __name__ == "__main__":
+    unittest.main()
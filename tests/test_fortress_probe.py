@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞网络探测单元测试
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_probe import NetworkProber, ProbeTarget, _icmp_socket, parse_targets
+
+
+def listener() -> socket.socket:
+    """本地 TCP 监听套接字 (不 accept，内核完成握手)"""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(16)
+    return sock
+
+
+def closed_port() -> int:
+    """一个当前无人监听的本地端口"""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port: int = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class TestProbeConfig(unittest.TestCase):
+    """测试探测目标配置"""
+
+    def test_default_targets_from_firewall(self):
+        """测试未配置目标时探测内网地址上防火墙放行的端口"""
+        config = {
+            "network": {"internal_ip": "192.168.1.100"},
+            "security": {
+                "firewall": {
+                    "rules": [
+                        {"allow": "internal_network", "ports": [8080, 8443, 2222]},
+                        {"allow": "vpn", "ports": ["9000-9100", 8443]},
+                        {"deny": "external_access", "ports": [22]},
+                    ]
+                }
+            },
+            "monitoring": {"network_probe": {"icmp": True, "timeout": 1.5}},
+        }
+        targets = parse_targets(config)
+        self.assertEqual(
+            [t.name for t in targets],
+            [
+                "tcp:192.168.1.100:8080",
+                "tcp:192.168.1.100:8443",
+                "tcp:192.168.1.100:2222",
+                "icmp:192.168.1.100",
+            ],
+        )
+        self.assertTrue(all(t.timeout == 1.5 for t in targets))
+        self.assertEqual(parse_targets({}), [])
+
+    def test_invalid_target(self):
+        """测试无效的类型或端口抛出 ValueError"""
+        for entry in ({"kind": "udp", "host": "h"}, {"host": "h", "port": 70000}):
+            config = {"monitoring": {"network_probe": {"targets": [entry]}}}
+            with self.assertRaises(ValueError):
+                parse_targets(config)
+
+
+class TestNetworkProber(unittest.TestCase):
+    """测试并发探测"""
+
+    def setUp(self):
+        """启动两个本地监听"""
+        self.listeners = [listener(), listener()]
+        for sock in self.listeners:
+            self.addCleanup(sock.close)
+        self.ports = [s.getsockname()[1] for s in self.listeners]
+
+    def tcp(self, name: str, port: int, **kwargs) -> ProbeTarget:
+        return ProbeTarget(name, "tcp", "127.0.0.1", port, **kwargs)
+
+    def test_local_listeners(self):
+        """测试可达目标记录往返时间，拒绝连接的目标记为失败"""
+        prober = NetworkProber(
+            [
+                self.tcp("a", self.ports[0]),
+                self.tcp("b", self.ports[1]),
+                self.tcp("closed", closed_port()),
+            ],
+            quorum=2,
+        )
+        self.assertEqual(prober.check(), "connected")
+        results = prober.results
+        self.assertTrue(results["a"].ok and results["b"].ok)
+        assert results["a"].rtt is not None
+        self.assertLess(results["a"].rtt, 1.0)
+        self.assertFalse(results["closed"].ok)
+        self.assertIsNone(results["closed"].rtt)
+        self.assertTrue(results["closed"].error)
+
+        prober.quorum = 3
+        self.assertEqual(prober.status(), "disconnected")
+        self.assertEqual(NetworkProber([]).check(), "unknown")
+
+    def test_round_takes_slowest_target(self):
+        """测试目标并发探测，慢目标各自超时且不累加"""
+
+        async def slow_connect(target):
+            await asyncio.sleep(0.3 if target.name.startswith("slow") else 5)
+
+        targets = [self.tcp(f"slow{i}", self.ports[0], timeout=1.0) for i in range(5)]
+        targets.append(self.tcp("hung", self.ports[0], timeout=0.2))
+        prober = NetworkProber(targets)
+        with patch.object(prober, "_tcp", side_effect=slow_connect):
+            start = time.monotonic()
+            self.assertEqual(prober.check(), "connected")
+            elapsed = time.monotonic() - start
+        self.assertLess(elapsed, 0.9)
+        self.assertEqual(prober.results["hung"].error, "timeout")
+        self.assertTrue(prober.results["slow4"].ok)
+
+    def test_results_cached_for_ttl(self):
+        """测试 TTL 内复用缓存结果，只重新探测过期的目标"""
+        prober = NetworkProber(
+            [
+                self.tcp("short", self.ports[0], ttl=10),
+                self.tcp("long", self.ports[1], ttl=100),
+            ]
+        )
+        prober.check(now=1000)
+        prober.check(now=1005)
+        self.assertEqual(prober.rounds, 1)
+        first_long = prober.results["long"]
+        prober.check(now=1000 + 10)
+        self.assertEqual(prober.rounds, 2)
+        self.assertIs(prober.results["long"], first_long)
+        self.assertEqual(prober.stale(1100), prober.targets)
+
+    def test_icmp_loopback(self):
+        """测试 ICMP 回显 (无 ICMP 套接字权限时跳过)"""
+        try:
+            _icmp_socket()[0].close()
+        except PermissionError:
+            self.skipTest("无 ICMP 套接字权限")
+        prober = NetworkProber([ProbeTarget("lo", "icmp", "127.0.0.1", timeout=2)])
+        self.assertEqual(prober.check(), "connected")
+        self.assertIsNotNone(prober.results["lo"].rtt)
+
+
+if __name__ == "__main__":
+    unittest.main()
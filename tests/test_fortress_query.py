@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞健康日志查询单元测试
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_query import HealthLogQuery, SparseIndex, parse_predicate
+
+
+class TestHealthLogQuery(unittest.TestCase):
+    """测试时间范围查询与稀疏索引"""
+
+    def setUp(self):
+        """写入一天的分钟级日志"""
+        self.log_dir = tempfile.mkdtemp()
+        self.day = datetime(2024, 1, 14)
+        self.log_path = os.path.join(self.log_dir, "fortress_health_20240114.log")
+        self._append(self.day, 24 * 60)
+        self.query = HealthLogQuery(self.log_dir)
+
+    def tearDown(self):
+        """删除临时日志目录"""
+        shutil.rmtree(self.log_dir, ignore_errors=True)
+
+    def _append(self, start: datetime, minutes: int):
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            for i in range(minutes):
+                ts = start + timedelta(minutes=i)
+                f.write(
+                    json.dumps(
+                        {
+                            "timestamp": ts.isoformat(),
+                            "cpu_usage": float(ts.minute),
+                            "memory_usage": 50.0,
+                            "network_status": "connected",
+                        }
+                    )
+                    + "\n"
+                )
+
+    def test_range_query(self):
+        """测试时间范围查询"""
+        start = self.day.replace(hour=3)
+        records = list(self.query.query(start, start + timedelta(minutes=5)))
+        self.assertEqual(len(records), 5)
+        self.assertEqual(records[0]["timestamp"], "2024-01-14T03:00:00")
+
+    def test_seeks_instead_of_scanning(self):
+        """测试查询直接定位到起始偏移，不解析之前的记录"""
+        start = self.day.replace(hour=23)
+        self.query._index_for(self.log_path)  # 预先建立索引
+
+        with patch("fortress_query.json.loads", wraps=json.loads) as loads:
+            records = list(self.query.query(start, start + timedelta(minutes=2)))
+        self.assertEqual(len(records), 2)
+        self.assertLessEqual(loads.call_count, 3)
+
+    def test_projection_and_predicate(self):
+        """测试字段投影与条件过滤"""
+        start = self.day.replace(hour=5)
+        records = list(
+            self.query.query(
+                start,
+                start + timedelta(hours=1),
+                fields=["cpu_usage"],
+                where="cpu_usage >= 55",
+            )
+        )
+        self.assertEqual(len(records), 5)
+        self.assertEqual(set(records[0]), {"timestamp", "cpu_usage"})
+
+    def test_incremental_index(self):
+        """测试追加记录后只增量索引新增部分"""
+        index = SparseIndex(self.log_path)
+        self.assertEqual(index.update(), 24 * 60)
+        end = index.indexed_end
+
+        self._append(datetime(2024, 1, 15), 3)
+        reloaded = SparseIndex(self.log_path)
+        self.assertEqual(reloaded.indexed_end, end)
+        self.assertEqual(reloaded.update(), 3)
+        self.assertEqual(len(reloaded.minutes), 24 * 60 + 3)
+
+    def test_partial_line_not_indexed(self):
+        """测试未写完的行留到下次索引"""
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write('{"timestamp": "2024-01-15T00:00')
+        index = SparseIndex(self.log_path)
+        index.update()
+        self.assertLess(index.indexed_end, os.path.getsize(self.log_path))
+
+    def test_parse_predicate(self):
+        """测试条件表达式解析"""
+        self.assertTrue(parse_predicate("cpu_usage > 85")({"cpu_usage": 90}))
+        self.assertFalse(parse_predicate("cpu_usage > 85")({"cpu_usage": 10}))
+        self.assertTrue(
+            parse_predicate("network_status == connected")(
+                {"network_status": "connected"}
+            )
+        )
+        with self.assertRaises(ValueError):
+            parse_predicate("cpu_usage ~ 1")
+
+
+if __name__ == "__main__":
+    unittest.main()
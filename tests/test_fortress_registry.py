@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞模块状态注册表单元测试
+"""
+
+import os
+import sys
+import threading
+import unittest
+from typing import List
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_registry import ModuleRecord, ModuleRegistry
+
+
+def make_registry(**kwargs):
+    return ModuleRegistry(
+        [
+            ModuleRecord("数据核心", "active", "critical"),
+            ModuleRecord("防御系统", "standby", "high", ["数据核心"]),
+        ],
+        **kwargs,
+    )
+
+
+class TestModuleRegistry(unittest.TestCase):
+    """测试写时复制注册表"""
+
+    def test_snapshots_are_immutable_versions(self):
+        """测试读者拿到的快照不随写入变化，读取不复制"""
+        registry = make_registry()
+        before = registry.snapshot()
+        self.assertIs(registry.snapshot(), before)
+        self.assertIs(before.as_dict(), before.as_dict())
+
+        after = registry.update("防御系统", status="active")
+        self.assertEqual(before.version, 0)
+        self.assertEqual(after.version, 1)
+        self.assertEqual(before["防御系统"].status, "standby")
+        self.assertEqual(after["防御系统"].status, "active")
+        self.assertIs(after["数据核心"], before["数据核心"])
+        with self.assertRaises(AttributeError):
+            setattr(after["数据核心"], "extra", 1)
+        with self.assertRaises(TypeError):
+            after._records["x"] = ModuleRecord("x", "a", "b")
+
+    def test_unchanged_update_keeps_version(self):
+        """测试内容未变的写入不产生新版本与事件"""
+        registry = make_registry()
+        registry.update("数据核心", status="active")
+        self.assertEqual(registry.version, 0)
+        self.assertEqual(registry.changes_since(0), [])
+
+    def test_change_events(self):
+        """测试更新与整体替换逐个生成增删改事件"""
+        registry = make_registry()
+        registry.update("防御系统", status="active")
+        registry.replace_all(
+            [
+                ModuleRecord("数据核心", "active", "critical"),
+                ModuleRecord("传输通道", "operational", "medium"),
+            ]
+        )
+        events = registry.changes_since(0)
+        assert events is not None
+        self.assertEqual(
+            [(e.version, e.kind, e.name) for e in events],
+            [
+                (1, "changed", "防御系统"),
+                (2, "removed", "防御系统"),
+                (3, "added", "传输通道"),
+            ],
+        )
+        self.assertEqual(events[-1].to_dict()["status"], "operational")
+
+    def test_changes_since(self):
+        """测试按版本拉取增量，历史不足时要求全量"""
+        registry = make_registry(history=2)
+        self.assertEqual(registry.changes_since(0), [])
+        for status in ("a", "b", "c"):
+            registry.update("防御系统", status=status)
+        changes = registry.changes_since(1)
+        assert changes is not None
+        self.assertEqual([e.record.status for e in changes if e.record], ["b", "c"])
+        self.assertIsNone(registry.changes_since(0))
+        self.assertEqual(registry.changes_since(3), [])
+
+    def test_concurrent_readers_and_writers(self):
+        """测试并发写入时读者总能看到完整且单调递增的版本"""
+        registry = make_registry()
+        stop = threading.Event()
+        errors: List[str] = []
+
+        def writer(name):
+            for i in range(500):
+                registry.update(name, status=f"s{i}")
+
+        def reader():
+            last = -1
+            while not stop.is_set():
+                snapshot = registry.snapshot()
+                if len(snapshot.as_dict()) != 2 or snapshot.version < last:
+                    errors.append("不一致")
+                last = snapshot.version
+
+        readers = [threading.Thread(target=reader) for _ in range(2)]
+        writers = [
+            threading.Thread(target=writer, args=(name,))
+            for name in ("数据核心", "防御系统")
+        ]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        stop.set()
+        for thread in readers:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(registry.version, 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞控制台渲染层单元测试
+"""
+
+import os
+import sys
+import unittest
+from typing import List, Tuple
+from unittest.mock import MagicMock, patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_console import FortressConsole
+from fortress_render import DiffRenderer, Frame, text_width
+
+
+class FakeScreen:
+    """记录 addstr 调用的伪 curses 窗口"""
+
+    def __init__(self, height: int = 30, width: int = 100):
+        self.height = height
+        self.width = width
+        self.calls: List[Tuple[int, int, str, int]] = []
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def addstr(self, y, x, text, attr=0):
+        self.calls.append((y, x, text, attr))
+
+    def noutrefresh(self):
+        pass
+
+
+class TestDiffRenderer(unittest.TestCase):
+    """测试差异渲染"""
+
+    def setUp(self):
+        """创建伪窗口与渲染器"""
+        self.screen = FakeScreen(5, 40)
+        self.doupdate = MagicMock()
+        self.renderer = DiffRenderer(self.screen, self.doupdate)
+
+    def _frame(self, text: str) -> Frame:
+        frame = Frame(5, 40)
+        frame.addstr(1, 2, text, 7)
+        return frame
+
+    def test_unchanged_frame_draws_nothing(self):
+        """测试帧未变化时没有任何输出"""
+        self.renderer.render(self._frame("CPU: 10%"))
+        self.screen.calls.clear()
+        self.doupdate.reset_mock()
+
+        self.assertEqual(self.renderer.render(self._frame("CPU: 10%")), 0)
+        self.assertEqual(self.screen.calls, [])
+        self.doupdate.assert_not_called()
+
+    def test_only_changed_run_is_drawn(self):
+        """测试只重绘变化的区段"""
+        self.renderer.render(self._frame("CPU: 10%"))
+        self.screen.calls.clear()
+        self.doupdate.reset_mock()
+
+        self.assertEqual(self.renderer.render(self._frame("CPU: 25%")), 2)
+        self.assertEqual(self.screen.calls, [(1, 7, "25", 7)])
+        self.doupdate.assert_called_once()
+
+    def test_wide_characters(self):
+        """测试宽字符按两列计算且不会被从中间重绘"""
+        self.assertEqual(text_width("模块a"), 5)
+        self.renderer.render(self._frame("模块状态"))
+        self.screen.calls.clear()
+
+        self.renderer.render(self._frame("模块异常"))
+        self.assertEqual(self.screen.calls, [(1, 6, "异常", 7)])
+
+    def test_invalidate_forces_full_redraw(self):
+        """测试失效后全量重绘"""
+        self.renderer.render(self._frame("x"))
+        self.renderer.invalidate()
+        self.assertEqual(self.renderer.render(self._frame("x")), 5 * 40)
+
+
+class TestConsoleFrame(unittest.TestCase):
+    """测试控制台离屏构建帧"""
+
+    @patch("curses.color_pair", return_value=0)
+    def test_idle_frames_are_empty_diffs(self, _):
+        """测试数据与时间不变时空闲帧不产生输出"""
+        console = FortressConsole(feed_path="/nonexistent/feed")
+        screen = FakeScreen()
+        console.screen = screen
+        console.renderer = DiffRenderer(screen)
+
+        with patch("fortress_console.datetime") as fake_datetime:
+            fake_datetime.now.return_value.strftime.return_value = "12:00:00"
+            console.renderer.render(console.build_frame())
+            screen.calls.clear()
+            self.assertEqual(console.renderer.render(console.build_frame()), 0)
+        self.assertEqual(screen.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
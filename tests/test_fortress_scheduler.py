@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞采集调度器单元测试
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_scheduler import LatencyHistogram, MetricScheduler
+
+
+class TestMetricScheduler(unittest.TestCase):
+    """测试采集调度器"""
+
+    def setUp(self):
+        """创建调度器"""
+        self.scheduler = MetricScheduler(max_workers=4)
+
+    def tearDown(self):
+        """停止调度器"""
+        self.scheduler.stop(timeout=1)
+
+    def test_slow_collector_does_not_block_others(self):
+        """测试慢探针不阻塞其他指标"""
+        release = threading.Event()
+        self.scheduler.add("fast", lambda: 1.0, interval=60, timeout=1)
+        self.scheduler.add(
+            "slow",
+            lambda: release.wait(2) and "ok",
+            interval=60,
+            timeout=5,
+            default="unknown",
+        )
+        self.scheduler.start()
+
+        deadline = time.monotonic() + 1
+        while self.scheduler.snapshot()["fast"] != 1.0:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        self.assertEqual(self.scheduler.snapshot()["slow"], "unknown")
+
+        release.set()
+        self.assertTrue(self.scheduler.wait_ready(1))
+        self.assertEqual(self.scheduler.snapshot()["slow"], "ok")
+
+    def test_per_collector_interval(self):
+        """测试每个采集器按自身周期执行"""
+        counts = {"a": 0, "b": 0}
+
+        def make(name):
+            def collect():
+                counts[name] += 1
+                return counts[name]
+
+            return collect
+
+        self.scheduler.add("a", make("a"), interval=0.05, timeout=1)
+        self.scheduler.add("b", make("b"), interval=60, timeout=1)
+        self.scheduler.start()
+        time.sleep(0.4)
+        self.assertGreaterEqual(counts["a"], 4)
+        self.assertEqual(counts["b"], 1)
+
+    def test_timeout_before_first_value(self):
+        """测试首次采集超时发布默认值 (不伪造读数) 并标记过期"""
+        block = threading.Event()
+        self.scheduler.add("hang", lambda: block.wait(5), interval=60, timeout=0.05)
+        self.scheduler.start()
+        self.assertTrue(self.scheduler.wait_ready(1))
+        self.assertIsNone(self.scheduler.snapshot()["hang"])
+        self.assertEqual(self.scheduler.stale(), ["hang"])
+        self.assertEqual(self.scheduler.latency_stats()["hang"]["timeouts"], 1)
+        block.set()
+
+    def test_timeout_keeps_last_value(self):
+        """测试超时保留上一次的值并标记过期，成功后清除标记"""
+        block = threading.Event()
+        calls = []
+
+        def collect():
+            calls.append(1)
+            if len(calls) == 2:
+                block.wait(5)
+            return float(len(calls))
+
+        self.scheduler.add("flaky", collect, interval=0.05, timeout=0.1)
+        self.scheduler.start()
+        deadline = time.monotonic() + 2
+        while self.scheduler.stale() != ["flaky"]:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        self.assertEqual(self.scheduler.snapshot()["flaky"], 1.0)
+
+        block.set()
+        while self.scheduler.stale():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        self.assertGreaterEqual(self.scheduler.snapshot()["flaky"], 3.0)
+
+    def test_error_keeps_last_value(self):
+        """测试采集异常不发布伪造的数值"""
+        self.scheduler.add(
+            "broken", lambda: 1 / 0, interval=60, timeout=1, default=None
+        )
+        self.scheduler.start()
+        self.assertTrue(self.scheduler.wait_ready(1))
+        self.assertIsNone(self.scheduler.snapshot()["broken"])
+        self.assertEqual(self.scheduler.stale(), ["broken"])
+        self.assertEqual(self.scheduler.latency_stats()["broken"]["errors"], 1)
+
+    def test_stop_wakes_immediately(self):
+        """测试停止事件立即唤醒调度线程"""
+        self.scheduler.add("a", lambda: 0, interval=3600, timeout=1)
+        self.scheduler.start()
+        self.scheduler.wait_ready(1)
+        start = time.monotonic()
+        self.scheduler.stop(timeout=2)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_latency_histogram(self):
+        """测试延迟直方图累计桶"""
+        histogram = LatencyHistogram(buckets=(0.01, 0.1))
+        for seconds in (0.005, 0.05, 0.5):
+            histogram.observe(seconds)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 3)
+        self.assertEqual([n for _, n in snapshot["buckets"]], [1, 2, 3])
+        self.assertAlmostEqual(snapshot["max"], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
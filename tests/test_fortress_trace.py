@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞热路径埋点单元测试
+"""
+
+import json
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from typing import List
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_trace import Tracer
+
+
+class TestTracer(unittest.TestCase):
+    """测试区段、计数器与导出"""
+
+    def setUp(self):
+        """创建独立的记录器与临时目录"""
+        self.tracer = Tracer(capacity=100)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """删除临时目录"""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_disabled_records_nothing(self):
+        """测试关闭时装饰器与上下文只透传调用"""
+
+        @self.tracer.traced("work")
+        def work(x):
+            return x * 2
+
+        self.assertEqual(work(21), 42)
+        self.assertEqual(work.__name__, "work")
+        with self.tracer.span("block"):
+            pass
+        self.tracer.count("hits")
+        self.assertEqual(len(self.tracer.events), 0)
+        self.assertEqual(self.tracer.histograms(), {})
+        self.assertEqual(self.tracer.counters(), {})
+
+    def test_spans_and_histograms(self):
+        """测试开启后区段计入直方图，异常时也记录"""
+        self.tracer.configure(True)
+
+        @self.tracer.traced()
+        def fail():
+            raise RuntimeError("boom")
+
+        for _ in range(3):
+            with self.tracer.span("collector.cpu"):
+                time.sleep(0.001)
+        with self.assertRaises(RuntimeError):
+            fail()
+        self.tracer.count("alerts", 2)
+        self.tracer.count("alerts")
+
+        histograms = self.tracer.histograms()
+        self.assertEqual(histograms["collector.cpu"]["count"], 3)
+        self.assertGreaterEqual(histograms["collector.cpu"]["max"], 0.001)
+        self.assertEqual(histograms[fail.__qualname__]["count"], 1)
+        self.assertEqual(self.tracer.counters(), {"alerts": 3})
+
+    def test_ring_buffer_bounded(self):
+        """测试只保留最近的区段，直方图仍累计全部"""
+        tracer = Tracer(capacity=10, enabled=True)
+        for _ in range(50):
+            with tracer.span("x"):
+                pass
+        self.assertEqual(len(tracer.events), 10)
+        self.assertEqual(tracer.histograms()["x"]["count"], 50)
+        tracer.configure(True, capacity=5)
+        self.assertEqual(len(tracer.events), 5)
+
+    def test_chrome_trace_dump(self):
+        """测试导出的文件是合法的 Chrome 追踪 JSON"""
+        self.tracer.configure(True)
+
+        def worker():
+            with self.tracer.span("guardian.log_health_data"):
+                pass
+
+        thread = threading.Thread(target=worker, name="bench-worker")
+        thread.start()
+        thread.join()
+        with self.tracer.span("guardian.monitor_iteration"):
+            pass
+
+        path = self.tracer.dump(self.tmp_dir)
+        self.assertTrue(os.path.basename(path).startswith("fortress_trace_"))
+        with open(path, encoding="utf-8") as f:
+            trace = json.load(f)
+        spans = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+        self.assertEqual(len(spans), 2)
+        self.assertEqual(spans[0]["cat"], "guardian")
+        self.assertNotEqual(spans[0]["tid"], spans[1]["tid"])
+        threads = [e["args"]["name"] for e in trace["traceEvents"] if e["ph"] == "M"]
+        self.assertIn("MainThread", threads)
+        buckets = trace["fortress"]["histograms"]["guardian.monitor_iteration"]
+        self.assertEqual(buckets["buckets"][-1], ["+Inf", 1])
+
+    @unittest.skipUnless(hasattr(signal, "SIGUSR2"), "需要 SIGUSR2")
+    def test_signal_enables_then_dumps(self):
+        """测试第一次信号开启追踪，第二次导出文件"""
+        previous = signal.getsignal(signal.SIGUSR2)
+        try:
+            self.assertTrue(self.tracer.install_signal("SIGUSR2", self.tmp_dir))
+            os.kill(os.getpid(), signal.SIGUSR2)
+            self.assertTrue(self.tracer.enabled)
+            with self.tracer.span("after_signal"):
+                pass
+            os.kill(os.getpid(), signal.SIGUSR2)
+            deadline = time.time() + 5
+            names: List[str] = []
+            while not names and time.time() < deadline:
+                names = [n for n in os.listdir(self.tmp_dir) if n.endswith(".json")]
+                time.sleep(0.01)
+            self.assertEqual(len(names), 1)
+        finally:
+            signal.signal(signal.SIGUSR2, previous)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据要塞列式时序存储单元测试
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortress_tsdb import ColumnStore
+
+
+def make_record(ts: float, cpu: float, network: str = "connected"):
+    return {
+        "timestamp": ts,
+        "cpu_usage": cpu,
+        "memory_usage": cpu / 2,
+        "disk_usage": 50.0,
+        "network_status": network,
+    }
+
+
+class TestColumnStore(unittest.TestCase):
+    """测试列式存储"""
+
+    def setUp(self):
+        """创建临时存储目录"""
+        self.root = tempfile.mkdtemp()
+        self.store = ColumnStore(self.root)
+
+    def tearDown(self):
+        """删除临时存储目录"""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_append_and_read_views(self):
+        """测试追加后通过mmap读取零拷贝视图"""
+        base = 1_700_000_000.0
+        self.store.append_many(make_record(base + i * 60, float(i)) for i in range(10))
+
+        columns = self.store.read(start=base + 120, end=base + 300)
+        self.assertEqual(list(columns["cpu_usage"]), [2.0, 3.0, 4.0])
+        self.assertEqual(columns["network_code"][0], 1)
+        self.assertIsInstance(columns["timestamp"].base, np.memmap)
+
+    def test_out_of_order_records_skipped(self):
+        """测试早于已有数据的记录被忽略"""
+        self.assertTrue(self.store.append(make_record(100.0, 1.0)))
+        self.assertFalse(self.store.append(make_record(50.0, 2.0)))
+        self.assertEqual(self.store.rows, 1)
+
+    def test_rollups(self):
+        """测试5分钟汇总 min/max/mean"""
+        # 两个完整的5分钟桶 + 一个未完成桶
+        self.store.append_many(make_record(i * 60.0, float(i)) for i in range(11))
+
+        rollup = self.store.rollup(300, include_partial=False)
+        self.assertEqual(list(rollup["start"]), [0.0, 300.0])
+        self.assertEqual(list(rollup["cpu_usage_min"]), [0.0, 5.0])
+        self.assertEqual(list(rollup["cpu_usage_max"]), [4.0, 9.0])
+        self.assertEqual(list(rollup["cpu_usage_mean"]), [2.0, 7.0])
+
+        with_partial = self.store.rollup(300)
+        self.assertEqual(list(with_partial["count"]), [5, 5, 1])
+
+    def test_missing_samples_stored_as_nan(self):
+        """测试采集失败 (None) 的指标存为 NaN，且不计入汇总"""
+        records = [make_record(i * 60.0, float(i)) for i in range(5)]
+        records[1]["cpu_usage"] = None
+        self.store.append_many(records)
+        self.assertTrue(np.isnan(self.store.read()["cpu_usage"][1]))
+        rollup = self.store.rollup(300)
+        self.assertEqual(list(rollup["cpu_usage_mean"]), [(0 + 2 + 3 + 4) / 4])
+        self.assertEqual(list(rollup["memory_usage_max"]), [2.0])
+
+    def test_reopen_restores_partial_bucket(self):
+        """测试重新打开后未完成的汇总桶可继续累加"""
+        self.store.append_many(make_record(i * 60.0, float(i)) for i in range(7))
+        reopened = ColumnStore(self.root)
+        reopened.append_many(make_record(i * 60.0, float(i)) for i in range(7, 11))
+
+        rollup = reopened.rollup(300, include_partial=False)
+        self.assertEqual(list(rollup["count"]), [5, 5])
+        self.assertEqual(list(rollup["cpu_usage_mean"]), [2.0, 7.0])
+
+    def test_repair_truncated_column(self):
+        """测试中断写入导致列长度不一致时自动截断"""
+        self.store.append_many(make_record(i * 60.0, float(i)) for i in range(3))
+        with open(os.path.join(self.root, "cpu_usage.f4"), "ab") as f:
+            f.write(b"\x00\x00\x80\x3f")
+        self.assertEqual(ColumnStore(self.root).rows, 3)
+
+    def test_import_jsonl(self):
+        """测试导入现有健康日志"""
+        log_path = os.path.join(self.root, "fortress_health_20240101.log")
+        with open(log_path, "w", encoding="utf-8") as f:
+            for minute in range(3):
+                record = make_record(0, 10.0 + minute)
+                record["timestamp"] = f"2024-01-01T00:0{minute}:00"
+                f.write(json.dumps(record) + "\n")
+            f.write("not json\n")
+
+        self.assertEqual(self.store.import_jsonl([log_path]), 3)
+        # 重复导入不会产生重复数据
+        self.assertEqual(self.store.import_jsonl([log_path]), 0)
+        self.assertEqual(list(self.store.read()["cpu_usage"]), [10.0, 11.0, 12.0])
+
+
+if __name__ == "__main__":
+    unittest.main()